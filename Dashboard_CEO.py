@@ -16,6 +16,10 @@ from datetime import date, datetime
 import math
 import subprocess
 import os
+import functools
+
+from armazenamento import cache_por_versao
+from pacote_dados import PacoteDados
 
 # ========== CONFIGURAÇÃO ==========
 st.set_page_config(
@@ -76,7 +80,8 @@ TRI = trimestre(SEM)
 
 
 # ========== CARREGAMENTO DE DADOS ==========
-@st.cache_data(ttl=300)
+# Cache invalidado pela mudanca do CSV (ou nova extracao), sem TTL
+@cache_por_versao(lambda nome: [DATA_DIR / nome])
 def carregar(nome):
     path = DATA_DIR / nome
     if path.exists():
@@ -85,18 +90,24 @@ def carregar(nome):
 
 
 def carregar_tudo():
-    return {
-        "prof": carregar("score_Professor.csv"),
-        "abc": carregar("score_Aluno_ABC.csv"),
-        "exec": carregar("resumo_Executivo.csv"),
-        "aulas": carregar("fato_Aulas.csv"),
-        "ocorr": carregar("fato_Ocorrencias.csv"),
-        "cruz": carregar("fato_Cruzamento.csv"),
-        "engaj": carregar("fato_Engajamento_SAE.csv"),
-        "notas": carregar("fato_Notas_Historico.csv"),
-        "alunos": carregar("dim_Alunos.csv"),
-        "disc": carregar("dim_Disciplinas.csv"),
+    """Pacote preguicoso: cada CSV so e lido quando a aba o usa; o que o
+    painel usou na execucao anterior ja comeca a carregar em segundo plano."""
+    arquivos = {
+        "prof": "score_Professor.csv",
+        "abc": "score_Aluno_ABC.csv",
+        "exec": "resumo_Executivo.csv",
+        "aulas": "fato_Aulas.csv",
+        "ocorr": "fato_Ocorrencias.csv",
+        "cruz": "fato_Cruzamento.csv",
+        "engaj": "fato_Engajamento_SAE.csv",
+        "notas": "fato_Notas_Historico.csv",
+        "alunos": "dim_Alunos.csv",
+        "disc": "dim_Disciplinas.csv",
     }
+    return PacoteDados(
+        {chave: functools.partial(carregar, nome) for chave, nome in arquivos.items()},
+        pagina="Dashboard_CEO",
+    )
 
 
 # ========== CSS ==========
@@ -151,13 +162,13 @@ st.markdown("""
 # ========== AUTENTICAÇÃO DESATIVADA (acesso direto CEO) ==========
 
 
+# Dados (pre-carga em segundo plano enquanto o cabecalho e desenhado)
+dados = carregar_tudo()
+
 # ========== HEADER ==========
 st.markdown("# 🎯 Excelência Pedagógica")
 st.markdown(f'<p class="subtitle">Semana {SEM} | Capítulo {CAP} esperado | {TRI} | {HOJE.strftime("%d/%m/%Y")}</p>', unsafe_allow_html=True)
 
-# Dados
-dados = carregar_tudo()
-
 # Sidebar: filtros + atualizar
 with st.sidebar:
     st.markdown("### Filtros")
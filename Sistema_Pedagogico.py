@@ -76,6 +76,10 @@ logout_button()
 
 role = get_user_role()
 
+# Leituras consistentes: a versao dos fatos fica fixa durante esta execucao
+from versoes_dados import fixar_versoes
+fixar_versoes()
+
 # ========== REGISTRO DE PAGINAS POR SECAO ==========
 
 sections = {}
@@ -0,0 +1,231 @@
+"""
+Visoes agregadas de frequencia, materializadas na extracao.
+
+carregar_frequencia_alunos agrupava a tabela de chamadas inteira a cada
+cache miss com tres lambdas Python ((x == 'P').sum() ...), e o score ABC e
+as paginas 19/20/23 repetiam a agregacao. extrair_frequencia_v3 agora publica
+tres visoes prontas (CSV + Parquet, lidas com ler_tabela):
+
+  - resumo_Frequencia_Aluno_Disciplina  aluno x disciplina (com nome/unidade/serie/turma)
+  - resumo_Frequencia_Turma_Dia         unidade x serie x turma x data_aula
+  - resumo_Frequencia_Unidade_Semana    unidade x semana_letiva
+
+Todas com total_aulas (chamadas P/F/J), presencas, faltas, justificadas e
+pct_frequencia = (presencas + justificadas) / total_aulas * 100.
+
+Contagem vetorizada: a presenca vira colunas 0/1 e um unico groupby().sum()
+produz os quatro contadores. Como contagens sao aditivas, a atualizacao e
+incremental: atualizar_agregados(novas=..., removidas=...) agrega so as
+chamadas que mudaram e soma (ou subtrai) nas visoes existentes, sem
+reagrupar a tabela inteira.
+
+Funcoes publicas:
+  - agregar_chamadas(df, visao)          — agrega chamadas brutas numa visao
+  - diferenca_chamadas(antes, depois)    — (novas, removidas) entre duas extracoes
+  - atualizar_agregados(diretorio, novas=None, removidas=None)
+  - visoes_em_dia(diretorio=None)        — visoes refletem as chamadas atuais?
+  - ler_agregado(visao, diretorio=None)  — DataFrame da visao (vazio se ausente)
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from armazenamento import DATA_DIR, ler_tabela, publicar_tabela
+
+logger = logging.getLogger("agregados_frequencia")
+
+INICIO_ANO_LETIVO = datetime(2026, 1, 26)
+
+ARQUIVO_CHAMADAS = "fato_Frequencia_Aluno.csv"
+
+VISOES = {
+    'aluno_disciplina': {
+        'csv': 'resumo_Frequencia_Aluno_Disciplina.csv',
+        'chaves': ['aluno_id', 'aluno_nome', 'unidade', 'serie', 'turma', 'disciplina'],
+    },
+    'turma_dia': {
+        'csv': 'resumo_Frequencia_Turma_Dia.csv',
+        'chaves': ['unidade', 'serie', 'turma', 'data_aula'],
+    },
+    'unidade_semana': {
+        'csv': 'resumo_Frequencia_Unidade_Semana.csv',
+        'chaves': ['unidade', 'semana_letiva'],
+    },
+}
+"""Visoes materializadas: arquivo de saida e colunas de agrupamento."""
+
+CONTADORES = ['total_aulas', 'presencas', 'faltas', 'justificadas']
+CHAMADA_FEITA = ['P', 'F', 'J']
+
+# Colunas que identificam uma chamada para detectar o que mudou entre extracoes
+_COLUNAS_CHAMADA = ['aluno_id', 'aula_id', 'aluno_nome', 'unidade', 'serie', 'turma',
+                    'disciplina', 'data_aula', 'presenca']
+
+
+# ========== AGREGACAO ==========
+
+def _preparar_chamadas(df):
+    """Chamadas feitas (P/F/J) com contadores 0/1 e semana_letiva."""
+    presenca = df['presenca'].astype(object)
+    feita = presenca.isin(CHAMADA_FEITA)
+    df = df.loc[feita]
+    presenca = presenca[feita]
+    base = pd.DataFrame({
+        'total_aulas': 1,
+        'presencas': (presenca == 'P').astype('int64'),
+        'faltas': (presenca == 'F').astype('int64'),
+        'justificadas': (presenca == 'J').astype('int64'),
+    }, index=df.index)
+    for col in {c for v in VISOES.values() for c in v['chaves']} - {'semana_letiva'}:
+        if col in df.columns:
+            base[col] = df[col]
+    if 'data_aula' in df.columns:
+        data = pd.to_datetime(df['data_aula'], errors='coerce')
+        base['data_aula'] = data
+        base['semana_letiva'] = ((data - INICIO_ANO_LETIVO).dt.days // 7 + 1).clip(lower=1)
+    return base
+
+
+def _com_pct(agg):
+    agg['pct_frequencia'] = (
+        (agg['presencas'] + agg['justificadas']) / agg['total_aulas'].clip(lower=1) * 100
+    ).round(1)
+    return agg
+
+
+def _agregar(base, visao):
+    chaves = [c for c in VISOES[visao]['chaves'] if c in base.columns]
+    if base.empty:
+        return pd.DataFrame(columns=chaves + CONTADORES + ['pct_frequencia'])
+    agg = (base.groupby(chaves, observed=True, dropna=False)[CONTADORES]
+           .sum().reset_index())
+    return _com_pct(agg)
+
+
+def agregar_chamadas(df, visao):
+    """Agrega chamadas brutas (formato fato_Frequencia_Aluno) numa visao.
+
+    Args:
+        df: DataFrame de chamadas (presenca P/F/J; demais linhas ignoradas)
+        visao: 'aluno_disciplina', 'turma_dia' ou 'unidade_semana'
+    """
+    return _agregar(_preparar_chamadas(df), visao)
+
+
+# ========== INCREMENTAL ==========
+
+def diferenca_chamadas(antes, depois):
+    """Chamadas que entraram e que sairam entre duas extracoes.
+
+    Uma chamada alterada (ex.: F -> J) aparece nas duas listas.
+
+    Returns:
+        (novas, removidas) — DataFrames no formato de fato_Frequencia_Aluno
+    """
+    cols = [c for c in _COLUNAS_CHAMADA if c in depois.columns and c in antes.columns]
+
+    def _chaves(df):
+        k = df[cols].astype(object).astype(str)
+        # Multiconjunto: linhas repetidas contam separadamente
+        k['_n'] = k.groupby(cols, sort=False).cumcount()
+        return k
+
+    ka, kd = _chaves(antes), _chaves(depois)
+    m = kd.reset_index().merge(ka.reset_index(), on=cols + ['_n'], how='outer',
+                               suffixes=('_depois', '_antes'), indicator=True)
+    novas = depois.loc[m.loc[m['_merge'] == 'left_only', 'index_depois'].astype('int64')]
+    removidas = antes.loc[m.loc[m['_merge'] == 'right_only', 'index_antes'].astype('int64')]
+    return novas, removidas
+
+
+def _combinar(atual, delta, visao):
+    chaves = [c for c in VISOES[visao]['chaves'] if c in delta.columns]
+    if atual.empty:
+        combinado = delta
+    else:
+        atual = atual.astype({c: object for c in chaves if c in atual.columns})
+        delta = delta.astype({c: object for c in chaves})
+        combinado = (pd.concat([atual[chaves + CONTADORES], delta[chaves + CONTADORES]],
+                               ignore_index=True)
+                     .groupby(chaves, dropna=False, sort=False)[CONTADORES].sum()
+                     .reset_index())
+    combinado = combinado[combinado['total_aulas'] > 0]
+    return _com_pct(combinado.sort_values(chaves, kind='stable').reset_index(drop=True))
+
+
+def _gravar(df, path_csv):
+    tmp = path_csv.with_suffix('.tmp')
+    df.to_csv(tmp, index=False)
+    tmp.replace(path_csv)
+    publicar_tabela(path_csv)
+
+
+def atualizar_agregados(diretorio=None, novas=None, removidas=None):
+    """(Re)materializa as visoes de frequencia.
+
+    Sem novas/removidas: reconstroi as visoes a partir de fato_Frequencia_Aluno.
+    Com novas/removidas: agrega so essas chamadas e soma/subtrai nas visoes
+    ja gravadas (visao ausente e reconstruida inteira).
+
+    Returns:
+        dict {visao: linhas gravadas}
+    """
+    diretorio = Path(diretorio) if diretorio else DATA_DIR
+    incremental = novas is not None or removidas is not None
+    if incremental:
+        partes = []
+        if novas is not None and not novas.empty:
+            partes.append(_preparar_chamadas(novas))
+        if removidas is not None and not removidas.empty:
+            neg = _preparar_chamadas(removidas)
+            neg[CONTADORES] = -neg[CONTADORES]
+            partes.append(neg)
+        base = pd.concat(partes, ignore_index=True) if partes else None
+    else:
+        path = diretorio / ARQUIVO_CHAMADAS
+        if not path.exists():
+            return {}
+        base = _preparar_chamadas(ler_tabela(path))
+
+    gravadas = {}
+    for visao, spec in VISOES.items():
+        path_csv = diretorio / spec['csv']
+        try:
+            if incremental and path_csv.exists():
+                if base is None:
+                    continue
+                df = _combinar(ler_tabela(path_csv), _agregar(base, visao), visao)
+            elif incremental:
+                df = _agregar(_preparar_chamadas(ler_tabela(diretorio / ARQUIVO_CHAMADAS)), visao)
+            else:
+                df = _agregar(base, visao)
+            _gravar(df, path_csv)
+            gravadas[visao] = len(df)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Visao de frequencia {visao} nao gravada: {e}")
+    return gravadas
+
+
+def visoes_em_dia(diretorio=None):
+    """True se todas as visoes existem e nao sao mais antigas que as chamadas.
+
+    O extrator consulta antes de regravar o CSV: so vale atualizar as visoes
+    incrementalmente se elas refletem a extracao anterior.
+    """
+    diretorio = Path(diretorio) if diretorio else DATA_DIR
+    try:
+        mtime = (diretorio / ARQUIVO_CHAMADAS).stat().st_mtime_ns
+        return all((diretorio / spec['csv']).stat().st_mtime_ns >= mtime for spec in VISOES.values())
+    except OSError:
+        return False
+
+
+# ========== LEITURA ==========
+
+def ler_agregado(visao, diretorio=None):
+    """Le uma visao materializada (DataFrame vazio se ainda nao foi gerada)."""
+    diretorio = Path(diretorio) if diretorio else DATA_DIR
+    return ler_tabela(diretorio / VISOES[visao]['csv'])
@@ -239,8 +239,8 @@ def main():
 
     # Alerta: Disciplinas/series sem nenhum registro
     if not df_horario_filt.empty:
-        slots_esp = set(df_horario_filt.groupby(['unidade', 'serie', 'disciplina']).size().index)
-        slots_real = set(df.groupby(['unidade', 'serie', 'disciplina']).size().index) if not df.empty else set()
+        slots_esp = set(df_horario_filt.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index)
+        slots_real = set(df.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index) if not df.empty else set()
         slots_sem = slots_esp - slots_real
         if len(slots_sem) > 0:
             exemplos = [f"{d} ({s}, {u})" for u, s, d in sorted(slots_sem)[:5]]
@@ -316,7 +316,7 @@ def main():
 
     with col_g1:
         # Por unidade
-        df_un = df.groupby('unidade').size().reset_index(name='aulas')
+        df_un = df.groupby('unidade', observed=True).size().reset_index(name='aulas')
         fig = px.pie(df_un, values='aulas', names='unidade',
                     title='Distribuição por Unidade',
                     color='unidade',
@@ -325,7 +325,7 @@ def main():
 
     with col_g2:
         # Por série com cores corretas
-        df_serie = df.groupby('serie').size().reset_index(name='aulas')
+        df_serie = df.groupby('serie', observed=True).size().reset_index(name='aulas')
         df_serie['ordem'] = df_serie['serie'].apply(lambda x: ORDEM_SERIES.index(x) if x in ORDEM_SERIES else 99)
         df_serie = df_serie.sort_values('ordem')
         fig = px.bar(df_serie, x='aulas', y='serie', orientation='h',
@@ -337,7 +337,7 @@ def main():
     # Timeline semanal
     st.subheader("📅 Evolução Semanal")
     if 'semana_letiva' in df.columns:
-        df_sem = df.groupby(['semana_letiva', 'unidade']).size().reset_index(name='aulas')
+        df_sem = df.groupby(['semana_letiva', 'unidade'], observed=True).size().reset_index(name='aulas')
         fig = px.bar(df_sem, x='semana_letiva', y='aulas', color='unidade',
                     title='Aulas Registradas por Semana Letiva',
                     labels={'semana_letiva': 'Semana', 'aulas': 'Aulas'},
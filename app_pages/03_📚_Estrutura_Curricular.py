@@ -70,7 +70,7 @@ def main():
     """, unsafe_allow_html=True)
 
     # Conta turmas por unidade e série
-    turmas = df.groupby(['unidade', 'serie'])['turma'].nunique().reset_index()
+    turmas = df.groupby(['unidade', 'serie'], observed=True)['turma'].nunique().reset_index()
     turmas_pivot = turmas.pivot(index='serie', columns='unidade', values='turma').fillna(0).astype(int)
 
     # Adiciona total
@@ -80,7 +80,7 @@ def main():
     st.dataframe(turmas_pivot, use_container_width=True)
 
     # Gráfico por unidade
-    turmas_total = df.groupby('unidade')['turma'].nunique().reset_index()
+    turmas_total = df.groupby('unidade', observed=True)['turma'].nunique().reset_index()
     turmas_total.columns = ['Unidade', 'Turmas']
     fig = px.bar(turmas_total, x='Unidade', y='Turmas',
                 title='Total de Turmas por Unidade (Fund II + EM)',
@@ -90,7 +90,7 @@ def main():
     st.plotly_chart(fig, use_container_width=True)
 
     # Gráfico por série com cores corretas
-    turmas_serie = df.groupby('serie')['turma'].nunique().reset_index()
+    turmas_serie = df.groupby('serie', observed=True)['turma'].nunique().reset_index()
     turmas_serie.columns = ['Série', 'Turmas']
     # Ordena as séries
     turmas_serie['ordem'] = turmas_serie['Série'].apply(lambda x: ORDEM_SERIES.index(x) if x in ORDEM_SERIES else 99)
@@ -119,8 +119,8 @@ def main():
     serie_sel = st.selectbox("Selecione a série:", series_disp)
 
     # Calcula aulas por turma (média, que deve ser igual)
-    aulas_turma = df.groupby(['unidade', 'serie', 'turma', 'disciplina']).size().reset_index(name='aulas')
-    media_serie = aulas_turma.groupby(['unidade', 'serie', 'disciplina'])['aulas'].mean().reset_index()
+    aulas_turma = df.groupby(['unidade', 'serie', 'turma', 'disciplina'], observed=True).size().reset_index(name='aulas')
+    media_serie = aulas_turma.groupby(['unidade', 'serie', 'disciplina'], observed=True)['aulas'].mean().reset_index()
 
     # Filtra série selecionada
     df_serie = media_serie[media_serie['serie'] == serie_sel]
@@ -222,12 +222,12 @@ def main():
     """, unsafe_allow_html=True)
 
     # Calcula totais
-    totais = df.groupby('unidade').agg({
+    totais = df.groupby('unidade', observed=True).agg({
         'turma': 'nunique',
         'professor': 'nunique',
         'disciplina': 'nunique'
     }).reset_index()
-    totais['aulas_semana'] = df.groupby('unidade').size().values
+    totais['aulas_semana'] = df.groupby('unidade', observed=True).size().values
     totais.columns = ['Unidade', 'Turmas', 'Professores', 'Disciplinas', 'Aulas/Semana']
 
     # Adiciona aulas por turma (para mostrar que é proporcional)
@@ -259,7 +259,7 @@ def main():
                                (media_serie['serie'].isin(SERIES_FUND_II))]
 
         # Agrupa por disciplina (pega a média entre séries)
-        resumo_fund = ref_fund.groupby('disciplina')['aulas'].mean().reset_index()
+        resumo_fund = ref_fund.groupby('disciplina', observed=True)['aulas'].mean().reset_index()
         resumo_fund.columns = ['Componente', 'Aulas/Semana']
         resumo_fund['Aulas/Semana'] = resumo_fund['Aulas/Semana'].round(0).astype(int)
         resumo_fund = resumo_fund.sort_values('Aulas/Semana', ascending=False)
@@ -279,7 +279,7 @@ def main():
         ref_em = media_serie[(media_serie['unidade'] == 'BV') &
                              (media_serie['serie'].isin(SERIES_EM))]
 
-        resumo_em = ref_em.groupby('disciplina')['aulas'].mean().reset_index()
+        resumo_em = ref_em.groupby('disciplina', observed=True)['aulas'].mean().reset_index()
         resumo_em.columns = ['Componente', 'Aulas/Semana']
         resumo_em['Aulas/Semana'] = resumo_em['Aulas/Semana'].round(0).astype(int)
         resumo_em = resumo_em.sort_values('Aulas/Semana', ascending=False)
@@ -57,26 +57,15 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def estimar_capitulo_real(conteudos):
+def estimar_capitulo_real(caps):
     """
-    Estima o capitulo atual baseado nos conteudos registrados.
-    Procura mencoes a 'capitulo X', 'cap X', 'cap. X' nos textos.
+    Estima o capitulo atual: maior capitulo citado nas aulas do grupo
+    (cap_detectado, indexado na extracao por conteudo_aulas).
     """
-    if conteudos is None or len(conteudos) == 0:
+    if caps is None or len(caps) == 0:
         return None
-    import re
-    max_cap = 0
-    for texto in conteudos:
-        if pd.isna(texto):
-            continue
-        texto = str(texto).lower()
-        # Procura padroes: "capítulo 3", "cap 3", "cap. 3", "capitulo 3"
-        matches = re.findall(r'cap[íi]?t?u?l?o?\.?\s*(\d{1,2})', texto)
-        for m in matches:
-            cap = int(m)
-            if 1 <= cap <= 12 and cap > max_cap:
-                max_cap = cap
-    return max_cap if max_cap > 0 else None
+    caps = pd.Series(caps).dropna()
+    return int(caps.max()) if len(caps) > 0 else None
 
 
 def calcular_progressao_real(df_aulas, df_prog, semana_atual):
@@ -88,16 +77,19 @@ def calcular_progressao_real(df_aulas, df_prog, semana_atual):
     if df_aulas.empty or df_prog.empty:
         return pd.DataFrame()
 
-    # Join via progressao_key
+    # Join via progressao_key — pela tripla de chaves int32 quando disponivel
+    chave = ['disciplina_cod', 'serie_cod', 'semana_letiva']
+    if not all(c in df_aulas.columns and c in df_prog.columns for c in chave):
+        chave = ['progressao_key']
     df_merged = df_aulas.merge(
-        df_prog[['progressao_key', 'capitulo_esperado']].drop_duplicates(subset='progressao_key'),
-        on='progressao_key',
+        df_prog[chave + ['capitulo_esperado']].drop_duplicates(subset=chave),
+        on=chave,
         how='left'
     )
 
     # Agrupa por unidade/serie/disciplina
     resultados = []
-    for (un, serie, disc), grupo in df_merged.groupby(['unidade', 'serie', 'disciplina']):
+    for (un, serie, disc), grupo in df_merged.groupby(['unidade', 'serie', 'disciplina'], observed=True):
         aulas = len(grupo)
         profs = grupo['professor'].nunique()
         prof_nome = grupo['professor'].iloc[0] if len(grupo) > 0 else ''
@@ -107,7 +99,7 @@ def calcular_progressao_real(df_aulas, df_prog, semana_atual):
         cap_esp = int(cap_esperado.max()) if len(cap_esperado) > 0 else calcular_capitulo_esperado(semana_atual)
 
         # Estima capitulo real pelo conteudo
-        cap_real = estimar_capitulo_real(grupo['conteudo'].tolist())
+        cap_real = estimar_capitulo_real(grupo['cap_detectado'])
 
         # Status
         if cap_real is None:
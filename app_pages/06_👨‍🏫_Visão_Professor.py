@@ -12,7 +12,7 @@ from pathlib import Path
 import math
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils import calcular_semana_letiva, calcular_capitulo_esperado, calcular_trimestre, carregar_horario_esperado, carregar_fato_aulas, filtrar_ate_hoje, DATA_DIR, ORDEM_SERIES
+from utils import calcular_semana_letiva, calcular_capitulo_esperado, calcular_trimestre, carregar_horario_esperado, consultar_horario, carregar_fato_aulas, filtrar_ate_hoje, DATA_DIR, ORDEM_SERIES
 
 
 st.markdown("""
@@ -180,7 +180,7 @@ def main():
 
     # Calcular aulas/semana real do horário
     if professor and professor != 'Selecione...' and not df_horario.empty:
-        df_disc = df_horario[(df_horario['professor'] == professor) & (df_horario['disciplina'] == disciplina)]
+        df_disc = consultar_horario(professor=professor, disciplina=disciplina)
         if not df_disc.empty and 'aulas_semana' in df_disc.columns:
             prof_aulas_sem = int(df_disc['aulas_semana'].iloc[0])
         elif not df_disc.empty:
@@ -132,7 +132,7 @@ def main():
             st.subheader("Professores que Mais Registram Tarefas")
             df_tarefa = df_f[df_f['tem_tarefa']]
             if len(df_tarefa) > 0:
-                ranking = df_tarefa.groupby(['professor', 'unidade']).agg(
+                ranking = df_tarefa.groupby(['professor', 'unidade'], observed=True).agg(
                     tarefas=('tarefa', 'count'),
                     disciplinas=('disciplina', 'nunique'),
                     turmas=('turma', 'nunique'),
@@ -165,7 +165,7 @@ def main():
             st.subheader("Menções a Avaliações por Professor")
             df_aval = df_f[mask_avaliacao]
             if len(df_aval) > 0:
-                ranking = df_aval.groupby(['professor', 'unidade']).size().reset_index(name='mencoes')
+                ranking = df_aval.groupby(['professor', 'unidade'], observed=True).size().reset_index(name='mencoes')
                 ranking = ranking.sort_values('mencoes', ascending=False)
                 st.dataframe(ranking.head(15).rename(columns={
                     'professor': 'Professor', 'unidade': 'Unidade', 'mencoes': 'Menções a Avaliação',
@@ -177,7 +177,7 @@ def main():
             st.subheader("Uso de Trilhas Digitais SAE")
             df_trilha = df_f[mask_trilha]
             if len(df_trilha) > 0:
-                ranking = df_trilha.groupby(['professor', 'unidade', 'disciplina']).size().reset_index(name='mencoes')
+                ranking = df_trilha.groupby(['professor', 'unidade', 'disciplina'], observed=True).size().reset_index(name='mencoes')
                 ranking = ranking.sort_values('mencoes', ascending=False)
                 st.dataframe(ranking.head(15).rename(columns={
                     'professor': 'Professor', 'unidade': 'Unidade',
@@ -190,7 +190,7 @@ def main():
             st.subheader("Projetos e Trabalhos")
             df_proj = df_f[mask_projeto]
             if len(df_proj) > 0:
-                ranking = df_proj.groupby(['professor', 'unidade']).size().reset_index(name='projetos')
+                ranking = df_proj.groupby(['professor', 'unidade'], observed=True).size().reset_index(name='projetos')
                 ranking = ranking.sort_values('projetos', ascending=False)
                 st.dataframe(ranking.head(15).rename(columns={
                     'professor': 'Professor', 'unidade': 'Unidade', 'projetos': 'Projetos',
@@ -251,7 +251,7 @@ def main():
 
         with col2:
             # Taxa de tarefa por unidade
-            tarefa_un = df_f.groupby('unidade').agg(
+            tarefa_un = df_f.groupby('unidade', observed=True).agg(
                 total=('conteudo', 'count'),
                 com_tarefa=('tem_tarefa', 'sum'),
             ).reset_index()
@@ -265,7 +265,7 @@ def main():
 
         # Por serie
         st.subheader("Taxa de Tarefa por Série")
-        tarefa_serie = df_f.groupby('serie').agg(
+        tarefa_serie = df_f.groupby('serie', observed=True).agg(
             total=('conteudo', 'count'),
             com_tarefa=('tem_tarefa', 'sum'),
         ).reset_index()
@@ -283,7 +283,7 @@ def main():
 
         # Por disciplina
         st.subheader("Taxa de Tarefa por Disciplina")
-        tarefa_disc = df_f.groupby('disciplina').agg(
+        tarefa_disc = df_f.groupby('disciplina', observed=True).agg(
             total=('conteudo', 'count'),
             com_tarefa=('tem_tarefa', 'sum'),
         ).reset_index()
@@ -397,7 +397,7 @@ def main():
         # Evolucao por unidade
         if un_sel == 'TODAS':
             st.subheader("Evolução por Unidade")
-            sem_un = evolucao.groupby(['semana_letiva', 'unidade']).agg(
+            sem_un = evolucao.groupby(['semana_letiva', 'unidade'], observed=True).agg(
                 com_tarefa=('tem_tarefa', 'sum'),
                 total=('conteudo', 'count'),
             ).reset_index()
@@ -146,10 +146,10 @@ def main():
 
         # 1. Disciplinas sem registro (unidade+serie+disciplina no horario mas sem aulas)
         slots_esperados = set(
-            df_horario_filt.groupby(['unidade', 'serie', 'disciplina']).size().index
+            df_horario_filt.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index
         )
         slots_com_aula = set(
-            df_aulas_filt.groupby(['unidade', 'serie', 'disciplina']).size().index
+            df_aulas_filt.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index
         )
         slots_sem = slots_esperados - slots_com_aula
 
@@ -385,10 +385,10 @@ def main():
                 # 1. Disciplinas sem registro (slot-based: compara combinações unidade+serie+disciplina)
                 if 'Professores sem registro' in tipos_divergencia:
                     slots_esperados = set(
-                        df_un_horario.groupby(['serie', 'disciplina']).size().index
+                        df_un_horario.groupby(['serie', 'disciplina'], observed=True).size().index
                     )
                     slots_com_aula = set(
-                        df_un_aulas.groupby(['serie', 'disciplina']).size().index
+                        df_un_aulas.groupby(['serie', 'disciplina'], observed=True).size().index
                     )
                     slots_sem = sorted(slots_esperados - slots_com_aula)
 
@@ -528,8 +528,8 @@ def main():
                 df_un_horario = df_horario_rel[df_horario_rel['unidade'] == un] if unidade_rel == 'TODAS' else df_horario_rel
 
                 if 'Professores sem registro' in tipos_divergencia:
-                    slots_esp = set(df_un_horario.groupby(['serie', 'disciplina']).size().index)
-                    slots_reg = set(df_un_aulas.groupby(['serie', 'disciplina']).size().index)
+                    slots_esp = set(df_un_horario.groupby(['serie', 'disciplina'], observed=True).size().index)
+                    slots_reg = set(df_un_aulas.groupby(['serie', 'disciplina'], observed=True).size().index)
                     for (serie, disc) in sorted(slots_esp - slots_reg):
                         todas_divergencias.append({
                             'Unidade': un,
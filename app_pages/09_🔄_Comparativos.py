@@ -135,11 +135,11 @@ def main():
             df_disc = df_disc[df_disc['serie'] == serie_sel]
 
         if len(df_disc) > 0:
-            hor_slots = df_horario.groupby(['unidade', 'serie', 'disciplina']).size()
+            hor_slots = df_horario.groupby(['unidade', 'serie', 'disciplina'], observed=True).size()
 
             # Agrupa por turma (cada turma = 1 linha)
             turma_comp = []
-            for _, row in df_disc.groupby(['turma', 'professor', 'unidade', 'serie']).agg(
+            for _, row in df_disc.groupby(['turma', 'professor', 'unidade', 'serie'], observed=True).agg(
                 aulas=('data', 'count'),
                 conteudos=('conteudo', lambda x: list(x.dropna().unique())),
                 ultima_data=('data', 'max'),
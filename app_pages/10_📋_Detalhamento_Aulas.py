@@ -284,7 +284,7 @@ def main():
 
     with col_a1:
         st.subheader("Top 10 Professores (mais aulas)")
-        top_profs = df_filtrado.groupby('professor').size().reset_index(name='aulas')
+        top_profs = df_filtrado.groupby('professor', observed=True).size().reset_index(name='aulas')
         top_profs = top_profs.nlargest(10, 'aulas')
         st.dataframe(top_profs, use_container_width=True, hide_index=True)
 
@@ -68,7 +68,7 @@ def calcular_metricas_professor(df_aulas, df_horario, semana_atual):
     hoje = _hoje()
     resultados = []
 
-    for prof, df_prof in df_aulas.groupby('professor'):
+    for prof, df_prof in df_aulas.groupby('professor', observed=True):
         unidade = df_prof['unidade'].iloc[0]
         disciplinas = sorted(df_prof['disciplina'].unique())
         series = df_prof['serie'].unique()
@@ -106,7 +106,7 @@ def detectar_alertas(df_aulas, df_horario, semana_atual):
 
     # Pre-calcula aulas por professor por semana
     if 'semana_letiva' in df_aulas.columns:
-        prof_semana = df_aulas.groupby(['professor', 'semana_letiva']).size().reset_index(name='aulas')
+        prof_semana = df_aulas.groupby(['professor', 'semana_letiva'], observed=True).size().reset_index(name='aulas')
     else:
         prof_semana = pd.DataFrame()
 
@@ -180,7 +180,7 @@ def detectar_alertas(df_aulas, df_horario, semana_atual):
                 })
 
     # --- ALERTA LARANJA: Curriculo Atrasado (por disciplina/serie) ---
-    for (un, serie, disc), grupo_hor in df_horario.groupby(['unidade', 'serie', 'disciplina']):
+    for (un, serie, disc), grupo_hor in df_horario.groupby(['unidade', 'serie', 'disciplina'], observed=True):
         df_disc_aulas = df_aulas[
             (df_aulas['unidade'] == un) &
             (df_aulas['serie'] == serie) &
@@ -207,7 +207,7 @@ def detectar_alertas(df_aulas, df_horario, semana_atual):
             })
 
     # --- ALERTA ROSA: Disciplina Orfa ---
-    for (un, serie, disc), grupo_hor in df_horario.groupby(['unidade', 'serie', 'disciplina']):
+    for (un, serie, disc), grupo_hor in df_horario.groupby(['unidade', 'serie', 'disciplina'], observed=True):
         df_disc_aulas = df_aulas[
             (df_aulas['unidade'] == un) &
             (df_aulas['serie'] == serie) &
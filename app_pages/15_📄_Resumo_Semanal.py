@@ -52,9 +52,9 @@ def calcular_metricas_unidade(df_aulas, df_horario, semana):
         taxa_conteudo = (com_conteudo / total_aulas * 100) if total_aulas > 0 else 0
 
         # Slots sem registro na semana (compara combinações serie+disciplina)
-        slots_esperados = set(df_hor_un.groupby(['serie', 'disciplina']).size().index)
+        slots_esperados = set(df_hor_un.groupby(['serie', 'disciplina'], observed=True).size().index)
         df_un_sem = df_un[(df_un['data'] >= inicio_semana) & (df_un['data'] <= fim_semana)]
-        slots_com_aula = set(df_un_sem.groupby(['serie', 'disciplina']).size().index) if not df_un_sem.empty else set()
+        slots_com_aula = set(df_un_sem.groupby(['serie', 'disciplina'], observed=True).size().index) if not df_un_sem.empty else set()
         profs_sem = len(slots_esperados - slots_com_aula)
 
         resultados.append({
@@ -213,14 +213,14 @@ def gerar_resumo_reuniao(semana, cap_esperado, trimestre, df_metricas, df_aulas,
     for un in sorted(df_aulas['unidade'].unique()):
         nome_un = UNIDADES_NOMES.get(un, un)
         df_hor_un = df_horario[df_horario['unidade'] == un]
-        slots_esperados = set(df_hor_un.groupby(['serie', 'disciplina']).size().index)
+        slots_esperados = set(df_hor_un.groupby(['serie', 'disciplina'], observed=True).size().index)
 
         df_un_sem = df_aulas[
             (df_aulas['unidade'] == un) &
             (df_aulas['data'] >= inicio_semana) &
             (df_aulas['data'] <= fim_semana)
         ]
-        slots_com = set(df_un_sem.groupby(['serie', 'disciplina']).size().index) if not df_un_sem.empty else set()
+        slots_com = set(df_un_sem.groupby(['serie', 'disciplina'], observed=True).size().index) if not df_un_sem.empty else set()
         slots_sem = sorted(slots_esperados - slots_com)
 
         if slots_sem:
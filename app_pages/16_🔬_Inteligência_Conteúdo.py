@@ -5,7 +5,6 @@ Análise profunda do campo conteúdo para extrair capítulos,
 medir qualidade dos registros e detectar alinhamento com SAE.
 """
 
-import re
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -24,91 +23,38 @@ from config_cores import CORES_SERIES, CORES_UNIDADES, ORDEM_SERIES
 from auth import get_user_unit
 
 # ========== FUNCOES DE ANALISE ==========
+# Capitulo (cap_detectado), pagina (pagina_ref) e tipo de aula (tipo_aula)
+# vem prontos em fato_Aulas — calculados na extracao (conteudo_aulas.py).
+# Esta pagina aceita "Unidade N" / "Modulo N" (cap_unidade) na falta de capitulo.
 
-# Regex para detectar capitulos no conteudo
-CAP_PATTERNS = [
-    r'[Cc]ap(?:ítulo|itulo)?\.?\s*(\d{1,2})',
-    r'[Cc]apítulo\s+(\d{1,2})',
-    r'[Uu]nidade\s+(\d{1,2})',
-    r'[Mm]ódulo\s+(\d{1,2})',
-]
-
-# Palavras-chave que indicam atividade avaliativa
-KEYWORDS_AVALIACAO = ['prova', 'avaliação', 'avaliaç', 'simulado', 'teste', 'a1', 'a2']
-KEYWORDS_PRATICA = ['atividade', 'exercício', 'exercicio', 'resolução', 'correção', 'tarefa']
-KEYWORDS_EXPOSICAO = ['exposição', 'explicação', 'aula expositiva', 'apresentação', 'conteúdo']
-KEYWORDS_PROJETO = ['projeto', 'trabalho', 'pesquisa', 'seminário']
-KEYWORDS_LEITURA = ['leitura', 'livro', 'texto', 'interpretação', 'pp.', 'pág']
-
-
-def extrair_capitulo(texto):
-    """Extrai numero do capitulo mencionado no conteudo."""
-    if pd.isna(texto) or texto in ('.', '', ','):
-        return None
-    for pattern in CAP_PATTERNS:
-        match = re.search(pattern, str(texto))
-        if match:
-            cap = int(match.group(1))
-            if 1 <= cap <= 12:
-                return cap
-    return None
-
-
-def classificar_tipo_aula(texto):
-    """Classifica o tipo de atividade descrita no conteudo."""
-    if pd.isna(texto) or texto in ('.', '', ','):
-        return 'Vazio'
-    texto_lower = str(texto).lower()
-    if any(k in texto_lower for k in KEYWORDS_AVALIACAO):
-        return 'Avaliativa'
-    if any(k in texto_lower for k in KEYWORDS_PROJETO):
-        return 'Projeto'
-    if any(k in texto_lower for k in KEYWORDS_PRATICA):
-        return 'Pratica'
-    if any(k in texto_lower for k in KEYWORDS_LEITURA):
-        return 'Leitura'
-    if any(k in texto_lower for k in KEYWORDS_EXPOSICAO):
-        return 'Expositiva'
-    return 'Outro'
-
-
-def calcular_score_qualidade(row):
-    """Score 0-100 de qualidade do registro."""
-    conteudo = str(row.get('conteudo', '')) if pd.notna(row.get('conteudo')) else ''
-    tarefa = str(row.get('tarefa', '')) if pd.notna(row.get('tarefa')) else ''
-
-    score = 0
-
-    # Conteudo preenchido (0-40)
-    if conteudo and conteudo not in ('.', ',', '-'):
-        length = len(conteudo)
-        if length >= 80:
-            score += 40
-        elif length >= 40:
-            score += 30
-        elif length >= 15:
-            score += 20
-        else:
-            score += 10
 
-    # Tarefa preenchida (0-20)
-    if tarefa and tarefa not in ('.', ',', '-'):
-        score += 20
+def capitulo_da_aula(df):
+    """cap_detectado, ou unidade/modulo citado quando nao ha capitulo."""
+    return df['cap_detectado'].fillna(df['cap_unidade'])
+
+_SEM_TEXTO = ['.', ',', '-']
 
-    # Mencao a capitulo (0-20)
-    if extrair_capitulo(conteudo):
-        score += 20
 
-    # Mencao a pagina do livro (0-10)
-    if re.search(r'p[pg]?\.\s*\d+|página\s+\d+', conteudo, re.IGNORECASE):
-        score += 10
+def _pontos_texto(textos, pontos_por_tamanho):
+    """Pontos por texto preenchido; pontos_por_tamanho = [(tam_min, pontos)...]."""
+    textos = textos.astype(object).fillna('').astype(str)
+    preenchido = (textos != '') & ~textos.isin(_SEM_TEXTO)
+    tamanho = textos.str.len()
+    pontos = pd.Series(0, index=textos.index)
+    for tam_min, valor in pontos_por_tamanho:
+        pontos = pontos.mask(tamanho >= tam_min, valor)
+    return pontos.where(preenchido, 0)
 
-    # Tipo de atividade identificavel (0-10)
-    tipo = classificar_tipo_aula(conteudo)
-    if tipo not in ('Vazio', 'Outro'):
-        score += 10
 
-    return min(100, score)
+def calcular_score_qualidade(df):
+    """Score 0-100 de qualidade de cada registro (vetorizado)."""
+    score = _pontos_texto(df['conteudo'], [(0, 10), (15, 20), (40, 30), (80, 40)])   # 0-40
+    if 'tarefa' in df.columns:
+        score += _pontos_texto(df['tarefa'], [(0, 20)])                               # 0-20
+    score += capitulo_da_aula(df).notna().astype(int) * 20                           # capitulo
+    score += df['pagina_ref'].notna().astype(int) * 10                                # pagina do livro
+    score += (~df['tipo_aula'].astype(str).isin(['Vazio', 'Outro'])).astype(int) * 10  # tipo identificavel
+    return score.clip(upper=100)
 
 
 def main():
@@ -132,10 +78,10 @@ def main():
     semana_atual = calcular_semana_letiva(hoje)
     cap_esperado = calcular_capitulo_esperado(semana_atual)
 
-    # Enriquece dados
-    df['capitulo_detectado'] = df['conteudo'].apply(extrair_capitulo)
-    df['tipo_aula'] = df['conteudo'].apply(classificar_tipo_aula)
-    df['score_qualidade'] = df.apply(calcular_score_qualidade, axis=1)
+    # Enriquece dados (capitulo e tipo de aula ja vem do indice de conteudo)
+    df['capitulo_detectado'] = capitulo_da_aula(df)
+    df['tipo_aula'] = df['tipo_aula'].astype(str)
+    df['score_qualidade'] = calcular_score_qualidade(df)
 
     # ========== FILTROS ==========
     col_f1, col_f2, col_f3, col_f4 = st.columns(4)
@@ -210,7 +156,7 @@ def main():
         """)
 
         # Agrupa por professor
-        prof_qual = df_f.groupby(['professor', 'unidade']).agg(
+        prof_qual = df_f.groupby(['professor', 'unidade'], observed=True).agg(
             aulas=('conteudo', 'count'),
             score_medio=('score_qualidade', 'mean'),
             vazios=('tipo_aula', lambda x: (x == 'Vazio').sum()),
@@ -317,7 +263,7 @@ def main():
             pivot = df_cap[df_cap['capitulo_detectado'].notna()].copy()
             pivot['capitulo_detectado'] = pivot['capitulo_detectado'].astype(int)
 
-            heat = pivot.groupby(['serie', 'capitulo_detectado']).size().reset_index(name='aulas')
+            heat = pivot.groupby(['serie', 'capitulo_detectado'], observed=True).size().reset_index(name='aulas')
             heat_pivot = heat.pivot(index='serie', columns='capitulo_detectado', values='aulas').fillna(0)
 
             # Reordenar series
@@ -416,7 +362,7 @@ def main():
 
         # Por unidade
         st.subheader("Tipos por Unidade")
-        tipo_un = df_f.groupby(['unidade', 'tipo_aula']).size().reset_index(name='qtd')
+        tipo_un = df_f.groupby(['unidade', 'tipo_aula'], observed=True).size().reset_index(name='qtd')
         fig = px.bar(tipo_un, x='unidade', y='qtd', color='tipo_aula',
                     title='Tipos de Atividade por Unidade',
                     color_discrete_map=cores_tipo,
@@ -425,7 +371,7 @@ def main():
 
         # Por serie
         st.subheader("Tipos por Série")
-        tipo_serie = df_f.groupby(['serie', 'tipo_aula']).size().reset_index(name='qtd')
+        tipo_serie = df_f.groupby(['serie', 'tipo_aula'], observed=True).size().reset_index(name='qtd')
         # Ordena series
         tipo_serie['ordem'] = tipo_serie['serie'].apply(
             lambda x: ORDEM_SERIES.index(x) if x in ORDEM_SERIES else 99)
@@ -444,7 +390,7 @@ def main():
         # Alerta 1: Professores com muitos registros vazios
         st.subheader("🔴 Professores com Registros Vazios Excessivos")
 
-        prof_vazio = df_f.groupby(['professor', 'unidade']).agg(
+        prof_vazio = df_f.groupby(['professor', 'unidade'], observed=True).agg(
             total=('conteudo', 'count'),
             vazios=('tipo_aula', lambda x: (x == 'Vazio').sum()),
         ).reset_index()
@@ -486,7 +432,7 @@ def main():
         # Alerta 3: Score abaixo da media
         st.subheader("📉 Professores com Score Abaixo de 30")
 
-        prof_baixo = df_f.groupby(['professor', 'unidade']).agg(
+        prof_baixo = df_f.groupby(['professor', 'unidade'], observed=True).agg(
             score=('score_qualidade', 'mean'),
             aulas=('conteudo', 'count'),
         ).reset_index()
@@ -5,7 +5,6 @@ Visao cross-disciplina para uma turma/serie:
 saude da turma, alinhamento entre disciplinas, gaps.
 """
 
-import re
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -26,25 +25,6 @@ from config_cores import CORES_SERIES, CORES_UNIDADES, ORDEM_SERIES
 
 from auth import get_user_unit
 
-# Regex para detectar capitulos
-CAP_PATTERNS = [
-    r'[Cc]ap(?:ítulo|itulo)?\.?\s*(\d{1,2})',
-    r'[Uu]nidade\s+(\d{1,2})',
-]
-
-
-def extrair_capitulo(texto):
-    if pd.isna(texto) or texto in ('.', '', ','):
-        return None
-    for pattern in CAP_PATTERNS:
-        match = re.search(pattern, str(texto))
-        if match:
-            cap = int(match.group(1))
-            if 1 <= cap <= 12:
-                return cap
-    return None
-
-
 @st.cache_data(ttl=300)
 def calcular_saude_turma(df_turma, df_horario, semana, unidade, serie):
     """Calcula score de saude da turma (0-100)."""
@@ -100,8 +80,8 @@ def main():
     semana = calcular_semana_letiva(hoje)
     cap_esperado = calcular_capitulo_esperado(semana)
 
-    # Enriquece
-    df['capitulo_detectado'] = df['conteudo'].apply(extrair_capitulo)
+    # Enriquece: "Unidade N" / "Modulo N" (cap_unidade) vale como capitulo so aqui e na pagina 16
+    df['capitulo_detectado'] = df['cap_detectado'].fillna(df['cap_unidade'])
 
     # ========== FILTROS ==========
     col_f1, col_f2, col_f3, col_f4 = st.columns(4)
@@ -409,7 +389,7 @@ def main():
         timeline_data = df_turma.groupby([
             df_turma['data'].dt.strftime('%d/%m'),
             'professor'
-        ]).size().reset_index(name='aulas')
+        ], observed=True).size().reset_index(name='aulas')
         timeline_data.columns = ['Data', 'Professor', 'Aulas']
 
         if len(timeline_data) > 0:
@@ -445,7 +425,7 @@ def main():
         # Contagem por disciplina
         st.subheader("Distribuição de Aulas por Disciplina")
 
-        disc_count = df_turma.groupby('disciplina').size().reset_index(name='aulas')
+        disc_count = df_turma.groupby('disciplina', observed=True).size().reset_index(name='aulas')
         disc_count = disc_count.sort_values('aulas', ascending=False)
 
         fig = px.bar(disc_count, x='disciplina', y='aulas',
@@ -161,7 +161,7 @@ def main():
             agg_dict['faltas'] = ('faltas', 'sum')
         if 'justificadas' in df.columns:
             agg_dict['justificadas'] = ('justificadas', 'sum')
-        freq_geral = df.groupby(group_aluno_cols).agg(**agg_dict).reset_index()
+        freq_geral = df.groupby(group_aluno_cols, observed=True).agg(**agg_dict).reset_index()
         if 'presencas' in freq_geral.columns:
             just = freq_geral['justificadas'] if 'justificadas' in freq_geral.columns else 0
             freq_geral['pct_frequencia'] = ((freq_geral['presencas'] + just) / freq_geral['total_aulas'].clip(lower=1) * 100).round(1)
@@ -205,7 +205,7 @@ def main():
 
         if 'unidade' in df.columns and 'pct_frequencia' in df.columns:
             # Agregar por aluno por unidade para box plot
-            df_box = df.groupby(['aluno_id', 'unidade']).agg(
+            df_box = df.groupby(['aluno_id', 'unidade'], observed=True).agg(
                 pct_frequencia=('pct_frequencia', 'mean'),
             ).reset_index() if 'aluno_id' in df.columns else df
 
@@ -238,7 +238,7 @@ def main():
 
         # Media por unidade - barras
         if 'unidade' in freq_geral.columns:
-            media_un = freq_geral.groupby('unidade')['pct_frequencia'].mean().reset_index()
+            media_un = freq_geral.groupby('unidade', observed=True)['pct_frequencia'].mean().reset_index()
             media_un = media_un.sort_values('pct_frequencia', ascending=False)
             media_un['unidade_nome'] = media_un['unidade'].map(UNIDADES_NOMES)
 
@@ -334,7 +334,7 @@ def main():
 
         if 'serie' in df.columns and 'pct_frequencia' in df.columns:
             # Media por serie
-            media_serie = df.groupby('serie')['pct_frequencia'].mean().reset_index()
+            media_serie = df.groupby('serie', observed=True)['pct_frequencia'].mean().reset_index()
             # Ordenar conforme ORDEM_SERIES
             media_serie['ordem'] = media_serie['serie'].apply(
                 lambda x: ORDEM_SERIES.index(x) if x in ORDEM_SERIES else 99
@@ -359,7 +359,7 @@ def main():
         if 'disciplina' in df.columns and 'serie' in df.columns and 'pct_frequencia' in df.columns:
             st.subheader("Heatmap: Frequencia (Serie x Disciplina)")
             pivot = df.pivot_table(
-                index='serie', columns='disciplina', values='pct_frequencia', aggfunc='mean'
+                index='serie', columns='disciplina', values='pct_frequencia', aggfunc='mean', observed=True
             ).round(1)
             if not pivot.empty:
                 # Reordenar series
@@ -384,9 +384,9 @@ def main():
                 _risco_mask_serie = _risco_mask_serie & (freq_geral['total_aulas'] >= MIN_AULAS_RISCO)
             risco_serie = freq_geral[_risco_mask_serie]
             if not risco_serie.empty:
-                risco_count = risco_serie.groupby('serie')['aluno_id'].nunique().reset_index()
+                risco_count = risco_serie.groupby('serie', observed=True)['aluno_id'].nunique().reset_index()
                 risco_count.columns = ['serie', 'alunos_risco']
-                total_count = freq_geral.groupby('serie')['aluno_id'].nunique().reset_index()
+                total_count = freq_geral.groupby('serie', observed=True)['aluno_id'].nunique().reset_index()
                 total_count.columns = ['serie', 'total_alunos']
                 risco_count = risco_count.merge(total_count, on='serie', how='left')
                 risco_count['pct_risco'] = (risco_count['alunos_risco'] / risco_count['total_alunos'].clip(lower=1) * 100).round(1)
@@ -407,7 +407,7 @@ def main():
             top_faltas = freq_geral.nlargest(20, 'faltas').copy()
             top_faltas['label'] = top_faltas['aluno_nome'].str[:35]
             if 'serie' in top_faltas.columns:
-                top_faltas['label'] = top_faltas['label'] + ' (' + top_faltas['serie'].fillna('') + ')'
+                top_faltas['label'] = top_faltas['label'] + ' (' + top_faltas['serie'].astype(object).fillna('') + ')'
 
             fig_top = px.bar(
                 top_faltas.sort_values('faltas'),
@@ -387,7 +387,7 @@ def _tab_visao_geral(df):
     with col_e:
         # Por tipo
         if 'tipo' in df.columns:
-            tipo_counts = df['tipo'].value_counts().reset_index()
+            tipo_counts = df['tipo'].value_counts().loc[lambda s: s > 0].reset_index()
             tipo_counts.columns = ['Tipo', 'Qtd']
             fig = px.bar(
                 tipo_counts.head(12), x='Qtd', y='Tipo', orientation='h',
@@ -400,7 +400,7 @@ def _tab_visao_geral(df):
     with col_d:
         # Por gravidade
         if 'gravidade' in df.columns:
-            grav_counts = df['gravidade'].value_counts().reset_index()
+            grav_counts = df['gravidade'].value_counts().loc[lambda s: s > 0].reset_index()
             grav_counts.columns = ['Gravidade', 'Qtd']
             cores_grav = {'Grave': '#D32F2F', 'Media': '#F57C00', 'Leve': '#FBC02D'}
             fig2 = px.pie(
@@ -442,7 +442,7 @@ def _tab_visao_geral(df):
 
         with col_cat:
             if 'categoria' in df.columns:
-                cat_counts = df['categoria'].value_counts().reset_index()
+                cat_counts = df['categoria'].value_counts().loc[lambda s: s > 0].reset_index()
                 cat_counts.columns = ['Categoria', 'Qtd']
                 fig6 = px.pie(
                     cat_counts, values='Qtd', names='Categoria',
@@ -465,7 +465,7 @@ def _tab_por_turma(df):
         return
 
     # Por serie
-    serie_counts = df['serie'].value_counts().reset_index()
+    serie_counts = df['serie'].value_counts().loc[lambda s: s > 0].reset_index()
     serie_counts.columns = ['Serie', 'Qtd']
     serie_counts['ordem'] = serie_counts['Serie'].apply(
         lambda x: ORDEM_SERIES.index(x) if x in ORDEM_SERIES else 99
@@ -486,7 +486,7 @@ def _tab_por_turma(df):
     if 'tipo' in df.columns:
         col_agg = 'aluno_id' if 'aluno_id' in df.columns else 'data'
         pivot = df.pivot_table(
-            index='serie', columns='tipo', values=col_agg, aggfunc='count', fill_value=0
+            index='serie', columns='tipo', values=col_agg, aggfunc='count', fill_value=0, observed=True
         )
         if not pivot.empty:
             # Reordenar
@@ -506,12 +506,12 @@ def _tab_por_turma(df):
     # Ranking por turma
     if 'turma' in df.columns and df['turma'].notna().any():
         st.subheader("Ranking por Turma")
-        turma_stats = df.groupby('turma').agg(
+        turma_stats = df.groupby('turma', observed=True).agg(
             total=('tipo', 'count'),
         ).reset_index().sort_values('total', ascending=False)
 
         if 'gravidade' in df.columns:
-            grav_turma = df.groupby('turma')['gravidade'].apply(
+            grav_turma = df.groupby('turma', observed=True)['gravidade'].apply(
                 lambda x: (x == 'Grave').sum()
             ).reset_index(name='graves')
             turma_stats = turma_stats.merge(grav_turma, on='turma', how='left')
@@ -547,13 +547,13 @@ def _tab_comparativo(df_ocorr_full, categoria_sel, periodo_sel, hoje, trimestre)
         return
 
     # Comparativo por unidade
-    comp = df.groupby('unidade').agg(
+    comp = df.groupby('unidade', observed=True).agg(
         total=('tipo', 'count'),
         alunos=('aluno_id', 'nunique') if 'aluno_id' in df.columns else ('aluno_nome', 'nunique'),
     ).reset_index()
 
     if 'gravidade' in df.columns:
-        grav_un = df.groupby('unidade')['gravidade'].apply(lambda x: (x == 'Grave').sum()).reset_index(name='graves')
+        grav_un = df.groupby('unidade', observed=True)['gravidade'].apply(lambda x: (x == 'Grave').sum()).reset_index(name='graves')
         comp = comp.merge(grav_un, on='unidade', how='left')
 
     comp['unidade_nome'] = comp['unidade'].map(UNIDADES_NOMES)
@@ -582,12 +582,12 @@ def _tab_comparativo(df_ocorr_full, categoria_sel, periodo_sel, hoje, trimestre)
     if 'tipo' in df.columns:
         col_agg = 'aluno_id' if 'aluno_id' in df.columns else 'data'
         pivot = df.pivot_table(
-            index='unidade', columns='tipo', values=col_agg, aggfunc='count', fill_value=0
+            index='unidade', columns='tipo', values=col_agg, aggfunc='count', fill_value=0, observed=True
         )
         if not pivot.empty:
             pivot.index = pivot.index.map(lambda x: UNIDADES_NOMES.get(x, x))
             # Selecionar top 8 tipos para nao poluir
-            top_tipos = df['tipo'].value_counts().head(8).index.tolist()
+            top_tipos = df['tipo'].value_counts().loc[lambda s: s > 0].head(8).index.tolist()
             pivot_top = pivot[[c for c in top_tipos if c in pivot.columns]]
             if not pivot_top.empty:
                 fig2 = px.imshow(
@@ -21,7 +21,9 @@ from utils import (
     carregar_horario_esperado, carregar_professores, filtrar_ate_hoje,
     calcular_semana_letiva, calcular_capitulo_esperado, calcular_trimestre,
     DATA_DIR, UNIDADES_NOMES, SERIES_FUND_II, SERIES_EM, ORDEM_SERIES,
+    PacoteDados,
 )
+from armazenamento import cache_por_versao
 from config_cores import CORES_UNIDADES, CORES_SERIES
 from shared_domain import (
     UNIDADES_CANONICAL, METAS_2026, META_TOTAL_2026,
@@ -73,6 +75,11 @@ st.markdown("""
 VAGAS_DB_PATH = Path("/Users/brunaviegas/Downloads/Cópia BI/output/vagas.db")
 VAGAS_2025_DB_PATH = Path("/Users/brunaviegas/Downloads/Cópia BI/output/vagas_2025.db")
 
+# Cache dos loaders invalidado pela escrita no banco (SQLite em modo WAL
+# grava primeiro no -wal), em vez de TTL fixo
+_ARQUIVOS_VAGAS = [VAGAS_DB_PATH, VAGAS_DB_PATH.with_name(VAGAS_DB_PATH.name + "-wal")]
+_ARQUIVOS_VAGAS_2025 = [VAGAS_2025_DB_PATH, VAGAS_2025_DB_PATH.with_name(VAGAS_2025_DB_PATH.name + "-wal")]
+
 # Nomes canônicos das unidades para exibicao
 NOMES_UNIDADES_CANONICAL = {
     cod: u.nome for cod, u in UNIDADES_CANONICAL.items()
@@ -93,7 +100,7 @@ def _vagas_2025_disponivel() -> bool:
 # CARREGAMENTO DE DADOS DO VAGAS.DB
 # ============================================================
 
-@st.cache_data(ttl=300)
+@cache_por_versao(_ARQUIVOS_VAGAS)
 def carregar_matriculas_vagas():
     """Carrega matriculas da ultima extracao do vagas.db.
     Retorna DataFrame com colunas: unidade_cod_ped, unidade_nome, segmento,
@@ -126,7 +133,7 @@ def carregar_matriculas_vagas():
     return df
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao(_ARQUIVOS_VAGAS_2025)
 def carregar_matriculas_2025():
     """Carrega matriculas 2025 para calculo de evasao."""
     if not _vagas_2025_disponivel():
@@ -151,7 +158,7 @@ def carregar_matriculas_2025():
     return df
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao(_ARQUIVOS_VAGAS)
 def carregar_matriculas_2026_evasao():
     """Carrega matriculas 2026 agrupadas por turma para calculo de evasao."""
     if not _vagas_db_disponivel():
@@ -176,7 +183,7 @@ def carregar_matriculas_2026_evasao():
     return df
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao(_ARQUIVOS_VAGAS)
 def carregar_ultima_extracao_vagas():
     """Retorna a data da ultima extracao do vagas.db."""
     if not _vagas_db_disponivel():
@@ -303,13 +310,16 @@ def main():
             "Dados pedagogicos continuam disponiveis."
         )
 
-    # Carregar dados
-    df_matriculas = carregar_matriculas_vagas() if vagas_ok else pd.DataFrame()
-    df_aulas = carregar_fato_aulas()
-    df_aulas = filtrar_ate_hoje(df_aulas) if not df_aulas.empty else df_aulas
-    df_ocorrencias = carregar_ocorrencias()
-    df_horario = carregar_horario_esperado()
-    df_professores = carregar_professores()
+    # Carregar dados: os cinco datasets carregam em paralelo, em segundo
+    # plano, enquanto o cabecalho abaixo e desenhado
+    dados = PacoteDados({
+        'matriculas': carregar_matriculas_vagas if vagas_ok else pd.DataFrame,
+        'aulas': carregar_fato_aulas,
+        'ocorrencias': carregar_ocorrencias,
+        'horario': carregar_horario_esperado,
+        'professores': carregar_professores,
+    }, pagina='26_Painel_Unificado')
+    dados.pre_carregar(*dados)
 
     # Info de atualizacao
     ultima_vagas = carregar_ultima_extracao_vagas() if vagas_ok else "N/A"
@@ -324,6 +334,13 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    df_matriculas = dados['matriculas']
+    df_aulas = dados['aulas']
+    df_aulas = filtrar_ate_hoje(df_aulas) if not df_aulas.empty else df_aulas
+    df_ocorrencias = dados['ocorrencias']
+    df_horario = dados['horario']
+    df_professores = dados['professores']
+
     # ========== ABAS ==========
     tab1, tab2, tab3, tab4 = st.tabs([
         "Visao Geral por Unidade",
@@ -521,7 +538,7 @@ def _render_cruzamento(df_matriculas, df_aulas, df_horario, df_professores):
     ).reset_index()
 
     # Agrupar aulas por unidade e serie
-    aulas_por_serie = df_aulas.groupby(['unidade', 'serie']).agg(
+    aulas_por_serie = df_aulas.groupby(['unidade', 'serie'], observed=True).agg(
         aulas=('aula_id', 'count') if 'aula_id' in df_aulas.columns else ('data', 'count'),
         professores=('professor', 'nunique'),
         disciplinas=('disciplina', 'nunique'),
@@ -776,7 +793,7 @@ def _render_correlacao_ocorrencias_evasao(df_ocorrencias, df_evasao):
     st.subheader("Correlacao: Ocorrencias x Evasao")
 
     # Ocorrencias por unidade
-    ocorr_un = df_ocorrencias.groupby('unidade').size().reset_index(name='ocorrencias')
+    ocorr_un = df_ocorrencias.groupby('unidade', observed=True).size().reset_index(name='ocorrencias')
     ocorr_un.rename(columns={'unidade': 'unidade_cod'}, inplace=True)
 
     # Evasao por unidade
@@ -821,9 +838,9 @@ def _render_ocorrencias_resumo(df_ocorrencias):
     st.subheader("Resumo de Ocorrencias por Unidade")
 
     if 'gravidade' in df_ocorrencias.columns and 'unidade' in df_ocorrencias.columns:
-        pivot = df_ocorrencias.groupby(['unidade', 'gravidade']).size().reset_index(name='total')
+        pivot = df_ocorrencias.groupby(['unidade', 'gravidade'], observed=True).size().reset_index(name='total')
         pivot_table = pivot.pivot_table(
-            index='unidade', columns='gravidade', values='total', fill_value=0, aggfunc='sum'
+            index='unidade', columns='gravidade', values='total', fill_value=0, aggfunc='sum', observed=True
         ).reset_index()
         pivot_table.rename(columns={'unidade': 'Unidade'}, inplace=True)
 
@@ -835,7 +852,7 @@ def _render_ocorrencias_resumo(df_ocorrencias):
         st.dataframe(pivot_table, use_container_width=True, hide_index=True)
     else:
         # Fallback simples
-        ocorr_un = df_ocorrencias.groupby('unidade').size().reset_index(name='Total')
+        ocorr_un = df_ocorrencias.groupby('unidade', observed=True).size().reset_index(name='Total')
         ocorr_un.rename(columns={'unidade': 'Unidade'}, inplace=True)
         st.dataframe(ocorr_un, use_container_width=True, hide_index=True)
 
@@ -306,8 +306,8 @@ if not df_aulas.empty and not df_horario.empty:
     pontos = []
 
     # 1. Disciplinas sem nenhum registro
-    slots_esp = set(df_horario.groupby(['unidade', 'serie', 'disciplina']).size().index)
-    slots_real = set(df_aulas.groupby(['unidade', 'serie', 'disciplina']).size().index)
+    slots_esp = set(df_horario.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index)
+    slots_real = set(df_aulas.groupby(['unidade', 'serie', 'disciplina'], observed=True).size().index)
     slots_sem = slots_esp - slots_real
     if user_unit:
         slots_sem_un = [s for s in slots_sem if s[0] == user_unit]
@@ -321,7 +321,7 @@ if not df_aulas.empty and not df_horario.empty:
     df_un_user = df_aulas if not user_unit else df_aulas[df_aulas['unidade'] == user_unit]
     df_hor_user = df_horario if not user_unit else df_horario[df_horario['unidade'] == user_unit]
     profs_baixos = []
-    for prof, df_p in df_un_user.groupby('professor'):
+    for prof, df_p in df_un_user.groupby('professor', observed=True):
         un_p = df_p['unidade'].iloc[0]
         esp = 0
         for s in df_p['serie'].unique():
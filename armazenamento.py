@@ -0,0 +1,450 @@
+"""
+Camada de armazenamento colunar (Parquet) dos CSVs de power_bi/.
+
+Cada CSV carregado pelas funcoes utils.carregar_* ganha uma copia tipada em
+<pasta do CSV>/_colunar/<nome>.v<N>.parquet, com datas ja convertidas,
+disciplinas ja normalizadas e colunas repetitivas como Categorical
+(esquema.py). A copia e
+publicada pelos extratores logo apos gravar o CSV e lida de forma
+transparente pelos loaders. Quando o Parquet nao existe, esta desatualizado
+(CSV mais novo) ou o pyarrow nao esta instalado, o loader cai de volta no
+CSV — e regrava o Parquet se puder. As chaves int32 *_cod
+(dicionario_chaves.py) nao sao gravadas: ler_tabela as acrescenta na leitura,
+contra o dim_Chaves.csv atual, entao um dicionario apagado ou substituido nao
+deixa codigos velhos em cache.
+
+Tabelas grandes (PARTICOES) tambem sao gravadas particionadas por unidade,
+em _colunar/<nome>.v<N>/unidade=<UN>.parquet: ler_tabela(path, unidades=[...])
+le so as particoes pedidas (um coordenador le 1/4 da rede).
+
+Cada gravacao usa um arquivo temporario proprio (pid + uuid) antes do
+replace, entao extratores e app podem regravar a mesma tabela ao mesmo
+tempo. Ao gravar a versao atual do formato, Parquets e pastas de particoes
+de outras versoes (VERSAO_FORMATO anterior) sao apagados.
+
+Tambem mantem o carimbo de versao dos dados (versao_dados.json), gravado
+por atualizar_siga.run_update apos cada extracao, e o decorator
+cache_por_versao, que substitui o TTL fixo dos loaders: o DataFrame fica em
+cache ate o arquivo de origem (ou o carimbo) mudar.
+
+Projetado para ser importavel sem Streamlit (extratores e scheduler usam);
+o Streamlit so e importado ao decorar um loader.
+
+Funcoes publicas:
+  - ler_tabela(path_csv, unidades=None) — DataFrame tipado (Parquet ou CSV),
+                                    opcionalmente so as particoes pedidas
+  - publicar_tabela(path_csv)     — (re)grava o Parquet a partir do CSV
+  - publicar_todas(diretorio)     — publica todos os CSVs do diretorio
+  - parquet_disponivel()
+  - registrar_versao_dados(origem) / ler_versao_dados()
+  - impressao_digital(paths)
+  - cache_por_versao(arquivos)    — decorator de cache sem TTL
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from conteudo_aulas import enriquecer_conteudo
+from dicionario_chaves import codificar_tabela, dicionario, sem_codigos
+from esquema import aplicar_esquema
+from normalizacao import DISCIPLINA_NORM_FATO, DISCIPLINA_NORM_HORARIO
+
+logger = logging.getLogger("armazenamento")
+
+DATA_DIR = Path(__file__).parent / "power_bi"
+COLUNAR_SUBDIR = "_colunar"
+ARQUIVO_VERSAO = DATA_DIR / "versao_dados.json"
+
+# Incrementar quando o preparo de alguma tabela mudar: invalida todos os
+# Parquets gravados com o preparo antigo.
+VERSAO_FORMATO = 6
+
+
+# ========== NORMALIZACAO DE DISCIPLINAS ==========
+# Dicts DISCIPLINA_NORM_FATO e DISCIPLINA_NORM_HORARIO sao importados de normalizacao.py
+
+
+def _normalizar_disciplina_fato(df):
+    """Aplica normalizacao de disciplinas e recalcula progressao_key."""
+    if 'disciplina' not in df.columns:
+        return df
+    mask = df['disciplina'].isin(DISCIPLINA_NORM_FATO)
+    if mask.any():
+        df.loc[mask, 'disciplina'] = df.loc[mask, 'disciplina'].map(DISCIPLINA_NORM_FATO)
+        if 'progressao_key' in df.columns and 'serie' in df.columns and 'semana_letiva' in df.columns:
+            df.loc[mask, 'progressao_key'] = (
+                df.loc[mask, 'disciplina'] + '|' +
+                df.loc[mask, 'serie'] + '|' +
+                df.loc[mask, 'semana_letiva'].astype(str)
+            )
+    return df
+
+
+def _normalizar_disciplina_horario(df):
+    """Normaliza disciplinas numeradas do horario (Matematica 1 → Matematica)."""
+    if 'disciplina' not in df.columns:
+        return df
+    mask = df['disciplina'].isin(DISCIPLINA_NORM_HORARIO)
+    if mask.any():
+        df.loc[mask, 'disciplina'] = df.loc[mask, 'disciplina'].map(DISCIPLINA_NORM_HORARIO)
+    return df
+
+
+# ========== PREPARO POR TABELA ==========
+
+def _converter_datas(df, *colunas):
+    for col in colunas:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def _preparar_aulas(df):
+    df = _converter_datas(df, 'data')
+    # cap_detectado/cap_unidade/pagina_ref/tipo_aula de CSVs gravados antes do extrator calcula-los
+    df = enriquecer_conteudo(df)
+    return _normalizar_disciplina_fato(df)
+
+
+def _preparar_horario(df):
+    return _normalizar_disciplina_horario(df)
+
+
+PREPARO_TABELAS = {
+    'fato_Aulas': _preparar_aulas,
+    'dim_Horario_Esperado': _preparar_horario,
+    'dim_Calendario': lambda df: _converter_datas(df, 'data'),
+    'fato_Ocorrencias': lambda df: _converter_datas(df, 'data'),
+    'fato_Frequencia_Aluno': lambda df: _converter_datas(df, 'data_aula'),
+    'fato_Notas': lambda df: _converter_datas(df, 'data_avaliacao'),
+    'resumo_Frequencia_Turma_Dia': lambda df: _converter_datas(df, 'data_aula'),
+}
+"""Preparo aplicado uma unica vez (na publicacao) a cada tabela, antes do
+esquema categorico. Tabelas ausentes daqui sao gravadas como lidas do CSV."""
+
+PARTICOES = {
+    'fato_Aulas': 'unidade',
+    'fato_Frequencia_Aluno': 'unidade',
+}
+"""Tabelas gravadas tambem particionadas, e a coluna de particao."""
+
+MARCADOR_PARTICOES = "_completo"
+
+
+# ========== PARQUET ==========
+
+def parquet_disponivel():
+    """Verifica se o pyarrow esta instalado (dependencia opcional)."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def caminho_colunar(path_csv):
+    """Caminho do Parquet correspondente a um CSV."""
+    path_csv = Path(path_csv)
+    return path_csv.parent / COLUNAR_SUBDIR / f"{path_csv.stem}.v{VERSAO_FORMATO}.parquet"
+
+
+def _colunar_atualizado(path_csv, path_pq):
+    """Parquet valido = existe e nao e mais antigo que o CSV de origem."""
+    if not path_pq.exists():
+        return False
+    try:
+        return path_pq.stat().st_mtime_ns >= Path(path_csv).stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def _ler_csv_preparado(path_csv):
+    path_csv = Path(path_csv)
+    df = pd.read_csv(path_csv)
+    preparar = PREPARO_TABELAS.get(path_csv.stem)
+    if preparar is not None:
+        df = preparar(df)
+    return aplicar_esquema(df, path_csv.stem)
+
+
+def _codificar(df, path_csv):
+    """Chaves int32 (<coluna>_cod) para professor/aluno/turma/disciplina/serie."""
+    return codificar_tabela(df, path_csv.stem, path_csv.parent)
+
+
+def _gravar_colunar(df, path_pq):
+    """Grava o Parquet de forma atomica (tmp unico + replace). Falha silenciosa."""
+    tmp = path_pq.with_name(f"{path_pq.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        path_pq.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp, index=False)
+        tmp.replace(path_pq)
+        return True
+    except Exception as e:
+        logger.warning(f"Parquet nao gravado ({path_pq.name}): {e}")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def _podar_formatos_antigos(path_csv):
+    """Apaga Parquets e pastas de particoes da tabela gravados com outra VERSAO_FORMATO."""
+    path_csv = Path(path_csv)
+    padrao = re.compile(rf"{re.escape(path_csv.stem)}\.v(\d+)(\.parquet)?")
+    pasta = path_csv.parent / COLUNAR_SUBDIR
+    for item in pasta.glob(f"{path_csv.stem}.v*"):
+        encontrado = padrao.fullmatch(item.name)
+        if encontrado is None or int(encontrado.group(1)) == VERSAO_FORMATO:
+            continue
+        try:
+            if item.is_dir():
+                shutil.rmtree(item)
+            else:
+                item.unlink()
+        except OSError as e:
+            logger.warning(f"Formato antigo nao removido ({item.name}): {e}")
+
+
+# ========== PARTICOES ==========
+
+def pasta_particoes(path_csv):
+    """Pasta com as particoes de uma tabela particionada."""
+    path_csv = Path(path_csv)
+    return path_csv.parent / COLUNAR_SUBDIR / f"{path_csv.stem}.v{VERSAO_FORMATO}"
+
+
+def _gravar_particoes(df, path_csv):
+    """Grava uma particao por valor da coluna de particao (tmp + replace).
+
+    O marcador _completo e gravado por ultimo: particoes so sao lidas se o
+    marcador for mais novo que o CSV.
+    """
+    coluna = PARTICOES.get(Path(path_csv).stem)
+    if coluna is None or coluna not in df.columns:
+        return False
+    pasta = pasta_particoes(path_csv)
+    marcador = pasta / MARCADOR_PARTICOES
+    try:
+        pasta.mkdir(parents=True, exist_ok=True)
+        marcador.unlink(missing_ok=True)
+        gravadas = set()
+        for valor, parte in df.groupby(coluna, observed=True, sort=False):
+            destino = pasta / f"{coluna}={valor}.parquet"
+            if not _gravar_colunar(parte.reset_index(drop=True), destino):
+                return False
+            gravadas.add(destino.name)
+        for antiga in pasta.glob("*.parquet"):
+            if antiga.name not in gravadas:
+                antiga.unlink()
+        marcador.touch()
+        return True
+    except OSError as e:
+        logger.warning(f"Particoes nao gravadas ({pasta.name}): {e}")
+        return False
+
+
+def _ler_particoes(path_csv, unidades):
+    """Le so as particoes pedidas; None se as particoes estiverem desatualizadas."""
+    pasta = pasta_particoes(path_csv)
+    if not _colunar_atualizado(path_csv, pasta / MARCADOR_PARTICOES):
+        return None
+    coluna = PARTICOES[Path(path_csv).stem]
+    arquivos = [pasta / f"{coluna}={u}.parquet" for u in unidades]
+    partes = [pd.read_parquet(a) for a in arquivos if a.exists()]
+    if not partes:
+        # Nenhuma linha das unidades pedidas: frame vazio com o mesmo esquema
+        qualquer = next(iter(sorted(pasta.glob("*.parquet"))), None)
+        return pd.read_parquet(qualquer).iloc[0:0] if qualquer else pd.DataFrame()
+    if len(partes) == 1:
+        return partes[0]
+    # Todas as particoes compartilham o mesmo dtype categorico: concat preserva
+    return pd.concat(partes, ignore_index=True)
+
+
+def ler_tabela(path_csv, unidades=None):
+    """Carrega uma tabela de power_bi/ ja tipada.
+
+    Usa o Parquet se estiver atualizado; senao le o CSV, aplica o preparo
+    da tabela e regrava o Parquet (e as particoes) para as proximas leituras.
+    As colunas *_cod sao acrescentadas aqui, depois da leitura.
+
+    Args:
+        path_csv: caminho do CSV de origem
+        unidades: lista de unidades (poda de particoes). Em tabelas
+            particionadas le so esses arquivos; nas demais, filtra.
+
+    Returns:
+        DataFrame (vazio se o CSV nao existir)
+    """
+    path_csv = Path(path_csv)
+    if not path_csv.exists():
+        return pd.DataFrame()
+
+    usar_parquet = parquet_disponivel()
+    if unidades is not None and usar_parquet and path_csv.stem in PARTICOES:
+        try:
+            df = _ler_particoes(path_csv, unidades)
+            if df is not None:
+                return _codificar(df, path_csv)
+        except Exception as e:
+            logger.warning(f"Particoes ilegiveis ({path_csv.stem}), usando tabela inteira: {e}")
+
+    path_pq = caminho_colunar(path_csv)
+    df = None
+    if usar_parquet and _colunar_atualizado(path_csv, path_pq):
+        try:
+            df = pd.read_parquet(path_pq)
+        except Exception as e:
+            logger.warning(f"Parquet ilegivel ({path_pq.name}), usando CSV: {e}")
+
+    if df is None:
+        df = _ler_csv_preparado(path_csv)
+        if usar_parquet and _gravar_colunar(df, path_pq):
+            _gravar_particoes(df, path_csv)
+            _podar_formatos_antigos(path_csv)
+    elif unidades is not None and path_csv.stem in PARTICOES:
+        # Parquet anterior ao particionamento: gera as particoes uma vez
+        if not _colunar_atualizado(path_csv, pasta_particoes(path_csv) / MARCADOR_PARTICOES):
+            _gravar_particoes(df, path_csv)
+    return _codificar(_filtrar_unidades(df, unidades), path_csv)
+
+
+def _filtrar_unidades(df, unidades):
+    if unidades is None or 'unidade' not in df.columns:
+        return df
+    return df[df['unidade'].isin(list(unidades))].reset_index(drop=True)
+
+
+def publicar_tabela(path_csv):
+    """Regrava o Parquet a partir do CSV recem-extraido.
+
+    Chamado pelos extratores logo apos salvar o CSV.
+
+    Returns:
+        True se o Parquet foi gravado
+    """
+    path_csv = Path(path_csv)
+    if not path_csv.exists() or not parquet_disponivel():
+        return False
+    df = _ler_csv_preparado(path_csv)
+    ok = _gravar_colunar(df, caminho_colunar(path_csv))
+    if ok:
+        _gravar_particoes(df, path_csv)
+        _podar_formatos_antigos(path_csv)
+    return ok
+
+
+def publicar_todas(diretorio):
+    """Publica o Parquet de todos os CSVs de um diretorio.
+
+    Returns:
+        lista com os nomes das tabelas publicadas
+    """
+    publicadas = []
+    for path_csv in sorted(Path(diretorio).glob("*.csv")):
+        if publicar_tabela(path_csv):
+            publicadas.append(path_csv.stem)
+    return publicadas
+
+
+# ========== VERSAO DOS DADOS E CACHE ==========
+
+def ler_versao_dados():
+    """Retorna o carimbo atual: dict com versao, atualizado_em e origem."""
+    if not ARQUIVO_VERSAO.exists():
+        return {'versao': 0, 'atualizado_em': None, 'origem': None}
+    try:
+        with open(ARQUIVO_VERSAO, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {'versao': 0, 'atualizado_em': None, 'origem': None}
+
+
+def registrar_versao_dados(origem=''):
+    """Incrementa o carimbo de versao dos dados apos uma extracao.
+
+    Todo loader decorado com cache_por_versao inclui o carimbo na chave, entao
+    o cache inteiro e invalidado logo apos a extracao.
+
+    Returns:
+        dict do novo carimbo
+    """
+    carimbo = {
+        'versao': int(ler_versao_dados().get('versao', 0)) + 1,
+        'atualizado_em': datetime.now().isoformat(),
+        'origem': origem,
+    }
+    ARQUIVO_VERSAO.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ARQUIVO_VERSAO.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(carimbo, f, ensure_ascii=False)
+    tmp.replace(ARQUIVO_VERSAO)
+    return carimbo
+
+
+def impressao_digital(paths):
+    """Impressao digital barata dos arquivos de origem: (nome, mtime_ns, tamanho).
+
+    So usa stat() — nenhum byte e lido — e inclui o carimbo de versao e a
+    geracao do dicionario de chaves (frames em cache carregam colunas *_cod).
+    Arquivo inexistente entra como (nome, None, None), entao o surgimento do
+    arquivo tambem invalida o cache.
+    """
+    impressao = [('dim_Chaves', dicionario(DATA_DIR).geracao)]
+    for path in list(paths) + [ARQUIVO_VERSAO]:
+        path = Path(path)
+        try:
+            st_ = path.stat()
+            impressao.append((str(path), st_.st_mtime_ns, st_.st_size))
+        except OSError:
+            impressao.append((str(path), None, None))
+    return tuple(impressao)
+
+
+def cache_por_versao(arquivos, max_entries=32):
+    """Decorator de cache (st.cache_data) invalidado pela mudanca dos dados.
+
+    Substitui @st.cache_data(ttl=300): o resultado fica em cache ate algum
+    arquivo de origem mudar (mtime/tamanho) ou uma nova extracao gravar o
+    carimbo de versao — nem recarrega a cada 5 minutos, nem serve dado velho
+    depois da extracao.
+
+    Args:
+        arquivos: lista de Paths de origem, ou funcao que recebe os mesmos
+            argumentos do loader e devolve essa lista.
+        max_entries: entradas mantidas por loader (versoes antigas saem primeiro).
+
+    O loader decorado mantem .clear() para compatibilidade.
+    """
+    import streamlit as st
+
+    def decorador(func):
+        def _com_versao(versao, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        # A chave do cache do Streamlit usa modulo + qualname: cada loader
+        # precisa dos seus para nao dividir o armazenamento com os outros.
+        _com_versao.__module__ = func.__module__
+        _com_versao.__qualname__ = func.__qualname__
+        cacheado = st.cache_data(max_entries=max_entries, show_spinner=False)(_com_versao)
+
+        @functools.wraps(func)
+        def loader(*args, **kwargs):
+            paths = arquivos(*args, **kwargs) if callable(arquivos) else arquivos
+            return cacheado(impressao_digital(paths), *args, **kwargs)
+
+        loader.clear = cacheado.clear
+        return loader
+
+    return decorador
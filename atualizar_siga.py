@@ -8,7 +8,7 @@ Pode ser executado standalone ou via botão no Sistema Pedagógico.
 Fluxo:
 1. Login via Playwright (headless) - captura cookies
 2. Extração paralela via requests (4 unidades simultâneas)
-3. Salva diretamente em power_bi/fato_Aulas.csv
+3. Salva diretamente em power_bi/fato_Aulas.csv (+ versao imutavel em _versoes/)
 4. Salva backup JSON timestampado
 """
 
@@ -54,6 +54,10 @@ from normalizacao import (
     normalizar_nome_professor,
     serie_eh_fund_ii,
 )
+from armazenamento import publicar_tabela, registrar_versao_dados
+from conteudo_aulas import COLUNAS_CONTEUDO, indexar_registros
+from banco_analitico import atualizar_banco
+from versoes_dados import publicar_versao, delta as delta_versoes
 
 # atualizar_siga.py usava set; normalizacao.py exporta list.
 # Convertemos para set para manter a semantica de lookup O(1).
@@ -62,8 +66,8 @@ SERIES_FUND_II = set(_SERIES_FUND_II_LIST)
 FIELDNAMES = [
     'aula_id', 'data', 'unidade', 'curso', 'disciplina', 'serie', 'turma',
     'professor', 'professor_normalizado', 'numero_aula', 'conteudo', 'tarefa',
-    'situacao', 'frequencia', 'semana_letiva', 'progressao_key'
-]
+    'situacao', 'frequencia', 'semana_letiva', 'progressao_key',
+] + COLUNAS_CONTEUDO
 
 
 def calcular_semana_letiva(data_str):
@@ -275,15 +279,45 @@ def run_update():
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # 5. Salva CSV (fato_Aulas.csv)
+    # 4b. Capitulo, pagina e tipo de aula detectados uma vez por aula (conteudo_aulas)
+    indexar_registros(todas_aulas_csv)
+
+    # 5. Salva CSV (fato_Aulas.csv) — tmp + replace: leitores nunca veem meio arquivo
     csv_path = OUTPUT_DIR / 'fato_Aulas.csv'
-    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+    tmp_path = csv_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(todas_aulas_csv)
+    tmp_path.replace(csv_path)
 
     print(f"\n  fato_Aulas.csv: {len(todas_aulas_csv)} aulas salvas")
 
+    # 5b. Publica a copia colunar tipada (lida pelos loaders do utils)
+    if publicar_tabela(csv_path):
+        print("  fato_Aulas.parquet publicado")
+
+    # 5b2. Instantaneo imutavel + troca atomica do ponteiro ATUAL.json
+    delta = None
+    ponteiro = publicar_versao(csv_path, origem='atualizar_siga')
+    if ponteiro:
+        print(f"  Versao de fato_Aulas: v{ponteiro['versao']}")
+        if ponteiro['anterior']:
+            try:
+                delta = delta_versoes('fato_Aulas', ponteiro['anterior'], ponteiro['versao'],
+                                      diretorio=OUTPUT_DIR)
+                print(f"  Delta: {len(delta['inseridos'])} novas, "
+                      f"{len(delta['alterados'])} alteradas, {len(delta['removidos'])} removidas")
+            except (OSError, ValueError) as e:
+                print(f"  Delta indisponivel: {e}")
+
+    # 5c. Carimbo de versao: invalida o cache dos loaders imediatamente
+    versao = registrar_versao_dados(origem='atualizar_siga')
+    print(f"  Versao dos dados: {versao['versao']}")
+
+    # 5d. Banco analitico (SQLite indexado) com a nova extracao
+    atualizar_banco(diretorio=OUTPUT_DIR)
+
     # 6. Backup JSON (em /tmp no cloud para nao poluir)
     import tempfile
     backup_dir = Path(tempfile.gettempdir()) if os.environ.get('RENDER') else SCRIPT_DIR
@@ -315,6 +349,9 @@ def run_update():
         "total": len(todas_aulas_csv),
         "por_unidade": resultados,
         "duracao": duracao,
+        "versao_dados": versao['versao'],
+        "versao_aulas": ponteiro['versao'] if ponteiro else None,
+        "delta_aulas": {k: len(v) for k, v in delta.items() if isinstance(v, list)} if delta else None,
     }
 
 
@@ -0,0 +1,297 @@
+"""
+Banco analitico local (SQLite) com os fatos de power_bi/.
+
+Paginas e detectores filtram os DataFrames inteiros com mascaras encadeadas
+(df[(unidade == u) & (serie == s) & (disciplina == d)]) dentro de lacos.
+Este modulo mantem uma copia dos fatos em analitico.sqlite3, na mesma pasta
+dos CSVs de origem (power_bi/), com indices nas chaves de busca, e responde
+esses filtros pelo indice.
+
+  - aulas       (fato_Aulas)             idx (unidade, serie, disciplina, semana_letiva)
+                                         idx (professor, data)
+  - horario     (dim_Horario_Esperado)   idx (unidade, serie, disciplina)
+                                         idx (professor, disciplina)
+  - frequencia  (fato_Frequencia_Aluno)  idx (aluno_id, data_aula)
+                                         so chamadas feitas (presenca P/F/J),
+                                         como carregar_frequencia_detalhada
+
+A carga e feita na extracao, nao nas paginas: atualizar_siga.run_update e
+extrair_frequencia_v3 chamam atualizar_banco() logo apos publicar o CSV.
+Cada tabela guarda em _carga a impressao digital (mtime/tamanho) do CSV de
+origem; so as tabelas cujo CSV mudou sao recarregadas, cada uma por inteiro
+(DROP + INSERT numa transacao). As consultas nao carregam nada: se o banco
+nao existe ou alguma tabela nao corresponde mais ao CSV, levantam
+sqlite3.OperationalError e utils.consultar_* cai no filtro em pandas. As
+colunas *_cod nao sao guardadas (dependem do dim_Chaves.csv atual) e o texto
+volta como str: utils.consultar_* reaplica esquema e codigos. Usa apenas
+sqlite3 da stdlib — roda offline dentro do container.
+
+Funcoes publicas:
+  - atualizar_banco(forcar=False, diretorio=None) — (re)carrega as tabelas desatualizadas
+  - consultar(tabela, colunas=None, **filtros) — SELECT indexado -> DataFrame
+  - consultar_sql(sql, params=())     — SQL livre (somente leitura) -> DataFrame
+  - status_banco(diretorio=None)
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from armazenamento import DATA_DIR, ler_tabela
+from dicionario_chaves import sem_codigos
+from esquema import PRESENCAS
+
+logger = logging.getLogger("banco_analitico")
+
+NOME_BANCO = "analitico.sqlite3"
+ARQUIVO_BANCO = DATA_DIR / NOME_BANCO
+
+TABELAS = {
+    'aulas': {
+        'csv': 'fato_Aulas.csv',
+        'datas': ['data'],
+        'indices': [
+            ('unidade', 'serie', 'disciplina', 'semana_letiva'),
+            ('professor', 'data'),
+        ],
+    },
+    'horario': {
+        'csv': 'dim_Horario_Esperado.csv',
+        'datas': [],
+        'indices': [
+            ('unidade', 'serie', 'disciplina'),
+            ('professor', 'disciplina'),
+        ],
+    },
+    'frequencia': {
+        'csv': 'fato_Frequencia_Aluno.csv',
+        'datas': ['data_aula'],
+        'indices': [
+            ('aluno_id', 'data_aula'),
+        ],
+        'filtro': ('presenca', PRESENCAS),
+    },
+}
+"""Tabelas do banco: CSV de origem, colunas de data, indices e filtro de linhas
+(coluna, valores aceitos) — o mesmo do loader equivalente em utils."""
+
+_LOCK_CARGA = threading.Lock()
+_ULTIMA_VERIFICACAO = {}  # arquivo do banco -> {tabela: impressao do CSV carregado}, lida de _carga
+
+
+# ========== CARGA ==========
+
+def _local(diretorio=None):
+    """(pasta dos CSVs, arquivo do banco): o banco fica junto dos CSVs."""
+    if diretorio is None:
+        return DATA_DIR, ARQUIVO_BANCO
+    diretorio = Path(diretorio)
+    return diretorio, diretorio / NOME_BANCO
+
+
+def _conectar(arquivo, somente_leitura=False):
+    if somente_leitura:
+        conn = sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(arquivo, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _impressao_csv(path_csv):
+    try:
+        st_ = Path(path_csv).stat()
+        return f"{st_.st_mtime_ns}:{st_.st_size}"
+    except OSError:
+        return None
+
+
+def _cargas_registradas(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS _carga "
+        "(tabela TEXT PRIMARY KEY, impressao TEXT, linhas INTEGER, carregado_em TEXT)"
+    )
+    return {t: imp for t, imp in conn.execute("SELECT tabela, impressao FROM _carga")}
+
+
+def _para_sql(df, datas):
+    """Converte o frame tipado em colunas que o SQLite guarda (texto/numero)."""
+    df = sem_codigos(df)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    for col in datas:
+        if col in df.columns:
+            # ISO 'YYYY-MM-DD': ordena e compara como texto
+            df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%Y-%m-%d')
+    return df
+
+
+def _carregar_tabela(conn, tabela, spec, path_csv, impressao):
+    df = ler_tabela(path_csv)
+    if 'filtro' in spec:
+        coluna, aceitos = spec['filtro']
+        df = df[df[coluna].isin(aceitos)]
+    df = _para_sql(df, spec['datas'])
+    with conn:
+        conn.execute(f'DROP TABLE IF EXISTS "{tabela}"')
+        df.to_sql(tabela, conn, index=False)
+        for cols in spec['indices']:
+            if all(c in df.columns for c in cols):
+                nome_idx = f"idx_{tabela}_{'_'.join(cols)}"
+                conn.execute(f'CREATE INDEX "{nome_idx}" ON "{tabela}" ({", ".join(cols)})')
+        conn.execute(
+            "INSERT OR REPLACE INTO _carga VALUES (?, ?, ?, datetime('now', 'localtime'))",
+            (tabela, impressao, len(df)),
+        )
+    return len(df)
+
+
+def atualizar_banco(forcar=False, diretorio=None):
+    """Recarrega as tabelas cujo CSV de origem mudou desde a ultima carga.
+
+    Chamado pelos extratores apos publicar os CSVs (nunca pelas paginas).
+
+    Args:
+        forcar: recarrega todas as tabelas
+        diretorio: pasta dos CSVs e do banco (padrao: power_bi/)
+
+    Returns:
+        dict {tabela: linhas} com as tabelas recarregadas
+    """
+    diretorio, arquivo = _local(diretorio)
+    recarregadas = {}
+    impressoes = {t: _impressao_csv(diretorio / spec['csv']) for t, spec in TABELAS.items()}
+    # Caminho rapido: so stat() dos CSVs, sem abrir o banco
+    if not forcar and arquivo.exists() and _em_dia(_ULTIMA_VERIFICACAO.get(arquivo), impressoes):
+        return recarregadas
+    with _LOCK_CARGA:
+        try:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            conn = _conectar(arquivo)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Banco analitico indisponivel: {e}")
+            return recarregadas
+        try:
+            cargas = _cargas_registradas(conn)
+            for tabela, spec in TABELAS.items():
+                path_csv = diretorio / spec['csv']
+                impressao = impressoes[tabela]
+                if impressao is None:
+                    continue
+                if not forcar and cargas.get(tabela) == impressao:
+                    continue
+                recarregadas[tabela] = _carregar_tabela(conn, tabela, spec, path_csv, impressao)
+                logger.info(f"Banco analitico: {tabela} recarregada ({recarregadas[tabela]} linhas)")
+            _ULTIMA_VERIFICACAO[arquivo] = _cargas_registradas(conn)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Falha ao atualizar banco analitico: {e}")
+        finally:
+            conn.close()
+    return recarregadas
+
+
+def _em_dia(cargas, impressoes):
+    """Toda tabela com CSV presente foi carregada a partir dele, na versao atual."""
+    return cargas is not None and all(
+        cargas.get(t) == imp for t, imp in impressoes.items() if imp is not None)
+
+
+# ========== CONSULTA ==========
+
+def _ler(sql, params, datas, tabelas):
+    diretorio, arquivo = _local()
+    impressoes = {t: _impressao_csv(diretorio / TABELAS[t]['csv']) for t in tabelas}
+    conn = _conectar(arquivo, somente_leitura=True)
+    try:
+        if not _em_dia(_ULTIMA_VERIFICACAO.get(arquivo), impressoes):
+            _ULTIMA_VERIFICACAO[arquivo] = dict(
+                conn.execute("SELECT tabela, impressao FROM _carga").fetchall())
+            if not _em_dia(_ULTIMA_VERIFICACAO[arquivo], impressoes):
+                # CSV mais novo que a carga (extracao em andamento ou banco
+                # nao reconstruido): quem chama cai no filtro em pandas
+                raise sqlite3.OperationalError(
+                    f"banco analitico desatualizado ({', '.join(tabelas)}): execute atualizar_banco()")
+        df = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+    for col in datas:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def consultar(tabela, colunas=None, **filtros):
+    """SELECT sobre uma tabela do banco usando os indices.
+
+    Filtros por igualdade (valor escalar) ou pertinencia (lista/tupla/set).
+    Sufixos __de / __ate filtram intervalos (>= / <=), ex.: data__de='2026-03-01'.
+
+    Exemplo:
+        consultar('horario', unidade='BV', serie='6º Ano', disciplina='Arte')
+
+    Returns:
+        DataFrame com as linhas filtradas (datas ja convertidas para
+        datetime; texto como str, sem Categorical nem *_cod — ver
+        utils.consultar_* para o mesmo formato dos loaders)
+
+    Raises:
+        KeyError se a tabela nao existir; sqlite3.Error se o banco falhar, nao
+        existir ou nao corresponder mais ao CSV
+    """
+    spec = TABELAS[tabela]
+    where, params = [], []
+    for chave, valor in filtros.items():
+        if valor is None:
+            continue
+        col, _, op = chave.partition('__')
+        if hasattr(valor, 'strftime'):
+            valor = valor.strftime('%Y-%m-%d')
+        if op == 'de':
+            where.append(f'"{col}" >= ?')
+            params.append(valor)
+        elif op == 'ate':
+            where.append(f'"{col}" <= ?')
+            params.append(valor)
+        elif isinstance(valor, (list, tuple, set)):
+            valores = list(valor)
+            if not valores:
+                where.append('0')
+                continue
+            where.append(f'"{col}" IN ({", ".join("?" * len(valores))})')
+            params.extend(valores)
+        else:
+            where.append(f'"{col}" = ?')
+            params.append(valor)
+
+    cols_sql = ', '.join(f'"{c}"' for c in colunas) if colunas else '*'
+    sql = f'SELECT {cols_sql} FROM "{tabela}"'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    return _ler(sql, params, spec['datas'], [tabela])
+
+
+def consultar_sql(sql, params=()):
+    """Executa SQL livre (conexao somente leitura) e devolve DataFrame."""
+    datas = [c for spec in TABELAS.values() for c in spec['datas']]
+    return _ler(sql, params, datas, list(TABELAS))
+
+
+def status_banco(diretorio=None):
+    """Tabelas carregadas: dict {tabela: {'linhas', 'carregado_em'}}."""
+    _, arquivo = _local(diretorio)
+    if not arquivo.exists():
+        return {}
+    conn = _conectar(arquivo, somente_leitura=True)
+    try:
+        return {
+            t: {'linhas': n, 'carregado_em': em}
+            for t, n, em in conn.execute("SELECT tabela, linhas, carregado_em FROM _carga")
+        }
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
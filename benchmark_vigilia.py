@@ -0,0 +1,135 @@
+"""
+Benchmark da Vigilia — tempo de geracao de missoes x numero de professores.
+
+Monta uma rede sintetica (fato_Aulas, horario, progressao SAE) com N
+professores, substitui os loaders de missoes por ela e mede a geracao de
+missoes de todos os coordenadores (mesmo caminho de engine.executar_vigilia,
+sem gravar JSON). Metade das aulas nao cita capitulo, entao o detector de
+CURRICULO_ATRASADO consulta a progressao SAE para esses professores.
+
+A coluna "legado" estima o custo do detector antigo, que relia
+dim_Progressao_SAE.csv (~270 KB) a cada (professor, disciplina) sem
+capitulo: leituras x tempo de um pd.read_csv do arquivo sintetico.
+
+Uso:
+    python benchmark_vigilia.py
+    python benchmark_vigilia.py --professores 50 100 200 400 --semanas 12
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import missoes
+from normalizacao import SERIES_EM, SERIES_FUND_II
+
+UNIDADES = ['BV', 'CD', 'JG', 'CDR']
+DISCIPLINAS = ['Matemática', 'Língua Portuguesa', 'História', 'Geografia', 'Ciências', 'Arte']
+SERIES = SERIES_FUND_II + SERIES_EM
+
+
+def rede_sintetica(n_professores, semanas, seed=0):
+    """(aulas, horario, progressao) sinteticos para n_professores."""
+    rng = np.random.default_rng(seed)
+    horario, aulas = [], []
+    for p in range(n_professores):
+        prof = f"PROF {p:04d}"
+        unidade = UNIDADES[p % len(UNIDADES)]
+        disc = DISCIPLINAS[p % len(DISCIPLINAS)]
+        for serie in rng.choice(SERIES, size=2, replace=False):
+            horario += [(unidade, serie, disc, prof)] * 2
+            cita_capitulo = p % 2 == 0
+            for semana in range(1, semanas + 1):
+                for i in range(int(rng.integers(0, 3))):
+                    cap = max(1, semana // 4 - int(rng.integers(0, 3)))
+                    conteudo = f"Cap. {cap} - exercicios" if cita_capitulo else "Exercicios do livro"
+                    data = pd.Timestamp('2026-01-26') + pd.Timedelta(days=7 * (semana - 1) + i)
+                    aulas.append((unidade, serie, disc, prof, semana, conteudo, data))
+    df_aulas = pd.DataFrame(aulas, columns=['unidade', 'serie', 'disciplina', 'professor',
+                                            'semana_letiva', 'conteudo', 'data'])
+    df_horario = pd.DataFrame(horario, columns=['unidade', 'serie', 'disciplina', 'professor'])
+    profs = df_horario[['professor', 'disciplina']].drop_duplicates()
+    df_prog = profs.assign(capitulo_atual=rng.integers(1, 4, size=len(profs)))
+    return df_aulas, df_horario, df_prog
+
+
+def _custo_leitura_progressao(df_prog):
+    """Segundos de um pd.read_csv de uma progressao com ~270 KB."""
+    repeticoes = max(1, 270_000 // max(1, len(df_prog.to_csv(index=False))))
+    texto = pd.concat([df_prog] * repeticoes, ignore_index=True).to_csv(index=False)
+    inicio = time.perf_counter()
+    pd.read_csv(io.StringIO(texto))
+    return time.perf_counter() - inicio
+
+
+def medir(n_professores, semanas):
+    """Roda a geracao de missoes da rede sintetica e devolve as metricas."""
+    df_aulas, df_horario, df_prog = rede_sintetica(n_professores, semanas)
+    leituras = []
+    loaders = {
+        'carregar_fato_aulas': lambda: df_aulas,
+        'carregar_horario_esperado': lambda: df_horario,
+        'carregar_frequencia_alunos': pd.DataFrame,
+        'carregar_ocorrencias': pd.DataFrame,
+        'carregar_progressao_sae': lambda: leituras.append(1) or df_prog,
+        'calcular_semana_letiva': lambda: semanas,
+        'filtrar_ate_hoje': lambda df: df,
+        '_detectar_processo_deadline': lambda unidade: [],
+    }
+    originais = {nome: getattr(missoes, nome) for nome in loaders}
+    for nome, funcao in loaders.items():
+        setattr(missoes, nome, funcao)
+    try:
+        coordenadores = [(un, SERIES) for un in UNIDADES]
+        inicio = time.perf_counter()
+        execucao = missoes._ExecucaoMissoes(coordenadores)
+        total = sum(len(missoes._pontuar(execucao.missoes_coordenador(un, series)))
+                    for un, series in coordenadores)
+        segundos = time.perf_counter() - inicio
+    finally:
+        for nome, funcao in originais.items():
+            setattr(missoes, nome, funcao)
+
+    sem_capitulo = df_aulas[~df_aulas['conteudo'].str.contains('Cap')]
+    grupos_sem_cap = sem_capitulo[['unidade', 'professor', 'disciplina']].drop_duplicates()
+    return {
+        'professores': n_professores,
+        'aulas': len(df_aulas),
+        'missoes': total,
+        'segundos': segundos,
+        'leituras_progressao': len(leituras),
+        'legado_leituras': len(grupos_sem_cap),
+        'legado_segundos': len(grupos_sem_cap) * _custo_leitura_progressao(df_prog),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--professores', type=int, nargs='+', default=[50, 100, 200, 400, 800])
+    parser.add_argument('--semanas', type=int, default=12)
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"  VIGILIA — missoes da rede x professores ({args.semanas} semanas)")
+    print("=" * 78)
+    print(f"  {'profs':>6} {'aulas':>8} {'missoes':>8} {'seg':>8} {'seg/prof':>9} "
+          f"{'leit.prog':>9} {'legado leit.':>12} {'+legado seg':>11}")
+    for n in args.professores:
+        r = medir(n, args.semanas)
+        print(f"  {r['professores']:>6} {r['aulas']:>8} {r['missoes']:>8} {r['segundos']:>8.2f} "
+              f"{r['segundos'] / n * 1000:>7.1f}ms {r['leituras_progressao']:>9} "
+              f"{r['legado_leituras']:>12} {r['legado_segundos']:>11.2f}")
+    print("-" * 78)
+    print("  leit.prog: leituras da progressao SAE na execucao (uma por rede)")
+    print("  legado: leituras e segundos extras do detector antigo (uma por professor sem capitulo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Indice de conteudo das aulas: capitulo, pagina e tipo de aula por registro.
+
+O regex "Cap. N / Capitulo N" era reimplementado (com variacoes) e rodado
+linha a linha em missoes, gerar_csvs_powerbi_ceo, extrair_sae_digital e nas
+paginas 05, 16 e 18. Agora atualizar_siga calcula uma vez por aula e grava
+em fato_Aulas.csv:
+
+  cap_detectado   maior capitulo citado (1-12) em "cap N", "cap. N",
+                  "capitulo N" ou "capítulo N"; vazio se nenhum
+  cap_unidade     maior "unidade N" / "modulo N" citado (1-12); vazio se
+                  nenhum. So as paginas 16/18 o usam, como fallback de
+                  cap_detectado — nos detectores (CURRICULO_ATRASADO), no
+                  Power BI e no SAE Digital "Modulo 1" / "Unidade 1 | Musica"
+                  nao e capitulo do livro
+  pagina_ref      primeira pagina citada ("p. 12", "pp. 12", "pg. 12",
+                  "pág. 12", "págs 12", "página 12"); vazio se nenhuma
+  tipo_aula       Vazio / Avaliativa / Projeto / Pratica / Leitura /
+                  Expositiva / Outro (palavras-chave, nessa precedencia)
+
+O preparo de fato_Aulas (armazenamento) preenche as colunas que faltarem em
+CSVs gravados antes delas, entao todo loader ve as quatro colunas. CSV sem
+cap_unidade tem o cap_detectado recalculado: extracoes anteriores gravavam
+nele o fallback unidade/modulo.
+
+A deteccao roda uma vez por texto distinto (conteudos se repetem entre
+turmas do mesmo professor).
+
+Funcoes publicas:
+  - detectar_capitulos(conteudo)   — Series Int64 (cap_detectado)
+  - detectar_unidades(conteudo)    — Series Int64 (cap_unidade)
+  - detectar_paginas(conteudo)     — Series Int64 (pagina_ref)
+  - classificar_tipos(conteudo)    — Series str (tipo_aula)
+  - enriquecer_conteudo(df)        — acrescenta as colunas ausentes
+  - indexar_registros(registros)   — preenche as colunas em dicts do extrator
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CONTEUDO = ['cap_detectado', 'cap_unidade', 'pagina_ref', 'tipo_aula']
+
+CAPITULO_MAX = 12
+"""Capitulos SAE por ano; numeros maiores nao sao capitulo."""
+
+_RE_CAPITULO = re.compile(r'\bcap(?:[ií]tulo)?\.?\s*(\d{1,2})(?!\d)', re.IGNORECASE)
+_RE_UNIDADE = re.compile(r'\b(?:unidade|m[óo]dulo)\s+(\d{1,2})(?!\d)', re.IGNORECASE)
+_RE_PAGINA = re.compile(r'\b(?:p[pg]?\.\s*|p[áa]gs?\.?\s*|p[áa]gina\s+)(\d{1,4})', re.IGNORECASE)
+
+_VAZIOS = ('.', '', ',')
+
+KEYWORDS_TIPO_AULA = [
+    ('Avaliativa', ['prova', 'avaliação', 'avaliaç', 'simulado', 'teste', 'a1', 'a2']),
+    ('Projeto', ['projeto', 'trabalho', 'pesquisa', 'seminário']),
+    ('Pratica', ['atividade', 'exercício', 'exercicio', 'resolução', 'correção', 'tarefa']),
+    ('Leitura', ['leitura', 'livro', 'texto', 'interpretação', 'pp.', 'pág']),
+    ('Expositiva', ['exposição', 'explicação', 'aula expositiva', 'apresentação', 'conteúdo']),
+]
+"""Tipo de aula -> palavras-chave, na ordem de precedencia."""
+
+
+def _por_texto_distinto(conteudo, funcao):
+    """Aplica funcao(texto) -> int|None uma vez por texto distinto."""
+    conteudo = pd.Series(conteudo).astype(object)
+    codigos, textos = pd.factorize(conteudo)
+    valores = pd.array([funcao(str(t)) for t in textos] + [None], dtype='Int64')
+    return pd.Series(valores[codigos], index=conteudo.index, dtype='Int64')
+
+
+def _maior_citado(regex):
+    def _detectar(texto):
+        caps = [int(m) for m in regex.findall(texto) if 1 <= int(m) <= CAPITULO_MAX]
+        return max(caps) if caps else None
+    return _detectar
+
+
+_capitulo = _maior_citado(_RE_CAPITULO)
+_unidade = _maior_citado(_RE_UNIDADE)
+
+
+def _pagina(texto):
+    m = _RE_PAGINA.search(texto)
+    return int(m.group(1)) if m else None
+
+
+def detectar_capitulos(conteudo):
+    """Capitulo citado em cada conteudo (Int64; <NA> se nenhum)."""
+    return _por_texto_distinto(conteudo, _capitulo)
+
+
+def detectar_unidades(conteudo):
+    """Unidade/modulo citado em cada conteudo (Int64; <NA> se nenhum)."""
+    return _por_texto_distinto(conteudo, _unidade)
+
+
+def detectar_paginas(conteudo):
+    """Primeira pagina citada em cada conteudo (Int64; <NA> se nenhuma)."""
+    return _por_texto_distinto(conteudo, _pagina)
+
+
+def classificar_tipos(conteudo):
+    """Tipo de aula de cada conteudo, vetorizado (str)."""
+    conteudo = pd.Series(conteudo).astype(object)
+    vazio = conteudo.isna() | conteudo.isin(_VAZIOS)
+    minusculo = conteudo.astype(str).str.lower()
+    condicoes = [vazio.to_numpy()]
+    for _, palavras in KEYWORDS_TIPO_AULA:
+        padrao = '|'.join(re.escape(p) for p in palavras)
+        condicoes.append(minusculo.str.contains(padrao, regex=True).to_numpy())
+    tipos = ['Vazio'] + [t for t, _ in KEYWORDS_TIPO_AULA]
+    return pd.Series(np.select(condicoes, tipos, default='Outro'), index=conteudo.index, dtype=str)
+
+
+def enriquecer_conteudo(df):
+    """Acrescenta cap_detectado/cap_unidade/pagina_ref/tipo_aula que faltarem no frame.
+
+    Colunas ja presentes (gravadas pelo extrator) so tem o tipo ajustado.
+    cap_detectado de CSV sem cap_unidade e recalculado (ver modulo).
+    """
+    if 'conteudo' not in df.columns:
+        return df
+    conteudo = df['conteudo']
+    if 'cap_unidade' in df.columns:
+        df['cap_detectado'] = pd.to_numeric(df['cap_detectado'], errors='coerce').astype('Int64')
+        df['cap_unidade'] = pd.to_numeric(df['cap_unidade'], errors='coerce').astype('Int64')
+    else:
+        df['cap_detectado'] = detectar_capitulos(conteudo)
+        df['cap_unidade'] = detectar_unidades(conteudo)
+    if 'pagina_ref' in df.columns:
+        df['pagina_ref'] = pd.to_numeric(df['pagina_ref'], errors='coerce').astype('Int64')
+    else:
+        df['pagina_ref'] = detectar_paginas(conteudo)
+    if 'tipo_aula' not in df.columns:
+        df['tipo_aula'] = classificar_tipos(conteudo)
+    return df
+
+
+def indexar_registros(registros, coluna='conteudo'):
+    """Preenche cap_detectado/cap_unidade/pagina_ref/tipo_aula nos dicts do extrator.
+
+    Capitulo/unidade/pagina ausentes viram '' (celula vazia no csv.DictWriter).
+    """
+    if not registros:
+        return registros
+    conteudo = pd.Series([r.get(coluna) for r in registros], dtype=object)
+    colunas = zip(detectar_capitulos(conteudo), detectar_unidades(conteudo),
+                  detectar_paginas(conteudo), classificar_tipos(conteudo))
+    for registro, (cap, unidade, pagina, tipo) in zip(registros, colunas):
+        registro['cap_detectado'] = '' if pd.isna(cap) else int(cap)
+        registro['cap_unidade'] = '' if pd.isna(unidade) else int(unidade)
+        registro['pagina_ref'] = '' if pd.isna(pagina) else int(pagina)
+        registro['tipo_aula'] = tipo
+    return registros
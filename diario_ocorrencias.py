@@ -0,0 +1,304 @@
+"""
+Diario append-only das ocorrencias registradas pelo app.
+
+Antes, cada ocorrencia salva relia o fato_Ocorrencias.csv inteiro, concatenava
+uma linha e regravava o arquivo (2+ MB), e dois coordenadores salvando ao mesmo
+tempo podiam receber o mesmo max(ocorrencia_id) + 1. Agora:
+
+  - registrar() acrescenta UMA linha JSON em fato_Ocorrencias.diario.jsonl
+    (O(1), com fsync), sob trava de arquivo (fcntl.flock);
+  - o ID vem de um contador persistente (fato_Ocorrencias.seq), incrementado
+    sob a mesma trava — monotonico mesmo com varios processos, e realinhado
+    ao maior ID do CSV quando uma extracao regrava o arquivo;
+  - compactar() incorpora o diario ao CSV principal (regrava CSV + Parquet e
+    zera o diario). Roda em thread de fundo quando o diario passa de
+    LIMITE_COMPACTACAO linhas, e pelo scheduler apos cada extracao do SIGA
+    (scheduler_standalone.executar_atualizacao);
+  - mesclar(base) junta a cauda do diario ao frame ja carregado do CSV, sem
+    reler o CSV.
+
+Um registro do diario cujo ID ja esta no CSV e o proprio registro (diario
+compactado mas nao zerado) se data_registro e descricao coincidem; senao e
+uma colisao com um ID gravado pela extracao do SIGA. Colisoes nunca sao
+descartadas: mesclar mantem o registro e compactar o incorpora com um ID
+novo do contador, com aviso no log.
+
+Funcoes publicas:
+  - registrar(diretorio, registro)   — grava e devolve o registro com ID
+  - ler_diario(diretorio)            — lista de registros pendentes
+  - mesclar(base, diretorio)         — DataFrame base + cauda do diario
+  - compactar(diretorio)             — incorpora o diario ao CSV
+  - arquivos_diario(diretorio)       — paths (para impressao digital do cache)
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from armazenamento import publicar_tabela, PREPARO_TABELAS
+from esquema import aplicar_esquema
+
+try:
+    import fcntl
+except ImportError:  # Windows: so a trava entre threads do processo
+    fcntl = None
+
+logger = logging.getLogger("diario_ocorrencias")
+
+ARQUIVO_CSV = "fato_Ocorrencias.csv"
+ARQUIVO_DIARIO = "fato_Ocorrencias.diario.jsonl"
+ARQUIVO_SEQ = "fato_Ocorrencias.seq"
+ARQUIVO_TRAVA = "fato_Ocorrencias.lock"
+
+LIMITE_COMPACTACAO = 200
+"""Linhas no diario a partir das quais a compactacao e disparada."""
+
+COLUNAS = ['ocorrencia_id', 'aluno_id', 'aluno_nome', 'data', 'unidade', 'serie',
+           'turma', 'tipo', 'categoria', 'gravidade', 'descricao', 'responsavel',
+           'providencia', 'registrado_por', 'data_registro']
+
+_LOCK_THREADS = threading.Lock()
+_compactando = threading.Event()
+
+
+# ========== TRAVA E SEQUENCIA ==========
+
+@contextlib.contextmanager
+def _travado(diretorio):
+    """Trava exclusiva entre threads e processos sobre o diario."""
+    with _LOCK_THREADS:
+        if fcntl is None:
+            yield
+            return
+        with open(Path(diretorio) / ARQUIVO_TRAVA, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _maior_id_existente(diretorio):
+    """Maior ocorrencia_id no CSV e no diario (so na criacao do contador)."""
+    maior = 0
+    path_csv = Path(diretorio) / ARQUIVO_CSV
+    if path_csv.exists():
+        ids = pd.read_csv(path_csv, usecols=['ocorrencia_id'])['ocorrencia_id']
+        if not ids.empty:
+            maior = int(ids.max())
+    for reg in ler_diario(diretorio):
+        maior = max(maior, int(reg.get('ocorrencia_id', 0)))
+    return maior
+
+
+def _mtime_csv(diretorio):
+    try:
+        return (Path(diretorio) / ARQUIVO_CSV).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _proximo_id(diretorio):
+    """Incrementa o contador persistente. Chamar com a trava adquirida.
+
+    O contador guarda o mtime do CSV em que se baseou: se uma extracao do SIGA
+    regravou o CSV (IDs novos), o maior ID e recalculado uma vez.
+    """
+    path_seq = Path(diretorio) / ARQUIVO_SEQ
+    mtime_csv = _mtime_csv(diretorio)
+    try:
+        with open(path_seq, 'r', encoding='utf-8') as f:
+            seq = json.load(f)
+        atual = int(seq['ultimo_id'])
+        if seq.get('mtime_csv') != mtime_csv:
+            atual = max(atual, _maior_id_existente(diretorio))
+    except (OSError, ValueError, KeyError, TypeError):
+        atual = _maior_id_existente(diretorio)
+    novo = atual + 1
+    tmp = path_seq.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'ultimo_id': novo, 'mtime_csv': mtime_csv}, f)
+    tmp.replace(path_seq)
+    return novo
+
+
+# ========== ESCRITA ==========
+
+def registrar(diretorio, registro):
+    """Acrescenta uma ocorrencia ao diario.
+
+    Args:
+        diretorio: pasta gravavel do fato_Ocorrencias.csv
+        registro: dict com as colunas da ocorrencia (sem ID)
+
+    Returns:
+        dict gravado (com ocorrencia_id e data_registro)
+    """
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    with _travado(diretorio):
+        registro = dict(registro)
+        registro['ocorrencia_id'] = _proximo_id(diretorio)
+        registro['data_registro'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+        linha = json.dumps(registro, ensure_ascii=False, default=str)
+        with open(diretorio / ARQUIVO_DIARIO, 'a', encoding='utf-8') as f:
+            f.write(linha + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        pendentes = _contar_linhas(diretorio / ARQUIVO_DIARIO)
+
+    if pendentes >= LIMITE_COMPACTACAO and not _compactando.is_set():
+        threading.Thread(target=compactar, args=(diretorio,), daemon=True,
+                         name="compactar_ocorrencias").start()
+    return registro
+
+
+def _contar_linhas(path):
+    try:
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+
+# ========== LEITURA ==========
+
+def arquivos_diario(diretorio):
+    """Paths que definem a versao do diario (para impressao_digital)."""
+    return [Path(diretorio) / ARQUIVO_DIARIO]
+
+
+def ler_diario(diretorio):
+    """Registros pendentes no diario (linhas incompletas sao ignoradas)."""
+    path = Path(diretorio) / ARQUIVO_DIARIO
+    if not path.exists():
+        return []
+    registros = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                logger.warning("Linha invalida no diario de ocorrencias ignorada")
+    return registros
+
+
+def _frame_diario(registros):
+    df = pd.DataFrame(registros)
+    for col in COLUNAS:
+        if col not in df.columns:
+            df[col] = None
+    return PREPARO_TABELAS['fato_Ocorrencias'](df)
+
+
+_ASSINATURA = ['ocorrencia_id', 'data_registro', 'descricao']
+"""Colunas que identificam um registro do diario ja incorporado ao CSV."""
+
+
+def _assinatura(df):
+    partes = []
+    for col in _ASSINATURA:
+        valores = df[col] if col in df.columns else pd.Series(None, index=df.index)
+        if col == 'ocorrencia_id':
+            valores = pd.to_numeric(valores, errors='coerce').astype('Int64')
+        valores = valores.astype(object)
+        partes.append(valores.where(valores.notna(), '').astype(str))
+    return partes[0].str.cat(partes[1:], sep='|')
+
+
+def _separar_colisoes(novos, base):
+    """Mascaras (ja_incorporados, colisoes) dos registros do diario com ID ja na base."""
+    existe = pd.Series(False, index=novos.index)
+    if base.empty or 'ocorrencia_id' not in base.columns:
+        return existe, existe
+    existe = novos['ocorrencia_id'].isin(base['ocorrencia_id'])
+    if not existe.any():
+        return existe, existe
+    mesmos = base[base['ocorrencia_id'].isin(novos['ocorrencia_id'])]
+    iguais = _assinatura(novos).isin(set(_assinatura(mesmos)))
+    return existe & iguais, existe & ~iguais
+
+
+def mesclar(base, diretorio):
+    """Junta os registros do diario ao frame carregado do CSV.
+
+    O CSV nao e relido: so o diario (pequeno) e lido e concatenado.
+    Registros ja presentes na base (diario compactado mas ainda nao
+    truncado) sao ignorados; colisoes de ID com o SIGA sao mantidas (o ID
+    novo so e atribuido na compactacao).
+    """
+    registros = ler_diario(diretorio)
+    if not registros:
+        return base
+    cauda = _frame_diario(registros)
+    if base.empty:
+        return aplicar_esquema(cauda[COLUNAS], 'fato_Ocorrencias')
+    ja_incorporados, colisoes = _separar_colisoes(cauda, base)
+    if colisoes.any():
+        logger.warning(f"{int(colisoes.sum())} ocorrencia(s) do diario com ID ja usado no CSV "
+                       f"({', '.join(map(str, cauda.loc[colisoes, 'ocorrencia_id']))}): "
+                       f"mantidas, ganham ID novo na compactacao")
+    cauda = cauda[~ja_incorporados]
+    if cauda.empty:
+        return base
+    base_obj = base.astype({
+        c: object for c in base.columns if isinstance(base[c].dtype, pd.CategoricalDtype)
+    })
+    df = pd.concat([base_obj, cauda.reindex(columns=base.columns)], ignore_index=True)
+    return aplicar_esquema(df, 'fato_Ocorrencias')
+
+
+# ========== COMPACTACAO ==========
+
+def compactar(diretorio):
+    """Incorpora o diario ao fato_Ocorrencias.csv e zera o diario.
+
+    Registros cujo ID colide com outro do CSV sao incorporados com um ID
+    novo do contador (aviso no log com o ID antigo e o novo).
+
+    Returns:
+        numero de registros incorporados
+    """
+    diretorio = Path(diretorio)
+    _compactando.set()
+    try:
+        with _travado(diretorio):
+            registros = ler_diario(diretorio)
+            if not registros:
+                return 0
+            path_csv = diretorio / ARQUIVO_CSV
+            if path_csv.exists():
+                df = pd.read_csv(path_csv)
+            else:
+                df = pd.DataFrame(columns=COLUNAS)
+            novos = pd.DataFrame(registros)
+            ja_incorporados, colisoes = _separar_colisoes(novos, df)
+            for i in novos.index[colisoes]:
+                antigo = novos.at[i, 'ocorrencia_id']
+                novos.at[i, 'ocorrencia_id'] = _proximo_id(diretorio)
+                logger.warning(f"Ocorrencia do diario com ID {antigo} ja usado no CSV "
+                               f"({novos.at[i, 'aluno_nome']}, {novos.at[i, 'data']}): "
+                               f"incorporada como {novos.at[i, 'ocorrencia_id']}")
+            novos = novos[~ja_incorporados]
+            df = pd.concat([df, novos], ignore_index=True)
+            tmp = path_csv.with_suffix('.tmp')
+            df.to_csv(tmp, index=False)
+            tmp.replace(path_csv)
+            publicar_tabela(path_csv)
+            (diretorio / ARQUIVO_DIARIO).unlink(missing_ok=True)
+            logger.info(f"Diario de ocorrencias compactado: {len(novos)} registros")
+            return len(novos)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Falha ao compactar diario de ocorrencias: {e}")
+        return 0
+    finally:
+        _compactando.clear()
@@ -0,0 +1,238 @@
+"""
+Dicionario de chaves substitutas (int32) compartilhado por fatos e dimensoes.
+
+Os cruzamentos entre fato_Aulas, dim_Horario_Esperado, score_Professor,
+dim_Alunos e fato_Notas_Historico eram feitos por texto livre (nome do
+professor, aluno_nome) ou por chaves compostas em string (progressao_key =
+"disciplina|serie|semana"). Aqui cada valor de texto de um dominio recebe um
+id int32 estavel, atribuido na ingestao e persistido entre execucoes:
+
+  dominio      colunas codificadas
+  professor    professor, professor_normalizado, professor_nome
+  aluno        aluno_nome
+  turma        turma
+  disciplina   disciplina
+  serie        serie
+
+Cada coluna ganha uma irma <coluna>_cod (int32; -1 = vazio) na leitura
+(armazenamento.ler_tabela chama codificar_tabela), entao merges e groupbys
+podem usar inteiros. O texto continua disponivel na propria coluna e pelo
+vetor de consulta (decodificar).
+
+Ids sao so acrescentados, nunca reaproveitados: o mesmo texto tem o mesmo id
+em todas as tabelas e em todas as extracoes. Persistido em dim_Chaves.csv
+(dominio, id, valor) na pasta dos CSVs, sob trava de arquivo — extratores e
+app podem codificar ao mesmo tempo. O arquivo e estado local (fora do git).
+
+Os ids dependem do dim_Chaves.csv em uso: se ele for apagado ou substituido,
+os mesmos textos ganham outros ids. Por isso nenhum cache em disco (Parquet,
+particoes, instantaneos de versao) guarda as colunas *_cod — sao sempre
+calculadas contra o dicionario atual — e a geracao do dicionario (incrementada
+quando o arquivo relido nao continua o que estava em memoria) entra na
+impressao digital dos caches em memoria.
+
+Funcoes publicas:
+  - DicionarioChaves(diretorio)            — .codificar / .decodificar / .valores
+  - dicionario(diretorio=None)             — instancia compartilhada do processo
+  - codificar_tabela(df, tabela, diretorio=None) — acrescenta as colunas *_cod
+  - sem_codigos(df)                        — remove as colunas *_cod (antes de gravar)
+"""
+
+import contextlib
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: so a trava entre threads do processo
+    fcntl = None
+
+logger = logging.getLogger("dicionario_chaves")
+
+DATA_DIR = Path(__file__).parent / "power_bi"
+ARQUIVO_CHAVES = "dim_Chaves.csv"
+ARQUIVO_TRAVA = "dim_Chaves.lock"
+
+SEM_CHAVE = -1
+"""Codigo dos valores vazios (NaN)."""
+
+COLUNAS_DOMINIO = {
+    'professor': 'professor',
+    'professor_normalizado': 'professor',
+    'professor_nome': 'professor',
+    'aluno_nome': 'aluno',
+    'turma': 'turma',
+    'disciplina': 'disciplina',
+    'serie': 'serie',
+}
+"""Coluna -> dominio do dicionario."""
+
+TABELAS_CODIFICADAS = {
+    'fato_Aulas', 'dim_Horario_Esperado', 'score_Professor', 'dim_Alunos',
+    'fato_Notas_Historico', 'dim_Progressao_SAE',
+}
+"""Tabelas que recebem as colunas *_cod na ingestao."""
+
+_LOCK_THREADS = threading.Lock()
+
+
+@contextlib.contextmanager
+def _travado(diretorio):
+    """Trava exclusiva entre threads e processos sobre dim_Chaves.csv."""
+    with _LOCK_THREADS:
+        if fcntl is None:
+            yield
+            return
+        Path(diretorio).mkdir(parents=True, exist_ok=True)
+        with open(Path(diretorio) / ARQUIVO_TRAVA, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class DicionarioChaves:
+    """Dominios {texto: id int32} com vetores de consulta id -> texto."""
+
+    def __init__(self, diretorio=None):
+        self.diretorio = Path(diretorio) if diretorio else DATA_DIR
+        self._indice = {}
+        self._valores = {}
+        self._mtime = None
+        self.geracao = 0
+        self.recarregar()
+
+    @property
+    def path(self):
+        return self.diretorio / ARQUIVO_CHAVES
+
+    def __repr__(self):
+        tamanhos = {d: len(v) for d, v in sorted(self._valores.items())}
+        return f"DicionarioChaves({tamanhos})"
+
+    def recarregar(self):
+        """Rele dim_Chaves.csv se outro processo o regravou.
+
+        Se o arquivo relido nao continua os ids em memoria (foi apagado e
+        recriado, ou substituido), incrementa a geracao: codigos calculados
+        antes nao valem mais.
+        """
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        df = pd.read_csv(self.path, dtype={'dominio': str, 'valor': str}, keep_default_na=False)
+        anteriores = self._valores
+        self._indice, self._valores = {}, {}
+        for dominio, grupo in df.sort_values('id').groupby('dominio', sort=False):
+            valores = grupo['valor'].tolist()
+            self._valores[dominio] = valores
+            self._indice[dominio] = {v: i for i, v in enumerate(valores)}
+        self._mtime = mtime
+        if any(self._valores.get(d, [])[:len(v)] != v for d, v in anteriores.items()):
+            self.geracao += 1
+            logger.warning(f"{ARQUIVO_CHAVES} substituido: ids remapeados (geracao {self.geracao})")
+
+    def _salvar(self):
+        linhas = [(d, i, v) for d, valores in self._valores.items() for i, v in enumerate(valores)]
+        df = pd.DataFrame(linhas, columns=['dominio', 'id', 'valor'])
+        tmp = self.path.with_suffix('.tmp')
+        df.to_csv(tmp, index=False)
+        tmp.replace(self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+    # ---------- Codificacao ----------
+
+    def _registrar(self, dominio, textos):
+        """Atribui ids aos textos ainda desconhecidos (sob trava, persistindo)."""
+        indice = self._indice.get(dominio, {})
+        if all(t in indice for t in textos):
+            return
+        with _travado(self.diretorio):
+            self.recarregar()
+            indice = self._indice.setdefault(dominio, {})
+            valores = self._valores.setdefault(dominio, [])
+            novos = [t for t in textos if t not in indice]
+            for t in novos:
+                indice[t] = len(valores)
+                valores.append(t)
+            if novos:
+                self._salvar()
+
+    def codificar(self, dominio, valores):
+        """Ids int32 dos valores (novos textos ganham id). NaN -> SEM_CHAVE.
+
+        Args:
+            dominio: 'professor', 'aluno', 'turma', 'disciplina' ou 'serie'
+            valores: Series/array (Categorical aproveita as categorias)
+        """
+        serie = pd.Series(valores)
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = [str(c) for c in serie.cat.categories]
+            self._registrar(dominio, categorias)
+            indice = self._indice[dominio]
+            ids_cat = np.array([indice[c] for c in categorias] + [SEM_CHAVE], dtype=np.int32)
+            # codigo -1 (NaN) cai na sentinela do final
+            return ids_cat[serie.cat.codes.to_numpy()]
+        textos = serie.dropna().astype(str)
+        self._registrar(dominio, list(dict.fromkeys(textos)))
+        indice = self._indice.get(dominio, {})
+        ids = np.full(len(serie), SEM_CHAVE, dtype=np.int32)
+        ids[serie.notna().to_numpy()] = textos.map(indice).to_numpy(dtype=np.int32)
+        return ids
+
+    def valores(self, dominio):
+        """Vetor de consulta id -> texto (object), com None na posicao final (-1)."""
+        return np.array(list(self._valores.get(dominio, [])) + [None], dtype=object)
+
+    def decodificar(self, dominio, ids):
+        """Textos dos ids (SEM_CHAVE -> None)."""
+        return self.valores(dominio)[np.asarray(ids, dtype=np.int64)]
+
+
+# ========== INSTANCIA COMPARTILHADA ==========
+
+_INSTANCIAS = {}
+
+
+def dicionario(diretorio=None):
+    """Dicionario compartilhado do processo para a pasta (relido se mudar)."""
+    diretorio = Path(diretorio) if diretorio else DATA_DIR
+    inst = _INSTANCIAS.get(diretorio)
+    if inst is None:
+        inst = _INSTANCIAS.setdefault(diretorio, DicionarioChaves(diretorio))
+    else:
+        inst.recarregar()
+    return inst
+
+
+def codificar_tabela(df, tabela, diretorio=None):
+    """Acrescenta <coluna>_cod (int32) para as colunas de dominio da tabela.
+
+    Colunas *_cod ja presentes sao recalculadas (ou removidas, se a
+    codificacao falhar) contra o dicionario atual. Tabelas fora de
+    TABELAS_CODIFICADAS sao devolvidas sem alteracao.
+    """
+    if tabela not in TABELAS_CODIFICADAS or df.empty:
+        return df
+    dic = dicionario(diretorio)
+    for coluna, dominio in COLUNAS_DOMINIO.items():
+        if coluna in df.columns:
+            try:
+                df[f"{coluna}_cod"] = dic.codificar(dominio, df[coluna])
+            except OSError as e:
+                logger.warning(f"Chaves de {coluna} nao codificadas ({tabela}): {e}")
+                df = df.drop(columns=[f"{coluna}_cod"], errors='ignore')
+    return df
+
+
+def sem_codigos(df):
+    """Copia do DataFrame sem as colunas *_cod (para gravar caches em disco)."""
+    return df.drop(columns=[f"{c}_cod" for c in COLUNAS_DOMINIO], errors='ignore')
@@ -6,55 +6,95 @@ Estrategista: roda semanalmente, atualiza historico, narrativa e scorecard.
 
 Outputs: JSONs pre-computados em WRITABLE_DIR.
 
+Os robos (Vigilia, Estrategista, Conselheiro, Comparador, Preditor,
+Retroalimentador, Preparador) formam um DAG (ROBOS): executar_robos roda uma
+cadeia em ordem de dependencia, compartilhando os intermediarios pesados
+(missoes da rede etc.) via ContextoRobos.
+
 Funcoes publicas:
-  - executar_vigilia()
-  - executar_estrategista()
+  - executar_vigilia(contexto=None)
+  - executar_estrategista(contexto=None)
+  - executar_robos(robos=None, contexto=None)  — cadeia de robos (ex.: CADEIA_SEGUNDA)
   - carregar_missoes_pregeradas(unidade, series)
+  - indice_missoes_pregeradas()  — consultas indexadas (nivel, tipo, top-k, paginas)
+  - carregar_projecoes_entidades(metrica, unidade, somente_alertas)
+  - carregar_serie_kpis()        — KPIs do resumo_Executivo por unidade x semana
   - carregar_narrativa_ceo()
   - carregar_scorecard_diretor(unidade)
 """
 
+import graphlib
+import hashlib
 import json
 import logging
+import pickle
+import time
+import numpy as np
 import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
 from utils import (
     WRITABLE_DIR, DATA_DIR, UNIDADES_NOMES,
     calcular_semana_letiva, calcular_capitulo_esperado,
     carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje,
-    CONFORMIDADE_META, CONFORMIDADE_BAIXO,
+    carregar_frequencia_detalhada, carregar_ocorrencias,
+    CONFORMIDADE_META, CONFORMIDADE_BAIXO, _hoje, arquivos_diario,
 )
 from missoes import (
-    gerar_todas_missoes_rede, gerar_missoes,
+    gerar_missoes, executar_missoes_rede,
     gerar_missao_fingerprint,
 )
-from missoes_historico import atualizar_historico, obter_persistentes
+import missoes_historico
+from missoes_historico import atualizar_historico, aplicar_eventos, obter_persistentes
+from armazenamento import impressao_digital
+from eventos_missoes import registrar_execucao
+from indice_missoes import IndiceMissoes, indice_missoes
+from kpi_semanal import registrar_kpis_semana, semana_do_resumo, serie_kpis
+from planos_acao import taxas_execucao
+from preditor_lote import prever_lote, projetar_entidades, salvar_projecoes, ler_projecoes
 from narrativa import gerar_narrativa_ceo, gerar_decisoes_ceo
 
 logger = logging.getLogger("engine_peex")
 
 # Paths dos outputs pre-computados
 _MISSOES_FILE = WRITABLE_DIR / "missoes_pregeradas.json"
+_MISSOES_CACHE_FILE = WRITABLE_DIR / "missoes_cache.pkl"
 _NARRATIVA_FILE = WRITABLE_DIR / "narrativa_ceo.json"
 _SCORECARD_FILE = WRITABLE_DIR / "scorecard_diretores.json"
+_KPIS_FILE = WRITABLE_DIR / "kpis_semanais.npz"
 
 
 # ========== VIGILIA ==========
 
-def executar_vigilia():
+def executar_vigilia(contexto=None):
     """Roda apos cada extracao do scheduler.
     Gera missoes para toda a rede e salva em missoes_pregeradas.json.
+    Incremental: so as particoes unidade x serie com dados novos sao
+    reavaliadas (missoes_cache.pkl guarda hashes e resultados anteriores).
+    Os detectores independentes rodam em paralelo. As diferencas para a
+    execucao anterior vao para o log de eventos (eventos_missoes) e sao
+    aplicadas ao historico de missoes.
+
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo). As missoes geradas
+            ficam memoizadas para os robos seguintes.
 
     Returns:
-        dict com metadados da execucao
+        dict com metadados da execucao; 'detectores' tem, por detector,
+        custo, segundos, linhas lidas e missoes produzidas. Com missoes
+        memoizadas (disco/memoria, 'memoizado': True) nenhum detector rodou:
+        recalculados 0 e 'detectores' vazio — as metricas gravadas no memo
+        sao da execucao que o gerou.
     """
     inicio = datetime.now()
     logger.info("Vigilia: iniciando geracao de missoes...")
+    contexto = contexto or ContextoRobos()
 
     try:
-        missoes_rede = gerar_todas_missoes_rede()
+        missoes_rede, estatisticas = contexto.obter('missoes_rede')
 
         # Serializar para JSON (remover campos nao-serializaveis)
         output = {
@@ -78,17 +118,41 @@ def executar_vigilia():
             output['unidades'][un] = serializado
             total_missoes += len(serializado)
 
-        with open(_MISSOES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(output, f, ensure_ascii=False, indent=2, default=str)
+        tmp = _MISSOES_FILE.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, separators=(',', ':'), default=str)
+        tmp.replace(_MISSOES_FILE)
+
+        # Eventos de mudanca (surgiu/score/nivel/resolvida) e historico
+        eventos = registrar_execucao(missoes_rede, output['semana'])
+        aplicar_eventos(eventos, output['semana'])
+        por_evento = {}
+        for e in eventos:
+            por_evento[e['evento']] = por_evento.get(e['evento'], 0) + 1
 
         duracao = (datetime.now() - inicio).total_seconds()
-        logger.info(f"Vigilia: {total_missoes} missoes geradas em {duracao:.1f}s")
+        logger.info(f"Vigilia: {total_missoes} missoes geradas em {duracao:.1f}s, eventos {por_evento}")
+
+        origem = contexto.origem('missoes_rede')
+        if origem != 'calculado':
+            estatisticas = {'recalculados': 0, 'detectores': {},
+                            'reaproveitados': estatisticas.get('recalculados', 0)
+                            + estatisticas.get('reaproveitados', 0)}
 
         return {
             'ok': True,
             'total_missoes': total_missoes,
             'duracao': duracao,
             'unidades': {un: len(bs) for un, bs in missoes_rede.items()},
+            'eventos': por_evento,
+            'missoes_origem': origem,
+            'memoizado': origem != 'calculado',
+            'recalculados': estatisticas.get('recalculados', 0),
+            'reaproveitados': estatisticas.get('reaproveitados', 0),
+            'detectores': {
+                nome: {**m, 'segundos': round(m['segundos'], 3)}
+                for nome, m in estatisticas.get('detectores', {}).items()
+            },
         }
 
     except Exception as e:
@@ -98,36 +162,36 @@ def executar_vigilia():
 
 # ========== ESTRATEGISTA ==========
 
-def executar_estrategista():
+def executar_estrategista(contexto=None):
     """Roda semanalmente (domingo 22h).
     Atualiza historico de missoes, gera narrativa CEO e scorecard diretores.
 
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo)
+
     Returns:
         dict com metadados da execucao
     """
     inicio = datetime.now()
     semana = calcular_semana_letiva()
     logger.info(f"Estrategista: semana {semana}, iniciando...")
+    contexto = contexto or ContextoRobos()
 
     try:
-        # 1. Gerar missoes frescas para toda a rede
-        missoes_rede = gerar_todas_missoes_rede()
+        # 1. Missoes da rede (memoizadas por versao dos dados)
+        missoes_rede = contexto.obter('missoes_rede')[0]
 
         # 2. Atualizar historico
         atualizar_historico(missoes_rede, semana)
 
-        # 3. Obter persistentes para as 3 Decisoes CEO
-        persistentes = obter_persistentes(min_semanas=4)
+        # 3. Obter persistentes para as 3 Decisoes CEO (ja com o historico atualizado)
+        persistentes = contexto.obter('persistentes')
 
         # 4. Gerar narrativa CEO
-        resumo_path = DATA_DIR / "resumo_Executivo.csv"
-        if resumo_path.exists():
-            resumo_df = pd.read_csv(resumo_path)
-        else:
-            resumo_df = pd.DataFrame()
+        resumo_df = contexto.obter('resumo_executivo')
 
         # Historico de semanas anteriores (simplificado)
-        historico_semanas = _carregar_historico_semanas()
+        historico_semanas = contexto.obter('historico_semanas')
 
         narrativa_texto = gerar_narrativa_ceo(resumo_df, historico_semanas, semana)
         decisoes = gerar_decisoes_ceo(persistentes)
@@ -149,8 +213,10 @@ def executar_estrategista():
         with open(_SCORECARD_FILE, 'w', encoding='utf-8') as f:
             json.dump(scorecard, f, ensure_ascii=False, indent=2)
 
-        # 6. Salvar snapshot da semana
+        # 6. Salvar snapshot da semana (tendencia) e os KPIs completos (serie semanal)
         _salvar_snapshot_semana(semana, resumo_df)
+        if not resumo_df.empty:
+            registrar_kpis_semana(_KPIS_FILE, semana_do_resumo(resumo_df, semana), resumo_df)
 
         duracao = (datetime.now() - inicio).total_seconds()
         logger.info(f"Estrategista: concluido em {duracao:.1f}s")
@@ -174,15 +240,19 @@ def executar_estrategista():
 _CONSELHEIRO_FILE = WRITABLE_DIR / "conselheiro_output.json"
 
 
-def executar_conselheiro():
+def executar_conselheiro(contexto=None):
     """Roda segunda 5h. Gera pauta de reuniao PEEX + perguntas + rituais.
 
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo)
+
     Returns:
         dict com metadados da execucao
     """
     inicio = datetime.now()
     semana = calcular_semana_letiva()
     logger.info(f"Conselheiro: semana {semana}, gerando pauta...")
+    contexto = contexto or ContextoRobos()
 
     try:
         from peex_utils import info_semana, proximas_reunioes
@@ -193,8 +263,8 @@ def executar_conselheiro():
         formato = info['formato_reuniao']
 
         # Carregar missoes
-        missoes_rede = gerar_todas_missoes_rede()
-        persistentes = obter_persistentes(min_semanas=4)
+        missoes_rede = contexto.obter('missoes_rede')[0]
+        persistentes = contexto.obter('persistentes')
 
         # Gerar pauta por unidade
         pautas = {}
@@ -344,15 +414,19 @@ def _sugerir_formato(missoes, formato_calendario):
 _COMPARADOR_FILE = WRITABLE_DIR / "comparador_output.json"
 
 
-def executar_comparador():
+def executar_comparador(contexto=None):
     """Roda segunda 5h30. Calcula estrelas e rankings.
 
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo)
+
     Returns:
         dict com metadados da execucao
     """
     inicio = datetime.now()
     semana = calcular_semana_letiva()
     logger.info(f"Comparador: semana {semana}, calculando rankings...")
+    contexto = contexto or ContextoRobos()
 
     try:
         from estrelas import (
@@ -363,16 +437,12 @@ def executar_comparador():
 
         trimestre = calcular_trimestre(semana)
 
-        resumo_path = DATA_DIR / "resumo_Executivo.csv"
-        resumo_df = pd.read_csv(resumo_path) if resumo_path.exists() else pd.DataFrame()
+        resumo_df = contexto.obter('resumo_executivo')
 
-        # Historico para comparar
-        historico_semanas = _carregar_historico_semanas()
-        if historico_semanas:
-            # Reconstruir resumo anterior simplificado
-            resumo_anterior = pd.DataFrame()
-        else:
-            resumo_anterior = pd.DataFrame()
+        # Resumo da ultima semana gravada antes da que o resumo atual descreve
+        kpis = contexto.obter('kpis_semanais')
+        semana_anterior = kpis.anterior(semana_do_resumo(resumo_df, semana))
+        resumo_anterior = kpis.resumo(semana_anterior)
 
         # Calcular e registrar estrelas
         if not resumo_df.empty:
@@ -391,6 +461,7 @@ def executar_comparador():
         output = {
             'gerado_em': inicio.isoformat(),
             'semana': semana,
+            'semana_anterior': semana_anterior,
             'estrelas_semana': estrelas,
             'ranking_evolucao': r_evolucao,
             'ranking_saude': r_saude,
@@ -403,7 +474,8 @@ def executar_comparador():
         duracao = (datetime.now() - inicio).total_seconds()
         logger.info(f"Comparador: concluido em {duracao:.1f}s")
 
-        return {'ok': True, 'semana': semana, 'duracao': duracao}
+        return {'ok': True, 'semana': semana, 'duracao': duracao,
+                'semana_anterior': semana_anterior}
 
     except Exception as e:
         logger.error(f"Comparador: erro - {e}", exc_info=True)
@@ -413,13 +485,20 @@ def executar_comparador():
 # ========== PREDITOR ==========
 
 _PREDITOR_FILE = WRITABLE_DIR / "preditor_output.json"
+_PREDITOR_ENTIDADES_FILE = WRITABLE_DIR / "preditor_entidades.parquet"
 
 
-def executar_preditor():
+def executar_preditor(contexto=None):
     """Roda sexta 20h. Projecoes baseadas em series temporais.
 
     Usa regressao linear simples sobre 4+ semanas de dados para projetar
-    conformidade, frequencia e risco para as proximas 2 semanas.
+    conformidade, frequencia e risco para as proximas 2 semanas: por unidade
+    (historico_semanas, em preditor_output.json) e por professor, turma e
+    aluno (preditor_lote, em preditor_entidades.parquet), todas ajustadas
+    em lote com intervalo bootstrap.
+
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo)
 
     Returns:
         dict com metadados da execucao
@@ -427,70 +506,80 @@ def executar_preditor():
     inicio = datetime.now()
     semana = calcular_semana_letiva()
     logger.info(f"Preditor: semana {semana}, gerando projecoes...")
+    contexto = contexto or ContextoRobos()
 
     try:
-        historico = _carregar_historico_semanas()
-
-        if len(historico) < 4:
-            logger.info("Preditor: historico insuficiente (<4 semanas). Pulando.")
-            return {'ok': True, 'semana': semana, 'motivo': 'historico_insuficiente'}
+        historico = contexto.obter('historico_semanas')
 
+        # Rede: conformidade por unidade (historico_semanas), mesma reta de antes
+        # agora ajustada em lote, com intervalo bootstrap
         projecoes = {}
         alertas = []
-
-        for un_code in ['BV', 'CD', 'JG', 'CDR']:
-            campo = f'conf_{un_code}'
-            valores = [(h['semana'], h.get(campo, 0)) for h in historico if campo in h]
-
-            if len(valores) < 3:
-                continue
-
-            # Regressao linear simples: y = a*x + b
-            xs = [v[0] for v in valores]
-            ys = [v[1] for v in valores]
-            n = len(xs)
-            sum_x = sum(xs)
-            sum_y = sum(ys)
-            sum_xy = sum(x * y for x, y in zip(xs, ys))
-            sum_x2 = sum(x * x for x in xs)
-
-            denom = n * sum_x2 - sum_x ** 2
-            if denom == 0:
-                continue
-
-            a = (n * sum_xy - sum_x * sum_y) / denom
-            b = (sum_y - a * sum_x) / n
-
-            # Projetar 2 semanas adiante
-            proj_1 = round(a * (semana + 1) + b, 1)
-            proj_2 = round(a * (semana + 2) + b, 1)
-            atual = ys[-1]
-            tendencia = 'subindo' if a > 0.5 else ('caindo' if a < -0.5 else 'estavel')
-
-            projecoes[un_code] = {
-                'atual': atual,
-                'proj_sem_mais_1': max(0, min(100, proj_1)),
-                'proj_sem_mais_2': max(0, min(100, proj_2)),
-                'tendencia': tendencia,
-                'coef_angular': round(a, 3),
-                'n_pontos': n,
-            }
-
-            # Alertas preventivos
-            if tendencia == 'caindo' and atual > 50 and proj_2 < 50:
-                alertas.append({
-                    'unidade': un_code,
-                    'tipo': 'queda_critica',
-                    'mensagem': f'{UNIDADES_NOMES.get(un_code, un_code)}: conformidade projetada para cair abaixo de 50% em 2 semanas',
-                    'urgencia': 'alta',
-                })
-            elif tendencia == 'caindo':
-                alertas.append({
-                    'unidade': un_code,
-                    'tipo': 'tendencia_queda',
-                    'mensagem': f'{UNIDADES_NOMES.get(un_code, un_code)}: tendencia de queda ({a:.1f}pp/sem)',
-                    'urgencia': 'media',
-                })
+        unidades = ['BV', 'CD', 'JG', 'CDR']
+        semanas_hist = sorted({h['semana'] for h in historico})
+        if len(historico) < 4:
+            logger.info("Preditor: historico insuficiente (<4 semanas) para projecoes da rede.")
+        else:
+            pos = {s: i for i, s in enumerate(semanas_hist)}
+            Y = np.full((len(unidades), len(semanas_hist)), np.nan)
+            for h in historico:
+                for i, un_code in enumerate(unidades):
+                    if f'conf_{un_code}' in h:
+                        Y[i, pos[h['semana']]] = h.get(f'conf_{un_code}', 0)
+            rede = prever_lote(Y, semanas_hist, [semana + 1, semana + 2], limites=(0, 100))
+
+            for i, un_code in enumerate(unidades):
+                a = rede['coef'][i]
+                if np.isnan(a):
+                    continue
+                atual = Y[i][~np.isnan(Y[i])][-1]
+                proj_2 = a * (semana + 2) + rede['intercepto'][i]
+                tendencia = 'subindo' if a > 0.5 else ('caindo' if a < -0.5 else 'estavel')
+
+                projecoes[un_code] = {
+                    'atual': float(atual),
+                    'proj_sem_mais_1': round(float(rede['previsao'][i, 0]), 1),
+                    'proj_sem_mais_2': round(float(rede['previsao'][i, 1]), 1),
+                    'intervalo_sem_mais_1': [round(float(v), 1) for v in
+                                             (rede['inferior'][i, 0], rede['superior'][i, 0])],
+                    'intervalo_sem_mais_2': [round(float(v), 1) for v in
+                                             (rede['inferior'][i, 1], rede['superior'][i, 1])],
+                    'tendencia': tendencia,
+                    'coef_angular': round(float(a), 3),
+                    'n_pontos': int(rede['n'][i]),
+                }
+
+                # Alertas preventivos
+                if tendencia == 'caindo' and atual > 50 and proj_2 < 50:
+                    alertas.append({
+                        'unidade': un_code,
+                        'tipo': 'queda_critica',
+                        'mensagem': f'{UNIDADES_NOMES.get(un_code, un_code)}: conformidade projetada para cair abaixo de 50% em 2 semanas',
+                        'urgencia': 'alta',
+                    })
+                elif tendencia == 'caindo':
+                    alertas.append({
+                        'unidade': un_code,
+                        'tipo': 'tendencia_queda',
+                        'mensagem': f'{UNIDADES_NOMES.get(un_code, un_code)}: tendencia de queda ({a:.1f}pp/sem)',
+                        'urgencia': 'media',
+                    })
+
+        # Entidades: professor, turma e aluno (alertas precoces)
+        esperadas_path = DATA_DIR / "resumo_Aulas_Esperadas.csv"
+        df_entidades = projetar_entidades(
+            filtrar_ate_hoje(carregar_fato_aulas()),
+            pd.read_csv(esperadas_path) if esperadas_path.exists() else pd.DataFrame(),
+            carregar_frequencia_detalhada(),
+            carregar_ocorrencias(),
+            semana,
+        )
+        salvar_projecoes(df_entidades, _PREDITOR_ENTIDADES_FILE)
+        resumo_entidades = {
+            metrica: {'series': int(len(g)), 'alertas': int((g['alerta'] != '').sum()),
+                      'criticos': int((g['alerta'] == 'critico').sum())}
+            for metrica, g in df_entidades.groupby('metrica', observed=True)
+        }
 
         output = {
             'gerado_em': inicio.isoformat(),
@@ -498,17 +587,22 @@ def executar_preditor():
             'projecoes': projecoes,
             'alertas': alertas,
             'n_semanas_historico': len(historico),
+            'entidades': resumo_entidades,
         }
 
         with open(_PREDITOR_FILE, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
 
         duracao = (datetime.now() - inicio).total_seconds()
-        logger.info(f"Preditor: concluido em {duracao:.1f}s, {len(alertas)} alerta(s)")
+        n_alertas_entidades = sum(r['alertas'] for r in resumo_entidades.values())
+        logger.info(f"Preditor: concluido em {duracao:.1f}s, {len(alertas)} alerta(s) da rede, "
+                    f"{len(df_entidades)} series por entidade ({n_alertas_entidades} alerta(s))")
 
         return {
             'ok': True, 'semana': semana, 'duracao': duracao,
             'n_projecoes': len(projecoes), 'n_alertas': len(alertas),
+            'n_projecoes_entidades': len(df_entidades),
+            'n_alertas_entidades': n_alertas_entidades,
         }
 
     except Exception as e:
@@ -527,12 +621,29 @@ def carregar_preditor():
     return {}
 
 
+def carregar_projecoes_entidades(metrica=None, unidade=None, somente_alertas=False):
+    """Projecoes por professor/turma/aluno do preditor (DataFrame; vazio se nao houver).
+
+    Args:
+        metrica: chave de preditor_lote.METRICAS (ex.: 'aluno_frequencia')
+        unidade: codigo da unidade
+        somente_alertas: so linhas com alerta ('critico' ou 'risco')
+    """
+    return ler_projecoes(_PREDITOR_ENTIDADES_FILE, metrica, unidade, somente_alertas)
+
+
 # ========== RETROALIMENTADOR ==========
 
 _RETRO_FILE = WRITABLE_DIR / "retroalimentador_output.json"
 
+RETRO_SEMANAS_ESCALACAO = 2
+"""Semanas consecutivas com execucao < 60% para escalar ao diretor."""
 
-def executar_retroalimentador():
+RETRO_JANELA_TAXA = 4
+"""Semanas da taxa de execucao acumulada em cada verificacao."""
+
+
+def executar_retroalimentador(contexto=None):
     """Roda cada 6h. Verifica execucao de acoes e escala se necessario.
 
     Checa:
@@ -540,6 +651,12 @@ def executar_retroalimentador():
     - Se missoes urgentes foram resolvidas
     - Se execucao <60% em 2+ semanas -> escala
 
+    Le os planos do banco de planos de acao (planos_acao), todas as unidades.
+
+    Args:
+        contexto: ContextoRobos da cadeia (nao usa intermediarios; aceito
+            para rodar no DAG)
+
     Returns:
         dict com metadados
     """
@@ -548,55 +665,38 @@ def executar_retroalimentador():
     logger.info(f"Retroalimentador: semana {semana}, verificando execucao...")
 
     try:
+        # Uma consulta agregada: execucao do plano por unidade x semana na janela
+        ini = semana - max(RETRO_SEMANAS_ESCALACAO, RETRO_JANELA_TAXA) + 1
+        taxas = taxas_execucao(ini, semana)
+        por_chave = {(r.unidade, r.semana): r for r in taxas.itertuples(index=False)}
+        unidades = list(UNIDADES_NOMES) + sorted(set(taxas['unidade']) - set(UNIDADES_NOMES))
+
         verificacoes = {}
         escalacoes = []
-
-        for un_code in ['BV', 'CD', 'JG', 'CDR']:
-            # Verificar plano de acao
-            plano_path = WRITABLE_DIR / f"plano_acao_{un_code}_sem{semana}.json"
-            if plano_path.exists():
-                try:
-                    with open(plano_path, 'r', encoding='utf-8') as f:
-                        plano = json.load(f)
-                    acoes = plano.get('acoes', [])
-                    total = len(acoes)
-                    resolvidas = sum(1 for a in acoes if a.get('status') == 'resolvida')
-                    taxa = resolvidas / max(total, 1) * 100
-                except (json.JSONDecodeError, IOError):
-                    total = 0
-                    resolvidas = 0
-                    taxa = 0
-            else:
-                total = 0
-                resolvidas = 0
-                taxa = 0
-
+        for un_code in unidades:
+            atual = por_chave.get((un_code, semana))
+            total = int(atual.total) if atual is not None else 0
+            resolvidas = int(atual.concluidas) if atual is not None else 0
+            janela = taxas[(taxas['unidade'] == un_code) & (taxas['semana'] > semana - RETRO_JANELA_TAXA)]
             verificacoes[un_code] = {
                 'acoes_total': total,
                 'acoes_resolvidas': resolvidas,
-                'taxa_execucao': round(taxa, 1),
+                'taxa_execucao': round(resolvidas / max(total, 1) * 100, 1),
+                f'taxa_{RETRO_JANELA_TAXA}_semanas': round(
+                    janela['concluidas'].sum() / max(janela['total'].sum(), 1) * 100, 1),
             }
 
-            # Verificar semana anterior tambem
-            plano_ant_path = WRITABLE_DIR / f"plano_acao_{un_code}_sem{semana - 1}.json"
-            taxa_ant = 0
-            if plano_ant_path.exists():
-                try:
-                    with open(plano_ant_path, 'r', encoding='utf-8') as f:
-                        plano_ant = json.load(f)
-                    acoes_ant = plano_ant.get('acoes', [])
-                    total_ant = len(acoes_ant)
-                    resolvidas_ant = sum(1 for a in acoes_ant if a.get('status') == 'resolvida')
-                    taxa_ant = resolvidas_ant / max(total_ant, 1) * 100
-                except (json.JSONDecodeError, IOError):
-                    pass
-
-            # Escalar se execucao <60% por 2+ semanas
-            if taxa < 60 and taxa_ant < 60 and total > 0:
+            # Escalar se execucao <60% em todas as ultimas RETRO_SEMANAS_ESCALACAO
+            # semanas (semana sem plano conta como 0%)
+            semanas_esc = range(semana - RETRO_SEMANAS_ESCALACAO + 1, semana + 1)
+            taxa_sem = {s: (por_chave[(un_code, s)].taxa if (un_code, s) in por_chave else 0)
+                        for s in semanas_esc}
+            if total > 0 and all(t < 60 for t in taxa_sem.values()):
+                detalhe = ', '.join(f'sem {s}: {t:.0f}%' for s, t in taxa_sem.items())
                 escalacoes.append({
                     'unidade': un_code,
-                    'motivo': f'Execucao abaixo de 60% por 2 semanas consecutivas '
-                              f'(sem {semana - 1}: {taxa_ant:.0f}%, sem {semana}: {taxa:.0f}%)',
+                    'motivo': f'Execucao abaixo de 60% por {RETRO_SEMANAS_ESCALACAO} semanas '
+                              f'consecutivas ({detalhe})',
                     'acao': 'Escalar para diretor: coordenador precisa de apoio',
                 })
 
@@ -661,19 +761,23 @@ def carregar_conselheiro():
 _PREPARADOR_FILE = WRITABLE_DIR / "preparador_output.json"
 
 
-def executar_preparador():
+def executar_preparador(contexto=None):
     """Roda segunda 5h45 (apos CONSELHEIRO e COMPARADOR).
     Consolida a inteligencia de TODOS os robos para gerar roteiro completo de reuniao.
 
     Input: outputs de VIGILIA, ESTRATEGISTA, CONSELHEIRO, COMPARADOR, PREDITOR, RETROALIMENTADOR
     Output: preparador_output.json com roteiro por unidade e script dos 5 atos.
 
+    Args:
+        contexto: ContextoRobos da cadeia (padrao: novo)
+
     Returns:
         dict com metadados da execucao
     """
     inicio = datetime.now()
     semana = calcular_semana_letiva()
     logger.info(f"Preparador: semana {semana}, consolidando inteligencia...")
+    contexto = contexto or ContextoRobos()
 
     try:
         from peex_utils import info_semana, estacao_atual
@@ -685,16 +789,15 @@ def executar_preparador():
         estacao, tom = estacao_atual(semana)
 
         # Carregar outputs de todos os robos
-        missoes_rede = gerar_todas_missoes_rede()
+        missoes_rede = contexto.obter('missoes_rede')[0]
         conselheiro_data = carregar_conselheiro()
         comparador_data = carregar_comparador()
         preditor_data = carregar_preditor()
         retro_data = carregar_retroalimentador()
-        persistentes = obter_persistentes(min_semanas=4)
+        persistentes = contexto.obter('persistentes')
 
         # Resumo executivo
-        resumo_path = DATA_DIR / "resumo_Executivo.csv"
-        resumo_df = pd.read_csv(resumo_path) if resumo_path.exists() else pd.DataFrame()
+        resumo_df = contexto.obter('resumo_executivo')
 
         # === Objetivo da reuniao ===
         objetivo = _gerar_objetivo(prox, missoes_rede, formato)
@@ -927,30 +1030,10 @@ def carregar_missoes_pregeradas(unidade=None, series=None):
     Returns:
         lista de dicts de missoes
     """
-    # Tentar pre-geradas
+    # Tentar pre-geradas (indice em memoria, relido so se o arquivo mudar)
     if _MISSOES_FILE.exists():
         try:
-            with open(_MISSOES_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if unidade:
-                missoes = data.get('unidades', {}).get(unidade, [])
-            else:
-                missoes = []
-                for un_missoes in data.get('unidades', {}).values():
-                    missoes.extend(un_missoes)
-
-            # Filtrar por series se especificado
-            if series and missoes:
-                missoes = [
-                    b for b in missoes
-                    if b.get('serie', '') in series
-                    or b.get('series', '') in series
-                    or not b.get('serie')  # manter missoes sem serie (ex: deadline)
-                ]
-
-            return missoes
-
+            return indice_missoes(_MISSOES_FILE).consultar(unidade=unidade or None, series=series)
         except (json.JSONDecodeError, IOError):
             pass
 
@@ -960,6 +1043,28 @@ def carregar_missoes_pregeradas(unidade=None, series=None):
     return []
 
 
+def indice_missoes_pregeradas():
+    """Indice das missoes pre-geradas para consultas (vazio se nao houver arquivo).
+
+    Ex.: indice_missoes_pregeradas().contar(unidade='BV', nivel='URGENTE')
+         indice_missoes_pregeradas().top(5, tipo='PROF_SILENCIOSO')
+    """
+    try:
+        return indice_missoes(_MISSOES_FILE)
+    except (json.JSONDecodeError, IOError):
+        return IndiceMissoes(_MISSOES_FILE)
+
+
+def carregar_serie_kpis():
+    """Serie semanal dos KPIs do resumo_Executivo (vazia se nao houver arquivo).
+
+    Ex.: carregar_serie_kpis().variacao(12)                 — semana 12 vs 11
+         carregar_serie_kpis().acumulado_trimestre(12)      — media do trimestre ate a 12
+         carregar_serie_kpis().intervalo(1, 12, kpis=['frequencia_media'])
+    """
+    return serie_kpis(_KPIS_FILE)
+
+
 def carregar_narrativa_ceo():
     """Carrega narrativa CEO pre-gerada. Fallback: gera on-the-fly.
 
@@ -1125,3 +1230,235 @@ def _salvar_snapshot_semana(semana, resumo_df):
 
     with open(path, 'w', encoding='utf-8') as f:
         json.dump(historico, f, ensure_ascii=False, indent=2)
+
+
+# ========== DAG DOS ROBOS ==========
+#
+# Cada robo declara os intermediarios que consome (entradas), os robos cujos
+# outputs le (depende) e os arquivos que grava (saidas). Os intermediarios
+# compartilhados (missoes da rede, persistentes, resumo executivo, historico
+# de semanas) sao calculados uma vez por versao dos dados e reaproveitados
+# por todos os robos do mesmo ContextoRobos; os pesados (disco=True) tambem
+# ficam memoizados em engine_memo/, entao um robo agendado depois da Vigilia
+# reaproveita as missoes que ela acabou de gerar.
+
+_MEMO_DIR = WRITABLE_DIR / "engine_memo"
+_AUSENTE = object()
+
+
+@dataclass(frozen=True)
+class Intermediario:
+    """Dado compartilhado entre robos, versionado pelos arquivos de origem."""
+    nome: str
+    calcular: Callable
+    origens: Callable               # () -> Paths cuja mudanca invalida o valor
+    diario: bool = False            # depende de "hoje" (semana letiva, filtrar_ate_hoje)
+    disco: bool = False             # memoizado em engine_memo/<nome>.pkl
+
+
+@dataclass(frozen=True)
+class Robo:
+    """No do DAG de robos."""
+    nome: str
+    executar: Callable              # (contexto) -> dict com 'ok'
+    entradas: tuple = ()            # nomes de INTERMEDIARIOS
+    depende: tuple = ()             # nomes de ROBOS que precisam rodar antes
+    saidas: tuple = ()              # arquivos gravados
+
+
+def _origens_missoes():
+    return [
+        DATA_DIR / "fato_Aulas.csv",
+        DATA_DIR / "dim_Horario_Esperado.csv",
+        DATA_DIR / "fato_Frequencia_Aluno.csv",
+        DATA_DIR / "dim_Progressao_SAE.csv",
+        DATA_DIR / "config_coordenadores.json",
+        WRITABLE_DIR / "fato_Ocorrencias.csv",
+        *arquivos_diario(WRITABLE_DIR),
+        Path(executar_missoes_rede.__code__.co_filename),
+    ]
+
+
+def _ler_resumo_executivo():
+    resumo_path = DATA_DIR / "resumo_Executivo.csv"
+    return pd.read_csv(resumo_path) if resumo_path.exists() else pd.DataFrame()
+
+
+INTERMEDIARIOS = {i.nome: i for i in (
+    # (missoes por unidade, estatisticas da execucao) — o calculo pesado
+    Intermediario('missoes_rede', lambda: executar_missoes_rede(cache_path=_MISSOES_CACHE_FILE),
+                  _origens_missoes, diario=True, disco=True),
+    Intermediario('persistentes', lambda: obter_persistentes(min_semanas=4),
+                  lambda: [missoes_historico._HISTORICO_PATH]),
+    Intermediario('resumo_executivo', _ler_resumo_executivo,
+                  lambda: [DATA_DIR / "resumo_Executivo.csv"]),
+    Intermediario('historico_semanas', lambda: _carregar_historico_semanas(),
+                  lambda: [WRITABLE_DIR / "historico_semanas.json"]),
+    Intermediario('kpis_semanais', lambda: serie_kpis(_KPIS_FILE), lambda: [_KPIS_FILE]),
+)}
+
+
+class ContextoRobos:
+    """Intermediarios memoizados por versao dos dados, compartilhados por uma cadeia.
+
+    A versao de um intermediario e a impressao digital (mtime/tamanho) dos
+    seus arquivos de origem mais o carimbo da extracao, e a data para os
+    diarios. Um robo que altera uma origem (ex.: Estrategista grava o
+    historico de missoes) invalida so os intermediarios que dependem dela.
+
+    estatisticas: {nome: {calculado, disco, memoria, segundos}}
+    """
+
+    def __init__(self, memo_dir=None):
+        self.memo_dir = Path(memo_dir) if memo_dir is not None else _MEMO_DIR
+        self.robo = None
+        self._valores = {}
+        self.estatisticas = {}
+
+    def versao(self, nome):
+        inter = INTERMEDIARIOS[nome]
+        partes = [impressao_digital(inter.origens())]
+        if inter.diario:
+            partes.append(_hoje().date().isoformat())
+        return hashlib.blake2b(repr(partes).encode('utf-8'), digest_size=16).hexdigest()
+
+    def _contar(self, nome, origem, segundos=0.0):
+        m = self.estatisticas.setdefault(
+            nome, {'calculado': 0, 'disco': 0, 'memoria': 0, 'segundos': 0.0})
+        m[origem] += 1
+        m['segundos'] += segundos
+
+    def obter(self, nome):
+        """Valor do intermediario na versao atual dos dados (calcula so se preciso)."""
+        if self.robo and nome not in ROBOS[self.robo].entradas:
+            logger.warning(f"Robo {self.robo} usa '{nome}' sem declarar em entradas")
+        inter = INTERMEDIARIOS[nome]
+        versao = self.versao(nome)
+        guardado = self._valores.get(nome)
+        if guardado is not None and guardado[0] == versao:
+            self._contar(nome, 'memoria')
+            return guardado[1]
+
+        valor = self._ler_memo(nome, versao) if inter.disco else _AUSENTE
+        if valor is _AUSENTE:
+            inicio = time.perf_counter()
+            valor = inter.calcular()
+            self._contar(nome, 'calculado', time.perf_counter() - inicio)
+            if inter.disco:
+                self._gravar_memo(nome, versao, valor)
+        else:
+            self._contar(nome, 'disco')
+        self._valores[nome] = (versao, valor)
+        return valor
+
+    def origem(self, nome):
+        """Como o ultimo valor foi obtido: 'calculado', 'disco' ou 'memoria'."""
+        m = self.estatisticas.get(nome, {})
+        return next((o for o in ('calculado', 'disco', 'memoria') if m.get(o)), None)
+
+    def _memo_path(self, nome):
+        return self.memo_dir / f"{nome}.pkl"
+
+    def _ler_memo(self, nome, versao):
+        path = self._memo_path(nome)
+        if not path.exists():
+            return _AUSENTE
+        try:
+            with open(path, 'rb') as f:
+                memo = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Memo {nome} ilegivel, recalculando: {e}")
+            return _AUSENTE
+        return memo['valor'] if memo.get('versao') == versao else _AUSENTE
+
+    def _gravar_memo(self, nome, versao, valor):
+        path = self._memo_path(nome)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump({'versao': versao, 'valor': valor}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning(f"Memo {nome} nao gravado: {e}")
+
+
+ROBOS = {r.nome: r for r in (
+    Robo('vigilia', executar_vigilia, entradas=('missoes_rede',),
+         saidas=(_MISSOES_FILE,)),
+    Robo('estrategista', executar_estrategista,
+         entradas=('missoes_rede', 'persistentes', 'resumo_executivo', 'historico_semanas'),
+         depende=('vigilia',), saidas=(_NARRATIVA_FILE, _SCORECARD_FILE, _KPIS_FILE)),
+    Robo('conselheiro', executar_conselheiro, entradas=('missoes_rede', 'persistentes'),
+         depende=('estrategista',), saidas=(_CONSELHEIRO_FILE,)),
+    Robo('comparador', executar_comparador, entradas=('resumo_executivo', 'kpis_semanais'),
+         depende=('estrategista',), saidas=(_COMPARADOR_FILE,)),
+    Robo('preditor', executar_preditor, entradas=('historico_semanas',),
+         depende=('estrategista',), saidas=(_PREDITOR_FILE, _PREDITOR_ENTIDADES_FILE)),
+    Robo('retroalimentador', executar_retroalimentador, saidas=(_RETRO_FILE,)),
+    Robo('preparador', executar_preparador,
+         entradas=('missoes_rede', 'persistentes', 'resumo_executivo'),
+         depende=('conselheiro', 'comparador', 'preditor', 'retroalimentador'),
+         saidas=(_PREPARADOR_FILE,)),
+)}
+
+CADEIA_SEGUNDA = ('conselheiro', 'comparador', 'retroalimentador', 'preparador')
+"""Robos da manha de segunda (apos Estrategista/Preditor da semana)."""
+
+
+def ordem_robos(robos=None):
+    """Ordem topologica dos robos pedidos (padrao: todos).
+
+    Dependencias fora da lista nao sao incluidas: seus outputs ja gravados
+    sao lidos como estao.
+
+    Raises:
+        KeyError se algum robo nao existir; graphlib.CycleError se houver ciclo
+    """
+    nomes = list(ROBOS) if robos is None else [ROBOS[n].nome for n in robos]
+    grafo = {n: [d for d in ROBOS[n].depende if d in nomes] for n in nomes}
+    return list(graphlib.TopologicalSorter(grafo).static_order())
+
+
+def executar_robos(robos=None, contexto=None):
+    """Roda os robos em ordem de dependencia compartilhando os intermediarios.
+
+    Numa cadeia completa as missoes da rede sao calculadas uma unica vez
+    (ou lidas do memo em disco, se os dados nao mudaram). Se um robo falha,
+    os que dependem dele na mesma cadeia nao rodam.
+
+    Args:
+        robos: nomes de ROBOS (padrao: todos)
+        contexto: ContextoRobos a reaproveitar (padrao: novo)
+
+    Returns:
+        dict com ok, duracao, robos {nome: resultado} e
+        intermediarios {nome: calculado/disco/memoria/segundos}
+    """
+    inicio = datetime.now()
+    contexto = contexto or ContextoRobos()
+    resultados = {}
+    for nome in ordem_robos(robos):
+        falhas = [d for d in ROBOS[nome].depende if resultados.get(d, {}).get('ok') is False]
+        if falhas:
+            resultados[nome] = {'ok': False, 'erro': f"dependencia falhou: {', '.join(falhas)}"}
+            logger.warning(f"Cadeia: {nome} nao executado ({resultados[nome]['erro']})")
+            continue
+        contexto.robo = nome
+        try:
+            resultados[nome] = ROBOS[nome].executar(contexto)
+        finally:
+            contexto.robo = None
+
+    duracao = (datetime.now() - inicio).total_seconds()
+    intermediarios = {
+        nome: {**m, 'segundos': round(m['segundos'], 3)}
+        for nome, m in contexto.estatisticas.items()
+    }
+    logger.info(f"Cadeia: {len(resultados)} robo(s) em {duracao:.1f}s, intermediarios {intermediarios}")
+    return {
+        'ok': all(r.get('ok') for r in resultados.values()),
+        'duracao': duracao,
+        'robos': resultados,
+        'intermediarios': intermediarios,
+    }
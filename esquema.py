@@ -0,0 +1,139 @@
+"""
+Esquema tipado das tabelas fato/dim de power_bi/.
+
+Colunas de baixa cardinalidade (unidade, serie, disciplina, turma, professor,
+gravidade, categoria, presenca...) se repetem como strings em milhares de
+linhas. Aqui cada tabela declara quais colunas viram pandas Categorical e,
+quando existe ordem canonica (normalizacao.UNIDADES, ORDEM_SERIES), com que
+ordem de categorias. Groupby, isin e comparacoes passam a rodar sobre os
+codigos inteiros e a memoria residente cai varias vezes.
+
+A ordem fixa vem primeiro; valores fora dela (ex.: series do Fund I nas
+ocorrencias) entram depois, em ordem alfabetica — nenhum valor e perdido.
+O esquema e aplicado por armazenamento.ler_tabela, entao o Parquet ja guarda
+as colunas como dicionario.
+
+Cuidados para quem consome os frames:
+  - groupby/pivot_table sobre essas colunas: usar observed=True
+    (no pandas 2 o padrao ainda gera grupos vazios para categorias ausentes)
+  - value_counts() lista categorias com contagem zero: filtrar (> 0)
+  - fillna/atribuicao de valor novo exige .astype(object) antes
+
+Funcoes publicas:
+  - ESQUEMAS                          — colunas categoricas por tabela
+  - tipo_categorico(valores, ordem)   — CategoricalDtype (ordem fixa + extras)
+  - aplicar_esquema(df, tabela)       — converte as colunas declaradas
+"""
+
+import pandas as pd
+
+from normalizacao import UNIDADES, ORDEM_SERIES
+
+# ========== ORDENS FIXAS ==========
+
+GRAVIDADES = ['Leve', 'Media', 'Grave']
+"""Niveis de gravidade das ocorrencias, do menor para o maior."""
+
+PRESENCAS = ['P', 'F', 'J']
+"""Codigos de presenca do SIGA (presente, falta, justificada)."""
+
+DIAS_SEMANA = ['SEG', 'TER', 'QUA', 'QUI', 'SEX']
+"""Codigos dos dias letivos do dim_Horario_Esperado."""
+
+# ========== ESQUEMAS ==========
+# coluna -> lista com a ordem fixa das categorias, ou None (categorias = valores
+# observados, em ordem alfabetica).
+
+ESQUEMAS = {
+    'fato_Aulas': {
+        'unidade': UNIDADES,
+        'serie': ORDEM_SERIES,
+        'curso': None,
+        'disciplina': None,
+        'turma': None,
+        'professor': None,
+        'professor_normalizado': None,
+        'situacao': None,
+        'frequencia': None,
+        'tipo_aula': None,
+    },
+    'fato_Frequencia_Aluno': {
+        'unidade': UNIDADES,
+        'serie': ORDEM_SERIES,
+        'curso': None,
+        'turma': None,
+        'disciplina': None,
+        'professor': None,
+        'fase_nota': None,
+        'presenca': PRESENCAS,
+    },
+    # Visoes pre-agregadas de frequencia (agregados_frequencia.py)
+    'resumo_Frequencia_Aluno_Disciplina': {
+        'unidade': UNIDADES,
+        'serie': ORDEM_SERIES,
+        'turma': None,
+        'disciplina': None,
+    },
+    'resumo_Frequencia_Turma_Dia': {
+        'unidade': UNIDADES,
+        'serie': ORDEM_SERIES,
+        'turma': None,
+    },
+    'resumo_Frequencia_Unidade_Semana': {
+        'unidade': UNIDADES,
+    },
+    'fato_Ocorrencias': {
+        'unidade': UNIDADES,
+        'serie': ORDEM_SERIES,
+        'turma': None,
+        'tipo': None,
+        'categoria': None,
+        'gravidade': GRAVIDADES,
+        'responsavel': None,
+        'registrado_por': None,
+    },
+    'dim_Horario_Esperado': {
+        'unidade': UNIDADES,
+        'turma': None,
+        'serie': ORDEM_SERIES,
+        'disciplina': None,
+        'professor': None,
+        'dia_semana': DIAS_SEMANA,
+        'dia_semana_nome': None,
+    },
+}
+
+
+def tipo_categorico(valores, ordem=None):
+    """Monta o CategoricalDtype de uma coluna.
+
+    Args:
+        valores: Series com os valores observados
+        ordem: lista com a ordem fixa (ou None para ordem alfabetica)
+
+    Returns:
+        CategoricalDtype com a ordem fixa primeiro e os valores extras depois
+    """
+    observados = pd.Series(valores).dropna().unique()
+    if ordem is None:
+        return pd.CategoricalDtype(sorted(observados, key=str))
+    fixos = list(ordem)
+    conhecidos = set(fixos)
+    extras = sorted((v for v in observados if v not in conhecidos), key=str)
+    return pd.CategoricalDtype(fixos + extras)
+
+
+def aplicar_esquema(df, tabela):
+    """Converte para Categorical as colunas declaradas em ESQUEMAS[tabela].
+
+    Colunas ausentes do frame ou ja categoricas sao ignoradas; tabelas sem
+    esquema voltam inalteradas.
+    """
+    esquema = ESQUEMAS.get(tabela)
+    if not esquema or df.empty:
+        return df
+    for col, ordem in esquema.items():
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        df[col] = df[col].astype(tipo_categorico(df[col], ordem))
+    return df
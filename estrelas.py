@@ -11,6 +11,7 @@ Funcoes publicas:
 """
 
 import json
+import math
 from pathlib import Path
 from datetime import datetime
 
@@ -80,6 +81,8 @@ def calcular_estrelas_semana(resumo_atual, resumo_anterior, trimestre=1):
             campo = ind['campo']
             val_atual = float(row_atual.iloc[0].get(campo, 0)) if not row_atual.empty else 0
             val_ant = float(row_ant.iloc[0].get(campo, val_atual)) if row_ant is not None and not row_ant.empty else val_atual
+            if math.isnan(val_ant):  # KPI nao gravado na semana anterior
+                val_ant = val_atual
             meta = metas.get(campo, 0)
 
             n_estrelas = _calc_estrela_indicador(val_atual, val_ant, meta, ind['inverso'])
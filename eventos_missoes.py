@@ -0,0 +1,189 @@
+"""
+Fluxo de eventos das missoes (surgiu / score / nivel / resolvida).
+
+A Vigilia regrava missoes_pregeradas.json inteiro a cada extracao, e quem
+queria saber o que mudou (historico, escalacoes, memoria) tinha de recarregar
+e comparar snapshots. Aqui cada execucao e comparada com o estado anterior,
+por gerar_missao_fingerprint, e so as diferencas sao gravadas:
+
+  missoes_eventos.jsonl  log so-de-acrescimo, um evento por linha:
+                         surgiu     missao nova
+                         score      score mudou >= SCORE_DELTA_MIN pontos
+                         nivel      nivel mudou (URGENTE/IMPORTANTE/MONITORAR)
+                         resolvida  missao deixou de ser gerada
+  missoes_estado.json    indice compacto do estado atual {fingerprint: resumo}
+                         + ultimo seq e o offset (byte) do 1o evento de cada
+                         semana, para ler o log a partir de uma semana sem
+                         varrer o arquivo
+
+Consumidores guardam um cursor (offset em bytes) e leem so o que chegou
+depois dele (ler_eventos), ou pedem os eventos das ultimas semanas.
+
+Funcoes publicas:
+  - registrar_execucao(missoes_por_unidade, semana) — diff + append, devolve os eventos
+  - ler_eventos(cursor=0)                            — (eventos, novo_cursor)
+  - eventos_recentes(semanas=1, unidade=None, eventos=None)
+  - estado_atual()                                   — {fingerprint: resumo}
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from utils import WRITABLE_DIR, calcular_semana_letiva
+from missoes import gerar_missao_fingerprint
+
+logger = logging.getLogger("eventos_missoes")
+
+_EVENTOS_PATH = WRITABLE_DIR / "missoes_eventos.jsonl"
+_ESTADO_PATH = WRITABLE_DIR / "missoes_estado.json"
+
+EVENTOS = ('surgiu', 'score', 'nivel', 'resolvida')
+
+SCORE_DELTA_MIN = 1.0
+"""Variacao minima de score (pontos) para emitir evento 'score'."""
+
+
+def _resumo(missao, unidade):
+    """Resumo compacto da missao guardado no indice de estado."""
+    return {
+        'unidade': missao.get('unidade', unidade),
+        'tipo': missao.get('tipo', ''),
+        'entidade': missao.get('professor', missao.get('serie', missao.get('disciplina', ''))),
+        'score': round(float(missao.get('score', 0) or 0), 1),
+        'nivel': missao.get('nivel', ''),
+        'n_afetados': int(missao.get('n_afetados', 0) or 0),
+        'o_que': missao.get('o_que', ''),
+    }
+
+
+def _carregar_estado():
+    if not _ESTADO_PATH.exists():
+        return {'ultimo_seq': 0, 'offset_semana': {}, 'missoes': {}}
+    try:
+        with open(_ESTADO_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Estado de missoes ilegivel, recomecando: {e}")
+        return {'ultimo_seq': 0, 'offset_semana': {}, 'missoes': {}}
+
+
+def _salvar_estado(estado):
+    tmp = _ESTADO_PATH.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, separators=(',', ':'))
+    tmp.replace(_ESTADO_PATH)
+
+
+def estado_atual():
+    """Missoes ativas na ultima execucao: {fingerprint: resumo}."""
+    return _carregar_estado().get('missoes', {})
+
+
+# ========== ESCRITA ==========
+
+def _diff(anteriores, atuais):
+    """Eventos (sem seq/em) entre dois indices {fingerprint: resumo}."""
+    eventos = []
+    for fp, novo in atuais.items():
+        antigo = anteriores.get(fp)
+        if antigo is None:
+            eventos.append({'evento': 'surgiu', 'fingerprint': fp, **novo})
+        elif antigo.get('nivel') != novo['nivel']:
+            eventos.append({'evento': 'nivel', 'fingerprint': fp, **novo,
+                            'nivel_anterior': antigo.get('nivel'),
+                            'score_anterior': antigo.get('score')})
+        elif abs(novo['score'] - antigo.get('score', 0)) >= SCORE_DELTA_MIN:
+            eventos.append({'evento': 'score', 'fingerprint': fp, **novo,
+                            'score_anterior': antigo.get('score')})
+    for fp, antigo in anteriores.items():
+        if fp not in atuais:
+            eventos.append({'evento': 'resolvida', 'fingerprint': fp, **antigo})
+    return eventos
+
+
+def registrar_execucao(missoes_por_unidade, semana=None):
+    """Compara a execucao com o estado anterior e acrescenta os eventos ao log.
+
+    Args:
+        missoes_por_unidade: dict {unidade: [missoes]} — output de gerar_todas_missoes_rede()
+        semana: semana letiva (padrao: atual)
+
+    Returns:
+        lista de eventos gravados (com seq, em e semana)
+    """
+    semana = calcular_semana_letiva() if semana is None else semana
+    estado = _carregar_estado()
+    atuais = {}
+    for unidade, missoes in missoes_por_unidade.items():
+        for b in missoes:
+            atuais.setdefault(gerar_missao_fingerprint(b), _resumo(b, unidade))
+
+    eventos = _diff(estado.get('missoes', {}), atuais)
+    agora = datetime.now().isoformat(timespec='seconds')
+    seq = estado.get('ultimo_seq', 0)
+    for e in eventos:
+        seq += 1
+        e.update(seq=seq, em=agora, semana=semana)
+
+    if eventos:
+        with open(_EVENTOS_PATH, 'ab') as f:
+            offset = f.tell()
+            estado.setdefault('offset_semana', {}).setdefault(str(semana), offset)
+            f.write(''.join(json.dumps(e, ensure_ascii=False, default=str) + '\n'
+                            for e in eventos).encode('utf-8'))
+
+    estado.update(ultimo_seq=seq, semana=semana, atualizado_em=agora, missoes=atuais)
+    _salvar_estado(estado)
+    return eventos
+
+
+# ========== LEITURA ==========
+
+def ler_eventos(cursor=0):
+    """Eventos gravados a partir do offset cursor (bytes).
+
+    Returns:
+        (lista de eventos, novo cursor) — passar o cursor na proxima chamada
+        para receber so o que chegou depois. Linha incompleta no fim (escrita
+        em andamento) fica para a proxima leitura.
+    """
+    if not _EVENTOS_PATH.exists():
+        return [], 0
+    with open(_EVENTOS_PATH, 'rb') as f:
+        f.seek(cursor)
+        bruto = f.read()
+    fim = bruto.rfind(b'\n') + 1
+    eventos = []
+    for linha in bruto[:fim].splitlines():
+        try:
+            eventos.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return eventos, cursor + fim
+
+
+def eventos_recentes(semanas=1, unidade=None, eventos=None):
+    """Eventos das ultimas `semanas` semanas letivas (mais recente primeiro).
+
+    Le o log a partir do offset da semana mais antiga pedida (indice em
+    missoes_estado.json), sem varrer o arquivo inteiro.
+
+    Args:
+        semanas: quantas semanas (incluindo a atual)
+        unidade: filtra por unidade
+        eventos: filtra por tipo de evento (ex.: ('nivel', 'resolvida'))
+    """
+    estado = _carregar_estado()
+    offsets = {int(s): o for s, o in estado.get('offset_semana', {}).items()}
+    semana = estado.get('semana', calcular_semana_letiva())
+    candidatos = [o for s, o in offsets.items() if s > semana - semanas]
+    if not candidatos:
+        return []
+    lidos, _ = ler_eventos(min(candidatos))
+    lidos = [
+        e for e in lidos
+        if (unidade is None or e.get('unidade') == unidade)
+        and (eventos is None or e.get('evento') in eventos)
+    ]
+    return lidos[::-1]
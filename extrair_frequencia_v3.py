@@ -14,7 +14,7 @@ Fluxo:
 1. Login via Playwright (headless) - captura cookies (igual atualizar_siga.py)
 2. Extrai diarios via requests (4 unidades)
 3. Para cada diario, busca frequencia via diario_frequencia/montar
-4. Salva em power_bi/fato_Frequencia_Aluno.csv
+4. Salva em power_bi/fato_Frequencia_Aluno.csv (+ visoes resumo_Frequencia_*)
 
 USO:
   export SIGA_SENHA='sua_senha'
@@ -287,12 +287,42 @@ def main():
 
     # CSV
     csv_path = OUTPUT_DIR / 'fato_Frequencia_Aluno.csv'
-    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+    from armazenamento import ler_tabela, publicar_tabela, registrar_versao_dados
+    from agregados_frequencia import atualizar_agregados, diferenca_chamadas, visoes_em_dia
+    # Base do incremental: a extracao anterior, se as visoes estao em dia com ela
+    chamadas_anteriores = ler_tabela(csv_path) if visoes_em_dia(csv_path.parent) else None
+    # tmp + replace: leitores nunca veem meio arquivo
+    tmp_path = csv_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
         writer.writeheader()
         writer.writerows(all_rows)
+    tmp_path.replace(csv_path)
     print(f"  fato_Frequencia_Aluno.csv: {len(all_rows)} registros")
 
+    # Copia colunar tipada (lida pelos loaders do utils)
+    if publicar_tabela(csv_path):
+        print("  fato_Frequencia_Aluno.parquet publicado")
+
+    # Visoes pre-agregadas: so as chamadas novas/alteradas entram na conta
+    if chamadas_anteriores is not None and not chamadas_anteriores.empty:
+        novas, removidas = diferenca_chamadas(chamadas_anteriores, ler_tabela(csv_path))
+        print(f"  Chamadas novas/alteradas: {len(novas)} | removidas: {len(removidas)}")
+        visoes = atualizar_agregados(csv_path.parent, novas=novas, removidas=removidas)
+    else:
+        visoes = atualizar_agregados(csv_path.parent)
+    for visao, linhas in visoes.items():
+        print(f"  resumo de frequencia {visao}: {linhas} linhas")
+
+    # Matriz de presenca compactada (2 bits por aluno x aula)
+    from matriz_frequencia import publicar_matriz
+    matriz = publicar_matriz(csv_path.parent)
+    if matriz is not None:
+        print(f"  {matriz}")
+    registrar_versao_dados(origem='extrair_frequencia_v3')
+    from banco_analitico import atualizar_banco
+    atualizar_banco(diretorio=csv_path.parent)
+
     # Backup JSON
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
     json_path = SCRIPT_DIR / f"backup_frequencia_{timestamp}.json"
@@ -370,6 +370,12 @@ def main():
 
     print(f"  fato_Ocorrencias.csv: {len(csv_rows)} registros")
 
+    # Copia colunar tipada (lida pelos loaders do utils)
+    from armazenamento import publicar_tabela, registrar_versao_dados
+    if publicar_tabela(csv_path):
+        print("  fato_Ocorrencias.parquet publicado")
+    registrar_versao_dados(origem='extrair_ocorrencias_siga')
+
     # Backup JSON
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
     json_path = SCRIPT_DIR / f"backup_ocorrencias_{timestamp}.json"
@@ -22,6 +22,8 @@ import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
+from conteudo_aulas import enriquecer_conteudo
+
 # ========== CONFIGURACAO ==========
 
 OUTPUT_DIR = Path(__file__).parent / "power_bi"
@@ -669,6 +671,7 @@ def gerar_cruzamento(df_materiais, df_alunos, df_engajamento):
 
     df_aulas = pd.read_csv(path_aulas)
     df_aulas['data'] = pd.to_datetime(df_aulas['data'], errors='coerce')
+    df_aulas = enriquecer_conteudo(df_aulas)
 
     semana_atual = calcular_semana_letiva()
     cap_esperado = calcular_capitulo_esperado(semana_atual)
@@ -691,8 +694,8 @@ def gerar_cruzamento(df_materiais, df_alunos, df_engajamento):
             unidade, serie, disciplina, turma, professor = keys
             semana = semana_atual
 
-        # Detectar capitulo do professor via regex no conteudo
-        cap_professor = detectar_capitulo(grp['conteudo'])
+        # Capitulo do professor: maior cap_detectado (indice de conteudo)
+        cap_professor = detectar_capitulo(grp['cap_detectado'])
 
         # Buscar engajamento SAE para esta serie/disciplina
         cap_alunos_mediana = None
@@ -761,26 +764,13 @@ def gerar_cruzamento(df_materiais, df_alunos, df_engajamento):
     return df_cruz
 
 
-def detectar_capitulo(conteudo_series):
-    """Detecta capitulo mencionado no conteudo registrado pelo professor.
-    Busca padroes como 'Cap. 3', 'Capitulo 5', 'cap 7', etc."""
-    caps = []
-    for conteudo in conteudo_series.dropna():
-        conteudo = str(conteudo)
-        # Padroes: Cap. N, Capitulo N, cap N, Cap N
-        matches = re.findall(
-            r'(?:cap(?:\u00edtulo|\.?)\s*(\d{1,2}))',
-            conteudo,
-            re.IGNORECASE,
-        )
-        for m in matches:
-            n = int(m)
-            if 1 <= n <= 12:
-                caps.append(n)
-
-    if caps:
-        return max(caps)  # Retorna o capitulo mais avancado
-    return None
+def detectar_capitulo(caps_series):
+    """Capitulo mais avancado entre as aulas do grupo.
+    Recebe a coluna cap_detectado (conteudo_aulas: 'Cap. 3', 'Capitulo 5'...)."""
+    caps = caps_series.dropna()
+    if caps.empty:
+        return None
+    return int(caps.max())
 
 
 def classificar_status(cap_prof, cap_esp, cap_alunos, pct_eng):
@@ -9,11 +9,12 @@ Gera 3 tabelas calculadas para o dashboard de 5 páginas:
 
 import pandas as pd
 import numpy as np
-import re
 import math
 from pathlib import Path
 from datetime import date
 
+from conteudo_aulas import enriquecer_conteudo
+
 # ========== CONFIGURAÇÃO ==========
 POWER_BI_DIR = Path(__file__).parent / "power_bi"
 INICIO_LETIVO = date(2026, 1, 26)
@@ -79,6 +80,13 @@ df_engajamento = carregar("fato_Engajamento_SAE.csv")
 df_disciplinas = carregar("dim_Disciplinas.csv")
 df_calendario = carregar("dim_Calendario.csv")
 df_freq_chamada = carregar("fato_Frequencia_Aluno.csv")
+# Visao aluno x disciplina materializada pela extracao (so se estiver em dia)
+_visao_freq = POWER_BI_DIR / "resumo_Frequencia_Aluno_Disciplina.csv"
+if (_visao_freq.exists() and (POWER_BI_DIR / "fato_Frequencia_Aluno.csv").exists()
+        and _visao_freq.stat().st_mtime >= (POWER_BI_DIR / "fato_Frequencia_Aluno.csv").stat().st_mtime):
+    df_freq_aluno_disc = carregar(_visao_freq.name)
+else:
+    df_freq_aluno_disc = pd.DataFrame()
 
 
 # ========================================================================
@@ -167,18 +175,9 @@ def gerar_score_professor():
     )
 
     # --- C) ALINHAMENTO SAE ---
-    # Detectar capítulo no conteúdo
-    def detectar_capitulo(txt):
-        if pd.isna(txt):
-            return None
-        txt = str(txt)
-        # Padrões: "Cap. 1", "Capítulo 3", "cap 2", "Cap.1"
-        match = re.search(r"[Cc]ap(?:ítulo|\.?\s*)(\d{1,2})", txt)
-        if match:
-            return int(match.group(1))
-        return None
-
-    aulas["cap_detectado"] = aulas["conteudo"].apply(detectar_capitulo)
+    # Capítulo no conteúdo: coluna cap_detectado gravada pelo extrator
+    # (calculada aqui só para CSVs antigos, sem a coluna)
+    aulas = enriquecer_conteudo(aulas)
 
     # Capítulo mais recente por professor/disciplina/serie
     caps_prof = (
@@ -323,24 +322,23 @@ def gerar_score_aluno_abc():
     # Tentar dados de chamada 2026 primeiro
     if not df_freq_chamada.empty:
         print("  [Eixo A] Usando fato_Frequencia_Aluno.csv (chamada 2026)")
-        fc = df_freq_chamada.copy()
-        # Filtrar apenas registros com chamada feita (P, F ou J)
-        # Ignorar registros sem presença registrada (NaN = chamada não feita)
-        fc_validos = fc[fc["presenca"].isin(["P", "F", "J"])].copy()
-        print(f"    Registros com chamada feita: {len(fc_validos)} de {len(fc)}")
+        # Contagens por aluno x disciplina (P, F, J; sem chamada ignorada):
+        # visao pre-agregada da extracao, ou agregada agora se faltar
+        if not df_freq_aluno_disc.empty:
+            por_disciplina = df_freq_aluno_disc
+        else:
+            from agregados_frequencia import agregar_chamadas
+            por_disciplina = agregar_chamadas(df_freq_chamada, "aluno_disciplina")
+        print(f"    Registros com chamada feita: {int(por_disciplina['total_aulas'].sum())} de {len(df_freq_chamada)}")
 
         # Calcular frequência por aluno:
         # Presente = P, Falta = F, Falta Justificada = J
         # % frequência = P / (P + F + J) * 100
         freq_aluno_chamada = (
-            fc_validos.groupby("aluno_id")
-            .agg(
-                presentes=("presenca", lambda x: (x == "P").sum()),
-                faltas=("presenca", lambda x: (x == "F").sum()),
-                justificadas=("presenca", lambda x: (x == "J").sum()),
-                total_chamadas=("presenca", "count"),
-            )
+            por_disciplina.groupby("aluno_id")[["presencas", "faltas", "justificadas", "total_aulas"]]
+            .sum()
             .reset_index()
+            .rename(columns={"presencas": "presentes", "total_aulas": "total_chamadas"})
         )
         freq_aluno_chamada["pct_frequencia"] = np.where(
             freq_aluno_chamada["total_chamadas"] > 0,
@@ -0,0 +1,176 @@
+"""
+Indice em memoria das missoes pre-geradas (missoes_pregeradas.json).
+
+carregar_missoes_pregeradas abria e parseava o JSON inteiro a cada rerun de
+cada pagina PEEX e depois filtrava com list comprehensions por unidade,
+serie, nivel ou tipo. IndiceMissoes parseia o arquivo uma vez por versao
+(relido so quando mtime/tamanho mudam) e mantem indices secundarios
+{valor: posicoes} por unidade, tipo, nivel, professor e serie, alem da ordem
+por score. Consultas intersectam os indices em vez de varrer a lista.
+
+As missoes devolvidas sao copias rasas: a pagina pode acrescentar chaves
+sem alterar o indice compartilhado entre sessoes.
+
+Filtro de series (mesma regra de carregar_missoes_pregeradas): entram as
+missoes cuja 'serie' esta na lista, cujo campo 'series' (texto) esta na
+lista, e as sem serie (ex.: PROCESSO_DEADLINE, professor de varias series).
+
+Funcoes publicas:
+  - IndiceMissoes(path)   — .consultar / .contar / .pagina / .top / .recarregar
+  - indice_missoes(path)  — instancia compartilhada do processo (recarrega se mudou)
+"""
+
+import json
+import threading
+from pathlib import Path
+
+CAMPOS_INDICE = ('unidade', 'tipo', 'nivel', 'professor', 'serie')
+"""Campos com indice secundario."""
+
+
+def _como_conjunto(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return list(valor)
+    return [valor]
+
+
+class IndiceMissoes:
+    """Missoes pre-geradas com indices secundarios, recarregadas se o arquivo mudar."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._assinatura = None
+        self._estado = ([], {}, {}, [])
+        self._lock = threading.Lock()
+        self.gerado_em = None
+        self.semana = None
+
+    def __len__(self):
+        return len(self._estado[0])
+
+    def recarregar(self):
+        """Rele o arquivo se mtime/tamanho mudaram. Retorna True se releu.
+
+        Raises:
+            OSError / json.JSONDecodeError se o arquivo existir mas nao puder ser lido
+        """
+        st = self.path.stat()
+        assinatura = (st.st_mtime_ns, st.st_size)
+        if assinatura == self._assinatura:
+            return False
+        with self._lock:
+            if assinatura == self._assinatura:
+                return False
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._estado = self._construir(data)
+            self.gerado_em = data.get('gerado_em')
+            self.semana = data.get('semana')
+            self._assinatura = assinatura
+        return True
+
+    @staticmethod
+    def _construir(data):
+        missoes = []
+        indices = {campo: {} for campo in CAMPOS_INDICE}
+        series_texto = {}
+        for unidade, lista in data.get('unidades', {}).items():
+            for b in lista:
+                pos = len(missoes)
+                missoes.append(b)
+                indices['unidade'].setdefault(unidade, []).append(pos)
+                for campo in ('tipo', 'nivel', 'professor'):
+                    if b.get(campo) is not None:
+                        indices[campo].setdefault(b[campo], []).append(pos)
+                # Sem serie (None/'') fica na chave None
+                indices['serie'].setdefault(b.get('serie') or None, []).append(pos)
+                if b.get('series'):
+                    series_texto.setdefault(b['series'], []).append(pos)
+        por_score = sorted(range(len(missoes)), key=lambda p: -(missoes[p].get('score') or 0))
+        return missoes, indices, series_texto, por_score
+
+    # ---------- Consulta ----------
+
+    def _posicoes(self, unidade=None, series=None, tipo=None, nivel=None, professor=None):
+        """Posicoes (conjunto) que passam nos filtros; None = todas."""
+        _, indices, series_texto, _ = self._estado
+        selecao = None
+        for campo, valor in (('unidade', unidade), ('tipo', tipo), ('nivel', nivel), ('professor', professor)):
+            valores = _como_conjunto(valor)
+            if valores is None:
+                continue
+            posicoes = set()
+            for v in valores:
+                posicoes.update(indices[campo].get(v, ()))
+            selecao = posicoes if selecao is None else selecao & posicoes
+        if series:
+            posicoes = set(indices['serie'].get(None, ()))
+            for s in series:
+                posicoes.update(indices['serie'].get(s, ()))
+                posicoes.update(series_texto.get(s, ()))
+            selecao = posicoes if selecao is None else selecao & posicoes
+        return selecao
+
+    def consultar(self, unidade=None, series=None, tipo=None, nivel=None, professor=None,
+                  por_score=False, inicio=0, limite=None):
+        """Missoes que passam nos filtros (copias).
+
+        Args:
+            unidade, tipo, nivel, professor: valor ou lista de valores aceitos
+            series: lista de series do coordenador (ver regra no modulo)
+            por_score: ordena por score desc; senao mantem a ordem do arquivo
+                (unidade a unidade, cada uma ja ordenada por score)
+            inicio, limite: fatia do resultado (paginacao)
+        """
+        missoes, _, _, ordem_score = self._estado
+        selecao = self._posicoes(unidade, series, tipo, nivel, professor)
+        if por_score:
+            ordem = ordem_score if selecao is None else [p for p in ordem_score if p in selecao]
+        else:
+            ordem = range(len(missoes)) if selecao is None else sorted(selecao)
+        fim = None if limite is None else inicio + limite
+        return [dict(missoes[p]) for p in list(ordem)[inicio:fim]]
+
+    def contar(self, **filtros):
+        """Quantidade de missoes que passam nos filtros (sem copiar)."""
+        selecao = self._posicoes(**filtros)
+        return len(self._estado[0]) if selecao is None else len(selecao)
+
+    def top(self, k=10, **filtros):
+        """As k missoes de maior score que passam nos filtros."""
+        return self.consultar(por_score=True, limite=k, **filtros)
+
+    def pagina(self, pagina=1, por_pagina=20, por_score=True, **filtros):
+        """Pagina de resultados.
+
+        Returns:
+            dict com missoes, total, pagina, por_pagina e paginas
+        """
+        total = self.contar(**filtros)
+        paginas = max(1, -(-total // por_pagina))
+        pagina = min(max(1, pagina), paginas)
+        missoes = self.consultar(por_score=por_score, inicio=(pagina - 1) * por_pagina,
+                                 limite=por_pagina, **filtros)
+        return {'missoes': missoes, 'total': total, 'pagina': pagina,
+                'por_pagina': por_pagina, 'paginas': paginas}
+
+
+# ========== INSTANCIA COMPARTILHADA ==========
+
+_INDICES = {}
+_LOCK_INDICES = threading.Lock()
+
+
+def indice_missoes(path):
+    """Indice compartilhado do processo para o arquivo (recarregado se mudou).
+
+    Raises:
+        OSError / json.JSONDecodeError se o arquivo nao puder ser lido
+    """
+    path = Path(path)
+    with _LOCK_INDICES:
+        indice = _INDICES.setdefault(path, IndiceMissoes(path))
+    indice.recarregar()
+    return indice
@@ -0,0 +1,231 @@
+"""
+Serie temporal semanal dos KPIs do resumo_Executivo (unidade x semana x KPI).
+
+historico_semanas.json guarda so a conformidade por unidade, entao o
+Comparador montava resumo_anterior como DataFrame vazio e as estrelas da
+semana comparavam cada indicador com ele mesmo. Aqui o Estrategista grava,
+a cada semana, todas as colunas numericas do resumo_Executivo num cubo
+denso float32 [unidade, semana, kpi] (NaN = semana sem snapshot),
+persistido em kpis_semanais.npz (~20 KB por ano de rede).
+
+Consultas sao indexacao direta no cubo: valor/resumo de uma semana e a
+variacao semana a semana sao O(1); medias de intervalo (trimestre ate
+agora, janela movel) usam somas acumuladas ao longo das semanas, tambem
+O(1) por consulta.
+
+Funcoes publicas:
+  - SerieKPI.carregar(path) / .salvar(path) / .registrar(semana, resumo_df)
+  - .valor(unidade, semana, kpi) / .resumo(semana) / .anterior(semana)
+  - .intervalo(inicio, fim, kpis, unidades)  — formato longo
+  - .variacao(semana, passos=1) / .media(inicio, fim) / .media_movel(semana, janela)
+  - .acumulado_trimestre(semana)
+  - semana_do_resumo(resumo_df, padrao)
+  - registrar_kpis_semana(path, semana, resumo_df)
+  - serie_kpis(path)          — instancia compartilhada (relida se o arquivo mudar)
+"""
+
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("kpi_semanal")
+
+SEMANAS_ANO = 47
+
+TRIMESTRES = {1: (1, 15), 2: (16, 33), 3: (34, SEMANAS_ANO)}
+"""Mesmo calendario de utils.calcular_trimestre / estrelas."""
+
+
+def _inicio_trimestre(semana):
+    return next(ini for ini, fim in TRIMESTRES.values() if semana <= fim)
+
+
+def semana_do_resumo(resumo_df, padrao):
+    """Semana letiva a que o resumo_Executivo se refere (coluna semana_atual)."""
+    if 'semana_atual' in resumo_df.columns and resumo_df['semana_atual'].notna().any():
+        return int(resumo_df['semana_atual'].max())
+    return padrao
+
+
+class SerieKPI:
+    """Cubo unidade x semana x KPI com consultas por semana e intervalo."""
+
+    def __init__(self, unidades=(), kpis=(), valores=None):
+        self.unidades = list(unidades)
+        self.kpis = list(kpis)
+        self.valores = (valores if valores is not None else
+                        np.full((len(self.unidades), SEMANAS_ANO, len(self.kpis)), np.nan, np.float32))
+        self._idx_un = {u: i for i, u in enumerate(self.unidades)}
+        self._idx_kpi = {k: i for i, k in enumerate(self.kpis)}
+        self._acumulado = None
+
+    # ---------- Persistencia ----------
+
+    @classmethod
+    def carregar(cls, path):
+        """Le o cubo gravado (vazio se nao existir ou estiver ilegivel)."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                return cls(z['unidades'].tolist(), z['kpis'].tolist(), z['valores'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Serie de KPIs ilegivel em {path}, recomecando: {e}")
+            return cls()
+
+    def salvar(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, unidades=np.array(self.unidades, dtype=str),
+                 kpis=np.array(self.kpis, dtype=str), valores=self.valores)
+        tmp.replace(path)
+
+    # ---------- Escrita ----------
+
+    def _garantir(self, unidades, kpis):
+        novas_un = [u for u in unidades if u not in self._idx_un]
+        novos_kpi = [k for k in kpis if k not in self._idx_kpi]
+        if not novas_un and not novos_kpi:
+            return
+        valores = np.full((len(self.unidades) + len(novas_un), SEMANAS_ANO,
+                           len(self.kpis) + len(novos_kpi)), np.nan, np.float32)
+        valores[:len(self.unidades), :, :len(self.kpis)] = self.valores
+        self.__init__(self.unidades + novas_un, self.kpis + novos_kpi, valores)
+
+    def registrar(self, semana, resumo_df):
+        """Grava (ou substitui) a semana com as colunas numericas do resumo."""
+        if resumo_df.empty or not 1 <= semana <= SEMANAS_ANO:
+            return self
+        numericos = resumo_df.drop(columns=['unidade']).select_dtypes('number')
+        unidades = resumo_df['unidade'].astype(str).tolist()
+        self._garantir(unidades, list(numericos.columns))
+        linhas = [self._idx_un[u] for u in unidades]
+        colunas = [self._idx_kpi[k] for k in numericos.columns]
+        self.valores[:, semana - 1, :] = np.nan
+        self.valores[np.ix_(linhas, [semana - 1], colunas)] = (
+            numericos.to_numpy(dtype=np.float32)[:, None, :])
+        self._acumulado = None
+        return self
+
+    # ---------- Consulta pontual ----------
+
+    def semanas(self):
+        """Semanas com snapshot gravado."""
+        return (np.flatnonzero(~np.isnan(self.valores).all(axis=(0, 2))) + 1).tolist()
+
+    def anterior(self, semana):
+        """Ultima semana gravada antes de `semana` (None se nao houver)."""
+        if not self.unidades or semana <= 1:
+            return None
+        tem = ~np.isnan(self.valores[:, :min(semana, SEMANAS_ANO + 1) - 1, :]).all(axis=(0, 2))
+        gravadas = np.flatnonzero(tem)
+        return int(gravadas[-1]) + 1 if len(gravadas) else None
+
+    def valor(self, unidade, semana, kpi):
+        """KPI da unidade na semana (None se nao gravado)."""
+        try:
+            v = self.valores[self._idx_un[unidade], semana - 1, self._idx_kpi[kpi]]
+        except (KeyError, IndexError):
+            return None
+        return None if np.isnan(v) else float(v)
+
+    def _quadro(self, matriz, kpis=None):
+        """DataFrame unidade + kpis a partir de uma matriz (unidades, kpis)."""
+        kpis = self.kpis if kpis is None else kpis
+        cols = [self._idx_kpi[k] for k in kpis]
+        df = pd.DataFrame(matriz[:, cols].astype(np.float64), columns=kpis)
+        df.insert(0, 'unidade', self.unidades)
+        return df
+
+    def resumo(self, semana):
+        """Snapshot da semana no formato do resumo_Executivo (vazio se nao gravado)."""
+        if semana is None or not 1 <= semana <= SEMANAS_ANO or semana not in self.semanas():
+            return pd.DataFrame()
+        df = self._quadro(self.valores[:, semana - 1, :])
+        return df[df[self.kpis].notna().any(axis=1)].reset_index(drop=True)
+
+    def variacao(self, semana, passos=1, kpis=None):
+        """Diferenca semana - (semana - passos) por unidade (NaN onde faltar)."""
+        if not (1 <= semana - passos and semana <= SEMANAS_ANO):
+            return pd.DataFrame()
+        return self._quadro(self.valores[:, semana - 1, :] - self.valores[:, semana - passos - 1, :], kpis)
+
+    def intervalo(self, inicio, fim, kpis=None, unidades=None):
+        """Semanas inicio..fim em formato longo (unidade, semana, kpis), so as gravadas."""
+        kpis = self.kpis if kpis is None else kpis
+        unidades = self.unidades if unidades is None else [u for u in unidades if u in self._idx_un]
+        ini, fim = max(inicio, 1), min(fim, SEMANAS_ANO)
+        if not unidades or ini > fim:
+            return pd.DataFrame(columns=['unidade', 'semana'] + list(kpis))
+        bloco = self.valores[np.ix_([self._idx_un[u] for u in unidades], np.arange(ini - 1, fim),
+                                    [self._idx_kpi[k] for k in kpis])]
+        df = pd.DataFrame(bloco.reshape(-1, len(kpis)).astype(np.float64), columns=kpis)
+        df.insert(0, 'semana', np.tile(np.arange(ini, fim + 1), len(unidades)))
+        df.insert(0, 'unidade', np.repeat(unidades, fim - ini + 1))
+        return df[df[kpis].notna().any(axis=1)].reset_index(drop=True)
+
+    # ---------- Agregados por intervalo (somas acumuladas) ----------
+
+    def _somas(self):
+        if self._acumulado is None:
+            validos = ~np.isnan(self.valores)
+            zeros = np.zeros((len(self.unidades), 1, len(self.kpis)))
+            self._acumulado = (
+                np.concatenate([zeros, np.cumsum(np.where(validos, self.valores, 0), axis=1, dtype=np.float64)], axis=1),
+                np.concatenate([zeros, np.cumsum(validos, axis=1, dtype=np.float64)], axis=1),
+            )
+        return self._acumulado
+
+    def media(self, inicio, fim, kpis=None):
+        """Media de cada KPI nas semanas gravadas de inicio..fim, por unidade."""
+        ini, fim = max(inicio, 1), min(fim, SEMANAS_ANO)
+        if not self.unidades or ini > fim:
+            return pd.DataFrame()
+        soma, contagem = self._somas()
+        n = contagem[:, fim, :] - contagem[:, ini - 1, :]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = (soma[:, fim, :] - soma[:, ini - 1, :]) / n
+        return self._quadro(np.where(n > 0, media, np.nan), kpis)
+
+    def media_movel(self, semana, janela=4, kpis=None):
+        """Media das ultimas `janela` semanas ate `semana` (inclusive)."""
+        return self.media(semana - janela + 1, semana, kpis)
+
+    def acumulado_trimestre(self, semana, kpis=None):
+        """Media do inicio do trimestre de `semana` ate ela."""
+        return self.media(_inicio_trimestre(min(semana, SEMANAS_ANO)), semana, kpis)
+
+
+# ========== ARQUIVO COMPARTILHADO ==========
+
+_SERIES = {}
+_LOCK = threading.Lock()
+
+
+def registrar_kpis_semana(path, semana, resumo_df):
+    """Grava o snapshot da semana no arquivo. Returns: SerieKPI atualizada."""
+    with _LOCK:
+        serie = SerieKPI.carregar(path).registrar(semana, resumo_df)
+        serie.salvar(path)
+    return serie
+
+
+def serie_kpis(path):
+    """SerieKPI do arquivo, mantida em memoria ate o arquivo mudar (mtime/tamanho)."""
+    path = Path(path)
+    try:
+        st_ = path.stat()
+        assinatura = (st_.st_mtime_ns, st_.st_size)
+    except OSError:
+        return SerieKPI()
+    with _LOCK:
+        guardado = _SERIES.get(path)
+        if guardado is None or guardado[0] != assinatura:
+            guardado = (assinatura, SerieKPI.carregar(path))
+            _SERIES[path] = guardado
+    return guardado[1]
@@ -0,0 +1,391 @@
+"""
+Matriz de presenca compactada (2 bits por celula) de fato_Frequencia_Aluno.
+
+Cada linha de chamada carrega ~18 colunas de texto (aluno_nome, curso,
+turma, professor, fase_nota...) para um unico sinal: o estado P/F/J de um
+aluno numa aula. Aqui o ano inteiro vira, por turma, uma matriz
+alunos x aulas com 2 bits por celula, empacotada 4 celulas por byte:
+
+  0 = sem chamada (aluno fora do diario ou chamada nao feita)
+  1 = P (presente)   2 = F (falta)   3 = J (falta justificada)
+
+Alunos e aulas ganham ids inteiros densos (linha/coluna da matriz da turma);
+os textos ficam nas tabelas de indice (alunos, aulas, turmas). Com 2 bits,
+um ano de chamadas da rede inteira cabe em poucos MB e fica residente.
+
+Persistencia: power_bi/_matriz_frequencia/ com um .npy por turma (aberto com
+mmap, sem copiar para a memoria) e os indices em Parquet. Publicada por
+extrair_frequencia_v3 logo apos o CSV. Cada publicacao grava uma subpasta
+nova (v<timestamp>_<pid>/) e so entao troca o manifesto.json, que aponta a
+versao vigente: leitores nunca veem turmas de uma publicacao com indices de
+outra. Versoes anteriores sao removidas depois da troca.
+
+Consultas sao operacoes de array: contagens por tabela de consulta de 256
+entradas sobre os bytes empacotados (sem desempacotar), janelas moveis por
+soma acumulada e sequencias de faltas por run-length vetorizado.
+
+Funcoes publicas:
+  - MatrizFrequencia.de_chamadas(df)      — monta a partir das chamadas brutas
+  - MatrizFrequencia.carregar(pasta, mmap=True) / .salvar(pasta)
+  - .taxas()                              — contagens e % por aluno
+  - .taxa_recente(ultimas)                — % nas ultimas N chamadas de cada aluno
+  - .janela_movel(turma, janela)          — % movel aluno x aula de uma turma
+  - .faltas_consecutivas(incluir_justificadas=False) — maior e atual sequencia
+  - publicar_matriz(diretorio) / carregar_matriz(diretorio=None)
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import DATA_DIR, impressao_digital, ler_tabela
+
+logger = logging.getLogger("matriz_frequencia")
+
+SUBDIR = "_matriz_frequencia"
+ARQUIVO_CHAMADAS = "fato_Frequencia_Aluno.csv"
+
+SEM_CHAMADA, PRESENTE, FALTA, JUSTIFICADA = 0, 1, 2, 3
+CODIGOS = {'P': PRESENTE, 'F': FALTA, 'J': JUSTIFICADA}
+
+_DESLOCAMENTOS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+# Tabelas de consulta: quantas celulas de cada codigo cabem em cada byte
+_BYTES = np.arange(256, dtype=np.uint8)
+_CELULAS_BYTE = (_BYTES[:, None] >> _DESLOCAMENTOS) & 3
+_CONTA = {codigo: (_CELULAS_BYTE == codigo).sum(axis=1).astype(np.int64)
+          for codigo in (PRESENTE, FALTA, JUSTIFICADA)}
+
+
+# ========== EMPACOTAMENTO ==========
+
+def empacotar(codigos):
+    """Matriz uint8 (alunos x aulas) de codigos 0-3 -> bytes com 4 celulas cada."""
+    linhas, colunas = codigos.shape
+    largura = -(-colunas // 4)
+    cheio = np.zeros((linhas, largura * 4), dtype=np.uint8)
+    cheio[:, :colunas] = codigos
+    grupos = cheio.reshape(linhas, largura, 4) << _DESLOCAMENTOS
+    return np.bitwise_or.reduce(grupos, axis=2).astype(np.uint8)
+
+
+def desempacotar(bits, colunas):
+    """Inverso de empacotar: bytes -> matriz de codigos (alunos x aulas)."""
+    celulas = (bits[:, :, None] >> _DESLOCAMENTOS) & 3
+    return celulas.reshape(bits.shape[0], -1)[:, :colunas]
+
+
+# ========== MATRIZ ==========
+
+class MatrizFrequencia:
+    """Matrizes de presenca por turma + indices de alunos/aulas/turmas.
+
+    Atributos:
+        turmas: DataFrame (turma_idx, unidade, serie, turma, n_alunos, n_aulas)
+        alunos: DataFrame (turma_idx, linha, aluno_id, aluno_nome)
+        aulas:  DataFrame (turma_idx, coluna, aula_id, data_aula, disciplina)
+        bits:   lista de arrays uint8 empacotados, um por turma_idx
+    """
+
+    def __init__(self, turmas, alunos, aulas, bits):
+        self.turmas = turmas
+        self.alunos = alunos
+        self.aulas = aulas
+        self.bits = bits
+        self._sequencias = {}
+
+    def __repr__(self):
+        return (f"MatrizFrequencia({len(self.turmas)} turmas, {len(self.alunos)} alunos, "
+                f"{len(self.aulas)} aulas, {self.tamanho_bytes() / 1024:.0f} KB)")
+
+    def tamanho_bytes(self):
+        """Bytes ocupados pelas celulas empacotadas."""
+        return int(sum(b.nbytes for b in self.bits))
+
+    # ---------- Construcao ----------
+
+    @classmethod
+    def de_chamadas(cls, df):
+        """Monta as matrizes a partir de chamadas no formato fato_Frequencia_Aluno."""
+        cols_turma = ['unidade', 'serie', 'turma']
+        ch = pd.DataFrame({
+            c: df[c].astype(object) for c in cols_turma + ['aluno_id', 'aluno_nome', 'aula_id',
+                                                          'disciplina'] if c in df.columns
+        })
+        ch['data_aula'] = pd.to_datetime(df['data_aula'], errors='coerce')
+        ch['codigo'] = df['presenca'].astype(object).map(CODIGOS).fillna(SEM_CHAMADA).astype(np.uint8)
+        ch = ch.dropna(subset=['aluno_id', 'aula_id'])
+
+        ch['turma_idx'] = ch.groupby(cols_turma, dropna=False, sort=True).ngroup()
+        turmas = (ch.groupby('turma_idx')[cols_turma].first().reset_index())
+
+        alunos = (ch.drop_duplicates(['turma_idx', 'aluno_id'])
+                  .sort_values(['turma_idx', 'aluno_nome', 'aluno_id'], na_position='last')
+                  [['turma_idx', 'aluno_id', 'aluno_nome']].reset_index(drop=True))
+        alunos['linha'] = alunos.groupby('turma_idx').cumcount()
+
+        aulas = (ch.drop_duplicates(['turma_idx', 'aula_id'])
+                 .sort_values(['turma_idx', 'data_aula', 'aula_id'], na_position='last')
+                 [['turma_idx', 'aula_id', 'data_aula', 'disciplina']].reset_index(drop=True))
+        aulas['coluna'] = aulas.groupby('turma_idx').cumcount()
+
+        ch = (ch.merge(alunos[['turma_idx', 'aluno_id', 'linha']], on=['turma_idx', 'aluno_id'])
+                .merge(aulas[['turma_idx', 'aula_id', 'coluna']], on=['turma_idx', 'aula_id']))
+
+        n_alunos = alunos.groupby('turma_idx').size()
+        n_aulas = aulas.groupby('turma_idx').size()
+        turmas['n_alunos'] = turmas['turma_idx'].map(n_alunos).astype(int)
+        turmas['n_aulas'] = turmas['turma_idx'].map(n_aulas).astype(int)
+
+        bits = []
+        por_turma = dict(tuple(ch.groupby('turma_idx')))
+        for t in turmas.itertuples():
+            codigos = np.zeros((t.n_alunos, t.n_aulas), dtype=np.uint8)
+            parte = por_turma[t.turma_idx]
+            # Chamada repetida (mesmo aluno/aula): prevalece o codigo mais alto
+            np.maximum.at(codigos, (parte['linha'].to_numpy(), parte['coluna'].to_numpy()),
+                          parte['codigo'].to_numpy())
+            bits.append(empacotar(codigos))
+        return cls(turmas, alunos, aulas, bits)
+
+    # ---------- Persistencia ----------
+
+    def salvar(self, pasta):
+        """Grava .npy por turma + indices numa subpasta nova e troca o manifesto por ultimo.
+
+        Returns:
+            nome da subpasta publicada
+        """
+        pasta = Path(pasta)
+        versao = f"v{time.time_ns()}_{os.getpid()}"
+        destino = pasta / versao
+        destino.mkdir(parents=True)
+        for idx, b in enumerate(self.bits):
+            np.save(destino / f"turma_{idx:04d}.npy", b)
+        self.turmas.to_parquet(destino / "turmas.parquet", index=False)
+        self.alunos.to_parquet(destino / "alunos.parquet", index=False)
+        self.aulas.to_parquet(destino / "aulas.parquet", index=False)
+        manifesto = pasta / "manifesto.json"
+        tmp = pasta / f"manifesto.{versao}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'versao': versao, 'turmas': len(self.bits),
+                       'bytes': self.tamanho_bytes()}, f)
+        tmp.replace(manifesto)
+        _podar_versoes(pasta, versao)
+        return versao
+
+    @classmethod
+    def carregar(cls, pasta, mmap=True):
+        """Abre a matriz vigente (celulas via mmap: so as paginas lidas vao a memoria)."""
+        pasta = Path(pasta)
+        with open(pasta / "manifesto.json", 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+        origem = pasta / manifesto['versao']
+        modo = 'r' if mmap else None
+        bits = [np.load(origem / f"turma_{idx:04d}.npy", mmap_mode=modo)
+                for idx in range(manifesto['turmas'])]
+        return cls(pd.read_parquet(origem / "turmas.parquet"),
+                   pd.read_parquet(origem / "alunos.parquet"),
+                   pd.read_parquet(origem / "aulas.parquet"),
+                   bits)
+
+    # ---------- Consultas ----------
+
+    def codigos(self, turma_idx):
+        """Matriz desempacotada (alunos x aulas) de uma turma."""
+        return desempacotar(np.asarray(self.bits[turma_idx]),
+                            int(self.turmas.at[turma_idx, 'n_aulas']))
+
+    def _por_aluno(self, valores):
+        """Soma por aluno_id valores alinhados com self.alunos (aluno em 2+ turmas)."""
+        df = self.alunos[['aluno_id', 'aluno_nome']].copy()
+        for nome, v in valores.items():
+            df[nome] = v
+        return df.groupby('aluno_id', sort=True).agg(
+            aluno_nome=('aluno_nome', 'first'),
+            **{nome: (nome, 'sum') for nome in valores},
+        ).reset_index()
+
+    def _contar(self, codigo):
+        return np.concatenate([_CONTA[codigo][np.asarray(b)].sum(axis=1) for b in self.bits]) \
+            if self.bits else np.zeros(0, dtype=np.int64)
+
+    def taxas(self):
+        """Contagens e % de frequencia por aluno (sem desempacotar).
+
+        Returns:
+            DataFrame aluno_id, aluno_nome, total_aulas, presencas, faltas,
+            justificadas, pct_frequencia ((P + J) / total * 100)
+        """
+        p, f, j = self._contar(PRESENTE), self._contar(FALTA), self._contar(JUSTIFICADA)
+        df = self._por_aluno({'total_aulas': p + f + j, 'presencas': p,
+                              'faltas': f, 'justificadas': j})
+        df['pct_frequencia'] = ((df['presencas'] + df['justificadas'])
+                                / df['total_aulas'].clip(lower=1) * 100).round(1)
+        return df
+
+    def taxa_recente(self, ultimas=20):
+        """% de frequencia de cada aluno nas suas ultimas N chamadas feitas."""
+        presentes, feitas = [], []
+        for idx in range(len(self.bits)):
+            c = self.codigos(idx)
+            feita = c != SEM_CHAMADA
+            # Conta a partir da direita: so as N ultimas chamadas de cada linha
+            recente = feita & (np.cumsum(feita[:, ::-1], axis=1)[:, ::-1] <= ultimas)
+            presentes.append((recente & ((c == PRESENTE) | (c == JUSTIFICADA))).sum(axis=1))
+            feitas.append(recente.sum(axis=1))
+        if not presentes:
+            return pd.DataFrame(columns=['aluno_id', 'aluno_nome', 'chamadas', 'pct_recente'])
+        df = self._por_aluno({'presentes': np.concatenate(presentes),
+                              'chamadas': np.concatenate(feitas)})
+        df['pct_recente'] = (df['presentes'] / df['chamadas'].clip(lower=1) * 100).round(1)
+        return df.drop(columns=['presentes'])
+
+    def janela_movel(self, turma_idx, janela=10):
+        """% de frequencia movel (ultimas `janela` aulas da turma) por aluno.
+
+        Returns:
+            array float (alunos x aulas); NaN onde nao houve chamada na janela
+        """
+        c = self.codigos(turma_idx)
+        feita = (c != SEM_CHAMADA).astype(np.int32)
+        presente = ((c == PRESENTE) | (c == JUSTIFICADA)).astype(np.int32)
+
+        # Soma da janela terminando na coluna k: acum[k+1] - acum[max(k+1-janela, 0)]
+        inicio = np.maximum(np.arange(c.shape[1]) + 1 - janela, 0)
+
+        def _movel(x):
+            acum = np.cumsum(np.pad(x, ((0, 0), (1, 0))), axis=1)
+            return acum[:, 1:] - acum[:, inicio]
+
+        n_feitas, n_pres = _movel(feita), _movel(presente)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n_feitas > 0, n_pres / n_feitas * 100, np.nan)
+
+    def faltas_consecutivas(self, incluir_justificadas=False):
+        """Maior sequencia e sequencia atual de faltas por aluno.
+
+        Aulas sem chamada do aluno nao quebram a sequencia. O resultado fica
+        guardado na instancia — carregar_matriz reaproveita a mesma instancia
+        enquanto o manifesto nao muda, entao a rede inteira e varrida uma vez
+        por publicacao.
+
+        Returns:
+            DataFrame aluno_id, aluno_nome, maior_sequencia, sequencia_atual
+        """
+        chave = bool(incluir_justificadas)
+        if chave not in self._sequencias:
+            self._sequencias[chave] = self._calcular_sequencias(chave)
+        return self._sequencias[chave].copy()
+
+    def _calcular_sequencias(self, incluir_justificadas):
+        maiores, atuais = [], []
+        for idx in range(len(self.bits)):
+            c = self.codigos(idx)
+            n_linhas = c.shape[0]
+            linha, coluna = np.nonzero(c != SEM_CHAMADA)  # ordem linha a linha
+            valor = c[linha, coluna]
+            falta = (valor == FALTA) | (incluir_justificadas & (valor == JUSTIFICADA))
+            nova_linha = np.r_[True, linha[1:] != linha[:-1]] if len(linha) else np.zeros(0, bool)
+            # Cada nao-falta ou troca de aluno abre um novo trecho
+            trecho = np.cumsum(~falta | nova_linha)
+            tamanho = np.bincount(trecho[falta], minlength=trecho.max() + 1 if len(trecho) else 1)
+            maior = np.zeros(n_linhas, dtype=np.int64)
+            np.maximum.at(maior, linha[falta], tamanho[trecho[falta]])
+            atual = np.zeros(n_linhas, dtype=np.int64)
+            if len(linha):
+                ultima = np.r_[linha[1:] != linha[:-1], True]
+                fim_em_falta = ultima & falta
+                atual[linha[fim_em_falta]] = tamanho[trecho[fim_em_falta]]
+            maiores.append(maior)
+            atuais.append(atual)
+        if not maiores:
+            return pd.DataFrame(columns=['aluno_id', 'aluno_nome', 'maior_sequencia', 'sequencia_atual'])
+        df = self.alunos[['aluno_id', 'aluno_nome']].copy()
+        df['maior_sequencia'] = np.concatenate(maiores)
+        df['sequencia_atual'] = np.concatenate(atuais)
+        # Aluno em 2+ turmas: vale a pior sequencia
+        return df.groupby('aluno_id', sort=True).agg(
+            aluno_nome=('aluno_nome', 'first'),
+            maior_sequencia=('maior_sequencia', 'max'),
+            sequencia_atual=('sequencia_atual', 'max'),
+        ).reset_index()
+
+
+# ========== PUBLICACAO E CACHE ==========
+
+_CACHE = {}
+
+
+def _instante(versao):
+    """Timestamp (ns) do nome v<timestamp>_<pid> de uma subpasta, ou None."""
+    try:
+        return int(versao[1:].split('_')[0])
+    except ValueError:
+        return None
+
+
+def _podar_versoes(pasta, vigente):
+    """Remove subpastas de publicacoes anteriores a vigente e o layout antigo.
+
+    Subpastas mais novas (outra publicacao em andamento) ficam. Falhas sao
+    so registradas (ex.: Windows com mmap aberto num leitor); a poda e
+    refeita na proxima publicacao.
+    """
+    limite = _instante(vigente)
+    for item in pasta.iterdir():
+        try:
+            if item.is_dir():
+                instante = _instante(item.name) if item.name.startswith('v') else None
+                if instante is not None and instante < limite:
+                    shutil.rmtree(item)
+            elif item.suffix in ('.npy', '.parquet'):
+                item.unlink()  # turma_*.npy e indices da pasta sem versao
+        except OSError as e:
+            logger.warning(f"Versao antiga da matriz nao removida ({item.name}): {e}")
+
+
+def publicar_matriz(diretorio=None):
+    """Monta a matriz a partir de fato_Frequencia_Aluno e grava em _matriz_frequencia/.
+
+    Returns:
+        MatrizFrequencia publicada, ou None se nao houver chamadas
+    """
+    diretorio = Path(diretorio) if diretorio else DATA_DIR
+    path = diretorio / ARQUIVO_CHAMADAS
+    if not path.exists():
+        return None
+    df = ler_tabela(path)
+    if df.empty:
+        return None
+    matriz = MatrizFrequencia.de_chamadas(df)
+    try:
+        matriz.salvar(diretorio / SUBDIR)
+    except Exception as e:
+        logger.warning(f"Matriz de frequencia nao gravada: {e}")
+    return matriz
+
+
+def carregar_matriz(diretorio=None):
+    """Matriz residente do processo (reaberta quando a extracao regrava).
+
+    Returns:
+        MatrizFrequencia, ou None se ainda nao foi publicada
+    """
+    pasta = Path(diretorio or DATA_DIR) / SUBDIR
+    impressao = impressao_digital([pasta / "manifesto.json"])
+    entrada = _CACHE.get(pasta)
+    if entrada is not None and entrada[0] == impressao:
+        return entrada[1]
+    try:
+        matriz = MatrizFrequencia.carregar(pasta)
+    except (OSError, ValueError, KeyError):
+        return None
+    _CACHE[pasta] = (impressao, matriz)
+    return matriz
@@ -2,23 +2,51 @@
 Motor de deteccao e priorizacao de missoes semanais.
 Centraliza logica de negocios separada da UI.
 Cada missao tem: tipo, nivel, score, frase_humana, contexto, acoes, links.
+
+fato_Aulas e agregado uma unica vez por execucao (preparar_base_missoes):
+contagens por (unidade, serie, disciplina, professor, semana_letiva), data do
+ultimo registro, aulas sem conteudo e maior capitulo citado no conteudo. Os
+detectores de aulas trabalham sobre essa base (algumas centenas de linhas)
+com comparacoes vetorizadas, em vez de remascarar o fato inteiro por
+professor/serie/disciplina. A progressao SAE usada como fallback do
+CURRICULO_ATRASADO tambem e lida uma vez por execucao e indexada por
+(professor, disciplina) (preparar_progressao_missoes).
+
+Os detectores ficam num registro (DETECTORES, @registrar_detector): cada um
+declara os datasets que le, a classe de custo e o escopo (coordenador, serie
+ou unidade). A rede e avaliada com os detectores independentes em paralelo,
+medindo tempo, linhas lidas e missoes de cada um (executar_missoes_rede).
+
+Benchmark de escala por numero de professores: python benchmark_vigilia.py
 """
 
 import math
 import json
+import time
+import hashlib
+import logging
+import os
+import pickle
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable, Optional
+from conteudo_aulas import detectar_capitulos
 from utils import (
     calcular_semana_letiva, calcular_capitulo_esperado, _hoje,
     carregar_fato_aulas, carregar_horario_esperado,
     carregar_ocorrencias, carregar_frequencia_alunos,
-    carregar_alunos, filtrar_ate_hoje,
+    carregar_alunos, carregar_progressao_sae, filtrar_ate_hoje,
     UNIDADES_NOMES, CONFORMIDADE_CRITICO, CONFORMIDADE_BAIXO,
     THRESHOLD_FREQUENCIA_LDB, DIAS_SEM_REGISTRO_URGENTE,
     DIAS_SEM_REGISTRO_ATENCAO, WRITABLE_DIR, DATA_DIR,
 )
 
+logger = logging.getLogger("missoes")
+
 
 # ========== PESOS POR TIPO ==========
 
@@ -81,9 +109,61 @@ def classificar(score):
     return 'MONITORAR'
 
 
+# ========== BASE AGREGADA ==========
+
+CHAVES_BASE = ['unidade', 'serie', 'disciplina', 'professor', 'semana_letiva']
+
+
+def preparar_base_missoes(df_aulas):
+    """Agrega fato_Aulas uma vez para todos os detectores.
+
+    Uma linha por (unidade, serie, disciplina, professor, semana_letiva) —
+    chaves vazias viram grupos proprios, entao as somas batem com o fato.
+
+    Colunas: n_aulas, ultima_data (max de data), e, se houver 'conteudo',
+    n_sem_conteudo (vazio ou so espacos) e max_capitulo (maior cap_detectado
+    do indice de conteudo; 0 se nenhum).
+    """
+    df = df_aulas.reset_index(drop=True)
+    base = pd.DataFrame({
+        c: df[c] if c in df.columns else pd.Series(float('nan'), index=df.index)
+        for c in CHAVES_BASE
+    })
+    base['n_aulas'] = 1
+    base['ultima_data'] = df['data'] if 'data' in df.columns else pd.NaT
+    agregacoes = {'n_aulas': ('n_aulas', 'sum'), 'ultima_data': ('ultima_data', 'max')}
+
+    if 'conteudo' in df.columns:
+        conteudo = df['conteudo']
+        base['n_sem_conteudo'] = (
+            conteudo.isna() | (conteudo.astype(str).str.strip() == '')
+        ).astype('int64')
+        caps = df['cap_detectado'] if 'cap_detectado' in df.columns else detectar_capitulos(conteudo)
+        base['max_capitulo'] = caps.fillna(0).astype('int64')
+        agregacoes['n_sem_conteudo'] = ('n_sem_conteudo', 'sum')
+        agregacoes['max_capitulo'] = ('max_capitulo', 'max')
+
+    return (base.groupby(CHAVES_BASE, observed=True, dropna=False)
+            .agg(**agregacoes).reset_index())
+
+
+def _base_coord(base, unidade, series):
+    return base[(base['unidade'] == unidade) & (base['serie'].isin(series))]
+
+
+def _por_professor(df_horario, unidade):
+    """Grupos do horario da unidade por professor (dict professor -> frame)."""
+    hor_un = df_horario[df_horario['unidade'] == unidade]
+    return dict(tuple(hor_un.groupby('professor', observed=True)))
+
+
+def _ordenados(valores, n=3):
+    return ', '.join(sorted(pd.unique(valores))[:n])
+
+
 # ========== DETECTORES ==========
 
-def _detectar_prof_silencioso(df_aulas, df_horario, semana, unidade, series):
+def _detectar_prof_silencioso(base, df_horario, semana, unidade, series):
     """Tipo 1: Professor com 0 registros na semana atual."""
     hoje = _hoje()
     missoes = []
@@ -96,35 +176,30 @@ def _detectar_prof_silencioso(df_aulas, df_horario, semana, unidade, series):
     if hor_coord.empty:
         return missoes
 
-    # Professores esperados (com series do coordenador)
-    profs_esperados = hor_coord.groupby('professor').agg(
+    # Professores esperados (com series do coordenador). As listas saem de
+    # colunas object: agregacao que devolve lista nao volta para Categorical.
+    profs_esperados = hor_coord.astype({'disciplina': object, 'serie': object}).groupby('professor', observed=True).agg(
         disciplinas=('disciplina', lambda x: sorted(x.unique())),
         series_prof=('serie', lambda x: sorted(x.unique())),
         slots=('disciplina', 'count'),
     ).reset_index()
 
-    # Aulas na semana atual
-    mask_a = (df_aulas['unidade'] == unidade) & (df_aulas['serie'].isin(series))
-    if 'semana_letiva' in df_aulas.columns:
-        aulas_sem = df_aulas[mask_a & (df_aulas['semana_letiva'] == semana)]
-    else:
-        aulas_sem = pd.DataFrame()
+    # Professores com aula na semana atual (series do coordenador)
+    coord = _base_coord(base, unidade, series)
+    profs_com_registro = coord.loc[coord['semana_letiva'] == semana, 'professor'].unique()
+    sem_registro = profs_esperados[~profs_esperados['professor'].isin(profs_com_registro)]
 
-    profs_com_registro = set(aulas_sem['professor'].unique()) if not aulas_sem.empty else set()
+    # Dias sem registro: ultimo registro do professor na unidade (qualquer serie)
+    ultima = base[base['unidade'] == unidade].groupby('professor', observed=True)['ultima_data'].max()
+    ultima.index = ultima.index.astype(object)
+    ultimas = ultima.reindex(sem_registro['professor'].astype(object)).to_numpy()
+    dias = (hoje - pd.Series(ultimas, dtype='datetime64[ns]')).dt.days
+    dias = dias.fillna((hoje - datetime(2026, 1, 26)).days).astype(int).to_numpy()
 
-    for _, row in profs_esperados.iterrows():
+    for (_, row), ultima_data, dias_sem in zip(sem_registro.iterrows(), ultimas, dias):
         prof = row['professor']
-        if prof in profs_com_registro:
-            continue
-
-        # Calcular dias sem registro
-        df_prof = df_aulas[(df_aulas['professor'] == prof) & (df_aulas['unidade'] == unidade)]
-        if df_prof.empty or df_prof['data'].isna().all():
-            dias_sem = (hoje - datetime(2026, 1, 26)).days
-            ultima_data = None
-        else:
-            ultima_data = df_prof['data'].max()
-            dias_sem = (hoje - ultima_data).days
+        ultima_data = pd.Timestamp(ultima_data) if pd.notna(ultima_data) else None
+        dias_sem = int(dias_sem)
 
         if dias_sem < DIAS_SEM_REGISTRO_ATENCAO:
             continue
@@ -174,33 +249,37 @@ def _acoes_prof_silencioso(prof, dias):
     return acoes
 
 
-def _detectar_turma_critica(df_aulas, df_horario, semana, unidade, series):
+def _detectar_turma_critica(base, df_horario, semana, unidade, series):
     """Tipo 4: Turma com conformidade abaixo do critico."""
     missoes = []
     if df_horario.empty or semana < 1:
         return missoes
 
+    hor_un = df_horario[df_horario['unidade'] == unidade]
+    slots = hor_un.groupby('serie', observed=True).size()
+    profs_horario = {s: set(g.unique()) for s, g in hor_un.groupby('serie', observed=True)['professor']}
+    base_un = base[base['unidade'] == unidade]
+    reais = base_un.groupby('serie', observed=True)['n_aulas'].sum()
+    profs_aulas = {s: set(g.unique()) for s, g in base_un.groupby('serie', observed=True)['professor']}
+
     for serie in series:
-        hor_turma = df_horario[(df_horario['unidade'] == unidade) & (df_horario['serie'] == serie)]
-        if hor_turma.empty:
+        n_slots = int(slots.get(serie, 0))
+        if n_slots == 0:
             continue
 
-        aulas_turma = df_aulas[(df_aulas['unidade'] == unidade) & (df_aulas['serie'] == serie)]
-        esperado = len(hor_turma) * semana
-        real = len(aulas_turma)
+        esperado = n_slots * semana
+        real = int(reais.get(serie, 0))
         conf = (real / esperado * 100) if esperado > 0 else 0
 
         if conf >= CONFORMIDADE_BAIXO:
             continue
 
         # Professores sem registro nesta turma
-        profs_esperados = set(hor_turma['professor'].unique())
-        profs_com = set(aulas_turma['professor'].unique()) if not aulas_turma.empty else set()
-        profs_sem = profs_esperados - profs_com
+        profs_sem = profs_horario[serie] - profs_aulas.get(serie, set())
         lista_sem = ', '.join(sorted(profs_sem)[:4])
         n_profs_sem = len(profs_sem)
 
-        n_afetados = len(hor_turma) * 30  # estimativa
+        n_afetados = n_slots * 30  # estimativa
 
         nivel = 'CRITICO' if conf < CONFORMIDADE_CRITICO else 'ATENCAO'
 
@@ -263,7 +342,7 @@ def _detectar_aluno_frequencia(df_freq, unidade, series):
 
     # Agrupar por serie
     if 'serie' in risco.columns and 'aluno_id' in risco.columns:
-        por_serie = risco.groupby('serie').agg(
+        por_serie = risco.groupby('serie', observed=True).agg(
             n_alunos=('aluno_id', 'nunique'),
             freq_min=('pct_frequencia', 'min'),
         ).reset_index()
@@ -365,7 +444,7 @@ def _detectar_ocorrencia_grave(df_ocorr, unidade, series):
     return missoes
 
 
-def _detectar_disciplina_orfa(df_aulas, df_horario, semana, unidade, series):
+def _detectar_disciplina_orfa(base, df_horario, semana, unidade, series):
     """Tipo 8: Disciplina com zero registros desde o inicio do ano."""
     missoes = []
     if df_horario.empty or semana <= 1:
@@ -373,45 +452,47 @@ def _detectar_disciplina_orfa(df_aulas, df_horario, semana, unidade, series):
 
     mask_h = (df_horario['unidade'] == unidade) & (df_horario['serie'].isin(series))
     hor = df_horario[mask_h]
+    if hor.empty:
+        return missoes
 
-    for (serie, disc), grupo in hor.groupby(['serie', 'disciplina']):
-        aulas_disc = df_aulas[
-            (df_aulas['unidade'] == unidade) &
-            (df_aulas['serie'] == serie) &
-            (df_aulas['disciplina'] == disc)
-        ]
-        if len(aulas_disc) == 0:
-            n_slots = len(grupo)
-            missoes.append({
-                'tipo': 'DISCIPLINA_ORFA',
-                'disciplina': disc,
-                'serie': serie,
-                'unidade': unidade,
-                'dias_problema': semana * 5,
-                'n_afetados': n_slots * 30,
-                'fator_recorrencia': 1.0,
-                'o_que': (
-                    f"{disc} no {serie} ({UNIDADES_NOMES.get(unidade, unidade)}) "
-                    f"nao tem NENHUM registro desde o inicio do ano. Ja se passaram {semana} semanas."
-                ),
-                'por_que': (
-                    f"Alunos estao sem nenhuma aula de {disc} registrada. "
-                    f"Possivel causa: professor nao designado ou problema de login."
-                ),
-                'como': [
-                    f"Verificar com secretaria se ha professor para {disc} no {serie}",
-                    "Se houver, contatar o professor sobre os registros",
-                    "Se nao houver, escalar para direcao (pendencia critica)",
-                ],
-                'links': [
-                    ('app_pages/14_🧠_Alertas_Inteligentes.py', '🧠 Alertas'),
-                ],
-            })
+    slots = hor.groupby(['serie', 'disciplina'], observed=True).size().reset_index(name='n_slots')
+    slots = slots.astype({'serie': object, 'disciplina': object})
+    com_aulas = (base.loc[base['unidade'] == unidade, ['serie', 'disciplina']]
+                 .astype(object).drop_duplicates())
+    orfas = slots.merge(com_aulas, on=['serie', 'disciplina'], how='left', indicator=True)
+    orfas = orfas[orfas['_merge'] == 'left_only']
+
+    for serie, disc, n_slots in zip(orfas['serie'], orfas['disciplina'], orfas['n_slots']):
+        missoes.append({
+            'tipo': 'DISCIPLINA_ORFA',
+            'disciplina': disc,
+            'serie': serie,
+            'unidade': unidade,
+            'dias_problema': semana * 5,
+            'n_afetados': int(n_slots) * 30,
+            'fator_recorrencia': 1.0,
+            'o_que': (
+                f"{disc} no {serie} ({UNIDADES_NOMES.get(unidade, unidade)}) "
+                f"nao tem NENHUM registro desde o inicio do ano. Ja se passaram {semana} semanas."
+            ),
+            'por_que': (
+                f"Alunos estao sem nenhuma aula de {disc} registrada. "
+                f"Possivel causa: professor nao designado ou problema de login."
+            ),
+            'como': [
+                f"Verificar com secretaria se ha professor para {disc} no {serie}",
+                "Se houver, contatar o professor sobre os registros",
+                "Se nao houver, escalar para direcao (pendencia critica)",
+            ],
+            'links': [
+                ('app_pages/14_🧠_Alertas_Inteligentes.py', '🧠 Alertas'),
+            ],
+        })
 
     return missoes
 
 
-def _detectar_prof_queda(df_aulas, df_horario, semana, unidade, series):
+def _detectar_prof_queda(base, df_horario, semana, unidade, series):
     """Tipo 6: Professor com queda >30% de registros vs semana anterior."""
     missoes = []
     if df_horario.empty or semana <= 2:
@@ -422,40 +503,36 @@ def _detectar_prof_queda(df_aulas, df_horario, semana, unidade, series):
     if hor_coord.empty:
         return missoes
 
-    mask_a = (df_aulas['unidade'] == unidade) & (df_aulas['serie'].isin(series))
-    aulas_coord = df_aulas[mask_a]
-    if aulas_coord.empty or 'semana_letiva' not in aulas_coord.columns:
-        return missoes
+    coord = _base_coord(base, unidade, series)
 
-    sem_atual = aulas_coord[aulas_coord['semana_letiva'] == semana]
-    sem_anterior = aulas_coord[aulas_coord['semana_letiva'] == semana - 1]
+    def _registros(sem):
+        return coord[coord['semana_letiva'] == sem].groupby('professor', observed=True)['n_aulas'].sum()
 
-    if sem_anterior.empty:
+    reg_anterior = _registros(semana - 1)
+    if reg_anterior.empty:
         return missoes
 
-    reg_anterior = sem_anterior.groupby('professor').size()
-    reg_atual = sem_atual.groupby('professor').size()
-
-    for prof in reg_anterior.index:
-        ant = reg_anterior[prof]
-        atu = reg_atual.get(prof, 0)
-        if ant == 0:
-            continue
-        queda_pct = (ant - atu) / ant * 100
-        if queda_pct < 30:
-            continue
-
-        # Verificar recorrencia (queda 2+ semanas consecutivas)
-        fator_rec = 1.0
-        if semana >= 3 and 'semana_letiva' in aulas_coord.columns:
-            sem_ant2 = aulas_coord[aulas_coord['semana_letiva'] == semana - 2]
-            reg_ant2 = len(sem_ant2[sem_ant2['professor'] == prof])
-            if reg_ant2 > ant:
-                fator_rec = 1.3  # queda em 2+ semanas
-
-        prof_info = hor_coord[hor_coord['professor'] == prof]
-        discs = ', '.join(sorted(prof_info['disciplina'].unique())[:3])
-        series_t = ', '.join(sorted(prof_info['serie'].unique())[:3])
+    # Uma linha por professor com registro na semana anterior
+    comp = pd.DataFrame({'ant': reg_anterior})
+    comp['atu'] = _registros(semana).reindex(comp.index, fill_value=0)
+    comp['ant2'] = _registros(semana - 2).reindex(comp.index, fill_value=0)
+    comp = comp[comp['ant'] > 0]
+    comp['queda_pct'] = (comp['ant'] - comp['atu']) / comp['ant'] * 100
+    comp = comp[comp['queda_pct'] >= 30]
+    # Recorrencia: semana retrasada ja tinha mais registros (queda 2+ semanas)
+    comp['fator_rec'] = 1.0
+    if semana >= 3:
+        comp.loc[comp['ant2'] > comp['ant'], 'fator_rec'] = 1.3
+
+    info_profs = dict(tuple(hor_coord.groupby('professor', observed=True)))
+    sem_info = hor_coord.iloc[0:0]
+
+    for prof, ant, atu, queda_pct, fator_rec in zip(
+            comp.index, comp['ant'], comp['atu'], comp['queda_pct'].to_numpy(), comp['fator_rec']):
+        fator_rec = float(fator_rec)
+        prof_info = info_profs.get(prof, sem_info)
+        discs = _ordenados(prof_info['disciplina'])
+        series_t = _ordenados(prof_info['serie'])
         n_afetados = len(prof_info) * 30
 
         missoes.append({
@@ -491,56 +568,79 @@ def _detectar_prof_queda(df_aulas, df_horario, semana, unidade, series):
     return missoes
 
 
-def _detectar_curriculo_atrasado(df_aulas, semana, unidade, series):
-    """Tipo 7: Professor >1 capitulo atras do SAE esperado."""
+def preparar_progressao_missoes(df_prog):
+    """Capitulo atual por (professor, disciplina) em dim_Progressao_SAE.
+
+    Indice de consulta do CURRICULO_ATRASADO: Series int com MultiIndex
+    (professor, disciplina), montada uma vez por execucao. Vazia se a tabela
+    nao tiver professor/disciplina/capitulo_atual.
+    """
+    vazio = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays(
+        [[], []], names=['professor', 'disciplina']))
+    if df_prog is None or df_prog.empty:
+        return vazio
+    if not {'professor', 'disciplina', 'capitulo_atual'} <= set(df_prog.columns):
+        return vazio
+    caps = pd.to_numeric(df_prog['capitulo_atual'], errors='coerce')
+    prog = df_prog.assign(
+        professor=df_prog['professor'].astype(object),
+        disciplina=df_prog['disciplina'].astype(object),
+        capitulo_atual=caps,
+    ).dropna(subset=['capitulo_atual'])
+    return prog.groupby(['professor', 'disciplina'])['capitulo_atual'].max().astype('int64')
+
+
+def _carregar_progressao_missoes():
+    try:
+        return preparar_progressao_missoes(carregar_progressao_sae())
+    except Exception:
+        return preparar_progressao_missoes(None)
+
+
+def _detectar_curriculo_atrasado(base, semana, unidade, series, progressao=None):
+    """Tipo 7: Professor >1 capitulo atras do SAE esperado.
+
+    progressao: indice de preparar_progressao_missoes (carregado se None).
+    """
     missoes = []
-    if df_aulas.empty or semana < 4:
+    if base.empty or semana < 4:
         return missoes
 
     capitulo_esperado = calcular_capitulo_esperado(semana)
     if capitulo_esperado <= 1:
         return missoes
 
-    mask = (df_aulas['unidade'] == unidade) & (df_aulas['serie'].isin(series))
-    aulas = df_aulas[mask]
-    if aulas.empty:
+    coord = _base_coord(base, unidade, series)
+    if coord.empty:
         return missoes
 
-    # Tentar detectar capitulo a partir do campo 'conteudo'
-    import re
-    cap_pattern = re.compile(r'cap(?:[ií]tulo|\.?)\s*(\d{1,2})', re.IGNORECASE)
-
-    for (prof, disc), grupo in aulas.groupby(['professor', 'disciplina']):
-        max_cap = 0
-        if 'conteudo' in grupo.columns:
-            conteudos = grupo['conteudo'].dropna().astype(str)
-            for txt in conteudos:
-                matches = cap_pattern.findall(txt)
-                for m in matches:
-                    max_cap = max(max_cap, int(m))
-
-        if max_cap == 0:
-            # Tentar dim_Progressao_SAE
-            prog_path = DATA_DIR / "dim_Progressao_SAE.csv"
-            if prog_path.exists():
-                try:
-                    prog_df = pd.read_csv(prog_path)
-                    mask_p = (prog_df.get('professor', pd.Series()) == prof) & \
-                             (prog_df.get('disciplina', pd.Series()) == disc)
-                    if mask_p.any():
-                        max_cap = int(prog_df[mask_p]['capitulo_atual'].max())
-                except Exception:
-                    pass
-
-        if max_cap == 0:
-            continue
+    # Capitulo detectado no campo 'conteudo' (max_capitulo da base)
+    if 'max_capitulo' not in coord.columns:
+        coord = coord.assign(max_capitulo=0)
+    grupos = coord.groupby(['professor', 'disciplina'], observed=True)['max_capitulo'].max().astype(int)
+
+    if (grupos == 0).any():
+        # Sem capitulo no conteudo: consultar dim_Progressao_SAE pelo indice
+        if progressao is None:
+            progressao = _carregar_progressao_missoes()
+        if not progressao.empty:
+            chaves = pd.MultiIndex.from_arrays(
+                [grupos.index.get_level_values(n).astype(object) for n in ('professor', 'disciplina')])
+            fallback = progressao.reindex(chaves, fill_value=0).to_numpy()
+            grupos = grupos.where(grupos > 0, fallback).astype(int)
+
+    atrasados = grupos[(grupos > 0) & (capitulo_esperado - grupos > 1)]
+    if atrasados.empty:
+        return missoes
+    series_grupo = coord.astype({'serie': object}).groupby(
+        ['professor', 'disciplina'], observed=True)['serie'].unique()
 
+    for (prof, disc), max_cap in atrasados.items():
+        max_cap = int(max_cap)
         gap = capitulo_esperado - max_cap
-        if gap <= 1:
-            continue
-
-        series_prof = ', '.join(sorted(grupo['serie'].unique())[:3])
-        n_afetados = grupo['serie'].nunique() * 30
+        series_lista = series_grupo[(prof, disc)]
+        series_prof = ', '.join(sorted(series_lista)[:3])
+        n_afetados = len(series_lista) * 30
 
         missoes.append({
             'tipo': 'CURRICULO_ATRASADO',
@@ -575,35 +675,34 @@ def _detectar_curriculo_atrasado(df_aulas, semana, unidade, series):
     return missoes
 
 
-def _detectar_prof_sem_conteudo(df_aulas, df_horario, semana, unidade, series):
+def _detectar_prof_sem_conteudo(base, df_horario, semana, unidade, series):
     """Tipo 8: Professor com >50% aulas sem campo conteudo preenchido."""
     missoes = []
-    if df_aulas.empty or df_horario.empty or semana < 2:
+    if base.empty or df_horario.empty or semana < 2:
         return missoes
 
-    mask_a = (df_aulas['unidade'] == unidade) & (df_aulas['serie'].isin(series))
-    aulas = df_aulas[mask_a]
-    if aulas.empty or 'conteudo' not in aulas.columns:
+    coord = _base_coord(base, unidade, series)
+    if coord.empty or 'n_sem_conteudo' not in coord.columns:
         return missoes
 
-    for prof, grupo in aulas.groupby('professor'):
-        total = len(grupo)
-        if total < 3:
-            continue
-
-        sem_conteudo = grupo['conteudo'].isna() | (grupo['conteudo'].astype(str).str.strip() == '')
-        n_vazio = sem_conteudo.sum()
-        pct_vazio = n_vazio / total * 100
+    por_prof = coord.groupby('professor', observed=True)[['n_aulas', 'n_sem_conteudo']].sum()
+    por_prof = por_prof[por_prof['n_aulas'] >= 3]
+    por_prof['pct_vazio'] = por_prof['n_sem_conteudo'] / por_prof['n_aulas'] * 100
+    por_prof = por_prof[por_prof['pct_vazio'] >= 50]
+    if por_prof.empty:
+        return missoes
 
-        if pct_vazio < 50:
-            continue
+    series_prof = coord.astype({'serie': object}).groupby('professor', observed=True)['serie'].unique()
+    info_profs = _por_professor(df_horario, unidade)
 
-        prof_info = df_horario[
-            (df_horario['unidade'] == unidade) & (df_horario['professor'] == prof)
-        ]
-        discs = ', '.join(sorted(prof_info['disciplina'].unique())[:3]) if not prof_info.empty else ''
-        series_t = ', '.join(sorted(grupo['serie'].unique())[:3])
-        n_afetados = grupo['serie'].nunique() * 30
+    for prof, total, n_vazio, pct_vazio in zip(
+            por_prof.index, por_prof['n_aulas'], por_prof['n_sem_conteudo'], por_prof['pct_vazio'].to_numpy()):
+        total = int(total)
+        prof_info = info_profs.get(prof)
+        discs = _ordenados(prof_info['disciplina']) if prof_info is not None else ''
+        series_lista = series_prof[prof]
+        series_t = ', '.join(sorted(series_lista)[:3])
+        n_afetados = len(series_lista) * 30
 
         missoes.append({
             'tipo': 'PROF_SEM_CONTEUDO',
@@ -684,41 +783,447 @@ def _detectar_processo_deadline(unidade, config_path=None):
     return missoes
 
 
+# ========== PARTICOES (VIGILIA INCREMENTAL) ==========
+
+def _digest(*partes):
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else repr(parte).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+def hash_particoes(df):
+    """Hash de conteudo das linhas de cada particao (unidade, serie).
+
+    Independe da ordem das linhas. Frames sem coluna 'serie' viram
+    particoes (unidade, None); sem 'unidade', uma so (None, None).
+    """
+    if df is None or df.empty:
+        return {}
+    linhas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    chaves = [c for c in ('unidade', 'serie') if c in df.columns]
+    if 'unidade' not in chaves:
+        return {(None, None): _digest(np.sort(linhas).tobytes())}
+    resultado = {}
+    for chave, idx in df.groupby(chaves, observed=True, dropna=False).indices.items():
+        chave = chave if isinstance(chave, tuple) else (chave,)
+        chave = tuple(None if pd.isna(c) else str(c) for c in chave)
+        resultado[chave + (None,) * (2 - len(chave))] = _digest(np.sort(linhas[idx]).tobytes())
+    return resultado
+
+
+def carregar_cache_missoes(path):
+    """Resultados da execucao anterior ({chave: (hash, missoes)}), ou {}."""
+    try:
+        with open(path, 'rb') as f:
+            cache = pickle.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Cache de missoes ignorado ({path}): {e}")
+        return {}
+
+
+def salvar_cache_missoes(path, cache):
+    """Grava o cache de resultados (escrita atomica)."""
+    path = Path(path)
+    tmp = path.with_suffix('.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning(f"Cache de missoes nao gravado ({path}): {e}")
+
+
+# ========== REGISTRO DE DETECTORES ==========
+
+CUSTOS = ('pesado', 'medio', 'leve')
+"""Classes de custo. Na execucao paralela os mais pesados saem primeiro."""
+
+
+@dataclass(frozen=True)
+class Detector:
+    """
+    Detector de missoes registrado.
+
+    Campos:
+        nome: Chave do detector (cache incremental e metricas).
+        avaliar: funcao(execucao, unidade, series) -> lista de missoes.
+        entradas: Datasets de _ExecucaoMissoes que le ('base', 'horario', 'freq', 'ocorr').
+        custo: 'leve', 'medio' ou 'pesado'.
+        escopo: 'coordenador' (unidade + series do coordenador), 'serie'
+            (decomponivel por serie: avaliado uma vez por unidade e repartido)
+            ou 'unidade'.
+        ordem_series: Dataset cuja coluna 'serie' ordena as series no escopo 'serie'.
+        colunas_serie: Colunas que entradas[0] precisa ter para repartir por
+            serie; sem elas o detector roda no escopo 'coordenador'.
+        requer_aulas: So roda se houver fato_Aulas.
+    """
+    nome: str
+    avaliar: Callable
+    entradas: tuple = ()
+    custo: str = 'leve'
+    escopo: str = 'coordenador'
+    ordem_series: Optional[str] = None
+    colunas_serie: tuple = ('serie',)
+    requer_aulas: bool = False
+
+
+DETECTORES = {}
+"""nome -> Detector, na ordem de registro (ordem das missoes antes do score)."""
+
+
+def registrar_detector(nome, entradas=(), custo='leve', escopo='coordenador', **opcoes):
+    """Decorator: registra funcao(execucao, unidade, series) como detector."""
+    if custo not in CUSTOS:
+        raise ValueError(f"Custo invalido para {nome}: {custo}")
+    if escopo not in ('coordenador', 'serie', 'unidade'):
+        raise ValueError(f"Escopo invalido para {nome}: {escopo}")
+
+    def decorar(funcao):
+        DETECTORES[nome] = Detector(nome, funcao, tuple(entradas), custo, escopo, **opcoes)
+        return funcao
+    return decorar
+
+
+@registrar_detector('silencioso', entradas=('base', 'horario'), custo='medio', requer_aulas=True)
+def _det_silencioso(ex, unidade, series):
+    return _detectar_prof_silencioso(
+        ex.dados('base', unidade), ex.dados('horario', unidade), ex.semana, unidade, series)
+
+
+@registrar_detector('turma', entradas=('base', 'horario'), custo='medio', escopo='serie',
+                    requer_aulas=True)
+def _det_turma(ex, unidade, series):
+    return _detectar_turma_critica(
+        ex.dados('base', unidade), ex.dados('horario', unidade), ex.semana, unidade, series)
+
+
+@registrar_detector('orfa', entradas=('base', 'horario'), custo='leve', escopo='serie',
+                    ordem_series='horario', requer_aulas=True)
+def _det_orfa(ex, unidade, series):
+    return _detectar_disciplina_orfa(
+        ex.dados('base', unidade), ex.dados('horario', unidade), ex.semana, unidade, series)
+
+
+@registrar_detector('queda', entradas=('base', 'horario'), custo='medio', requer_aulas=True)
+def _det_queda(ex, unidade, series):
+    return _detectar_prof_queda(
+        ex.dados('base', unidade), ex.dados('horario', unidade), ex.semana, unidade, series)
+
+
+@registrar_detector('curriculo', entradas=('base',), custo='leve', requer_aulas=True)
+def _det_curriculo(ex, unidade, series):
+    return _detectar_curriculo_atrasado(
+        ex.dados('base', unidade), ex.semana, unidade, series, ex.progressao)
+
+
+@registrar_detector('sem_conteudo', entradas=('base', 'horario'), custo='medio', requer_aulas=True)
+def _det_sem_conteudo(ex, unidade, series):
+    return _detectar_prof_sem_conteudo(
+        ex.dados('base', unidade), ex.dados('horario', unidade), ex.semana, unidade, series)
+
+
+@registrar_detector('frequencia', entradas=('freq',), custo='pesado', escopo='serie',
+                    ordem_series='freq', colunas_serie=('serie', 'aluno_id'))
+def _det_frequencia(ex, unidade, series):
+    return _detectar_aluno_frequencia(ex.dados('freq', unidade), unidade, series)
+
+
+@registrar_detector('ocorrencia', entradas=('ocorr',), custo='leve')
+def _det_ocorrencia(ex, unidade, series):
+    return _detectar_ocorrencia_grave(ex.dados('ocorr', unidade), unidade, series)
+
+
+@registrar_detector('deadline', custo='leve', escopo='unidade')
+def _det_deadline(ex, unidade, series):
+    return _detectar_processo_deadline(unidade)
+
+
 # ========== PIPELINE PRINCIPAL ==========
 
-def gerar_missoes(unidade, series):
-    """Gera todas as missoes para um coordenador. Retorna lista ordenada por score."""
-    df_aulas = carregar_fato_aulas()
-    if not df_aulas.empty:
-        df_aulas = filtrar_ate_hoje(df_aulas)
-    df_horario = carregar_horario_esperado()
-    df_freq = carregar_frequencia_alunos()
-    df_ocorr = carregar_ocorrencias()
-    semana = calcular_semana_letiva()
+def _na_ordem_de(coluna, series):
+    """Series na ordem em que um groupby sobre a coluna as percorre."""
+    series = list(dict.fromkeys(series))
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        pos = {c: i for i, c in enumerate(coluna.cat.categories)}
+        return sorted((s for s in series if s in pos), key=pos.get)
+    return sorted(series)
+
+
+class _ExecucaoMissoes:
+    """Dados de uma geracao de missoes, carregados e particionados uma vez.
+
+    Os fatos sao particionados por unidade numa unica passada. Cada
+    detector registrado (DETECTORES) roda conforme o escopo: 'serie' uma
+    vez por unidade, sobre todas as series dos coordenadores dela, com o
+    resultado repartido por serie; 'coordenador' uma vez por (unidade,
+    series); 'unidade' uma vez por unidade. Cada coordenador recebe copias
+    das missoes das particoes unidade x serie que cobre.
+
+    preparar() avalia de uma vez as tarefas de varios coordenadores,
+    em paralelo (threads) se max_workers > 1; detectores independentes
+    rodam ao mesmo tempo, os de custo 'pesado' primeiro.
+
+    Incremental: com cache (resultados de uma execucao anterior, ver
+    carregar_cache_missoes), cada resultado guarda o hash das entradas que
+    o detector declara — as particoes unidade x serie desses datasets —,
+    mais o contexto (semana, data, progressao SAE, config e o proprio
+    codigo dos detectores). Detectores de escopo 'serie' rodam so nas series
+    cujo hash mudou; os demais, so se alguma particao da unidade mudou. O
+    resto vem do cache. cache_atual tem os resultados desta execucao.
+
+    estatisticas: recalculados, reaproveitados e, por detector, custo,
+    segundos (soma do tempo das avaliacoes), linhas lidas, missoes,
+    avaliacoes e reaproveitados.
+
+    Args:
+        coordenadores: lista de (unidade, series) que serao consultados
+        cache: dict {chave: (hash, missoes)} da execucao anterior
+        detectores: dict nome -> Detector (padrao: DETECTORES)
+    """
+
+    _FRAMES = ('base', 'horario', 'freq', 'ocorr')
+
+    def __init__(self, coordenadores, cache=None, detectores=None):
+        self.coordenadores = [(unidade, list(series)) for unidade, series in coordenadores]
+        self.series_unidade = {}
+        for unidade, series in self.coordenadores:
+            self.series_unidade.setdefault(unidade, {}).update(dict.fromkeys(series))
+        self.detectores = list((detectores if detectores is not None else DETECTORES).values())
+        df_aulas = carregar_fato_aulas()
+        if not df_aulas.empty:
+            df_aulas = filtrar_ate_hoje(df_aulas)
+        self.tem_aulas = not df_aulas.empty
+        self.base = preparar_base_missoes(df_aulas) if self.tem_aulas else None
+        self.horario = carregar_horario_esperado()
+        self.freq = carregar_frequencia_alunos()
+        self.ocorr = carregar_ocorrencias()
+        self.semana = calcular_semana_letiva()
+        self._progressao = None
+        self._particoes = {}
+        self._resultados = {}
+        self._cache = cache
+        self.cache_atual = {}
+        self._hashes = None
+        self._contexto = None
+        self.estatisticas = {
+            'recalculados': 0,
+            'reaproveitados': 0,
+            'detectores': {d.nome: {
+                'custo': d.custo, 'segundos': 0.0, 'linhas': 0, 'missoes': 0,
+                'avaliacoes': 0, 'reaproveitados': 0,
+            } for d in self.detectores},
+        }
+
+    def dados(self, nome, unidade):
+        """Linhas da unidade (frame inteiro se nao houver coluna 'unidade')."""
+        df = getattr(self, nome)
+        if df is None or 'unidade' not in df.columns:
+            return df
+        if nome not in self._particoes:
+            self._particoes[nome] = dict(tuple(df.groupby('unidade', observed=True)))
+        return self._particoes[nome].get(unidade, df.iloc[0:0])
+
+    @property
+    def progressao(self):
+        """Indice (professor, disciplina) -> capitulo, lido no primeiro uso."""
+        if self._progressao is None:
+            self._progressao = _carregar_progressao_missoes()
+        return self._progressao
+
+    # ---------- Hashes das entradas ----------
+
+    def _hash_contexto(self):
+        if self._contexto is None:
+            config = DATA_DIR / "config_coordenadores.json"
+            self._contexto = _digest(
+                self.semana, _hoje().date().isoformat(),
+                Path(__file__).read_bytes(),
+                config.read_bytes() if config.exists() else b'',
+                sorted(self.progressao.items()),
+            )
+        return self._contexto
+
+    def _hashes_frames(self):
+        if self._hashes is None:
+            self._hashes = {nome: hash_particoes(getattr(self, nome)) for nome in self._FRAMES}
+        return self._hashes
+
+    def _hash_serie(self, unidade, serie, entradas):
+        """Hash das entradas do detector na particao unidade x serie."""
+        partes = [self._hash_contexto()]
+        for nome in entradas:
+            hashes = self._hashes_frames()[nome]
+            partes += [nome] + [hashes.get(k) for k in ((unidade, serie), (unidade, None), (None, None))]
+        return _digest(*partes)
+
+    def _hash_unidade(self, unidade, entradas):
+        """Hash das entradas do detector em todas as particoes da unidade."""
+        partes = [self._hash_contexto()]
+        for nome in entradas:
+            hashes = self._hashes_frames()[nome]
+            partes += [nome] + sorted((str(k), h) for k, h in hashes.items() if k[0] in (unidade, None))
+        return _digest(*partes)
+
+    def _do_cache(self, detector, chave, hash_entradas):
+        if self._cache is None:
+            return None
+        anterior = self._cache.get(chave)
+        if anterior is not None and anterior[0] == hash_entradas:
+            self.estatisticas['reaproveitados'] += 1
+            self.estatisticas['detectores'][detector.nome]['reaproveitados'] += 1
+            return anterior[1]
+        return None
+
+    # ---------- Tarefas ----------
+
+    def _tarefas(self, unidade, series):
+        """(detector, escopo, chave) dos detectores que rodam para o coordenador."""
+        for d in self.detectores:
+            if d.requer_aulas and not self.tem_aulas:
+                continue
+            escopo = d.escopo
+            if escopo == 'serie':
+                colunas = self.dados(d.entradas[0], unidade).columns
+                if not all(c in colunas for c in d.colunas_serie):
+                    escopo = 'coordenador'
+            if escopo == 'coordenador':
+                chave = (d.nome, unidade, tuple(series))
+            else:
+                chave = (d.nome, unidade)
+            yield d, escopo, chave
+
+    def _pendente(self, d, escopo, chave, unidade, series):
+        """Resolve a tarefa pelo cache, ou devolve o que falta avaliar."""
+        incremental = self._cache is not None
+        if escopo != 'serie':
+            hash_entradas = self._hash_unidade(unidade, d.entradas) if incremental else None
+            resultado = self._do_cache(d, chave, hash_entradas)
+            if resultado is not None:
+                self._guardar(d, escopo, chave, unidade, {None: hash_entradas}, resultado)
+                return None
+            return {'detector': d, 'escopo': escopo, 'chave': chave, 'unidade': unidade,
+                    'series': series, 'hashes': {None: hash_entradas}, 'anteriores': None}
+        por_serie, hashes, alteradas = {}, {}, []
+        for serie in self.series_unidade.get(unidade, series):
+            hashes[serie] = self._hash_serie(unidade, serie, d.entradas) if incremental else None
+            anterior = self._do_cache(d, (d.nome, unidade, serie), hashes[serie])
+            if anterior is None:
+                alteradas.append(serie)
+            elif anterior:
+                por_serie[serie] = anterior
+        if not alteradas:
+            self._guardar(d, escopo, chave, unidade, hashes, por_serie)
+            return None
+        return {'detector': d, 'escopo': escopo, 'chave': chave, 'unidade': unidade,
+                'series': alteradas, 'hashes': hashes, 'anteriores': por_serie}
+
+    def _rodar(self, tarefa):
+        """Avalia o detector (pode rodar numa thread). -> (missoes, segundos, linhas)"""
+        d, unidade = tarefa['detector'], tarefa['unidade']
+        inicio = time.perf_counter()
+        missoes = d.avaliar(self, unidade, tarefa['series'])
+        segundos = time.perf_counter() - inicio
+        linhas = 0
+        for nome in d.entradas:
+            df = self.dados(nome, unidade)
+            linhas += 0 if df is None else len(df)
+        return missoes, segundos, linhas
+
+    def _concluir(self, tarefa, avaliacao):
+        missoes, segundos, linhas = avaliacao
+        d = tarefa['detector']
+        metricas = self.estatisticas['detectores'][d.nome]
+        metricas['segundos'] += segundos
+        metricas['linhas'] += linhas
+        metricas['missoes'] += len(missoes)
+        metricas['avaliacoes'] += 1
+        self.estatisticas['recalculados'] += 1
+        resultado = missoes
+        if tarefa['escopo'] == 'serie':
+            resultado = dict(tarefa['anteriores'])
+            for m in missoes:
+                resultado.setdefault(m['serie'], []).append(m)
+        self._guardar(d, tarefa['escopo'], tarefa['chave'], tarefa['unidade'], tarefa['hashes'], resultado)
+
+    def _guardar(self, d, escopo, chave, unidade, hashes, resultado):
+        self._resultados[chave] = resultado
+        if self._cache is None:
+            return
+        if escopo == 'serie':
+            for serie, hash_entradas in hashes.items():
+                self.cache_atual[(d.nome, unidade, serie)] = (hash_entradas, resultado.get(serie, []))
+        else:
+            self.cache_atual[chave] = (hashes[None], resultado)
+
+    def preparar(self, coordenadores=None, max_workers=None):
+        """Avalia as tarefas pendentes dos coordenadores (padrao: todos).
+
+        Com max_workers > 1 as tarefas rodam num pool de threads; os dados
+        compartilhados sao particionados antes, no thread principal.
+        """
+        pendentes, vistas = [], set()
+        for unidade, series in (coordenadores or self.coordenadores):
+            for d, escopo, chave in self._tarefas(unidade, series):
+                if chave in self._resultados or chave in vistas:
+                    continue
+                vistas.add(chave)
+                tarefa = self._pendente(d, escopo, chave, unidade, series)
+                if tarefa is not None:
+                    pendentes.append(tarefa)
+        if not pendentes:
+            return
+        if max_workers and max_workers > 1 and len(pendentes) > 1:
+            for nome in self._FRAMES:
+                for unidade in self.series_unidade:
+                    self.dados(nome, unidade)
+            if any(t['detector'].nome == 'curriculo' for t in pendentes):
+                self.progressao
+            pendentes.sort(key=lambda t: CUSTOS.index(t['detector'].custo))
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futuros = [(t, pool.submit(self._rodar, t)) for t in pendentes]
+                for tarefa, futuro in futuros:
+                    self._concluir(tarefa, futuro.result())
+        else:
+            for tarefa in pendentes:
+                self._concluir(tarefa, self._rodar(tarefa))
+
+    def missoes_coordenador(self, unidade, series):
+        """Missoes do coordenador (unidade + series), sem score."""
+        self.preparar([(unidade, series)])
+        todas = []
+        for d, escopo, chave in self._tarefas(unidade, series):
+            resultado = self._resultados[chave]
+            if escopo == 'serie':
+                ordem = series
+                if d.ordem_series:
+                    ordem = _na_ordem_de(self.dados(d.ordem_series, unidade)['serie'], series)
+                todas.extend(dict(m) for serie in ordem for m in resultado.get(serie, []))
+            else:
+                todas.extend(dict(m) for m in resultado)
+        return todas
+
 
-    todas = []
-    if not df_aulas.empty:
-        todas.extend(_detectar_prof_silencioso(df_aulas, df_horario, semana, unidade, series))
-        todas.extend(_detectar_turma_critica(df_aulas, df_horario, semana, unidade, series))
-        todas.extend(_detectar_disciplina_orfa(df_aulas, df_horario, semana, unidade, series))
-        todas.extend(_detectar_prof_queda(df_aulas, df_horario, semana, unidade, series))
-        todas.extend(_detectar_curriculo_atrasado(df_aulas, semana, unidade, series))
-        todas.extend(_detectar_prof_sem_conteudo(df_aulas, df_horario, semana, unidade, series))
-    todas.extend(_detectar_aluno_frequencia(df_freq, unidade, series))
-    todas.extend(_detectar_ocorrencia_grave(df_ocorr, unidade, series))
-    todas.extend(_detectar_processo_deadline(unidade))
-
-    # Calcular score e classificar
+def _pontuar(todas):
     for b in todas:
         b['score'] = calcular_score(b)
         b['nivel'] = classificar(b['score'])
         b['icone'] = ICONES_MISSAO.get(b['tipo'], '⚪')
         b['cor'] = CORES_MISSAO.get(b['tipo'], '#607D8B')
-
     todas.sort(key=lambda x: x['score'], reverse=True)
     return todas
 
 
+def gerar_missoes(unidade, series):
+    """Gera todas as missoes para um coordenador. Retorna lista ordenada por score."""
+    execucao = _ExecucaoMissoes([(unidade, series)])
+    return _pontuar(execucao.missoes_coordenador(unidade, series))
+
+
 # ========== PERSISTENCIA ==========
 
 def _status_path():
@@ -766,26 +1271,56 @@ def gerar_missao_fingerprint(missao):
     return f"{missao['tipo']}_{un}_{entidade}".replace(' ', '_')
 
 
-def gerar_todas_missoes_rede():
+MAX_WORKERS_DETECTORES = min(8, os.cpu_count() or 1)
+"""Threads da avaliacao paralela dos detectores na rede."""
+
+
+def gerar_todas_missoes_rede(cache_path=None, max_workers=None):
     """Gera missoes para TODOS os coordenadores de todas as unidades.
-    Usa config_coordenadores.json. Retorna dict {unidade: [missoes]}."""
+    Usa config_coordenadores.json. Retorna dict {unidade: [missoes]}.
+
+    Ver executar_missoes_rede (mesmos argumentos), que tambem devolve as
+    metricas da execucao."""
+    return executar_missoes_rede(cache_path, max_workers)[0]
+
+
+def executar_missoes_rede(cache_path=None, max_workers=None):
+    """Gera as missoes da rede e devolve ({unidade: [missoes]}, estatisticas).
+
+    Os dados sao carregados e particionados uma unica vez para a rede
+    (_ExecucaoMissoes); cada particao unidade x serie e avaliada uma vez e
+    os detectores independentes rodam em paralelo (max_workers threads;
+    padrao MAX_WORKERS_DETECTORES). Com cache_path, so as particoes cujas
+    entradas mudaram desde a execucao anterior sao reavaliadas; as demais
+    reaproveitam o resultado gravado.
+
+    estatisticas: ver _ExecucaoMissoes (segundos/linhas/missoes por detector).
+    """
     config_path = DATA_DIR / "config_coordenadores.json"
     if not config_path.exists():
-        return {}
+        return {}, {}
 
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
 
+    coordenadores = [(c['unidade'], c.get('series', [])) for c in config.get('coordenadores', [])]
+    cache = carregar_cache_missoes(cache_path) if cache_path else None
+    execucao = _ExecucaoMissoes(coordenadores, cache)
+    execucao.preparar(max_workers=max_workers or MAX_WORKERS_DETECTORES)
     resultado = {}
-    for coord in config.get('coordenadores', []):
-        un = coord['unidade']
-        series = coord.get('series', [])
-        missoes = gerar_missoes(un, series)
+    for un, series in coordenadores:
+        missoes = _pontuar(execucao.missoes_coordenador(un, series))
         if un not in resultado:
             resultado[un] = []
         resultado[un].extend(missoes)
-
-    # Deduplicar por fingerprint dentro de cada unidade
+    if cache_path:
+        salvar_cache_missoes(cache_path, execucao.cache_atual)
+        logger.info(
+            f"Missoes: {execucao.estatisticas['recalculados']} avaliacoes recalculadas, "
+            f"{execucao.estatisticas['reaproveitados']} resultados reaproveitados")
+
+    # Deduplicar por fingerprint dentro de cada unidade (mesmo professor
+    # visto por dois coordenadores; deadline repetido por coordenador)
     for un in resultado:
         seen = set()
         dedup = []
@@ -796,4 +1331,4 @@ def gerar_todas_missoes_rede():
                 dedup.append(b)
         resultado[un] = sorted(dedup, key=lambda x: x['score'], reverse=True)
 
-    return resultado
+    return resultado, execucao.estatisticas
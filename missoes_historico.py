@@ -2,40 +2,195 @@
 Rastreamento de missoes entre semanas.
 Fingerprint estavel (sem semana no ID) permite detectar missoes persistentes.
 
+Alem da atualizacao semanal, a Vigilia aplica a cada execucao so os eventos
+de mudanca (eventos_missoes): missao nova, mudanca de score/nivel e missao
+resolvida (campo resolvida_em), sem reprocessar as missoes que nao mudaram.
+
+O historico fica em missoes_historico.sqlite3 (sqlite3 da stdlib), tabela
+historico com o fingerprint como chave primaria: cada missao da semana e um
+upsert pela chave, sem carregar nem regravar o historico inteiro. As semanas
+vistas sao um bitset (BLOB, bit s = semana s) e semanas_ativas e a contagem
+de bits, mantida no proprio upsert. Indices:
+  - (semanas_ativas, score)  — obter_persistentes (Decisoes CEO, escalacoes)
+  - (unidade, semanas_ativas) — escalacoes de uma unidade
+  - (ultima_semana)           — limpar_historico_antigo
+Na primeira abertura o missoes_historico.json antigo (se existir) e importado.
+
+As entradas devolvidas tem o mesmo formato do JSON de antes (semanas_vistas
+como lista; resolvida_em so quando a missao saiu da ultima execucao).
+
 Funcoes publicas:
-  - atualizar_historico(missoes_por_unidade, semana)
-  - obter_persistentes(min_semanas=4)
+  - atualizar_historico(missoes_por_unidade, semana) — numero de entradas gravadas
+  - aplicar_eventos(eventos, semana)
+  - obter_persistentes(min_semanas=4, unidade=None, limite=None)
+  - obter_entrada(fingerprint)
+  - obter_historico_completo()
+  - limpar_historico_antigo(semana_atual, max_inatividade=8)
   - gerar_fingerprint(missao) — alias de missoes.gerar_missao_fingerprint
 """
 
 import json
-from pathlib import Path
+import logging
+import sqlite3
+import threading
+from contextlib import closing
 from datetime import datetime
 
 from utils import WRITABLE_DIR
 from missoes import gerar_missao_fingerprint
 
+logger = logging.getLogger("missoes_historico")
+
 # Re-export para conveniencia
 gerar_fingerprint = gerar_missao_fingerprint
 
-_HISTORICO_PATH = WRITABLE_DIR / "missoes_historico.json"
+_HISTORICO_PATH = WRITABLE_DIR / "missoes_historico.sqlite3"
+_LEGADO_JSON = "missoes_historico.json"
+"""Arquivo do formato anterior, importado na criacao do banco (mesma pasta)."""
+
+_COLUNAS = ('fingerprint', 'tipo', 'unidade', 'entidade', 'primeira_semana', 'ultima_semana',
+            'semanas', 'semanas_ativas', 'criado_em', 'atualizado_em',
+            'score', 'nivel', 'n_afetados', 'o_que', 'resolvida_em')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS historico (
+    fingerprint     TEXT PRIMARY KEY,
+    tipo            TEXT,
+    unidade         TEXT,
+    entidade        TEXT,
+    primeira_semana INTEGER,
+    ultima_semana   INTEGER,
+    semanas         BLOB,
+    semanas_ativas  INTEGER,
+    criado_em       TEXT,
+    atualizado_em   TEXT,
+    score           REAL,
+    nivel           TEXT,
+    n_afetados      INTEGER,
+    o_que           TEXT,
+    resolvida_em    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_historico_persistencia ON historico (semanas_ativas, score);
+CREATE INDEX IF NOT EXISTS idx_historico_unidade ON historico (unidade, semanas_ativas);
+CREATE INDEX IF NOT EXISTS idx_historico_ultima ON historico (ultima_semana);
+"""
+
+# Upsert pela chave: nova entrada ou marca a semana no bitset da existente.
+# Campos da missao NULL (evento sem o campo) mantem o valor gravado.
+_UPSERT = """
+INSERT INTO historico (fingerprint, tipo, unidade, entidade, primeira_semana, ultima_semana,
+                       semanas, semanas_ativas, criado_em, atualizado_em,
+                       score, nivel, n_afetados, o_que)
+VALUES (:fingerprint, :tipo, :unidade, :entidade, :semana, :semana,
+        marcar_semana(NULL, :semana), 1, :agora, :agora,
+        :score, :nivel, :n_afetados, :o_que)
+ON CONFLICT (fingerprint) DO UPDATE SET
+    ultima_semana  = excluded.ultima_semana,
+    semanas        = marcar_semana(historico.semanas, excluded.ultima_semana),
+    semanas_ativas = contar_semanas(marcar_semana(historico.semanas, excluded.ultima_semana)),
+    atualizado_em  = excluded.atualizado_em,
+    score          = COALESCE(excluded.score, historico.score),
+    nivel          = COALESCE(excluded.nivel, historico.nivel),
+    n_afetados     = COALESCE(excluded.n_afetados, historico.n_afetados),
+    o_que          = COALESCE(excluded.o_que, historico.o_que),
+    resolvida_em   = NULL
+"""
+
+
+# ========== BITSET DE SEMANAS ==========
+
+def _bits(blob):
+    return int.from_bytes(blob, 'little') if blob else 0
+
+
+def _blob(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8 or 1, 'little')
 
 
-def _carregar_historico():
-    """Carrega historico de missoes do JSON."""
-    if not _HISTORICO_PATH.exists():
-        return {}
+def _marcar_semana(blob, semana):
+    return _blob(_bits(blob) | (1 << max(int(semana), 0)))
+
+
+def _contar_semanas(blob):
+    return _bits(blob).bit_count()
+
+
+def _semanas_do_bitset(blob):
+    bits = _bits(blob)
+    return [s for s in range(bits.bit_length()) if bits >> s & 1]
+
+
+# ========== CONEXAO ==========
+
+_LOCK = threading.Lock()
+_PRONTOS = set()  # caminhos com esquema criado neste processo
+
+
+def _conectar():
+    """Conexao com as funcoes do bitset; cria o esquema (e importa o JSON) na 1a vez."""
+    path = _HISTORICO_PATH
+    novo = not path.exists()
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.create_function('marcar_semana', 2, _marcar_semana, deterministic=True)
+    conn.create_function('contar_semanas', 1, _contar_semanas, deterministic=True)
+    if novo or path not in _PRONTOS:
+        with _LOCK:
+            conn.executescript(_ESQUEMA)
+            if novo:
+                _importar_json(conn, path.with_name(_LEGADO_JSON))
+            _PRONTOS.add(path)
+    return conn
+
+
+def _importar_json(conn, path_json):
+    """Importa o historico do formato JSON anterior (uma vez, na criacao do banco)."""
+    if not path_json.exists():
+        return
     try:
-        with open(_HISTORICO_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
+        with open(path_json, 'r', encoding='utf-8') as f:
+            historico = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Historico JSON ilegivel, nao importado: {e}")
+        return
+    linhas = []
+    for fp, entry in historico.items():
+        bits = 0
+        for s in entry.get('semanas_vistas', []):
+            bits |= 1 << max(int(s), 0)
+        linhas.append((
+            fp, entry.get('tipo', ''), entry.get('unidade', ''), entry.get('entidade', ''),
+            entry.get('primeira_semana'), entry.get('ultima_semana'), _blob(bits), bits.bit_count(),
+            entry.get('criado_em'), entry.get('atualizado_em'), entry.get('score', 0),
+            entry.get('nivel', ''), entry.get('n_afetados', 0), entry.get('o_que', ''),
+            entry.get('resolvida_em'),
+        ))
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO historico ({', '.join(_COLUNAS)}) "
+            f"VALUES ({', '.join('?' * len(_COLUNAS))})", linhas)
+    logger.info(f"Historico de missoes: {len(linhas)} entradas importadas de {path_json.name}")
+
 
+def _entrada(row):
+    """Linha do banco -> dict no formato do historico JSON."""
+    entry = dict(row)
+    entry['semanas_vistas'] = _semanas_do_bitset(entry.pop('semanas'))
+    if entry.get('resolvida_em') is None:
+        entry.pop('resolvida_em', None)
+    return entry
 
-def _salvar_historico(historico):
-    """Salva historico de missoes em JSON."""
-    with open(_HISTORICO_PATH, 'w', encoding='utf-8') as f:
-        json.dump(historico, f, ensure_ascii=False, indent=2)
+
+def _consultar(sql, params=()):
+    with closing(_conectar()) as conn:
+        return [_entrada(r) for r in conn.execute(sql, params)]
+
+
+# ========== ESCRITA ==========
+
+def _upsert(linhas):
+    with closing(_conectar()) as conn, conn:
+        conn.executemany(_UPSERT, linhas)
 
 
 def atualizar_historico(missoes_por_unidade, semana):
@@ -46,76 +201,99 @@ def atualizar_historico(missoes_por_unidade, semana):
         semana: numero da semana letiva atual
 
     Returns:
-        dict do historico atualizado
+        int: numero de entradas gravadas. A versao em JSON devolvia o dict
+        do historico inteiro; quem precisar dele usa obter_historico_completo()
     """
-    historico = _carregar_historico()
     agora = datetime.now().isoformat()
-
-    # Coletar todos os fingerprints ativos nesta semana
-    fingerprints_ativos = set()
-
+    linhas = {}
     for unidade, missoes in missoes_por_unidade.items():
         for b in missoes:
             fp = gerar_missao_fingerprint(b)
-            fingerprints_ativos.add(fp)
-
-            if fp in historico:
-                # Atualizar registro existente
-                entry = historico[fp]
-                entry['ultima_semana'] = semana
-                entry['atualizado_em'] = agora
-                if semana not in entry.get('semanas_vistas', []):
-                    entry['semanas_vistas'].append(semana)
-                entry['semanas_ativas'] = len(entry['semanas_vistas'])
-                # Atualizar dados da missao mais recente
-                entry['score'] = b.get('score', 0)
-                entry['nivel'] = b.get('nivel', '')
-                entry['n_afetados'] = b.get('n_afetados', 0)
-                entry['o_que'] = b.get('o_que', '')
-            else:
-                # Novo registro
-                historico[fp] = {
-                    'fingerprint': fp,
-                    'tipo': b.get('tipo', ''),
-                    'unidade': unidade,
-                    'entidade': b.get('professor', b.get('serie', b.get('disciplina', ''))),
-                    'primeira_semana': semana,
-                    'ultima_semana': semana,
-                    'semanas_vistas': [semana],
-                    'semanas_ativas': 1,
-                    'criado_em': agora,
-                    'atualizado_em': agora,
-                    'score': b.get('score', 0),
-                    'nivel': b.get('nivel', ''),
-                    'n_afetados': b.get('n_afetados', 0),
-                    'o_que': b.get('o_que', ''),
-                }
-
-    _salvar_historico(historico)
-    return historico
-
-
-def obter_persistentes(min_semanas=4):
+            linhas[fp] = {
+                'fingerprint': fp,
+                'tipo': b.get('tipo', ''),
+                'unidade': unidade,
+                'entidade': b.get('professor', b.get('serie', b.get('disciplina', ''))),
+                'semana': semana,
+                'agora': agora,
+                'score': b.get('score', 0),
+                'nivel': b.get('nivel', ''),
+                'n_afetados': b.get('n_afetados', 0),
+                'o_que': b.get('o_que', ''),
+            }
+    _upsert(list(linhas.values()))
+    return len(linhas)
+
+
+def aplicar_eventos(eventos, semana):
+    """Atualiza o historico so com os eventos de uma execucao da Vigilia.
+
+    Args:
+        eventos: lista de eventos de eventos_missoes.registrar_execucao()
+        semana: numero da semana letiva atual
+
+    Returns:
+        int: numero de entradas alteradas
+    """
+    if not eventos:
+        return 0
+    agora = datetime.now().isoformat()
+    ativos = [
+        {
+            'fingerprint': e['fingerprint'],
+            'tipo': e.get('tipo', ''),
+            'unidade': e.get('unidade', ''),
+            'entidade': e.get('entidade', ''),
+            'semana': semana,
+            'agora': agora,
+            **{campo: e.get(campo) for campo in ('score', 'nivel', 'n_afetados', 'o_que')},
+        }
+        for e in eventos if e['evento'] != 'resolvida'
+    ]
+    resolvidas = [(e.get('em', agora), agora, e['fingerprint'])
+                  for e in eventos if e['evento'] == 'resolvida']
+    with closing(_conectar()) as conn, conn:
+        conn.executemany(_UPSERT, ativos)
+        conn.executemany(
+            "UPDATE historico SET resolvida_em = ?, atualizado_em = ? WHERE fingerprint = ?",
+            resolvidas)
+    return len({e['fingerprint'] for e in eventos})
+
+
+# ========== CONSULTA ==========
+
+def obter_persistentes(min_semanas=4, unidade=None, limite=None):
     """Retorna missoes que aparecem em min_semanas ou mais semanas.
 
     Args:
         min_semanas: minimo de semanas ativas para considerar persistente (default 4)
+        unidade: so as missoes da unidade
+        limite: no maximo N entradas (ex.: 3 para as Decisoes CEO)
 
     Returns:
         lista de dicts ordenada por semanas_ativas desc, score desc
     """
-    historico = _carregar_historico()
-    persistentes = [
-        entry for entry in historico.values()
-        if entry.get('semanas_ativas', 0) >= min_semanas
-    ]
-    persistentes.sort(key=lambda x: (-x.get('semanas_ativas', 0), -x.get('score', 0)))
-    return persistentes
+    sql = "SELECT * FROM historico WHERE semanas_ativas >= ?"
+    params = [min_semanas]
+    if unidade:
+        sql += " AND unidade = ?"
+        params.append(unidade)
+    sql += " ORDER BY semanas_ativas DESC, score DESC"
+    if limite is not None:
+        sql += " LIMIT ?"
+        params.append(limite)
+    return _consultar(sql, params)
+
+
+def obter_entrada(fingerprint):
+    """Entrada de uma missao pelo fingerprint (None se nunca vista)."""
+    entradas = _consultar("SELECT * FROM historico WHERE fingerprint = ?", (fingerprint,))
+    return entradas[0] if entradas else None
 
 
 def obter_historico_completo():
-    """Retorna o historico completo para analise."""
-    return _carregar_historico()
+    """Retorna o historico completo para analise: {fingerprint: entrada}."""
+    return {e['fingerprint']: e for e in _consultar("SELECT * FROM historico")}
 
 
 def limpar_historico_antigo(semana_atual, max_inatividade=8):
@@ -128,20 +306,6 @@ def limpar_historico_antigo(semana_atual, max_inatividade=8):
     Returns:
         int: numero de entradas removidas
     """
-    historico = _carregar_historico()
-    removidos = 0
-    para_remover = []
-
-    for fp, entry in historico.items():
-        ultima = entry.get('ultima_semana', 0)
-        if semana_atual - ultima > max_inatividade:
-            para_remover.append(fp)
-
-    for fp in para_remover:
-        del historico[fp]
-        removidos += 1
-
-    if removidos > 0:
-        _salvar_historico(historico)
-
-    return removidos
+    with closing(_conectar()) as conn, conn:
+        return conn.execute("DELETE FROM historico WHERE ultima_semana < ?",
+                            (semana_atual - max_inatividade,)).rowcount
@@ -0,0 +1,133 @@
+"""
+Pacote de dados sob demanda (substitui o carregamento ansioso de tudo).
+
+utils.carregar_todos_dados carregava nove datasets de uma vez — inclusive
+notas, frequencia e ocorrencias — mesmo quando a pagina so usava aulas e
+horario. PacoteDados e um Mapping {nome: DataFrame} que so chama o loader
+de cada dataset no primeiro acesso, e registra o que cada pagina de fato usou.
+
+Pre-carregamento: pacote.pre_carregar('aulas', 'horario') dispara os loaders
+em threads de fundo enquanto a pagina desenha o cabecalho; o acesso depois
+apenas espera a thread terminar. Com pagina='...', o pacote pre-carrega
+sozinho os datasets que a pagina usou na execucao anterior.
+
+Funcoes publicas:
+  - PacoteDados(loaders, pagina=None, pre_carregar_usados=True)
+  - uso_por_pagina()  — {pagina: {dataset: {'acessos', 'segundos'}}}
+"""
+
+import threading
+import time
+from collections.abc import Mapping
+
+_USO_POR_PAGINA = {}
+_LOCK_USO = threading.Lock()
+
+
+def _contexto_streamlit():
+    """(ctx, add_script_run_ctx) para propagar a sessao as threads, se houver."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        return get_script_run_ctx(), add_script_run_ctx
+    except Exception:
+        return None, None
+
+
+class PacoteDados(Mapping):
+    """Mapping preguicoso {nome: DataFrame}.
+
+    Args:
+        loaders: dict {nome: funcao sem argumentos que devolve o DataFrame}
+        pagina: rotulo da pagina (para uso_por_pagina e pre-carga aprendida)
+        pre_carregar_usados: pre-carrega o que a pagina usou da ultima vez
+
+    Diferente do dict antigo, todas as chaves existem; um dataset sem dados
+    e um DataFrame vazio (verificar com .empty).
+    """
+
+    def __init__(self, loaders, pagina=None, pre_carregar_usados=True):
+        self._loaders = dict(loaders)
+        self._pagina = pagina
+        self._dados = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+        self.acessados = {}
+        if pagina and pre_carregar_usados:
+            with _LOCK_USO:
+                usados = list(_USO_POR_PAGINA.get(pagina, {}))
+            self.pre_carregar(*usados)
+
+    # ---------- Mapping ----------
+
+    def __getitem__(self, nome):
+        if nome not in self._loaders:
+            raise KeyError(nome)
+        inicio = time.perf_counter()
+        with self._lock:
+            thread = self._threads.get(nome)
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            carregado = nome in self._dados
+        if not carregado:
+            self._carregar(nome)
+        self._registrar_acesso(nome, time.perf_counter() - inicio)
+        return self._dados[nome]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+    def __repr__(self):
+        carregados = sorted(self._dados)
+        return f"PacoteDados({sorted(self._loaders)}, carregados={carregados})"
+
+    # ---------- Carga ----------
+
+    def _carregar(self, nome):
+        df = self._loaders[nome]()
+        with self._lock:
+            self._dados.setdefault(nome, df)
+
+    def pre_carregar(self, *nomes):
+        """Dispara o carregamento dos datasets em threads de fundo."""
+        ctx, add_ctx = _contexto_streamlit()
+        for nome in nomes:
+            if nome not in self._loaders:
+                continue
+            with self._lock:
+                if nome in self._dados or nome in self._threads:
+                    continue
+                thread = threading.Thread(target=self._carregar, args=(nome,), daemon=True,
+                                          name=f"pre_carga_{nome}")
+                self._threads[nome] = thread
+            if ctx is not None:
+                add_ctx(thread, ctx)
+            thread.start()
+        return self
+
+    def carregados(self):
+        """Nomes dos datasets ja materializados."""
+        with self._lock:
+            return sorted(self._dados)
+
+    # ---------- Rastreamento ----------
+
+    def _registrar_acesso(self, nome, segundos):
+        reg = self.acessados.setdefault(nome, {'acessos': 0, 'segundos': 0.0})
+        reg['acessos'] += 1
+        reg['segundos'] += segundos
+        if self._pagina:
+            with _LOCK_USO:
+                uso = _USO_POR_PAGINA.setdefault(self._pagina, {}).setdefault(
+                    nome, {'acessos': 0, 'segundos': 0.0})
+                uso['acessos'] += 1
+                uso['segundos'] += segundos
+
+
+def uso_por_pagina():
+    """Datasets acessados por pagina neste processo (acessos e tempo de espera)."""
+    with _LOCK_USO:
+        return {p: {n: dict(v) for n, v in usos.items()} for p, usos in _USO_POR_PAGINA.items()}
@@ -25,6 +25,7 @@ from utils import (
 from engine import (
     carregar_narrativa_ceo, carregar_scorecard_diretor,
     carregar_missoes_pregeradas, carregar_preditor, carregar_preparador,
+    carregar_projecoes_entidades,
 )
 from peex_utils import (
     info_semana, calcular_indice_elo, estacao_atual, proximas_reunioes,
@@ -781,6 +782,27 @@ with tab_projecoes:
         st.markdown("---")
         st.markdown("**Complemento: Ritmo necessario por indicador**")
 
+    # Alertas precoces por professor / turma / aluno (preditor em lote)
+    alertas_entidades = carregar_projecoes_entidades(somente_alertas=True)
+    if not alertas_entidades.empty:
+        st.markdown("#### Alertas precoces por entidade")
+        st.caption("Series que devem cruzar o limiar em ate 2 semanas "
+                   "(critico: ate o limite otimista do intervalo de 80% cruza)")
+        contagem = (alertas_entidades.groupby(['metrica', 'alerta'], observed=True).size()
+                    .unstack(fill_value=0))
+        cols_ent = st.columns(len(contagem))
+        for col, (metrica, linha) in zip(cols_ent, contagem.iterrows()):
+            col.metric(metrica.replace('_', ' ').capitalize(),
+                       int(linha.sum()), f"{int(linha.get('critico', 0))} critico(s)",
+                       delta_color="off")
+        criticos = alertas_entidades[alertas_entidades['alerta'] == 'critico']
+        if not criticos.empty:
+            st.dataframe(
+                criticos[['metrica', 'unidade', 'serie', 'rotulo', 'atual', 'proj_2',
+                          'proj_2_inf', 'proj_2_sup', 'tendencia']].head(50),
+                use_container_width=True, hide_index=True,
+            )
+
     # Sempre mostrar projecoes baseadas em metas (dados reais)
     projecoes = _gerar_projecoes(total_row, unidades_df, semana)
 
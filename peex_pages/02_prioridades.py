@@ -25,7 +25,7 @@ from auth import get_user_unit, get_user_role
 from engine import carregar_missoes_pregeradas
 from narrativa import gerar_nudge
 from peex_utils import info_semana, progresso_metas, nivel_escalacao, info_escalacao, FORMATOS_REUNIAO
-from missoes_historico import obter_historico_completo
+from missoes_historico import obter_entrada
 
 
 # ========== CSS ==========
@@ -480,13 +480,13 @@ def render_saude_professores(unidade, semana):
     if hor_un.empty:
         return
 
-    profs_esperados = hor_un.groupby('professor').agg(
+    profs_esperados = hor_un.groupby('professor', observed=True).agg(
         slots=('disciplina', 'count'),
     ).reset_index()
 
     # Registros por professor
     aulas_un = df_aulas[df_aulas['unidade'] == unidade]
-    registros = aulas_un.groupby('professor').size().reset_index(name='n_registros')
+    registros = aulas_un.groupby('professor', observed=True).size().reset_index(name='n_registros')
 
     # Merge
     df = profs_esperados.merge(registros, on='professor', how='left')
@@ -588,10 +588,8 @@ def render_metas_fase(semana):
 
 def _get_escalacao_missao(missao):
     """Retorna info de escalacao se a missao e persistente."""
-    historico = obter_historico_completo()
     from missoes import gerar_missao_fingerprint
-    fp = gerar_missao_fingerprint(missao)
-    entry = historico.get(fp)
+    entry = obter_entrada(gerar_missao_fingerprint(missao))
     if not entry:
         return None
     semanas = entry.get('semanas_ativas', 0)
@@ -16,7 +16,7 @@ from utils import (
     CONFORMIDADE_META, CONFORMIDADE_BAIXO,
 )
 from components import cabecalho_pagina
-from engine import carregar_scorecard_diretor, carregar_missoes_pregeradas
+from engine import carregar_scorecard_diretor, indice_missoes_pregeradas
 from peex_utils import calcular_indice_elo
 
 
@@ -102,10 +102,11 @@ for un_code in ['BV', 'CD', 'JG', 'CDR']:
         status = 'CRITICO'
 
     # Missoes
-    missoes = carregar_missoes_pregeradas(un_code)
-    n_missoes = len(missoes)
-    n_urgentes = len([b for b in missoes if b.get('nivel') == 'URGENTE'])
-    top_missao = missoes[0].get('o_que', '')[:80] if missoes else 'Nenhuma'
+    indice = indice_missoes_pregeradas()
+    n_missoes = indice.contar(unidade=un_code)
+    n_urgentes = indice.contar(unidade=un_code, nivel='URGENTE')
+    top = indice.consultar(unidade=un_code, limite=1)
+    top_missao = top[0].get('o_que', '')[:80] if top else 'Nenhuma'
 
     st.markdown(f"""
     <div class="{card_class}">
@@ -158,7 +159,6 @@ for un_code in ['BV', 'CD', 'JG', 'CDR']:
     if not row.empty:
         r = row.iloc[0]
         ie = calcular_indice_elo(r)
-        missoes = carregar_missoes_pregeradas(un_code)
         dados_tabela.append({
             'Unidade': UNIDADES_NOMES.get(un_code, un_code),
             'IE': round(ie, 1),
@@ -166,7 +166,7 @@ for un_code in ['BV', 'CD', 'JG', 'CDR']:
             'Frequencia': f"{r.get('frequencia_media', 0):.0f}%",
             'Prof Ritmo': f"{r.get('pct_prof_no_ritmo', 0):.0f}%",
             'Alunos Risco': f"{r.get('pct_alunos_risco', 0):.0f}%",
-            'Missoes': len(missoes),
+            'Missoes': indice_missoes_pregeradas().contar(unidade=un_code),
         })
 
 if dados_tabela:
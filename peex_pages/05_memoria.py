@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_role, ROLE_CEO, ROLE_DIRETOR
 from utils import calcular_semana_letiva, UNIDADES_NOMES, WRITABLE_DIR
 from components import cabecalho_pagina
-from engine import carregar_missoes_pregeradas
+from engine import indice_missoes_pregeradas
 
 
 # ========== CSS ==========
@@ -118,7 +118,7 @@ _VACINAS_PADRAO = [
 
 # ========== VERIFICACAO DE GATILHOS ==========
 
-def verificar_gatilhos(vacinas, missoes):
+def verificar_gatilhos(vacinas, indice):
     """Verifica se alguma vacina deve ser ativada com base nos dados atuais.
 
     Returns:
@@ -130,9 +130,8 @@ def verificar_gatilhos(vacinas, missoes):
         tipo = v.get('tipo_gatilho', '')
 
         if tipo == 'prof_silencioso':
-            profs_silenciosos = [b for b in missoes
-                                 if b.get('tipo') == 'PROF_SILENCIOSO'
-                                 and b.get('semanas_ativas', 0) >= v.get('limiar', 3)]
+            profs_silenciosos = [b for b in indice.consultar(tipo='PROF_SILENCIOSO')
+                                 if b.get('semanas_ativas', 0) >= v.get('limiar', 3)]
             if profs_silenciosos:
                 alertas.append({
                     'vacina': v,
@@ -141,9 +140,8 @@ def verificar_gatilhos(vacinas, missoes):
                 })
 
         elif tipo == 'ocorrencias_surto':
-            ocorr_missoes = [b for b in missoes
-                              if b.get('tipo') == 'ALUNO_OCORRENCIA'
-                              and b.get('n_afetados', 0) >= v.get('limiar', 10)]
+            ocorr_missoes = [b for b in indice.consultar(tipo='ALUNO_OCORRENCIA')
+                              if b.get('n_afetados', 0) >= v.get('limiar', 10)]
             if ocorr_missoes:
                 alertas.append({
                     'vacina': v,
@@ -162,8 +160,7 @@ semana = calcular_semana_letiva()
 vacinas = _carregar_vacinas()
 
 # Verificar alertas preventivos
-missoes = carregar_missoes_pregeradas()
-alertas = verificar_gatilhos(vacinas, missoes)
+alertas = verificar_gatilhos(vacinas, indice_missoes_pregeradas())
 
 if alertas:
     st.markdown("### Alertas Preventivos Ativos")
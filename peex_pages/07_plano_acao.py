@@ -4,7 +4,6 @@ PEEX — Plano de Acao Semanal
 Cada acao tem responsavel, prazo e status rastreavel.
 """
 
-import json
 import streamlit as st
 import pandas as pd
 from datetime import datetime
@@ -15,12 +14,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from auth import get_user_unit, get_user_role
 from utils import (
-    DATA_DIR, calcular_semana_letiva, UNIDADES_NOMES, WRITABLE_DIR,
+    DATA_DIR, calcular_semana_letiva, UNIDADES_NOMES,
     carregar_fato_aulas, carregar_horario_esperado, carregar_ocorrencias,
     filtrar_ate_hoje, _hoje,
 )
 from components import cabecalho_pagina
 from engine import carregar_missoes_pregeradas
+from planos_acao import carregar_plano, salvar_plano
 from narrativa import gerar_nudge
 
 
@@ -60,29 +60,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# ========== PERSISTENCIA ==========
-
-def _plano_path(semana, unidade):
-    return WRITABLE_DIR / f"plano_acao_sem{semana}_{unidade}.json"
-
-
-def carregar_plano(semana, unidade):
-    path = _plano_path(semana, unidade)
-    if path.exists():
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return None
-
-
-def salvar_plano(semana, unidade, plano):
-    path = _plano_path(semana, unidade)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(plano, f, ensure_ascii=False, indent=2)
-
-
 # ========== GERAR ACOES COM DADOS REAIS ==========
 
 def _gerar_acoes_reais(unidade, semana):
@@ -119,7 +96,7 @@ def _gerar_acoes_reais(unidade, semana):
         df_un = df_aulas[df_aulas['unidade'] == unidade]
         df_hor_un = df_hor[df_hor['unidade'] == unidade]
 
-        for prof, df_p in df_un.groupby('professor'):
+        for prof, df_p in df_un.groupby('professor', observed=True):
             esp = 0
             for s in df_p['serie'].unique():
                 for d in df_p['disciplina'].unique():
@@ -140,7 +117,7 @@ def _gerar_acoes_reais(unidade, semana):
         df_ocorr_un = df_ocorr[df_ocorr['unidade'] == unidade]
         g = df_ocorr_un[df_ocorr_un['gravidade'] == 'Grave']
         if not g.empty:
-            top = g.groupby(['serie', 'turma']).size().sort_values(ascending=False).head(3)
+            top = g.groupby(['serie', 'turma'], observed=True).size().sort_values(ascending=False).head(3)
             turmas_graves = [(f"{s} {t}", int(n)) for (s, t), n in top.items()]
 
     # ===== GERAR ACOES POR PRIORIDADE =====
@@ -319,7 +296,7 @@ st.markdown(f'<div class="nudge-semanal">{_NUDGES_SEMANAIS[nudge_idx]}</div>', u
 st.markdown(f"### Semana {semana} — {nome_un}")
 
 # Carregar plano salvo ou gerar novo
-plano = carregar_plano(semana, user_unit)
+plano = carregar_plano(user_unit, semana)
 
 if plano is None:
     # Tentar gerar com dados reais primeiro
@@ -354,7 +331,7 @@ if plano is None:
         'fonte': 'dados_reais',
         'acoes': acoes,
     }
-    salvar_plano(semana, user_unit, plano)
+    salvar_plano(user_unit, semana, plano)
     st.caption("Plano gerado automaticamente com dados reais da unidade")
 else:
     st.caption(f"Plano salvo em {plano.get('gerado_em', '?')[:10]}")
@@ -420,7 +397,7 @@ for i, acao in enumerate(acoes):
 if alterado:
     plano['acoes'] = acoes
     plano['atualizado_em'] = datetime.now().isoformat()
-    salvar_plano(semana, user_unit, plano)
+    salvar_plano(user_unit, semana, plano)
 
 # ========== REGENERAR ==========
 
@@ -431,7 +408,7 @@ if st.button("Regenerar plano com dados atuais", type="secondary"):
         plano['acoes'] = acoes_novas
         plano['gerado_em'] = datetime.now().isoformat()
         plano['fonte'] = 'dados_reais'
-        salvar_plano(semana, user_unit, plano)
+        salvar_plano(user_unit, semana, plano)
         st.rerun()
 
 # ========== RESUMO ==========
@@ -91,7 +91,7 @@ semana = calcular_semana_letiva()
 user_unit = get_user_unit() or 'BV'
 nome_un = UNIDADES_NOMES.get(user_unit, user_unit)
 
-df_aulas = carregar_fato_aulas()
+df_aulas = carregar_fato_aulas(unidades=[user_unit])
 df_horario = carregar_horario_esperado()
 
 if df_aulas.empty or df_horario.empty:
@@ -108,37 +108,42 @@ if hor_un.empty:
     st.warning(f"Nenhum professor encontrado para {nome_un}.")
     st.stop()
 
-# Calcular metricas por professor
-profs_esperados = hor_un.groupby('professor').agg(
+# Calcular metricas por professor — cruzamentos pela chave int32 professor_cod
+# quando disponivel (sem dicionario de chaves, pelo nome)
+chave = 'professor_cod'
+if chave not in hor_un.columns or chave not in aulas_un.columns:
+    chave = 'professor'
+profs_esperados = hor_un.groupby(list(dict.fromkeys([chave, 'professor'])), observed=True).agg(
     slots=('disciplina', 'count'),
     disciplinas=('disciplina', lambda x: ', '.join(sorted(x.unique()))),
     series=('serie', lambda x: ', '.join(sorted(x.unique()))),
 ).reset_index()
 
-registros = aulas_un.groupby('professor').agg(
+registros = aulas_un.groupby(chave).agg(
     n_registros=('disciplina', 'count'),
 ).reset_index()
 
 # Conteudo
 if 'conteudo' in aulas_un.columns:
     conteudo_ok = aulas_un[aulas_un['conteudo'].notna() & (aulas_un['conteudo'].str.strip() != '')]
-    conteudo_por_prof = conteudo_ok.groupby('professor').size().reset_index(name='com_conteudo')
+    conteudo_por_prof = conteudo_ok.groupby(chave).size().reset_index(name='com_conteudo')
 else:
-    conteudo_por_prof = pd.DataFrame(columns=['professor', 'com_conteudo'])
+    conteudo_por_prof = pd.DataFrame({chave: pd.Series(dtype=hor_un[chave].dtype), 'com_conteudo': 0})
 
 # Ultimo registro
 if 'data' in aulas_un.columns:
     aulas_un_copy = aulas_un.copy()
     aulas_un_copy['data_dt'] = pd.to_datetime(aulas_un_copy['data'], errors='coerce')
-    ultimo_reg = aulas_un_copy.groupby('professor')['data_dt'].max().reset_index()
-    ultimo_reg.columns = ['professor', 'ultima_data']
+    ultimo_reg = aulas_un_copy.groupby(chave)['data_dt'].max().reset_index()
+    ultimo_reg.columns = [chave, 'ultima_data']
 else:
-    ultimo_reg = pd.DataFrame(columns=['professor', 'ultima_data'])
+    ultimo_reg = pd.DataFrame({chave: pd.Series(dtype=hor_un[chave].dtype),
+                               'ultima_data': pd.Series(dtype='datetime64[ns]')})
 
 # Merge
-df = profs_esperados.merge(registros, on='professor', how='left')
-df = df.merge(conteudo_por_prof, on='professor', how='left')
-df = df.merge(ultimo_reg, on='professor', how='left')
+df = profs_esperados.merge(registros, on=chave, how='left')
+df = df.merge(conteudo_por_prof, on=chave, how='left')
+df = df.merge(ultimo_reg, on=chave, how='left')
 
 df['n_registros'] = df['n_registros'].fillna(0).astype(int)
 df['com_conteudo'] = df['com_conteudo'].fillna(0).astype(int)
@@ -12,8 +12,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from auth import get_user_unit
 from utils import (
-    calcular_semana_letiva, DATA_DIR,
-    UNIDADES_NOMES,
+    calcular_semana_letiva, DATA_DIR, carregar_frequencia_agregada,
+    carregar_matriz_frequencia, UNIDADES_NOMES,
 )
 from components import cabecalho_pagina
 
@@ -73,10 +73,10 @@ if alunos_un.empty:
     st.warning(f"Nenhum aluno encontrado para {nome_un}.")
     st.stop()
 
-# Carregar frequencia se disponivel
+# Carregar frequencia se disponivel (visao aluno x disciplina pre-agregada)
 freq_df = pd.DataFrame()
 if freq_path.exists():
-    freq_df = pd.read_csv(freq_path)
+    freq_df = carregar_frequencia_agregada('aluno_disciplina')
     if 'unidade' in freq_df.columns:
         freq_df = freq_df[freq_df['unidade'] == user_unit]
 
@@ -93,17 +93,9 @@ alunos_un['frequencia'] = 100.0
 alunos_un['n_ocorrencias'] = 0
 alunos_un['ocorr_graves'] = 0
 
-# --- Frequencia: agregar presenca bruta por aluno_id ---
-if not freq_df.empty and 'aluno_id' in freq_df.columns and 'presenca' in freq_df.columns:
-    f = freq_df.copy()
-    f['_presente'] = f['presenca'].isin(['P'])
-    f['_justificada'] = f['presenca'].isin(['J'])
-    f['_registrada'] = f['presenca'].isin(['P', 'F', 'J'])
-    freq_agg = f.groupby('aluno_id').agg(
-        presencas=('_presente', 'sum'),
-        justificadas=('_justificada', 'sum'),
-        total_aulas=('_registrada', 'sum'),
-    ).reset_index()
+# --- Frequencia: somar as disciplinas de cada aluno_id ---
+if not freq_df.empty and 'aluno_id' in freq_df.columns:
+    freq_agg = freq_df.groupby('aluno_id')[['presencas', 'justificadas', 'total_aulas']].sum().reset_index()
     freq_agg['pct_freq'] = (
         (freq_agg['presencas'] + freq_agg['justificadas'])
         / freq_agg['total_aulas'].clip(lower=1) * 100
@@ -118,6 +110,13 @@ if not freq_df.empty and 'aluno_id' in freq_df.columns and 'presenca' in freq_df
     alunos_un.loc[mask_valido, 'frequencia'] = alunos_un.loc[mask_valido, 'pct_freq'].fillna(100)
     alunos_un.drop(columns=['pct_freq', 'total_aulas'], inplace=True, errors='ignore')
 
+# --- Faltas seguidas (matriz de presenca compactada, se publicada) ---
+alunos_un['faltas_seguidas'] = 0
+matriz = carregar_matriz_frequencia()
+if matriz is not None and 'aluno_id' in alunos_un.columns:
+    seq = matriz.faltas_consecutivas().set_index('aluno_id')['sequencia_atual']
+    alunos_un['faltas_seguidas'] = alunos_un['aluno_id'].map(seq).fillna(0).astype(int)
+
 # --- Ocorrencias: contar por aluno_id (so Disciplinar — Pedagogico e informativo) ---
 if not ocorr_df.empty and 'aluno_id' in ocorr_df.columns:
     oc = ocorr_df.copy()
@@ -211,6 +210,8 @@ for _, row in lista.iterrows():
         alerta = ' | RISCO INFREQUENCIA (LDB)'
     elif ocorr >= 5:
         alerta = ' | OCORRENCIAS GRAVES'
+    if row.get('faltas_seguidas', 0) >= 3:
+        alerta += f" | {int(row['faltas_seguidas'])} FALTAS SEGUIDAS"
 
     st.markdown(f"""
     <div class="{card_class}">
@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit
 from utils import (
     calcular_semana_letiva, _hoje,
-    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje,
+    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje, unidades_do_usuario,
     UNIDADES_NOMES, INICIO_ANO_LETIVO,
 )
 from components import cabecalho_pagina
@@ -58,7 +58,7 @@ nome_un = UNIDADES_NOMES.get(user_unit, user_unit)
 
 hoje = _hoje()
 
-df_aulas = carregar_fato_aulas()
+df_aulas = carregar_fato_aulas(unidades_do_usuario())  # so as particoes visiveis ao usuario
 df_horario = carregar_horario_esperado()
 
 if df_aulas.empty:
@@ -160,7 +160,7 @@ if not df_aulas.empty and 'data' in df_aulas.columns:
         df_copy = df_copy.dropna(subset=['data_dt'])
         df_copy['semana_num'] = ((df_copy['data_dt'] - pd.Timestamp(INICIO_ANO_LETIVO)).dt.days // 7 + 1).clip(lower=1)
 
-        hist = df_copy.groupby('semana_num').size().reset_index(name='registros')
+        hist = df_copy.groupby('semana_num', observed=True).size().reset_index(name='registros')
         hist = hist[hist['semana_num'] >= max(1, semana - 3)]
         hist = hist[hist['semana_num'] <= semana]
 
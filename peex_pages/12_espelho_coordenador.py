@@ -16,11 +16,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit, get_user_role
 from utils import (
     calcular_semana_letiva, UNIDADES_NOMES, WRITABLE_DIR, DATA_DIR,
-    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje,
+    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje, unidades_do_usuario,
     CONFORMIDADE_META,
 )
 from components import cabecalho_pagina
 from missoes import carregar_status
+from planos_acao import execucao_acumulada
 
 
 # ========== CSS ==========
@@ -78,7 +79,7 @@ nome_un = UNIDADES_NOMES.get(user_unit, user_unit)
 
 # ========== CONFORMIDADE REAL (dados do SIGA) ==========
 
-df_aulas = carregar_fato_aulas()
+df_aulas = carregar_fato_aulas(unidades_do_usuario())  # so as particoes visiveis ao usuario
 df_horario = carregar_horario_esperado()
 
 conf_val = 0
@@ -274,22 +275,11 @@ with c1:
         st.caption("Nenhuma missao rastreada. Acesse Prioridades da Semana para comecar.")
 
 with c2:
-    # Carregar planos de acao
-    planos_resolvidos = 0
-    planos_total = 0
-    for sem in range(1, semana + 1):
-        path = WRITABLE_DIR / f"plano_acao_sem{sem}_{user_unit}.json"
-        if path.exists():
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    plano = json.load(f)
-                acoes = plano.get('acoes', [])
-                planos_total += len(acoes)
-                planos_resolvidos += sum(1 for a in acoes if a.get('status') == 'resolvida')
-            except (json.JSONDecodeError, IOError):
-                pass
-
-    pct_execucao_plano = round(planos_resolvidos / max(planos_total, 1) * 100, 0)
+    # Planos de acao do ano (uma consulta agregada)
+    execucao = execucao_acumulada(user_unit, semana)
+    planos_total = execucao['total']
+    planos_resolvidos = execucao['concluidas']
+    pct_execucao_plano = round(execucao['taxa'], 0)
 
     st.markdown("**Plano de Acao**")
     if planos_total > 0:
@@ -14,7 +14,7 @@ from auth import get_user_role, ROLE_CEO
 from utils import calcular_semana_letiva, calcular_trimestre, DATA_DIR, UNIDADES_NOMES
 from components import cabecalho_pagina
 from peex_utils import info_semana, proximas_reunioes, calcular_indice_elo
-from engine import carregar_missoes_pregeradas, carregar_comparador, carregar_preparador
+from engine import indice_missoes_pregeradas, carregar_comparador, carregar_preparador
 
 
 # ========== GATE ==========
@@ -82,11 +82,12 @@ if obj:
 
 # Missoes por unidade
 st.markdown("### Panorama de Missoes")
+indice = indice_missoes_pregeradas()
 for un_code in ['BV', 'CD', 'JG', 'CDR']:
-    missoes = carregar_missoes_pregeradas(un_code)
-    urgentes = [b for b in missoes if b.get('nivel') == 'URGENTE']
+    n_missoes = indice.contar(unidade=un_code)
+    n_urgentes = indice.contar(unidade=un_code, nivel='URGENTE')
     nome = UNIDADES_NOMES.get(un_code, un_code)
-    st.markdown(f"- **{nome}**: {len(missoes)} missoes ({len(urgentes)} urgentes)")
+    st.markdown(f"- **{nome}**: {n_missoes} missoes ({n_urgentes} urgentes)")
 
 # Roteiro por unidade (PREPARADOR)
 roteiro_un = preparador.get('roteiro_por_unidade', {})
@@ -142,8 +143,7 @@ pauta_items = [
 ]
 
 # Top 3 problemas da rede
-todas_missoes = carregar_missoes_pregeradas()
-urgentes_rede = [b for b in todas_missoes if b.get('nivel') == 'URGENTE']
+urgentes_rede = indice.consultar(nivel='URGENTE')
 if urgentes_rede:
     pauta_items.append(f"4. Missoes urgentes na rede: {len(urgentes_rede)} ({', '.join(set(b.get('tipo','') for b in urgentes_rede[:5]))})")
 else:
@@ -68,7 +68,7 @@ def _carregar_dados_unidade(unidade, semana):
         df_hor_un = df_hor[df_hor['unidade'] == unidade]
 
         profs_conf = []
-        for prof, df_p in df_un.groupby('professor'):
+        for prof, df_p in df_un.groupby('professor', observed=True):
             esp = 0
             for s in df_p['serie'].unique():
                 for d in df_p['disciplina'].unique():
@@ -97,7 +97,7 @@ def _carregar_dados_unidade(unidade, semana):
         graves_un = df_ocorr_un[df_ocorr_un['gravidade'] == 'Grave']
         if not graves_un.empty:
             top_turmas = (
-                graves_un.groupby(['serie', 'turma']).size()
+                graves_un.groupby(['serie', 'turma'], observed=True).size()
                 .sort_values(ascending=False).head(3)
             )
             dados['turmas_graves'] = [
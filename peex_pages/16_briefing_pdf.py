@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit
 from utils import calcular_semana_letiva, calcular_capitulo_esperado, calcular_trimestre, UNIDADES_NOMES, _hoje
 from components import cabecalho_pagina
-from engine import carregar_missoes_pregeradas, carregar_conselheiro
+from engine import indice_missoes_pregeradas, carregar_conselheiro
 from narrativa import gerar_nudge
 from peex_utils import info_semana
 
@@ -30,16 +30,16 @@ user_unit = get_user_unit() or 'BV'
 nome_un = UNIDADES_NOMES.get(user_unit, user_unit)
 hoje = _hoje()
 
-missoes = carregar_missoes_pregeradas(user_unit)
+indice = indice_missoes_pregeradas()
 conselheiro = carregar_conselheiro()
 pauta = conselheiro.get('pautas', {}).get(user_unit, {})
 info = info_semana(semana)
 fase = info['fase']
 
 # Gerar HTML
-urgentes = [b for b in missoes if b.get('nivel') == 'URGENTE']
-importantes = [b for b in missoes if b.get('nivel') == 'IMPORTANTE']
-monitorar = [b for b in missoes if b.get('nivel') == 'MONITORAR']
+urgentes = indice.consultar(unidade=user_unit or None, nivel='URGENTE')
+importantes = indice.consultar(unidade=user_unit or None, nivel='IMPORTANTE')
+monitorar = indice.consultar(unidade=user_unit or None, nivel='MONITORAR')
 
 html = f"""<!DOCTYPE html>
 <html>
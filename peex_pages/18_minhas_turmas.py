@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit, get_user_role, get_professor_name, ROLE_PROFESSOR
 from utils import (
     calcular_semana_letiva, DATA_DIR,
-    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje,
+    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje, unidades_do_usuario,
     UNIDADES_NOMES,
 )
 from components import cabecalho_pagina
@@ -65,7 +65,7 @@ if not prof_nome:
 st.markdown(f"**Professor(a):** {prof_nome} | **Unidade:** {UNIDADES_NOMES.get(user_unit, user_unit)}")
 
 # Carregar dados
-df_aulas = carregar_fato_aulas()
+df_aulas = carregar_fato_aulas(unidades_do_usuario())  # so as particoes visiveis ao usuario
 df_horario = carregar_horario_esperado()
 
 if df_aulas.empty:
@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit, get_user_role, get_professor_name, ROLE_PROFESSOR
 from utils import (
     calcular_semana_letiva, calcular_trimestre,
-    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje,
+    carregar_fato_aulas, carregar_horario_esperado, filtrar_ate_hoje, unidades_do_usuario,
     UNIDADES_NOMES,
 )
 from components import cabecalho_pagina
@@ -102,7 +102,7 @@ if not prof_nome:
 st.markdown(f"**Professor(a):** {prof_nome} | **Semana {semana}/47** | **{trimestre}o Trimestre**")
 
 # Carregar dados
-df_aulas = carregar_fato_aulas()
+df_aulas = carregar_fato_aulas(unidades_do_usuario())  # so as particoes visiveis ao usuario
 df_horario = carregar_horario_esperado()
 
 if df_aulas.empty:
@@ -148,7 +148,7 @@ if not aulas_prof.empty and 'data' in aulas_prof.columns:
         from utils import INICIO_ANO_LETIVO
         aulas_prof_copy['semana_num'] = ((aulas_prof_copy['data_dt'] - pd.Timestamp(INICIO_ANO_LETIVO)).dt.days // 7 + 1).clip(lower=1)
 
-        por_semana = aulas_prof_copy.groupby('semana_num').size().reset_index(name='aulas')
+        por_semana = aulas_prof_copy.groupby('semana_num', observed=True).size().reset_index(name='aulas')
         por_semana = por_semana.sort_values('semana_num')
 
         if len(por_semana) > 1:
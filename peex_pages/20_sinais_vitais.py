@@ -16,6 +16,7 @@ from utils import (
     CONFORMIDADE_META, CONFORMIDADE_BAIXO, CONFORMIDADE_CRITICO,
 )
 from components import cabecalho_pagina
+from engine import carregar_projecoes_entidades
 from peex_utils import calcular_indice_elo
 
 
@@ -147,3 +148,27 @@ for nome, campo, inverso, vmax in indicadores:
     """, unsafe_allow_html=True)
     if delta_txt:
         st.caption(delta_txt)
+
+
+# Alertas precoces da unidade (preditor em lote)
+st.markdown("### Alertas Precoces (proximas 2 semanas)")
+alertas_un = carregar_projecoes_entidades(unidade=user_unit, somente_alertas=True)
+if alertas_un.empty:
+    st.caption("Nenhuma serie da unidade projetada para cruzar o limiar.")
+else:
+    titulos = {
+        'professor_conformidade': 'Professores — conformidade',
+        'turma_frequencia': 'Turmas — frequencia',
+        'aluno_frequencia': 'Alunos — frequencia',
+        'aluno_ocorrencias': 'Alunos — ocorrencias',
+    }
+    for metrica, grupo in alertas_un.groupby('metrica', observed=True):
+        grupo = grupo.sort_values(['alerta', 'proj_2'], ascending=[True, True])
+        with st.expander(f"{titulos.get(metrica, metrica)}: {len(grupo)} "
+                         f"({(grupo['alerta'] == 'critico').sum()} critico(s))"):
+            for _, a in grupo.head(20).iterrows():
+                st.markdown(
+                    f"{'🔴' if a['alerta'] == 'critico' else '🟡'} **{a['rotulo']}** ({a['serie']}): "
+                    f"atual {a['atual']:.0f} → {a['proj_2']:.0f} em 2 sem "
+                    f"(intervalo {a['proj_2_inf']:.0f}–{a['proj_2_sup']:.0f})"
+                )
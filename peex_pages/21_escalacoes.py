@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from auth import get_user_unit, get_user_role, ROLE_DIRETOR, ROLE_CEO
 from utils import calcular_semana_letiva, UNIDADES_NOMES, WRITABLE_DIR
 from components import cabecalho_pagina
-from missoes_historico import obter_historico_completo
+from missoes_historico import obter_persistentes
 from peex_utils import nivel_escalacao, info_escalacao
 from peex_config import NIVEIS_ESCALACAO
 
@@ -56,19 +56,14 @@ cabecalho_pagina("Escalacoes", "Missoes que precisam da sua intervencao")
 semana = calcular_semana_letiva()
 user_unit = get_user_unit()
 
-# Carregar historico e filtrar escalacoes
-historico = obter_historico_completo()
+# Escalacoes: Diretor so ve nivel 2+ (3+ semanas ativas), consulta pelo indice
+# do historico; CEO ve a rede toda
+persistentes = obter_persistentes(
+    min_semanas=3, unidade=user_unit if user_unit and role != 'ceo' else None)
 
 escalacoes = []
-for fp, entry in historico.items():
-    sem_ativas = entry.get('semanas_ativas', 0)
-    nivel = nivel_escalacao(sem_ativas)
-    if nivel < 2:  # Diretor so ve nivel 2+
-        continue
-    un = entry.get('unidade', '')
-    if user_unit and un != user_unit and role != 'ceo':
-        continue
-
+for entry in persistentes:
+    nivel = nivel_escalacao(entry.get('semanas_ativas', 0))
     esc_info = info_escalacao(nivel)
     escalacoes.append({
         **entry,
@@ -76,10 +71,13 @@ for fp, entry in historico.items():
         'esc_info': esc_info,
     })
 
-# Ordenar por nivel (maior primeiro) e semanas ativas
-escalacoes.sort(key=lambda x: (-x['nivel_esc'], -x.get('semanas_ativas', 0)))
+# Ordenar: ativas antes das ja resolvidas (historico aplica os eventos da
+# Vigilia), depois por nivel (maior primeiro) e semanas ativas
+escalacoes.sort(key=lambda x: (bool(x.get('resolvida_em')), -x['nivel_esc'], -x.get('semanas_ativas', 0)))
 
-st.markdown(f"### {len(escalacoes)} escalacao(oes) ativa(s)")
+n_resolvidas = sum(1 for e in escalacoes if e.get('resolvida_em'))
+st.markdown(f"### {len(escalacoes) - n_resolvidas} escalacao(oes) ativa(s)"
+            + (f" · {n_resolvidas} resolvida(s) aguardando fechamento" if n_resolvidas else ""))
 
 if not escalacoes:
     st.success("Nenhuma escalacao pendente. As coordenacoes estao resolvendo as missoes.")
@@ -130,6 +128,7 @@ else:
             <div class="esc-meta">
                 {un_nome} | {esc.get('semanas_ativas', 0)} semanas ativas |
                 Score: {esc.get('score', 0)} | Tipo: {esc.get('tipo', '')}
+                {f"| Resolvida em {esc['resolvida_em'][:10]}" if esc.get('resolvida_em') else ''}
             </div>
         </div>
         """, unsafe_allow_html=True)
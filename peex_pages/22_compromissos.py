@@ -3,7 +3,6 @@ PEEX — Compromissos (Diretor)
 Compromissos registrados em reuniao + status.
 """
 
-import json
 import streamlit as st
 from datetime import datetime
 from pathlib import Path
@@ -12,8 +11,9 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from auth import get_user_unit, get_user_role, ROLE_DIRETOR, ROLE_CEO, ROLE_COORDENADOR
-from utils import calcular_semana_letiva, UNIDADES_NOMES, WRITABLE_DIR
+from utils import calcular_semana_letiva, UNIDADES_NOMES
 from components import cabecalho_pagina
+from planos_acao import carregar_compromissos, adicionar_compromisso, atualizar_acao
 
 
 # ========== CSS ==========
@@ -40,29 +40,6 @@ if role not in (ROLE_CEO, ROLE_DIRETOR, ROLE_COORDENADOR):
     st.stop()
 
 
-# ========== PERSISTENCIA ==========
-
-def _path_compromissos(unidade):
-    return WRITABLE_DIR / f"compromissos_diretor_{unidade}.json"
-
-
-def carregar_compromissos(unidade):
-    path = _path_compromissos(unidade)
-    if path.exists():
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return []
-
-
-def salvar_compromissos(unidade, compromissos):
-    path = _path_compromissos(unidade)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(compromissos, f, ensure_ascii=False, indent=2)
-
-
 # ========== MAIN ==========
 
 cabecalho_pagina("Compromissos", "Compromissos registrados em reuniao")
@@ -85,15 +62,13 @@ with st.form("novo_compromisso"):
     submitted = st.form_submit_button("Adicionar")
 
     if submitted and titulo:
-        compromissos.append({
+        adicionar_compromisso(user_unit, semana, {
             'titulo': titulo,
             'responsavel': responsavel,
             'prazo': prazo,
             'status': 'pendente',
             'criado_em': datetime.now().isoformat(),
-            'semana': semana,
         })
-        salvar_compromissos(user_unit, compromissos)
         st.rerun()
 
 # Listar compromissos
@@ -122,7 +97,6 @@ if not compromissos:
 </div>
 """, unsafe_allow_html=True)
 else:
-    alterado = False
     for i, c in enumerate(compromissos):
         cor = cores_status.get(c.get('status', 'pendente'), '#9e9e9e')
         st.markdown(f"""
@@ -148,10 +122,7 @@ else:
         status_key = status_novo.lower().replace(' ', '_').replace('í', 'i')
         if status_key != c.get('status', 'pendente'):
             c['status'] = status_key
-            alterado = True
-
-    if alterado:
-        salvar_compromissos(user_unit, compromissos)
+            atualizar_acao(user_unit, c['semana'], c['acao'], origem='compromisso', status=status_key)
 
     # Resumo
     total = len(compromissos)
@@ -0,0 +1,279 @@
+"""
+Planos de acao semanais e compromissos de reuniao num banco unico indexado.
+
+Antes cada plano era um JSON por unidade por semana, e o Retroalimentador
+abria os arquivos um a um (com um nome diferente do que a pagina gravava,
+plano_acao_{un}_sem{n}.json x plano_acao_sem{n}_{un}.json, entao nunca via
+os planos). Aqui 07_plano_acao, 22_compromissos, 12_espelho_coordenador e o
+Retroalimentador usam planos_acao.sqlite3 (sqlite3 da stdlib):
+
+  planos  (unidade, semana)                 cabecalho: gerado_em, fonte, ...
+  acoes   (unidade, semana, origem, acao)   uma linha por acao
+          origem 'plano'       — acoes do plano semanal (acao = posicao 1..N)
+          origem 'compromisso' — compromissos de reuniao do diretor
+
+Taxas de execucao de N semanas x todas as unidades sao um unico GROUP BY
+(taxas_execucao); o indice (origem, semana, unidade) cobre as janelas que
+as regras de escalacao olham para tras.
+
+Na criacao do banco os JSONs antigos (plano_acao_*.json,
+compromissos_diretor_*.json) sao importados.
+
+Funcoes publicas:
+  - carregar_plano(unidade, semana) / salvar_plano(unidade, semana, plano)
+  - carregar_compromissos(unidade) / adicionar_compromisso(unidade, semana, compromisso)
+  - atualizar_acao(unidade, semana, acao, origem='plano', **campos)
+  - taxas_execucao(semana_inicio, semana_fim, unidades=None, origem='plano')
+  - execucao_acumulada(unidade, ate_semana, origem='plano')
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+from utils import WRITABLE_DIR
+
+logger = logging.getLogger("planos_acao")
+
+_PLANOS_PATH = WRITABLE_DIR / "planos_acao.sqlite3"
+
+STATUS_CONCLUIDO = ('resolvida', 'concluido')
+"""Status que contam como acao executada (plano / compromisso)."""
+
+CAMPOS_ACAO = ('titulo', 'contexto', 'como', 'responsavel', 'prazo', 'status', 'nota',
+               'tipo_missao', 'criado_em')
+"""Campos com coluna propria; os demais vao para 'extra' (JSON)."""
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS planos (
+    unidade       TEXT,
+    semana        INTEGER,
+    gerado_em     TEXT,
+    atualizado_em TEXT,
+    fonte         TEXT,
+    PRIMARY KEY (unidade, semana)
+);
+CREATE TABLE IF NOT EXISTS acoes (
+    unidade       TEXT,
+    semana        INTEGER,
+    origem        TEXT,
+    acao          INTEGER,
+    titulo        TEXT,
+    contexto      TEXT,
+    como          TEXT,
+    responsavel   TEXT,
+    prazo         TEXT,
+    status        TEXT,
+    nota          TEXT,
+    tipo_missao   TEXT,
+    criado_em     TEXT,
+    atualizado_em TEXT,
+    extra         TEXT,
+    PRIMARY KEY (unidade, semana, origem, acao)
+);
+CREATE INDEX IF NOT EXISTS idx_acoes_janela ON acoes (origem, semana, unidade);
+"""
+
+_RE_PLANO = (re.compile(r'plano_acao_sem(\d+)_(\w+)\.json$'), re.compile(r'plano_acao_(\w+)_sem(\d+)\.json$'))
+
+
+# ========== CONEXAO ==========
+
+_LOCK = threading.Lock()
+_PRONTOS = set()  # caminhos com esquema criado neste processo
+
+
+def _conectar():
+    """Conexao ao banco; cria o esquema (e importa os JSONs antigos) na 1a vez."""
+    path = _PLANOS_PATH
+    novo = not path.exists()
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    if novo or path not in _PRONTOS:
+        with _LOCK:
+            conn.executescript(_ESQUEMA)
+            if novo:
+                _importar_json(conn, path.parent)
+            _PRONTOS.add(path)
+    return conn
+
+
+def _linha_acao(unidade, semana, origem, acao, dados, agora):
+    extra = {k: v for k, v in dados.items()
+             if k not in CAMPOS_ACAO and k not in ('semana', 'acao', 'atualizado_em')}
+    return (unidade, semana, origem, acao, *(dados.get(c) for c in CAMPOS_ACAO),
+            dados.get('atualizado_em', agora), json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+_INSERIR_ACAO = (f"INSERT OR REPLACE INTO acoes (unidade, semana, origem, acao, {', '.join(CAMPOS_ACAO)}, "
+                 f"atualizado_em, extra) VALUES ({', '.join('?' * (len(CAMPOS_ACAO) + 6))})")
+
+
+def _importar_json(conn, pasta):
+    """Importa planos e compromissos gravados em JSON pelas versoes anteriores."""
+    agora = datetime.now().isoformat()
+    planos, acoes = {}, []
+    for path in sorted(pasta.glob('plano_acao_*.json')):
+        m = _RE_PLANO[0].search(path.name)
+        chave = (m.group(2), int(m.group(1))) if m else None
+        if chave is None and (m := _RE_PLANO[1].search(path.name)):
+            chave = (m.group(1), int(m.group(2)))
+        if chave is None or chave in planos:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                plano = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Plano {path.name} ilegivel, nao importado: {e}")
+            continue
+        planos[chave] = (*chave, plano.get('gerado_em'), plano.get('atualizado_em'), plano.get('fonte'))
+        acoes += [_linha_acao(*chave, 'plano', i, a, agora) for i, a in enumerate(plano.get('acoes', []), 1)]
+
+    for path in sorted(pasta.glob('compromissos_diretor_*.json')):
+        unidade = path.stem[len('compromissos_diretor_'):]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                compromissos = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Compromissos {path.name} ilegiveis, nao importados: {e}")
+            continue
+        por_semana = {}
+        for c in compromissos:
+            semana = int(c.get('semana') or 0)
+            por_semana[semana] = por_semana.get(semana, 0) + 1
+            acoes.append(_linha_acao(unidade, semana, 'compromisso', por_semana[semana], c, agora))
+
+    if planos or acoes:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO planos VALUES (?, ?, ?, ?, ?)", planos.values())
+            conn.executemany(_INSERIR_ACAO, acoes)
+        logger.info(f"Planos de acao: {len(planos)} planos e {len(acoes)} acoes importados")
+
+
+def _acao(row):
+    """Linha de acoes -> dict no formato dos JSONs antigos (com semana e acao)."""
+    dados = dict(row)
+    extra = dados.pop('extra')
+    for campo in ('unidade', 'origem'):
+        dados.pop(campo)
+    dados = {k: v for k, v in dados.items() if v is not None}
+    if extra:
+        dados.update(json.loads(extra))
+    return dados
+
+
+# ========== PLANOS ==========
+
+def carregar_plano(unidade, semana):
+    """Plano da unidade na semana (None se nao houver).
+
+    Returns:
+        dict {semana, unidade, gerado_em, fonte, acoes: [...]} como o JSON antigo
+    """
+    with closing(_conectar()) as conn:
+        cab = conn.execute("SELECT * FROM planos WHERE unidade = ? AND semana = ?",
+                           (unidade, semana)).fetchone()
+        if cab is None:
+            return None
+        linhas = conn.execute(
+            "SELECT * FROM acoes WHERE unidade = ? AND semana = ? AND origem = 'plano' ORDER BY acao",
+            (unidade, semana)).fetchall()
+    plano = {k: v for k, v in dict(cab).items() if v is not None}
+    plano['acoes'] = [_acao(r) for r in linhas]
+    return plano
+
+
+def salvar_plano(unidade, semana, plano):
+    """Grava o plano inteiro (substitui as acoes da semana)."""
+    agora = datetime.now().isoformat()
+    acoes = [_linha_acao(unidade, semana, 'plano', i, a, agora)
+             for i, a in enumerate(plano.get('acoes', []), 1)]
+    with closing(_conectar()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO planos VALUES (?, ?, ?, ?, ?)",
+                     (unidade, semana, plano.get('gerado_em', agora),
+                      plano.get('atualizado_em'), plano.get('fonte')))
+        conn.execute("DELETE FROM acoes WHERE unidade = ? AND semana = ? AND origem = 'plano'",
+                     (unidade, semana))
+        conn.executemany(_INSERIR_ACAO, acoes)
+
+
+def atualizar_acao(unidade, semana, acao, origem='plano', **campos):
+    """Altera campos (ex.: status, nota) de uma acao pela chave. Returns: True se existia."""
+    colunas = {c: v for c, v in campos.items() if c in CAMPOS_ACAO}
+    if not colunas:
+        return False
+    colunas['atualizado_em'] = datetime.now().isoformat()
+    with closing(_conectar()) as conn, conn:
+        cursor = conn.execute(
+            f"UPDATE acoes SET {', '.join(f'{c} = ?' for c in colunas)} "
+            "WHERE unidade = ? AND semana = ? AND origem = ? AND acao = ?",
+            (*colunas.values(), unidade, semana, origem, acao))
+    return cursor.rowcount > 0
+
+
+# ========== COMPROMISSOS ==========
+
+def carregar_compromissos(unidade):
+    """Compromissos de reuniao da unidade, em ordem de semana e registro."""
+    with closing(_conectar()) as conn:
+        linhas = conn.execute(
+            "SELECT * FROM acoes WHERE unidade = ? AND origem = 'compromisso' ORDER BY semana, acao",
+            (unidade,)).fetchall()
+    return [_acao(r) for r in linhas]
+
+
+def adicionar_compromisso(unidade, semana, compromisso):
+    """Registra um compromisso na semana. Returns: numero da acao criada."""
+    agora = datetime.now().isoformat()
+    with closing(_conectar()) as conn, conn:
+        proxima = conn.execute(
+            "SELECT COALESCE(MAX(acao), 0) + 1 FROM acoes "
+            "WHERE unidade = ? AND semana = ? AND origem = 'compromisso'",
+            (unidade, semana)).fetchone()[0]
+        conn.execute(_INSERIR_ACAO, _linha_acao(
+            unidade, semana, 'compromisso', proxima, {'criado_em': agora, **compromisso}, agora))
+    return proxima
+
+
+# ========== AGREGADOS ==========
+
+def taxas_execucao(semana_inicio, semana_fim, unidades=None, origem='plano'):
+    """Execucao por unidade x semana em uma consulta agregada.
+
+    Returns:
+        DataFrame unidade, semana, total, concluidas, taxa (0-100); so as
+        combinacoes com acoes registradas
+    """
+    sql = (f"SELECT unidade, semana, COUNT(*) AS total, "
+           f"SUM(status IN ({', '.join('?' * len(STATUS_CONCLUIDO))})) AS concluidas "
+           "FROM acoes WHERE origem = ? AND semana BETWEEN ? AND ?")
+    params = [*STATUS_CONCLUIDO, origem, semana_inicio, semana_fim]
+    if unidades is not None:
+        sql += f" AND unidade IN ({', '.join('?' * len(unidades))})"
+        params += list(unidades)
+    sql += " GROUP BY unidade, semana ORDER BY unidade, semana"
+    with closing(_conectar()) as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+    df['taxa'] = (df['concluidas'] / df['total'].clip(lower=1) * 100).round(1)
+    return df
+
+
+def execucao_acumulada(unidade, ate_semana, origem='plano'):
+    """Acoes e concluidas da unidade da semana 1 ate ate_semana.
+
+    Returns:
+        dict {total, concluidas, taxa}
+    """
+    with closing(_conectar()) as conn:
+        total, concluidas = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(status IN ({', '.join('?' * len(STATUS_CONCLUIDO))})), 0) "
+            "FROM acoes WHERE origem = ? AND unidade = ? AND semana <= ?",
+            (*STATUS_CONCLUIDO, origem, unidade, ate_semana)).fetchone()
+    return {'total': total, 'concluidas': concluidas,
+            'taxa': round(concluidas / max(total, 1) * 100, 1)}
@@ -0,0 +1,449 @@
+"""
+Previsao em lote das series semanais por entidade (Preditor).
+
+executar_preditor ajustava, em Python puro, uma reta por unidade so para
+conf_{BV,CD,JG,CDR} (historico_semanas.json): 4 projecoes para a rede toda.
+Aqui cada metrica vira uma matriz entidades x semanas (NaN = sem dado) e
+todas as retas sao ajustadas de uma vez por minimos quadrados em forma
+fechada, com somas mascaradas por linha.
+
+Intervalos de previsao por bootstrap de residuos, tambem vetorizado: os
+residuos de cada serie sao reamostrados B vezes, as B retas sao
+reajustadas numa unica operacao de array (com as mesmas semanas so Sy e Sxy
+mudam) e os quantis de reta + residuo novo dao o intervalo. As series sao
+processadas em blocos para limitar a memoria (B x bloco x semanas celulas).
+
+Metricas (METRICAS):
+  professor_conformidade  aulas registradas / esperadas na semana (%)
+  turma_frequencia        (presencas + justificadas) / chamadas da turma (%)
+  aluno_frequencia        idem por aluno (%)
+  aluno_ocorrencias       ocorrencias do aluno na semana (contagem)
+
+Alerta precoce quando a serie deve cruzar o limiar da metrica ate a 2a
+semana projetada: 'critico' (urgencia alta) se ate o extremo favoravel do
+intervalo cruza, 'risco' (media) se so a previsao pontual cruza.
+
+Funcoes publicas:
+  - ajustar_lote(Y, semanas)                  — (coef, intercepto, n) de cada linha
+  - prever_lote(Y, semanas, alvos, ...)       — previsao + intervalo bootstrap
+  - series_professor_conformidade(df_aulas, df_esperadas, ate_semana)
+  - series_turma_frequencia(df_chamadas, ate_semana)
+  - series_aluno_frequencia(df_chamadas, ate_semana)
+  - series_aluno_ocorrencias(df_ocorr, ate_semana)
+  - projetar(series, metrica, semana)         — DataFrame de projecoes + alertas
+  - projetar_entidades(df_aulas, df_esperadas, df_chamadas, df_ocorr, semana)
+  - salvar_projecoes(df, path) / ler_projecoes(path, metrica, unidade, somente_alertas)
+"""
+
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import parquet_disponivel
+
+logger = logging.getLogger("preditor_lote")
+
+INICIO_ANO_LETIVO = datetime(2026, 1, 26)
+
+MIN_PONTOS = 3
+"""Semanas com dado necessarias para ajustar uma serie."""
+
+N_BOOTSTRAP = 200
+NIVEL_INTERVALO = 0.8
+"""Intervalo de previsao central (80%: quantis 10% e 90%)."""
+
+JANELA_SEMANAS = 8
+"""Semanas mais recentes usadas no ajuste: o alerta segue a tendencia atual,
+e series sem dado recente (ex.: aluno transferido) ficam sem projecao."""
+
+CELULAS_BLOCO = 2_000_000
+"""Celulas (B x series x semanas) por bloco do bootstrap (~16 MB em float64)."""
+
+METRICAS = {
+    'professor_conformidade': {
+        'limiar': 50.0, 'maior_melhor': True, 'limites': (0.0, 100.0), 'estavel': 0.5,
+        'rotulo': 'Conformidade do professor',
+    },
+    'turma_frequencia': {
+        'limiar': 75.0, 'maior_melhor': True, 'limites': (0.0, 100.0), 'estavel': 0.5,
+        'rotulo': 'Frequencia da turma',
+    },
+    'aluno_frequencia': {
+        'limiar': 75.0, 'maior_melhor': True, 'limites': (0.0, 100.0), 'estavel': 0.5,
+        'rotulo': 'Frequencia do aluno',
+    },
+    'aluno_ocorrencias': {
+        'limiar': 1.0, 'maior_melhor': False, 'limites': (0.0, None), 'estavel': 0.1,
+        'rotulo': 'Ocorrencias do aluno por semana',
+    },
+}
+"""limiar: conformidade critica (50%), frequencia minima da LDB (75%), 1 ocorrencia/semana."""
+
+COLUNAS_PROJECAO = [
+    'metrica', 'unidade', 'serie', 'entidade', 'rotulo', 'atual', 'n_pontos', 'coef_angular',
+    'proj_1', 'proj_1_inf', 'proj_1_sup', 'proj_2', 'proj_2_inf', 'proj_2_sup',
+    'tendencia', 'alerta', 'urgencia',
+]
+
+
+# ========== AJUSTE EM LOTE ==========
+
+def _somas(M, Y, x):
+    Mf = M.astype(np.float64)
+    Y0 = np.where(M, Y, 0.0)
+    return Mf.sum(axis=1), Mf @ x, Mf @ (x * x), Y0.sum(axis=1), Y0 @ x
+
+
+def ajustar_lote(Y, semanas):
+    """Reta de minimos quadrados de cada linha de Y (NaN = semana sem dado).
+
+    Args:
+        Y: array (series, semanas)
+        semanas: array (semanas,) com o x de cada coluna
+
+    Returns:
+        (coef, intercepto, n) — arrays (series,); NaN onde ha menos de
+        MIN_PONTOS pontos ou todos na mesma semana
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    x = np.asarray(semanas, dtype=np.float64)
+    M = ~np.isnan(Y)
+    n, sx, sxx, sy, sxy = _somas(M, Y, x)
+    den = n * sxx - sx ** 2
+    ok = (n >= MIN_PONTOS) & (den > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.where(ok, (n * sxy - sx * sy) / den, np.nan)
+        intercepto = np.where(ok, (sy - coef * sx) / n, np.nan)
+    return coef, intercepto, n.astype(np.int64)
+
+
+def prever_lote(Y, semanas, alvos, n_boot=N_BOOTSTRAP, nivel=NIVEL_INTERVALO,
+                limites=(None, None), seed=0):
+    """Previsao das series em `alvos` com intervalo por bootstrap de residuos.
+
+    Args:
+        Y, semanas: ver ajustar_lote
+        alvos: semanas a projetar (ex.: [semana + 1, semana + 2])
+        n_boot: reamostragens
+        nivel: cobertura do intervalo central
+        limites: (min, max) para recortar previsoes (None = sem limite)
+        seed: semente do gerador (resultado reprodutivel)
+
+    Returns:
+        dict com coef, intercepto, n (series,) e previsao, inferior,
+        superior (series, alvos); linhas sem ajuste ficam NaN
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    x = np.asarray(semanas, dtype=np.float64)
+    xh = np.asarray(alvos, dtype=np.float64)
+    coef, intercepto, n = ajustar_lote(Y, x)
+    n_series, n_semanas = Y.shape
+    previsao = coef[:, None] * xh + intercepto[:, None]
+    inferior = np.full_like(previsao, np.nan)
+    superior = np.full_like(previsao, np.nan)
+
+    linhas = np.flatnonzero(~np.isnan(coef))
+    if len(linhas):
+        M = ~np.isnan(Y[linhas])
+        nf, sx, sxx, _, _ = _somas(M, Y[linhas], x)
+        den = nf * sxx - sx ** 2
+        ajuste = coef[linhas, None] * x + intercepto[linhas, None]
+        # Residuos inflados pelos graus de liberdade; validos primeiro em cada linha
+        fator = np.sqrt(nf / np.maximum(nf - 2, 1))
+        resid = np.where(M, Y[linhas] - ajuste, 0.0) * fator[:, None]
+        resid = np.take_along_axis(resid, np.argsort(~M, axis=1, kind='stable'), axis=1)
+        Mf = M.astype(np.float64)
+
+        rng = np.random.default_rng(seed)
+        q = [(1 - nivel) / 2, 1 - (1 - nivel) / 2]
+        bloco = max(1, CELULAS_BLOCO // (n_boot * max(n_semanas, len(xh))))
+        for ini in range(0, len(linhas), bloco):
+            sl = slice(ini, ini + bloco)
+            k = len(resid[sl])
+            pool = resid[sl][None]
+            tam = nf[sl][None, :, None]
+            idx = (rng.random((n_boot, k, n_semanas)) * tam).astype(np.intp)
+            Yb = (ajuste[sl] + np.take_along_axis(pool, idx, axis=2)) * Mf[sl]
+            sy_b = Yb.sum(axis=2)
+            sxy_b = Yb @ x
+            a_b = (nf[sl] * sxy_b - sx[sl] * sy_b) / den[sl]
+            b_b = (sy_b - a_b * sx[sl]) / nf[sl]
+            idx_novo = (rng.random((n_boot, k, len(xh))) * tam).astype(np.intp)
+            P = a_b[..., None] * xh + b_b[..., None] + np.take_along_axis(pool, idx_novo, axis=2)
+            inf_b, sup_b = np.quantile(P, q, axis=0)
+            inferior[linhas[sl]] = inf_b
+            superior[linhas[sl]] = sup_b
+
+    lo, hi = limites
+    if lo is not None or hi is not None:
+        previsao, inferior, superior = (np.clip(v, lo, hi) for v in (previsao, inferior, superior))
+    return {'coef': coef, 'intercepto': intercepto, 'n': n,
+            'previsao': previsao, 'inferior': inferior, 'superior': superior}
+
+
+# ========== SERIES POR ENTIDADE ==========
+
+def _semana_letiva(datas):
+    datas = pd.to_datetime(datas, errors='coerce')
+    return (datas - INICIO_ANO_LETIVO).dt.days // 7 + 1
+
+
+def _matriz(longo, ate_semana, preencher=np.nan, desde_primeira=True):
+    """Formato longo (unidade, serie, entidade, rotulo, semana_letiva, valor) -> (Y, semanas, info).
+
+    Semanas sem dado em nenhuma entidade ficam NaN (recesso). Com preencher,
+    as demais semanas sem linha recebem esse valor — a partir da primeira
+    semana da entidade se desde_primeira, senao desde a semana 1.
+    """
+    semanas = np.arange(1, ate_semana + 1)
+    colunas_info = ['unidade', 'serie', 'entidade', 'rotulo']
+    longo = longo[longo['semana_letiva'].between(1, ate_semana)]
+    if longo.empty:
+        return np.empty((0, ate_semana)), semanas, pd.DataFrame(columns=colunas_info)
+
+    chave = pd.MultiIndex.from_arrays([longo['unidade'].astype(str), longo['entidade'].astype(str)])
+    codigos, _ = pd.factorize(chave)
+    col = longo['semana_letiva'].to_numpy(dtype=np.int64) - 1
+    Y = np.full((codigos.max() + 1, ate_semana), np.nan)
+    if not np.isnan(preencher):
+        Y[:] = preencher
+        if desde_primeira:
+            primeira = np.full(len(Y), ate_semana)
+            np.minimum.at(primeira, codigos, col)
+            Y[np.arange(ate_semana)[None, :] < primeira[:, None]] = np.nan
+        sem_dado = np.ones(ate_semana, dtype=bool)
+        sem_dado[col] = False
+        Y[:, sem_dado] = np.nan
+    Y[codigos, col] = longo['valor'].to_numpy(dtype=np.float64)
+
+    info = (longo[colunas_info].astype(object)
+            .groupby(codigos, sort=True).first().reset_index(drop=True))
+    info['entidade'] = info['entidade'].astype(str)
+    return Y, semanas, info
+
+
+def series_professor_conformidade(df_aulas, df_esperadas, ate_semana):
+    """Conformidade semanal por professor: registradas / esperadas (%).
+
+    Esperadas = soma de aulas_esperadas_semana (resumo_Aulas_Esperadas) das
+    combinacoes unidade x serie x disciplina que o professor registra, como
+    em score_Professor.
+    """
+    prof = 'professor_normalizado' if 'professor_normalizado' in df_aulas.columns else 'professor'
+    if df_aulas.empty or df_esperadas.empty:
+        return _matriz(pd.DataFrame(columns=['semana_letiva']), ate_semana)
+    chaves = ['unidade', 'serie', 'disciplina']
+    colunas = list(dict.fromkeys([prof, 'professor', 'semana_letiva'] + chaves))
+    aulas = df_aulas[colunas].astype({c: object for c in colunas if c != 'semana_letiva'})
+    esperadas = (df_esperadas.astype({c: object for c in chaves})
+                 .groupby(chaves)['aulas_esperadas_semana'].sum())
+    combos = aulas[[prof] + chaves].drop_duplicates()
+    combos = combos.join(esperadas, on=chaves)
+    por_prof = combos.groupby([prof, 'unidade'])['aulas_esperadas_semana'].sum()
+    por_prof = por_prof[por_prof > 0]
+
+    registradas = (aulas.groupby([prof, 'unidade'])
+                   .agg(serie=('serie', 'first'), rotulo=('professor', 'first'))
+                   .join(aulas.groupby([prof, 'unidade', 'semana_letiva']).size()
+                         .rename('n').reset_index(level='semana_letiva'))
+                   .join(por_prof, how='inner')
+                   .reset_index())
+    longo = pd.DataFrame({
+        'unidade': registradas['unidade'],
+        'serie': registradas['serie'],
+        'entidade': registradas[prof],
+        'rotulo': registradas['rotulo'],
+        'semana_letiva': registradas['semana_letiva'],
+        'valor': (registradas['n'] / registradas['aulas_esperadas_semana'] * 100).clip(0, 100),
+    })
+    return _matriz(longo, ate_semana, preencher=0.0)
+
+
+def _frequencia_semanal(df_chamadas, chaves):
+    presenca = df_chamadas['presenca'].astype(object)
+    feita = presenca.isin(['P', 'F', 'J'])
+    base = df_chamadas.loc[feita, chaves].astype(object)
+    base['semana_letiva'] = _semana_letiva(df_chamadas.loc[feita, 'data_aula'])
+    base['presente'] = presenca[feita].isin(['P', 'J']).astype(np.float64)
+    return (base.groupby(chaves + ['semana_letiva'], dropna=False)['presente']
+            .agg(['sum', 'count']).reset_index())
+
+
+def series_turma_frequencia(df_chamadas, ate_semana):
+    """Frequencia semanal por turma: (P + J) / chamadas (%)."""
+    if df_chamadas.empty:
+        return _matriz(pd.DataFrame(columns=['semana_letiva']), ate_semana)
+    agg = _frequencia_semanal(df_chamadas, ['unidade', 'serie', 'turma'])
+    longo = agg.rename(columns={'turma': 'entidade'}).assign(
+        rotulo=agg['turma'], valor=agg['sum'] / agg['count'] * 100)
+    return _matriz(longo, ate_semana)
+
+
+def series_aluno_frequencia(df_chamadas, ate_semana):
+    """Frequencia semanal por aluno: (P + J) / chamadas (%)."""
+    if df_chamadas.empty:
+        return _matriz(pd.DataFrame(columns=['semana_letiva']), ate_semana)
+    nome = ['aluno_nome'] if 'aluno_nome' in df_chamadas.columns else []
+    agg = _frequencia_semanal(df_chamadas, ['unidade', 'serie', 'aluno_id'] + nome)
+    longo = agg.rename(columns={'aluno_id': 'entidade'}).assign(
+        rotulo=agg[nome[0]] if nome else agg['aluno_id'], valor=agg['sum'] / agg['count'] * 100)
+    return _matriz(longo, ate_semana)
+
+
+def series_aluno_ocorrencias(df_ocorr, ate_semana):
+    """Ocorrencias por aluno e semana (so alunos com alguma ocorrencia)."""
+    if df_ocorr.empty:
+        return _matriz(pd.DataFrame(columns=['semana_letiva']), ate_semana)
+    base = df_ocorr[['unidade', 'serie', 'aluno_id', 'aluno_nome']].astype(object)
+    base['semana_letiva'] = _semana_letiva(df_ocorr['data'])
+    agg = (base.groupby(['unidade', 'aluno_id', 'semana_letiva'])
+           .agg(serie=('serie', 'first'), rotulo=('aluno_nome', 'first'), valor=('serie', 'size'))
+           .reset_index())
+    longo = agg.rename(columns={'aluno_id': 'entidade'})
+    return _matriz(longo, ate_semana, preencher=0.0, desde_primeira=False)
+
+
+# ========== PROJECOES E ALERTAS ==========
+
+def projetar(series, metrica, semana, n_boot=N_BOOTSTRAP, seed=0):
+    """Projecoes das series para semana+1 e semana+2, com alertas.
+
+    Ajusta so as ultimas JANELA_SEMANAS semanas de cada serie.
+
+    Args:
+        series: (Y, semanas, info) de uma funcao series_*
+        metrica: chave de METRICAS
+        semana: semana letiva atual
+
+    Returns:
+        DataFrame (COLUNAS_PROJECAO), uma linha por serie ajustada
+    """
+    Y, semanas, info = series
+    cfg = METRICAS[metrica]
+    if len(Y) == 0:
+        return pd.DataFrame(columns=COLUNAS_PROJECAO)
+    Y, semanas = Y[:, -JANELA_SEMANAS:], semanas[-JANELA_SEMANAS:]
+    r = prever_lote(Y, semanas, [semana + 1, semana + 2], n_boot=n_boot,
+                    limites=cfg['limites'], seed=seed)
+    ok = ~np.isnan(r['coef'])
+    ultima = np.where(~np.isnan(Y), np.arange(Y.shape[1]), -1).max(axis=1)
+    atual = Y[np.arange(len(Y)), np.maximum(ultima, 0)]
+
+    df = info.assign(metrica=metrica, atual=atual, n_pontos=r['n'], coef_angular=r['coef'])
+    for h in (0, 1):
+        df[f'proj_{h + 1}'] = r['previsao'][:, h]
+        df[f'proj_{h + 1}_inf'] = r['inferior'][:, h]
+        df[f'proj_{h + 1}_sup'] = r['superior'][:, h]
+    df = df[ok].reset_index(drop=True)
+
+    coef = df['coef_angular']
+    df['tendencia'] = np.select([coef > cfg['estavel'], coef < -cfg['estavel']],
+                                ['subindo', 'caindo'], 'estavel')
+    limiar = cfg['limiar']
+    if cfg['maior_melhor']:
+        dentro = df['atual'] >= limiar
+        critico = dentro & (df['proj_2_sup'] < limiar)
+        risco = dentro & (df['proj_2'] < limiar)
+    else:
+        dentro = df['atual'] < limiar
+        critico = dentro & (df['proj_2_inf'] >= limiar)
+        risco = dentro & (df['proj_2'] >= limiar)
+    df['alerta'] = np.select([critico, risco], ['critico', 'risco'], '')
+    df['urgencia'] = np.select([critico, risco], ['alta', 'media'], '')
+
+    decimais = {c: 2 for c in COLUNAS_PROJECAO if c.startswith('proj_') or c in ('atual', 'coef_angular')}
+    return df[COLUNAS_PROJECAO].round(decimais)
+
+
+def projetar_entidades(df_aulas, df_esperadas, df_chamadas, df_ocorr, semana, n_boot=N_BOOTSTRAP):
+    """Projecoes de todas as metricas, usando as semanas completas (< semana).
+
+    Returns:
+        DataFrame (COLUNAS_PROJECAO) com as quatro metricas
+    """
+    ate = max(semana - 1, 1)
+    series = {
+        'professor_conformidade': series_professor_conformidade(df_aulas, df_esperadas, ate),
+        'turma_frequencia': series_turma_frequencia(df_chamadas, ate),
+        'aluno_frequencia': series_aluno_frequencia(df_chamadas, ate),
+        'aluno_ocorrencias': series_aluno_ocorrencias(df_ocorr, ate),
+    }
+    partes = [projetar(s, metrica, semana, n_boot=n_boot) for metrica, s in series.items()]
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_PROJECAO)
+    return pd.concat(partes, ignore_index=True)
+
+
+# ========== PERSISTENCIA E CONSULTA ==========
+
+_CACHE = {}
+_LOCK = threading.Lock()
+
+
+def _compactar(df):
+    df = df.copy()
+    for col in ('metrica', 'unidade', 'serie', 'tendencia', 'alerta', 'urgencia'):
+        df[col] = df[col].astype('category')
+    for col in df.columns:
+        if col.startswith('proj_') or col in ('atual', 'coef_angular'):
+            df[col] = df[col].astype(np.float32)
+    df['n_pontos'] = df['n_pontos'].astype(np.int16)
+    df['entidade'] = df['entidade'].astype(str)
+    return df
+
+
+def salvar_projecoes(df, path):
+    """Grava as projecoes (Parquet tipado; CSV se o pyarrow faltar).
+
+    Returns:
+        Path gravado
+    """
+    path = Path(path)
+    if not parquet_disponivel():
+        path = path.with_suffix('.csv')
+    tmp = path.with_name(path.name + '.tmp')
+    if path.suffix == '.parquet':
+        _compactar(df).to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def ler_projecoes(path, metrica=None, unidade=None, somente_alertas=False):
+    """Projecoes gravadas por salvar_projecoes, filtradas (vazio se nao houver).
+
+    O arquivo fica em memoria ate mudar (mtime/tamanho).
+    """
+    path = Path(path)
+    if not path.exists() and path.with_suffix('.csv').exists():
+        path = path.with_suffix('.csv')
+    try:
+        st_ = path.stat()
+    except OSError:
+        return pd.DataFrame(columns=COLUNAS_PROJECAO)
+    assinatura = (st_.st_mtime_ns, st_.st_size)
+    with _LOCK:
+        guardado = _CACHE.get(path)
+        if guardado is None or guardado[0] != assinatura:
+            try:
+                df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+            except Exception as e:
+                logger.warning(f"Projecoes ilegiveis em {path}: {e}")
+                return pd.DataFrame(columns=COLUNAS_PROJECAO)
+            guardado = (assinatura, df)
+            _CACHE[path] = guardado
+    df = guardado[1]
+    mask = pd.Series(True, index=df.index)
+    if metrica is not None:
+        mask &= df['metrica'].astype(object) == metrica
+    if unidade is not None:
+        mask &= df['unidade'].astype(object) == unidade
+    if somente_alertas:
+        mask &= df['alerta'].fillna('').astype(object) != ''
+    return df[mask].reset_index(drop=True)
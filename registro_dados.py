@@ -0,0 +1,180 @@
+"""
+Registro compartilhado (processo inteiro) dos datasets pesados.
+
+st.cache_data serializa e devolve uma copia nova do DataFrame a cada
+chamada: com ~300 usuarios, cada rerun de cada pagina copiava fato_Aulas,
+fato_Frequencia_Aluno e fato_Ocorrencias de novo. Os loaders decorados com
+@compartilhado carregam o dataset UMA vez por versao dos dados (mesma
+impressao digital de cache_por_versao) e entregam a todas as sessoes uma
+visao rasa (sem copia) do mesmo frame.
+
+A visao rasa depende do Copy-on-Write do pandas 3 (requirements.txt exige
+pandas>=3): escrita in-place na visao (df.loc[...] = x, fillna(inplace=True))
+gera uma copia local da pagina e nunca altera o frame das outras sessoes.
+Criar ou substituir colunas (df['nova'] = ...) so afeta a visao da pagina.
+Como defesa extra, os arrays numpy do frame compartilhado ficam somente
+leitura (_congelar).
+
+Como st.cache_resource, vive no processo, mas nao depende do Streamlit
+(o scheduler e a Vigilia usam os mesmos loaders).
+
+Funcoes publicas:
+  - compartilhado(nome, arquivos)  — decorator de loader (argumentos opcionais)
+  - obter_dataset(nome)            — visao somente leitura de um dataset registrado
+  - relatorio_memoria()            — DataFrame com o que esta residente
+  - descartar(nome=None)
+"""
+
+import functools
+import inspect
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from armazenamento import impressao_digital
+
+_LOADERS = {}
+_ENTRADAS = {}
+_LOCKS = {}
+_LOCK_REGISTRO = threading.Lock()
+
+
+def _congelar(df):
+    """Marca como somente leitura os arrays numpy que sustentam o frame.
+
+    Usa o BlockManager (interno do pandas); se a estrutura mudar, o frame
+    fica sem a marcacao e a protecao e so a do Copy-on-Write.
+    """
+    for arr in getattr(getattr(df, '_mgr', None), 'arrays', ()):
+        base = getattr(arr, '_ndarray', None)
+        if base is None:
+            base = getattr(arr, '_codes', arr)
+        try:
+            base.flags.writeable = False
+        except (AttributeError, ValueError):
+            # Arrays Arrow/extension ja sao imutaveis
+            pass
+    return df
+
+
+def _lock(nome):
+    with _LOCK_REGISTRO:
+        return _LOCKS.setdefault(nome, threading.Lock())
+
+
+def _chave(nome, args):
+    """Chave do registro: nome, ou nome[arg|...] para loaders com argumentos."""
+    if all(arg is None for arg in args):
+        return nome
+    partes = []
+    for arg in args:
+        if arg is None:
+            arg = '-'
+        elif isinstance(arg, (list, tuple, set, frozenset)):
+            arg = ','.join(sorted(map(str, arg)))
+        partes.append(str(arg))
+    return f"{nome}[{'|'.join(partes)}]"
+
+
+def _obter(nome, func, arquivos, args=()):
+    chave = _chave(nome, args)
+    impressao = impressao_digital(arquivos)
+    entrada = _ENTRADAS.get(chave)
+    if entrada is None or entrada['impressao'] != impressao:
+        # Um carregamento por dataset; as outras sessoes esperam e reaproveitam
+        with _lock(chave):
+            entrada = _ENTRADAS.get(chave)
+            if entrada is None or entrada['impressao'] != impressao:
+                df = _congelar(func(*args))
+                entrada = {
+                    'df': df,
+                    'impressao': impressao,
+                    'carregado_em': datetime.now(),
+                    'acessos': 0,
+                }
+                _ENTRADAS[chave] = entrada
+                _descartar_obsoletas(nome, impressao)
+    entrada['acessos'] += 1
+    return entrada['df'].copy(deep=False)
+
+
+def _descartar_obsoletas(nome, impressao):
+    """Solta as outras entradas do dataset carregadas de uma versao anterior."""
+    for chave in [c for c in list(_ENTRADAS) if c.startswith(nome + '[') or c == nome]:
+        entrada = _ENTRADAS.get(chave)
+        if entrada is not None and entrada['impressao'] != impressao:
+            _ENTRADAS.pop(chave, None)
+
+
+def compartilhado(nome, arquivos):
+    """Decorator: o loader passa a devolver a visao compartilhada do registro.
+
+    Args:
+        nome: chave do dataset no registro (ex.: 'aulas')
+        arquivos: lista de Paths de origem (define a versao do dataset)
+
+    O loader decorado mantem .clear() para compatibilidade com st.cache_data.
+    Argumentos opcionais do loader (ex.: unidades=['BV']) viram entradas
+    proprias do registro; None equivale a nao passar o argumento.
+    """
+    def decorador(func):
+        assinatura = inspect.signature(func)
+
+        @functools.wraps(func)
+        def loader(*args, **kwargs):
+            ligados = assinatura.bind(*args, **kwargs)
+            ligados.apply_defaults()
+            return _obter(nome, func, arquivos, tuple(ligados.arguments.values()))
+
+        loader.clear = lambda: descartar(nome)
+        _LOADERS[nome] = loader
+        return loader
+
+    return decorador
+
+
+def obter_dataset(nome):
+    """Visao somente leitura de um dataset registrado (ex.: 'aulas')."""
+    if nome not in _LOADERS:
+        raise KeyError(f"Dataset nao registrado: {nome}. Disponiveis: {sorted(_LOADERS)}")
+    return _LOADERS[nome]()
+
+
+def descartar(nome=None):
+    """Remove um dataset (ou todos, inclusive particoes) do registro."""
+    if nome is None:
+        _ENTRADAS.clear()
+        return
+    for chave in [c for c in _ENTRADAS if c == nome or c.startswith(nome + '[')]:
+        _ENTRADAS.pop(chave, None)
+
+
+def relatorio_memoria():
+    """Relatorio do que esta residente no registro.
+
+    Returns:
+        DataFrame com colunas: dataset, linhas, colunas, memoria_mb,
+        carregado_em, acessos — ordenado por memoria desc.
+    """
+    linhas = []
+    for nome in sorted(_LOADERS):
+        if not any(c == nome or c.startswith(nome + '[') for c in _ENTRADAS):
+            linhas.append({
+                'dataset': nome, 'linhas': 0, 'colunas': 0, 'memoria_mb': 0.0,
+                'carregado_em': None, 'acessos': 0,
+            })
+    for chave, entrada in list(_ENTRADAS.items()):
+        df = entrada['df']
+        linhas.append({
+            'dataset': chave,
+            'linhas': len(df),
+            'colunas': len(df.columns),
+            'memoria_mb': round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+            'carregado_em': entrada['carregado_em'].strftime('%d/%m/%Y %H:%M'),
+            'acessos': entrada['acessos'],
+        })
+    if not linhas:
+        return pd.DataFrame(columns=['dataset', 'linhas', 'colunas', 'memoria_mb',
+                                     'carregado_em', 'acessos'])
+    return pd.DataFrame(linhas).sort_values('memoria_mb', ascending=False).reset_index(drop=True)
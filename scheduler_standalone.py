@@ -77,6 +77,29 @@ def write_health(result: dict) -> None:
         logger.error(f"Falha ao escrever health check: {e}")
 
 
+def write_health_vigilia(result: dict) -> None:
+    """Acrescenta o resultado da Vigilia (com metricas por detector) ao health check."""
+    health = read_health()
+    health["vigilia"] = {
+        "last_run": datetime.now().isoformat(),
+        "ok": result.get("ok", False),
+        "erro": result.get("erro"),
+        "duracao": result.get("duracao", 0),
+        "total_missoes": result.get("total_missoes", 0),
+        # memoizado: missoes servidas do memo, sem detector rodando (sem metricas)
+        "missoes_origem": result.get("missoes_origem"),
+        "memoizado": result.get("memoizado", False),
+        "recalculados": result.get("recalculados", 0),
+        "reaproveitados": result.get("reaproveitados", 0),
+        "detectores": result.get("detectores", {}),
+    }
+    try:
+        with open(HEALTH_FILE, "w", encoding="utf-8") as f:
+            json.dump(health, f, indent=2, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"Falha ao escrever health check da Vigilia: {e}")
+
+
 def read_health() -> dict:
     """Le o health check. Retorna dict vazio se nao existir."""
     if not HEALTH_FILE.exists():
@@ -93,7 +116,8 @@ def read_health() -> dict:
 # ---------------------------------------------------------------------------
 
 def executar_atualizacao() -> None:
-    """Executa run_update() e grava health check. Roda Vigilia apos sucesso."""
+    """Executa run_update() e grava health check. Apos sucesso compacta o
+    diario de ocorrencias e roda a Vigilia."""
     logger.info("Iniciando atualizacao do SIGA...")
     try:
         from atualizar_siga import run_update
@@ -104,7 +128,8 @@ def executar_atualizacao() -> None:
                 f"Atualizacao concluida: {result.get('total', 0)} aulas "
                 f"em {result.get('duracao', 0):.0f}s"
             )
-            # Rodar Vigilia apos extracao com sucesso
+            # Compactar diario de ocorrencias e rodar Vigilia apos extracao com sucesso
+            _compactar_ocorrencias()
             _executar_vigilia()
         else:
             logger.error(f"Atualizacao falhou: {result.get('erro', '?')}")
@@ -113,11 +138,24 @@ def executar_atualizacao() -> None:
         write_health({"ok": False, "erro": str(e)})
 
 
+def _compactar_ocorrencias() -> None:
+    """Incorpora o diario de ocorrencias do app ao fato_Ocorrencias.csv."""
+    try:
+        from diario_ocorrencias import compactar
+        from utils import WRITABLE_DIR
+        n = compactar(WRITABLE_DIR)
+        if n:
+            logger.info(f"Diario de ocorrencias compactado: {n} registro(s)")
+    except Exception as e:
+        logger.warning(f"Diario de ocorrencias nao compactado: {e}")
+
+
 def _executar_vigilia() -> None:
     """Executa engine.executar_vigilia() para pre-gerar missoes."""
     try:
         from engine import executar_vigilia
         result = executar_vigilia()
+        write_health_vigilia(result)
         if result.get("ok"):
             logger.info(
                 f"Vigilia concluida: {result.get('total_missoes', 0)} missoes "
@@ -147,20 +185,6 @@ def _executar_estrategista() -> None:
         logger.error(f"Estrategista nao executado: {e}", exc_info=True)
 
 
-def _executar_comparador() -> None:
-    """Executa engine.executar_comparador() semanal (segunda 5h30)."""
-    logger.info("Comparador: iniciando calculo de rankings...")
-    try:
-        from engine import executar_comparador
-        result = executar_comparador()
-        if result.get("ok"):
-            logger.info(f"Comparador concluido: semana {result.get('semana')} em {result.get('duracao', 0):.1f}s")
-        else:
-            logger.error(f"Comparador falhou: {result.get('erro', '?')}")
-    except Exception as e:
-        logger.error(f"Comparador nao executado: {e}", exc_info=True)
-
-
 def _executar_preditor() -> None:
     """Executa engine.executar_preditor() semanal (sexta 20h)."""
     logger.info("Preditor: iniciando projecoes...")
@@ -212,39 +236,27 @@ def _executar_analista() -> None:
         logger.error(f"Analista nao executado: {e}", exc_info=True)
 
 
-def _executar_conselheiro() -> None:
-    """Executa engine.executar_conselheiro() semanal (segunda 5h)."""
-    logger.info("Conselheiro: iniciando geracao de pauta PEEX...")
+def _executar_cadeia_segunda() -> None:
+    """Executa a cadeia de segunda 5h (engine.CADEIA_SEGUNDA): Conselheiro,
+    Comparador, Retroalimentador e Preparador, em ordem de dependencia e
+    compartilhando as missoes da rede (calculadas no maximo uma vez)."""
+    logger.info("Cadeia de segunda: iniciando Conselheiro -> Comparador -> Retroalimentador -> Preparador...")
     try:
-        from engine import executar_conselheiro
-        result = executar_conselheiro()
-        if result.get("ok"):
-            logger.info(
-                f"Conselheiro concluido: semana {result.get('semana')}, "
-                f"unidades={result.get('unidades')} em {result.get('duracao', 0):.1f}s"
-            )
-        else:
-            logger.error(f"Conselheiro falhou: {result.get('erro', '?')}")
-    except Exception as e:
-        logger.error(f"Conselheiro nao executado: {e}", exc_info=True)
-
-
-def _executar_preparador() -> None:
-    """Executa engine.executar_preparador() semanal (segunda 5h45).
-    Consolida inteligencia de todos os robos para roteiro de reuniao."""
-    logger.info("Preparador: iniciando geracao de roteiro de reuniao...")
-    try:
-        from engine import executar_preparador
-        result = executar_preparador()
-        if result.get("ok"):
-            logger.info(
-                f"Preparador concluido: semana {result.get('semana')}, "
-                f"reuniao='{result.get('reuniao', '?')}' em {result.get('duracao', 0):.1f}s"
-            )
-        else:
-            logger.error(f"Preparador falhou: {result.get('erro', '?')}")
+        from engine import executar_robos, CADEIA_SEGUNDA
+        result = executar_robos(CADEIA_SEGUNDA)
+        for nome, r in result["robos"].items():
+            if r.get("ok"):
+                logger.info(f"{nome.capitalize()} concluido: semana {r.get('semana')} "
+                            f"em {r.get('duracao', 0):.1f}s")
+            else:
+                logger.error(f"{nome.capitalize()} falhou: {r.get('erro', '?')}")
+        missoes = result["intermediarios"].get("missoes_rede", {})
+        logger.info(
+            f"Cadeia de segunda concluida em {result.get('duracao', 0):.1f}s "
+            f"(missoes: {missoes.get('calculado', 0)} calculo(s), {missoes.get('disco', 0)} do memo)"
+        )
     except Exception as e:
-        logger.error(f"Preparador nao executado: {e}", exc_info=True)
+        logger.error(f"Cadeia de segunda nao executada: {e}", exc_info=True)
 
 
 # ---------------------------------------------------------------------------
@@ -284,30 +296,12 @@ def run_daemon() -> None:
         replace_existing=True,
     )
 
-    # Conselheiro semanal (segunda 5h)
+    # Cadeia de segunda 5h: Conselheiro -> Comparador -> Retroalimentador -> Preparador
     scheduler.add_job(
-        _executar_conselheiro,
+        _executar_cadeia_segunda,
         CronTrigger(day_of_week="mon", hour=5, minute=0, timezone="America/Recife"),
-        id="conselheiro_semanal",
-        name="Conselheiro PEEX",
-        replace_existing=True,
-    )
-
-    # Comparador semanal (segunda 5h30)
-    scheduler.add_job(
-        _executar_comparador,
-        CronTrigger(day_of_week="mon", hour=5, minute=30, timezone="America/Recife"),
-        id="comparador_semanal",
-        name="Comparador PEEX",
-        replace_existing=True,
-    )
-
-    # Preparador semanal (segunda 5h45 — apos Conselheiro e Comparador)
-    scheduler.add_job(
-        _executar_preparador,
-        CronTrigger(day_of_week="mon", hour=5, minute=45, timezone="America/Recife"),
-        id="preparador_semanal",
-        name="Preparador Reuniao PEEX",
+        id="cadeia_segunda",
+        name="Cadeia PEEX de segunda (Conselheiro, Comparador, Retroalimentador, Preparador)",
         replace_existing=True,
     )
 
@@ -340,7 +334,7 @@ def run_daemon() -> None:
 
     logger.info("=" * 60)
     logger.info("SCHEDULER STANDALONE INICIADO")
-    logger.info("Horarios: 8h, 12h, 18h, 20h (America/Recife) + Estrategista dom 22h + Analista dom 23h + Conselheiro seg 5h + Comparador seg 5h30 + Preparador seg 5h45 + Preditor sex 20h + Retro 6h")
+    logger.info("Horarios: 8h, 12h, 18h, 20h (America/Recife) + Estrategista dom 22h + Analista dom 23h + Cadeia seg 5h (Conselheiro/Comparador/Retroalimentador/Preparador) + Preditor sex 20h + Retro 6h")
     logger.info(f"Health check: {HEALTH_FILE}")
     logger.info(f"Log: {LOG_FILE}")
     logger.info(f"PID: {os.getpid()}")
@@ -398,6 +392,24 @@ def show_health() -> int:
     else:
         print(f"Erro: {erro}")
 
+    vigilia = health.get("vigilia")
+    if vigilia:
+        print(f"\nVigilia: {'OK' if vigilia.get('ok') else 'ERRO'} em {vigilia.get('last_run', '?')}")
+        if vigilia.get("ok") and vigilia.get("memoizado"):
+            print(f"  {vigilia.get('total_missoes', 0)} missoes em {vigilia.get('duracao', 0):.1f}s "
+                  f"(memoizadas: {vigilia.get('missoes_origem')}, nenhum detector rodou)")
+        elif vigilia.get("ok"):
+            print(f"  {vigilia.get('total_missoes', 0)} missoes em {vigilia.get('duracao', 0):.1f}s "
+                  f"({vigilia.get('recalculados', 0)} avaliacoes, "
+                  f"{vigilia.get('reaproveitados', 0)} reaproveitadas do cache)")
+            detectores = sorted(vigilia.get("detectores", {}).items(),
+                                key=lambda x: -x[1].get("segundos", 0))
+            for nome, m in detectores:
+                print(f"  {nome:<14} {m.get('custo', ''):<7} {m.get('segundos', 0):>7.3f}s "
+                      f"{m.get('linhas', 0):>8} linhas {m.get('missoes', 0):>5} missoes")
+        else:
+            print(f"  Erro: {vigilia.get('erro')}")
+
     # Verifica se esta stale (>5 horas sem atualizar)
     try:
         last_dt = datetime.fromisoformat(last_run)
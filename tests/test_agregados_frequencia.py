@@ -0,0 +1,70 @@
+"""
+Testes das visoes pre-agregadas de frequencia (agregados_frequencia.py).
+
+Executar: pytest tests/test_agregados_frequencia.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from agregados_frequencia import (
+    agregar_chamadas, atualizar_agregados, diferenca_chamadas, ler_agregado, visoes_em_dia,
+)
+
+
+def _chamadas(presencas):
+    """Uma chamada por presenca: alunos 1/2 alternados, turma A, duas datas."""
+    n = len(presencas)
+    return pd.DataFrame({
+        'aluno_id': [1 + i % 2 for i in range(n)],
+        'aluno_nome': ['ANA' if i % 2 == 0 else 'BETO' for i in range(n)],
+        'unidade': 'BV',
+        'serie': '6º Ano',
+        'turma': 'A',
+        'disciplina': 'Arte',
+        'aula_id': [100 + i // 2 for i in range(n)],
+        'data_aula': ['2026-02-09' if i < 4 else '2026-02-17' for i in range(n)],
+        'presenca': presencas,
+    })
+
+
+class TestAgregados:
+
+    def test_contagens_iguais_a_agregacao_antiga(self):
+        df = _chamadas(['P', 'F', 'J', 'P', None, 'P'])
+        agg = agregar_chamadas(df, 'aluno_disciplina').set_index('aluno_id')
+        validos = df[df['presenca'].isin(['P', 'F', 'J'])]
+        antigo = validos.groupby('aluno_id').agg(
+            total_aulas=('presenca', 'count'),
+            presencas=('presenca', lambda x: (x == 'P').sum()),
+            faltas=('presenca', lambda x: (x == 'F').sum()),
+            justificadas=('presenca', lambda x: (x == 'J').sum()),
+        )
+        pd.testing.assert_frame_equal(agg[antigo.columns], antigo, check_dtype=False)
+        assert agg.loc[1, 'pct_frequencia'] == 100.0
+        semanas = agregar_chamadas(df, 'unidade_semana')
+        assert semanas['semana_letiva'].tolist() == [3, 4]
+        assert semanas['total_aulas'].tolist() == [4, 1]
+
+    def test_incremental_igual_a_reconstrucao(self, tmp_path):
+        path = tmp_path / "fato_Frequencia_Aluno.csv"
+        antes = _chamadas(['P', 'F', 'J', 'P'])
+        antes.to_csv(path, index=False)
+        atualizar_agregados(tmp_path)
+        assert visoes_em_dia(tmp_path)
+
+        # Nova extracao: uma falta virou justificada e chegaram chamadas novas
+        depois = _chamadas(['P', 'J', 'J', 'P', 'F', 'P'])
+        novas, removidas = diferenca_chamadas(antes, depois)
+        assert len(novas) == 3 and len(removidas) == 1
+        atualizar_agregados(tmp_path, novas=novas, removidas=removidas)
+
+        for visao in ('aluno_disciplina', 'turma_dia', 'unidade_semana'):
+            incremental = ler_agregado(visao, tmp_path)
+            completo = agregar_chamadas(depois, visao)
+            cols = ['total_aulas', 'presencas', 'faltas', 'justificadas', 'pct_frequencia']
+            assert incremental[cols].values.tolist() == completo[cols].values.tolist(), visao
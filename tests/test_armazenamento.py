@@ -0,0 +1,163 @@
+"""
+Testes da camada colunar (armazenamento.py).
+
+Executar: pytest tests/test_armazenamento.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import armazenamento
+from armazenamento import (
+    ler_tabela,
+    publicar_tabela,
+    caminho_colunar,
+    parquet_disponivel,
+    impressao_digital,
+    registrar_versao_dados,
+    ler_versao_dados,
+)
+
+requer_parquet = pytest.mark.skipif(not parquet_disponivel(), reason="pyarrow nao instalado")
+
+
+def _gravar_aulas(path, disciplina='Física 2'):
+    pd.DataFrame({
+        'aula_id': [1, 2],
+        'data': ['2026-02-09', '2026-02-10'],
+        'disciplina': [disciplina, 'Arte'],
+        'serie': ['1ª Série', '6º Ano'],
+        'semana_letiva': [3, 3],
+        'progressao_key': [f'{disciplina}|1ª Série|3', 'Arte|6º Ano|3'],
+    }).to_csv(path, index=False)
+
+
+class TestLerTabela:
+
+    def test_csv_inexistente_retorna_vazio(self, tmp_path):
+        assert ler_tabela(tmp_path / "fato_Aulas.csv").empty
+
+    def test_preparo_aplicado_no_fallback_csv(self, tmp_path):
+        """Datas convertidas e disciplinas numeradas normalizadas."""
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        df = ler_tabela(path)
+        assert pd.api.types.is_datetime64_any_dtype(df['data'])
+        assert df.loc[0, 'disciplina'] == 'Física'
+        assert df.loc[0, 'progressao_key'] == 'Física|1ª Série|3'
+
+    @requer_parquet
+    def test_parquet_publicado_e_lido(self, tmp_path):
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        assert publicar_tabela(path)
+        assert caminho_colunar(path).exists()
+        df = ler_tabela(path)
+        assert pd.api.types.is_datetime64_any_dtype(df['data'])
+        assert list(df['disciplina']) == ['Física', 'Arte']
+
+    @requer_parquet
+    def test_parquet_desatualizado_cai_no_csv(self, tmp_path):
+        """CSV regravado depois do Parquet invalida a copia colunar."""
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        publicar_tabela(path)
+        _gravar_aulas(path, disciplina='Química')
+        pq = caminho_colunar(path)
+        os.utime(pq, ns=(0, 0))
+        df = ler_tabela(path)
+        assert df.loc[0, 'disciplina'] == 'Química'
+
+    @requer_parquet
+    def test_particoes_por_unidade(self, tmp_path):
+        from armazenamento import pasta_particoes
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        df = pd.read_csv(path)
+        df['unidade'] = ['BV', 'CD']
+        df.to_csv(path, index=False)
+        publicar_tabela(path)
+        pasta = pasta_particoes(path)
+        assert sorted(p.name for p in pasta.glob('*.parquet')) == [
+            'unidade=BV.parquet', 'unidade=CD.parquet']
+        bv = ler_tabela(path, unidades=['BV'])
+        assert bv['aula_id'].tolist() == [1]
+        ambas = ler_tabela(path, unidades=['BV', 'CD'])
+        assert isinstance(ambas['unidade'].dtype, pd.CategoricalDtype)
+        assert sorted(ambas['aula_id']) == [1, 2]
+        assert ler_tabela(path, unidades=['JG']).empty
+        # Particoes desatualizadas: le a tabela inteira e filtra
+        os.utime(pasta / '_completo', ns=(0, 0))
+        assert ler_tabela(path, unidades=['CD'])['aula_id'].tolist() == [2]
+
+    @requer_parquet
+    def test_formatos_antigos_apagados_ao_gravar(self, tmp_path):
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        colunar = tmp_path / armazenamento.COLUNAR_SUBDIR
+        (colunar / "fato_Aulas.v1").mkdir(parents=True)
+        (colunar / "fato_Aulas.v1" / "unidade=BV.parquet").write_bytes(b"")
+        (colunar / "fato_Aulas.v1.parquet").write_bytes(b"")
+        (colunar / "fato_Aulas_Extra.v1.parquet").write_bytes(b"")
+        assert publicar_tabela(path)
+        assert sorted(p.name for p in colunar.iterdir()) == [
+            "fato_Aulas.v%d.parquet" % armazenamento.VERSAO_FORMATO, "fato_Aulas_Extra.v1.parquet"]
+
+    @requer_parquet
+    def test_gravacao_nao_deixa_temporario(self, tmp_path):
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        publicar_tabela(path)
+        assert not list((tmp_path / armazenamento.COLUNAR_SUBDIR).glob("*.tmp"))
+
+
+class TestVersaoDados:
+
+    @pytest.fixture(autouse=True)
+    def _carimbo_temporario(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(armazenamento, 'ARQUIVO_VERSAO', tmp_path / "versao_dados.json")
+
+    def test_carimbo_incrementa(self):
+        assert ler_versao_dados()['versao'] == 0
+        registrar_versao_dados('teste')
+        carimbo = registrar_versao_dados('teste')
+        assert carimbo['versao'] == 2
+        assert ler_versao_dados()['origem'] == 'teste'
+
+    def test_impressao_muda_com_o_arquivo(self, tmp_path):
+        path = tmp_path / "dim_Series.csv"
+        antes = impressao_digital([path])
+        path.write_text("serie\n6º Ano\n", encoding='utf-8')
+        depois = impressao_digital([path])
+        assert antes != depois
+        assert impressao_digital([path]) == depois
+
+    def test_impressao_muda_com_nova_extracao(self, tmp_path):
+        path = tmp_path / "dim_Series.csv"
+        path.write_text("serie\n6º Ano\n", encoding='utf-8')
+        antes = impressao_digital([path])
+        registrar_versao_dados('atualizar_siga')
+        assert impressao_digital([path]) != antes
+
+
+class TestEsquema:
+
+    def test_colunas_categoricas_com_ordem_fixa(self, tmp_path):
+        path = tmp_path / "fato_Aulas.csv"
+        _gravar_aulas(path)
+        df = ler_tabela(path)
+        assert isinstance(df['serie'].dtype, pd.CategoricalDtype)
+        assert list(df['serie'].cat.categories[:2]) == ['6º Ano', '7º Ano']
+        assert set(df['disciplina']) == {'Física', 'Arte'}
+
+    def test_valores_fora_da_ordem_sao_preservados(self):
+        from esquema import aplicar_esquema
+        df = aplicar_esquema(pd.DataFrame({'serie': ['3º Ano', '6º Ano', None]}), 'fato_Ocorrencias')
+        assert df['serie'].tolist()[:2] == ['3º Ano', '6º Ano']
+        assert df['serie'].cat.categories[-1] == '3º Ano'
+        assert df['serie'].isna().sum() == 1
@@ -0,0 +1,118 @@
+"""
+Testes do banco analitico local (banco_analitico.py).
+
+Executar: pytest tests/test_banco_analitico.py -v
+"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import banco_analitico
+from banco_analitico import atualizar_banco, consultar
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco_analitico, 'ARQUIVO_BANCO', tmp_path / "analitico.sqlite3")
+    monkeypatch.setattr(banco_analitico, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(banco_analitico, '_ULTIMA_VERIFICACAO', {})
+    pd.DataFrame({
+        'aula_id': [1, 2, 3],
+        'data': ['2026-02-09', '2026-02-10', '2026-02-17'],
+        'unidade': ['BV', 'BV', 'CD'],
+        'serie': ['6º Ano', '7º Ano', '6º Ano'],
+        'disciplina': ['Arte', 'Arte', 'Arte'],
+        'professor': ['ANA', 'ANA', 'BETO'],
+        'semana_letiva': [3, 3, 4],
+    }).to_csv(tmp_path / "fato_Aulas.csv", index=False)
+    return tmp_path
+
+
+class TestBancoAnalitico:
+
+    def test_carga_incremental(self, pasta):
+        assert atualizar_banco() == {'aulas': 3}
+        assert atualizar_banco() == {}
+        assert atualizar_banco(forcar=True) == {'aulas': 3}
+
+    def test_filtros(self, pasta):
+        atualizar_banco()
+        df = consultar('aulas', unidade='BV', serie=['6º Ano', '7º Ano'], semana_letiva=3)
+        assert sorted(df['aula_id']) == [1, 2]
+        df = consultar('aulas', professor='ANA', data__de=pd.Timestamp('2026-02-10'))
+        assert df['aula_id'].tolist() == [2]
+        assert pd.api.types.is_datetime64_any_dtype(df['data'])
+
+    def test_csv_alterado_recarrega(self, pasta):
+        atualizar_banco()
+        path = pasta / "fato_Aulas.csv"
+        df = pd.read_csv(path)
+        pd.concat([df, df.tail(1).assign(aula_id=4)]).to_csv(path, index=False)
+        futuro = path.stat().st_mtime_ns + 10 ** 9
+        os.utime(path, ns=(futuro, futuro))
+        # Consulta nao recarrega: banco desatualizado ate a extracao chamar atualizar_banco
+        with pytest.raises(sqlite3.OperationalError):
+            consultar('aulas', unidade='CD')
+        assert atualizar_banco() == {'aulas': 4}
+        assert len(consultar('aulas', unidade='CD')) == 2
+
+    def test_consulta_sem_banco_nao_carrega(self, pasta):
+        with pytest.raises(sqlite3.OperationalError):
+            consultar('aulas', unidade='BV')
+        assert not (pasta / "analitico.sqlite3").exists()
+
+    def test_frequencia_so_chamadas_feitas(self, pasta):
+        pd.DataFrame({
+            'aluno_id': [1, 1, 1, 1],
+            'data_aula': ['2026-02-09', '2026-02-10', '2026-02-11', '2026-02-12'],
+            'unidade': ['BV'] * 4,
+            'presenca': ['P', 'F', 'J', None],
+        }).to_csv(pasta / "fato_Frequencia_Aluno.csv", index=False)
+        atualizar_banco()
+        assert consultar('frequencia', aluno_id=1)['presenca'].tolist() == ['P', 'F', 'J']
+
+    def test_banco_fica_na_pasta_dos_csvs(self, pasta, tmp_path_factory):
+        outra = tmp_path_factory.mktemp("outra")
+        (pasta / "fato_Aulas.csv").replace(outra / "fato_Aulas.csv")
+        assert atualizar_banco(diretorio=outra) == {'aulas': 3}
+        assert (outra / "analitico.sqlite3").exists()
+        assert not (pasta / "analitico.sqlite3").exists()
+        assert banco_analitico.status_banco(outra)['aulas']['linhas'] == 3
+
+
+class TestConsultaIndexada:
+
+    @pytest.fixture
+    def utils(self, pasta, monkeypatch):
+        import dicionario_chaves
+        import utils
+        monkeypatch.setattr(dicionario_chaves, 'DATA_DIR', pasta)
+        monkeypatch.setattr(dicionario_chaves, '_INSTANCIAS', {})
+        monkeypatch.setattr(utils, '_AVISOS_BANCO', {})
+        return utils
+
+    def _consultar(self, utils, pasta, **filtros):
+        from armazenamento import ler_tabela
+        return utils._consulta_indexada(
+            'aulas', lambda: ler_tabela(pasta / "fato_Aulas.csv"), None, filtros)
+
+    def test_mesmo_formato_com_e_sem_banco(self, utils, pasta):
+        sem_banco = self._consultar(utils, pasta, unidade='BV')
+        atualizar_banco()
+        com_banco = self._consultar(utils, pasta, unidade='BV')
+        assert list(com_banco.columns) == list(sem_banco.columns)
+        assert 'professor_cod' in com_banco.columns
+        assert isinstance(com_banco['unidade'].dtype, pd.CategoricalDtype)
+        assert com_banco['professor_cod'].tolist() == sem_banco['professor_cod'].tolist()
+
+    def test_aviso_uma_vez_por_estado(self, utils, pasta, caplog):
+        with caplog.at_level('WARNING', logger='utils'):
+            self._consultar(utils, pasta, unidade='BV')
+            self._consultar(utils, pasta, unidade='CD')
+        assert len([r for r in caplog.records if r.name == 'utils']) == 1
@@ -0,0 +1,98 @@
+"""
+Testes do indice de conteudo das aulas (conteudo_aulas.py).
+
+Executar: pytest tests/test_conteudo_aulas.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from conteudo_aulas import (
+    classificar_tipos, detectar_capitulos, detectar_paginas, detectar_unidades,
+    enriquecer_conteudo, indexar_registros,
+)
+
+
+class TestCapitulos:
+
+    def test_variacoes_e_maior_capitulo(self):
+        caps = detectar_capitulos(pd.Series([
+            'Cap. 2 - As Origens', 'capítulo 4 e CAP.5', 'Capitulo 3',
+            'BIOGRAFIA (PÁG.19 CAP.1)', 'sem referencia', None,
+        ]))
+        assert str(caps.dtype) == 'Int64'
+        assert caps.iloc[:4].tolist() == [2, 5, 3, 1]
+        assert caps.iloc[4:].isna().all()
+
+    def test_fora_do_intervalo_ignorado(self):
+        caps = detectar_capitulos(pd.Series(['cap 15', 'cap 0 e cap 7', 'cap 123']))
+        assert pd.isna(caps.iloc[0])
+        assert caps.iloc[1] == 7
+        assert pd.isna(caps.iloc[2])
+
+    def test_unidade_modulo_em_coluna_separada(self):
+        textos = pd.Series(['Unidade 3', 'Módulo 1 - páginas 10 à 17', 'Unidade 9 - cap 1'])
+        caps = detectar_capitulos(textos)
+        assert caps.iloc[:2].isna().all() and caps.iloc[2] == 1
+        assert detectar_unidades(textos).tolist() == [3, 1, 9]
+
+
+class TestPaginasETipos:
+
+    def test_primeira_pagina(self):
+        pags = detectar_paginas(pd.Series(['leitura p. 12 e p. 14', 'pp.30', 'página 7', 'Cap. 2']))
+        assert pags.iloc[:3].tolist() == [12, 30, 7]
+        assert pd.isna(pags.iloc[3])
+
+    def test_precedencia_dos_tipos(self):
+        tipos = classificar_tipos(pd.Series([
+            None, '.', 'Prova de leitura', 'Projeto com atividade',
+            'Atividade do livro', 'Leitura do texto', 'Explicação do tema', 'Frações',
+        ]))
+        assert tipos.tolist() == [
+            'Vazio', 'Vazio', 'Avaliativa', 'Projeto',
+            'Pratica', 'Leitura', 'Expositiva', 'Outro',
+        ]
+
+
+class TestEnriquecimento:
+
+    def test_preenche_colunas_ausentes(self):
+        df = enriquecer_conteudo(pd.DataFrame({'conteudo': ['Cap. 3 pág. 40', None]}))
+        assert df['cap_detectado'].iloc[0] == 3
+        assert df['cap_unidade'].isna().all()
+        assert df['pagina_ref'].iloc[0] == 40
+        assert df['tipo_aula'].tolist() == ['Leitura', 'Vazio']
+
+    def test_mantem_colunas_gravadas(self):
+        df = pd.DataFrame({
+            'conteudo': ['Cap. 3'], 'cap_detectado': ['7'], 'cap_unidade': [''],
+            'pagina_ref': [''], 'tipo_aula': ['Projeto'],
+        })
+        df = enriquecer_conteudo(df)
+        assert str(df['cap_detectado'].dtype) == 'Int64'
+        assert df['cap_detectado'].iloc[0] == 7
+        assert pd.isna(df['pagina_ref'].iloc[0])
+        assert df['tipo_aula'].iloc[0] == 'Projeto'
+
+    def test_recalcula_capitulo_de_csv_sem_cap_unidade(self):
+        # Extracoes antigas gravavam o fallback unidade/modulo em cap_detectado
+        df = enriquecer_conteudo(pd.DataFrame({
+            'conteudo': ['Unidade 1 | Música'], 'cap_detectado': ['1'],
+            'pagina_ref': [''], 'tipo_aula': ['Outro'],
+        }))
+        assert pd.isna(df['cap_detectado'].iloc[0])
+        assert df['cap_unidade'].iloc[0] == 1
+
+    def test_indexar_registros(self):
+        registros = [{'conteudo': 'Capítulo 2, p. 15'}, {'conteudo': ''}]
+        indexar_registros(registros)
+        assert registros[0]['cap_detectado'] == 2
+        assert registros[0]['pagina_ref'] == 15
+        assert registros[1] == {
+            'conteudo': '', 'cap_detectado': '', 'cap_unidade': '', 'pagina_ref': '', 'tipo_aula': 'Vazio',
+        }
@@ -0,0 +1,98 @@
+"""
+Testes do diario append-only de ocorrencias (diario_ocorrencias.py).
+
+Executar: pytest tests/test_diario_ocorrencias.py -v
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import diario_ocorrencias
+from armazenamento import ler_tabela
+from diario_ocorrencias import registrar, ler_diario, mesclar, compactar
+
+
+def _registro(nome='Aluno Teste'):
+    return {
+        'aluno_id': 1, 'aluno_nome': nome, 'data': '2026-03-02', 'unidade': 'BV',
+        'serie': '6º Ano', 'turma': '', 'tipo': 'Atraso', 'categoria': 'Disciplinar',
+        'gravidade': 'Leve', 'descricao': 'teste', 'responsavel': '', 'providencia': '',
+        'registrado_por': 'teste',
+    }
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    pd.DataFrame([dict(_registro('Base'), ocorrencia_id=500, data_registro='2026-02-01 10:00')]) \
+        .to_csv(tmp_path / "fato_Ocorrencias.csv", index=False)
+    return tmp_path
+
+
+class TestDiario:
+
+    def test_ids_monotonicos_e_sem_colisao(self, pasta):
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            ids = list(ex.map(lambda i: registrar(pasta, _registro())['ocorrencia_id'], range(40)))
+        assert sorted(ids) == list(range(501, 541))
+        assert len(ler_diario(pasta)) == 40
+
+    def test_mesclar_sem_reler_csv(self, pasta):
+        base = ler_tabela(pasta / "fato_Ocorrencias.csv")
+        registrar(pasta, _registro('Novo'))
+        df = mesclar(base, pasta)
+        assert df['aluno_nome'].tolist() == ['Base', 'Novo']
+        assert pd.api.types.is_datetime64_any_dtype(df['data'])
+        assert isinstance(df['gravidade'].dtype, pd.CategoricalDtype)
+
+    def test_compactar_incorpora_e_zera(self, pasta):
+        registrar(pasta, _registro('Novo'))
+        assert compactar(pasta) == 1
+        assert ler_diario(pasta) == []
+        df = pd.read_csv(pasta / "fato_Ocorrencias.csv")
+        assert df['ocorrencia_id'].tolist() == [500, 501]
+        assert registrar(pasta, _registro())['ocorrencia_id'] == 502
+
+    def test_colisao_com_id_do_siga_nao_descarta(self, pasta, caplog):
+        registrar(pasta, _registro('Diario'))                       # ID 501
+        # Extracao do SIGA regrava o CSV com o mesmo ID para outra ocorrencia
+        path = pasta / "fato_Ocorrencias.csv"
+        pd.DataFrame([dict(_registro('Siga'), ocorrencia_id=501, data_registro='')]) \
+            .to_csv(path, index=False)
+        futuro = path.stat().st_mtime_ns + 10 ** 9
+        os.utime(path, ns=(futuro, futuro))
+
+        assert mesclar(ler_tabela(path), pasta)['aluno_nome'].tolist() == ['Siga', 'Diario']
+        assert compactar(pasta) == 1
+        df = pd.read_csv(path)
+        assert list(zip(df['ocorrencia_id'], df['aluno_nome'])) == [(501, 'Siga'), (502, 'Diario')]
+        assert 'incorporada como 502' in caplog.text
+        assert registrar(pasta, _registro())['ocorrencia_id'] == 503
+
+    def test_registro_ja_compactado_nao_duplica(self, pasta):
+        registrar(pasta, _registro('Novo'))
+        linhas = (pasta / "fato_Ocorrencias.diario.jsonl").read_text(encoding='utf-8')
+        compactar(pasta)
+        # Diario nao zerado (queda entre regravar o CSV e apagar o diario)
+        (pasta / "fato_Ocorrencias.diario.jsonl").write_text(linhas, encoding='utf-8')
+        base = ler_tabela(pasta / "fato_Ocorrencias.csv")
+        assert mesclar(base, pasta)['aluno_nome'].tolist() == ['Base', 'Novo']
+        assert compactar(pasta) == 0
+        assert pd.read_csv(pasta / "fato_Ocorrencias.csv")['ocorrencia_id'].tolist() == [500, 501]
+
+    def test_compactacao_automatica(self, pasta, monkeypatch):
+        monkeypatch.setattr(diario_ocorrencias, 'LIMITE_COMPACTACAO', 2)
+        chamadas = []
+        monkeypatch.setattr(diario_ocorrencias, 'compactar', chamadas.append)
+        registrar(pasta, _registro())
+        registrar(pasta, _registro())
+        for t in threading.enumerate():
+            if t.name == 'compactar_ocorrencias':
+                t.join()
+        assert chamadas == [pasta]
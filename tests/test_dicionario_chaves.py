@@ -0,0 +1,110 @@
+"""
+Testes do dicionario de chaves substitutas (dicionario_chaves.py).
+
+Executar: pytest tests/test_dicionario_chaves.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+from dicionario_chaves import ARQUIVO_CHAVES, SEM_CHAVE, DicionarioChaves, codificar_tabela, dicionario
+
+
+class TestDicionarioChaves:
+
+    def test_codifica_e_decodifica(self, tmp_path):
+        dic = DicionarioChaves(tmp_path)
+        ids = dic.codificar('professor', pd.Series(['ANA', 'BIA', None, 'ANA']))
+        assert ids.dtype == np.int32
+        assert list(ids) == [0, 1, SEM_CHAVE, 0]
+        assert list(dic.decodificar('professor', ids)) == ['ANA', 'BIA', None, 'ANA']
+
+    def test_ids_estaveis_entre_execucoes(self, tmp_path):
+        DicionarioChaves(tmp_path).codificar('turma', ['6A', '7B'])
+        dic = DicionarioChaves(tmp_path)
+        # Ordem diferente e valor novo: ids antigos preservados, novo acrescentado
+        assert list(dic.codificar('turma', ['8C', '7B', '6A'])) == [2, 1, 0]
+        assert list(DicionarioChaves(tmp_path).codificar('turma', ['8C'])) == [2]
+
+    def test_categorical_usa_mesmos_ids(self, tmp_path):
+        dic = DicionarioChaves(tmp_path)
+        texto = dic.codificar('serie', ['6º Ano', '7º Ano'])
+        cat = pd.Series(['7º Ano', None, '6º Ano'], dtype='category')
+        assert list(dic.codificar('serie', cat)) == [texto[1], SEM_CHAVE, texto[0]]
+
+    def test_dominios_independentes(self, tmp_path):
+        dic = DicionarioChaves(tmp_path)
+        dic.codificar('professor', ['X'])
+        assert list(dic.codificar('aluno', ['Y', 'X'])) == [0, 1]
+
+    def test_arquivo_substituido_muda_geracao(self, tmp_path):
+        dic = DicionarioChaves(tmp_path)
+        dic.codificar('professor', ['ANA', 'BIA'])
+        DicionarioChaves(tmp_path).codificar('professor', ['CAIO'])   # acrescimo: mesma geracao
+        dic.recarregar()
+        assert dic.geracao == 0
+        (tmp_path / ARQUIVO_CHAVES).unlink()
+        DicionarioChaves(tmp_path).codificar('professor', ['BIA'])    # outro processo recria
+        dic.recarregar()
+        assert dic.geracao == 1
+        assert list(dic.codificar('professor', ['BIA', 'ANA'])) == [0, 1]
+
+
+class TestIngestao:
+
+    def test_colunas_cod_na_leitura(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(armazenamento, 'ARQUIVO_VERSAO', tmp_path / "versao_dados.json")
+        horario = tmp_path / "dim_Horario_Esperado.csv"
+        horario.write_text("unidade,turma,serie,disciplina,professor\n"
+                           "BV,6A,6º Ano,Geografia,ANA\nBV,6A,6º Ano,Historia,BIA\n", encoding='utf-8')
+        aulas = tmp_path / "fato_Aulas.csv"
+        aulas.write_text("aula_id,unidade,turma,serie,disciplina,professor\n"
+                         "1,BV,6A,6º Ano,Historia,BIA\n", encoding='utf-8')
+        df_h = armazenamento.ler_tabela(horario)
+        df_a = armazenamento.ler_tabela(aulas)
+        assert df_h['professor_cod'].dtype == np.int32
+        assert df_a['professor_cod'].iloc[0] == df_h['professor_cod'].iloc[1]
+        assert df_a['disciplina_cod'].iloc[0] == df_h['disciplina_cod'].iloc[1]
+        assert list(dicionario(tmp_path).decodificar('professor', df_h['professor_cod'])) == ['ANA', 'BIA']
+
+    def test_dicionario_recriado_nao_deixa_codigos_velhos(self, tmp_path, monkeypatch):
+        # Parquet de fato_Aulas gravado, dim_Chaves.csv apagado, horario reextraido
+        monkeypatch.setattr(armazenamento, 'ARQUIVO_VERSAO', tmp_path / "versao_dados.json")
+        aulas = tmp_path / "fato_Aulas.csv"
+        aulas.write_text("aula_id,unidade,turma,serie,disciplina,professor\n"
+                         "1,BV,6A,6º Ano,Geografia,ANA\n2,BV,6A,6º Ano,Historia,BIA\n", encoding='utf-8')
+        assert armazenamento.publicar_tabela(aulas)
+        assert 'professor_cod' not in pd.read_parquet(armazenamento.caminho_colunar(aulas)).columns
+
+        assert list(armazenamento.ler_tabela(aulas)['professor_cod']) == [0, 1]
+        (tmp_path / ARQUIVO_CHAVES).unlink()
+        DicionarioChaves(tmp_path).codificar('professor', ['BIA', 'ANA'])  # recriado em outra ordem
+        horario = tmp_path / "dim_Horario_Esperado.csv"
+        horario.write_text("unidade,turma,serie,disciplina,professor\n"
+                           "BV,6A,6º Ano,Historia,BIA\n", encoding='utf-8')
+
+        df_a = armazenamento.ler_tabela(aulas)
+        df_h = armazenamento.ler_tabela(horario)
+        cruzado = df_h.merge(df_a, on='professor_cod', suffixes=('_h', '_a'))
+        assert list(cruzado['professor_a']) == ['BIA']
+        assert list(armazenamento.ler_tabela(aulas, unidades=['BV'])['professor_cod']) == [1, 0]
+
+    def test_falha_ao_codificar_remove_cod_antigo(self, tmp_path, monkeypatch):
+        dic = dicionario(tmp_path)
+
+        def falha(dominio, valores):
+            raise OSError("somente leitura")
+
+        monkeypatch.setattr(dic, 'codificar', falha)
+        df = pd.DataFrame({'professor': ['ANA'], 'professor_cod': np.int32([7])})
+        assert list(codificar_tabela(df, 'fato_Aulas', tmp_path).columns) == ['professor']
+
+    def test_tabela_fora_da_lista_inalterada(self, tmp_path):
+        df = pd.DataFrame({'professor': ['ANA']})
+        assert list(codificar_tabela(df, 'fato_Outra', tmp_path).columns) == ['professor']
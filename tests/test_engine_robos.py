@@ -0,0 +1,123 @@
+"""
+Testes do DAG de robos do engine (ContextoRobos / executar_robos).
+
+Executar: pytest tests/test_engine_robos.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import engine
+from engine import INTERMEDIARIOS, ROBOS, ContextoRobos, Intermediario, Robo, executar_robos, ordem_robos
+
+
+@pytest.fixture
+def dag(tmp_path, monkeypatch):
+    """Mini-DAG: 'pesado' memoizado em disco, usado por tres robos."""
+    origem = tmp_path / "fato.csv"
+    origem.write_text("a\n1\n")
+    calculos = []
+    intermediarios = {
+        'pesado': Intermediario('pesado', lambda: calculos.append(1) or {'BV': [len(calculos)]},
+                                lambda: [origem], disco=True),
+    }
+    executados = []
+
+    def robo(nome, ok=True):
+        def executar(contexto):
+            executados.append(nome)
+            contexto.obter('pesado')
+            return {'ok': ok} if ok else {'ok': False, 'erro': 'falhou'}
+        return executar
+
+    robos = {
+        'a': Robo('a', robo('a'), entradas=('pesado',)),
+        'b': Robo('b', robo('b'), entradas=('pesado',), depende=('a',)),
+        'c': Robo('c', robo('c'), entradas=('pesado',), depende=('b',)),
+    }
+    monkeypatch.setattr(engine, 'INTERMEDIARIOS', intermediarios)
+    monkeypatch.setattr(engine, 'ROBOS', robos)
+    return {'origem': origem, 'calculos': calculos, 'executados': executados,
+            'robos': robos, 'robo': robo, 'memo': tmp_path / "memo"}
+
+
+class TestCadeia:
+
+    def test_calcula_uma_vez_por_cadeia(self, dag):
+        resultado = executar_robos(['c', 'a', 'b'], ContextoRobos(dag['memo']))
+        assert resultado['ok']
+        assert dag['executados'] == ['a', 'b', 'c']
+        assert len(dag['calculos']) == 1
+        assert resultado['intermediarios']['pesado']['memoria'] == 2
+
+    def test_memo_em_disco_por_versao(self, dag):
+        executar_robos(contexto=ContextoRobos(dag['memo']))
+        contexto = ContextoRobos(dag['memo'])
+        assert contexto.obter('pesado') == {'BV': [1]}
+        assert contexto.origem('pesado') == 'disco'
+        assert len(dag['calculos']) == 1
+
+        dag['origem'].write_text("a\n1\n2\n")
+        contexto = ContextoRobos(dag['memo'])
+        assert contexto.obter('pesado') == {'BV': [2]}
+        assert contexto.origem('pesado') == 'calculado'
+
+    def test_falha_interrompe_dependentes(self, dag):
+        dag['robos']['a'] = Robo('a', dag['robo']('a', ok=False), entradas=('pesado',))
+        resultado = executar_robos(contexto=ContextoRobos(dag['memo']))
+        assert not resultado['ok']
+        assert dag['executados'] == ['a']
+        assert 'dependencia falhou: a' in resultado['robos']['b']['erro']
+        assert 'dependencia falhou: b' in resultado['robos']['c']['erro']
+
+
+class TestGrafoDosRobos:
+
+    def test_declaracoes_consistentes(self):
+        for robo in ROBOS.values():
+            assert set(robo.entradas) <= set(INTERMEDIARIOS), robo.nome
+            assert set(robo.depende) <= set(ROBOS), robo.nome
+
+    def test_ordem(self):
+        ordem = ordem_robos()
+        assert set(ordem) == set(ROBOS)
+        for robo in ROBOS.values():
+            for dep in robo.depende:
+                assert ordem.index(dep) < ordem.index(robo.nome)
+        segunda = ordem_robos(engine.CADEIA_SEGUNDA)
+        assert segunda[-1] == 'preparador'
+
+
+class TestVigilia:
+
+    @pytest.fixture
+    def vigilia(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(engine, '_MISSOES_FILE', tmp_path / "missoes_pregeradas.json")
+        monkeypatch.setattr(engine, 'registrar_execucao', lambda missoes, semana: [])
+        monkeypatch.setattr(engine, 'aplicar_eventos', lambda eventos, semana: 0)
+        monkeypatch.setattr(engine, 'calcular_semana_letiva', lambda: 5)
+        estatisticas = {'recalculados': 60, 'reaproveitados': 4, 'detectores': {
+            'silencio': {'custo': 'baixo', 'segundos': 1.23456, 'linhas': 900, 'missoes': 1}}}
+
+        def executar(origem):
+            contexto = ContextoRobos(tmp_path / "memo")
+            monkeypatch.setattr(contexto, 'obter', lambda nome: ({'BV': []}, estatisticas))
+            monkeypatch.setattr(contexto, 'origem', lambda nome: origem)
+            return engine.executar_vigilia(contexto)
+        return executar
+
+    def test_metricas_dos_detectores_quando_calculado(self, vigilia):
+        resultado = vigilia('calculado')
+        assert not resultado['memoizado']
+        assert resultado['recalculados'] == 60
+        assert resultado['detectores']['silencio']['segundos'] == 1.235
+
+    def test_memo_nao_repete_metricas_antigas(self, vigilia):
+        resultado = vigilia('disco')
+        assert resultado['ok'] and resultado['memoizado']
+        assert (resultado['recalculados'], resultado['reaproveitados']) == (0, 64)
+        assert resultado['detectores'] == {}
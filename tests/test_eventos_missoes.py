@@ -0,0 +1,80 @@
+"""
+Testes do fluxo de eventos das missoes (eventos_missoes.py).
+
+Executar: pytest tests/test_eventos_missoes.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import eventos_missoes
+import missoes_historico
+from eventos_missoes import estado_atual, eventos_recentes, ler_eventos, registrar_execucao
+
+
+@pytest.fixture(autouse=True)
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(eventos_missoes, '_EVENTOS_PATH', tmp_path / "missoes_eventos.jsonl")
+    monkeypatch.setattr(eventos_missoes, '_ESTADO_PATH', tmp_path / "missoes_estado.json")
+    monkeypatch.setattr(missoes_historico, '_HISTORICO_PATH', tmp_path / "missoes_historico.sqlite3")
+    return tmp_path
+
+
+def _missao(prof, score, nivel='IMPORTANTE', tipo='PROF_SILENCIOSO'):
+    return {'tipo': tipo, 'unidade': 'BV', 'professor': prof, 'score': score, 'nivel': nivel,
+            'n_afetados': 30, 'o_que': f'{prof} sem registro'}
+
+
+class TestEventos:
+
+    def test_surgiu_score_nivel_resolvida(self):
+        primeiro = registrar_execucao({'BV': [_missao('ANA', 50), _missao('BIA', 45)]}, 5)
+        assert [e['evento'] for e in primeiro] == ['surgiu', 'surgiu']
+
+        segundo = registrar_execucao({'BV': [_missao('ANA', 50.4), _missao('BIA', 75, 'URGENTE'),
+                                             _missao('CAIO', 42)]}, 5)
+        assert {e['entidade']: e['evento'] for e in segundo} == {'BIA': 'nivel', 'CAIO': 'surgiu'}
+        nivel = next(e for e in segundo if e['evento'] == 'nivel')
+        assert (nivel['nivel_anterior'], nivel['nivel']) == ('IMPORTANTE', 'URGENTE')
+
+        terceiro = registrar_execucao({'BV': [_missao('ANA', 58), _missao('BIA', 75, 'URGENTE')]}, 6)
+        assert sorted((e['entidade'], e['evento']) for e in terceiro) == [
+            ('ANA', 'score'), ('CAIO', 'resolvida')]
+        assert [e['seq'] for e in primeiro + segundo + terceiro] == [1, 2, 3, 4, 5, 6]
+        assert set(estado_atual()) == {'PROF_SILENCIOSO_BV_ANA', 'PROF_SILENCIOSO_BV_BIA'}
+
+    def test_cursor_le_so_o_que_chegou_depois(self):
+        registrar_execucao({'BV': [_missao('ANA', 50)]}, 5)
+        todos, cursor = ler_eventos()
+        assert len(todos) == 1
+        assert ler_eventos(cursor) == ([], cursor)
+        registrar_execucao({'BV': []}, 5)
+        novos, _ = ler_eventos(cursor)
+        assert [e['evento'] for e in novos] == ['resolvida']
+
+    def test_recentes_por_semana(self):
+        registrar_execucao({'BV': [_missao('ANA', 50)]}, 5)
+        registrar_execucao({'BV': [_missao('ANA', 50), _missao('BIA', 45)]}, 6)
+        assert [e['entidade'] for e in eventos_recentes(semanas=1)] == ['BIA']
+        assert [e['entidade'] for e in eventos_recentes(semanas=2)] == ['BIA', 'ANA']
+        assert eventos_recentes(semanas=2, eventos=('resolvida',)) == []
+
+
+class TestHistoricoPorEventos:
+
+    def test_aplica_deltas(self):
+        missoes_historico.aplicar_eventos(registrar_execucao({'BV': [_missao('ANA', 50)]}, 5), 5)
+        missoes_historico.aplicar_eventos(
+            registrar_execucao({'BV': [_missao('ANA', 80, 'URGENTE')]}, 6), 6)
+        entry = missoes_historico.obter_historico_completo()['PROF_SILENCIOSO_BV_ANA']
+        assert entry['semanas_vistas'] == [5, 6]
+        assert entry['nivel'] == 'URGENTE'
+
+        missoes_historico.aplicar_eventos(registrar_execucao({'BV': []}, 6), 6)
+        entry = missoes_historico.obter_historico_completo()['PROF_SILENCIOSO_BV_ANA']
+        assert entry['resolvida_em']
+        assert entry['semanas_ativas'] == 2
@@ -0,0 +1,95 @@
+"""
+Testes do indice em memoria das missoes pre-geradas (indice_missoes.py).
+
+Executar: pytest tests/test_indice_missoes.py -v
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from indice_missoes import IndiceMissoes, indice_missoes
+
+
+def _missao(tipo, professor, score, nivel, serie=None, series=None):
+    b = {'tipo': tipo, 'professor': professor, 'score': score, 'nivel': nivel}
+    if serie:
+        b['serie'] = serie
+    if series:
+        b['series'] = series
+    return b
+
+
+def _gravar(path, unidades, semana=7):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'gerado_em': '2026-03-09T06:00:00', 'semana': semana, 'unidades': unidades}, f)
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    path = tmp_path / "missoes_pregeradas.json"
+    _gravar(path, {
+        'BV': [
+            _missao('PROF_SILENCIOSO', 'ANA', 80, 'URGENTE', series='6º Ano'),
+            _missao('TURMA_SEM_REGISTRO', None, 55, 'IMPORTANTE', serie='7º Ano'),
+            _missao('PROCESSO_DEADLINE', None, 30, 'MONITORAR'),
+        ],
+        'CD': [
+            _missao('PROF_SILENCIOSO', 'BIA', 90, 'URGENTE', series='1ª Série'),
+            _missao('ALUNO_OCORRENCIA', None, 40, 'MONITORAR', serie='6º Ano'),
+        ],
+    })
+    return path
+
+
+class TestConsulta:
+
+    def test_filtros_intersectam(self, arquivo):
+        indice = IndiceMissoes(arquivo)
+        indice.recarregar()
+        assert len(indice) == 5
+        assert indice.semana == 7
+        assert [b['professor'] for b in indice.consultar(tipo='PROF_SILENCIOSO', unidade='CD')] == ['BIA']
+        assert indice.contar(nivel='URGENTE') == 2
+        assert indice.contar(unidade='BV', nivel=['URGENTE', 'MONITORAR']) == 2
+        assert indice.contar(unidade='XX') == 0
+
+    def test_regra_de_series(self, arquivo):
+        indice = IndiceMissoes(arquivo)
+        indice.recarregar()
+        tipos = [b['tipo'] for b in indice.consultar(unidade='BV', series=['6º Ano'])]
+        # 'series' texto e missao sem serie entram; serie de outra turma nao
+        assert tipos == ['PROF_SILENCIOSO', 'PROCESSO_DEADLINE']
+
+    def test_top_e_pagina(self, arquivo):
+        indice = IndiceMissoes(arquivo)
+        indice.recarregar()
+        assert [b['score'] for b in indice.top(3)] == [90, 80, 55]
+        pagina = indice.pagina(2, por_pagina=2)
+        assert (pagina['total'], pagina['paginas'], pagina['pagina']) == (5, 3, 2)
+        assert [b['score'] for b in pagina['missoes']] == [55, 40]
+        assert indice.pagina(9, por_pagina=2)['pagina'] == 3
+
+    def test_copias_nao_alteram_indice(self, arquivo):
+        indice = IndiceMissoes(arquivo)
+        indice.recarregar()
+        indice.consultar(unidade='BV')[0]['professor'] = 'OUTRO'
+        assert indice.consultar(unidade='BV')[0]['professor'] == 'ANA'
+
+
+class TestRecarga:
+
+    def test_relido_so_quando_muda(self, arquivo):
+        indice = indice_missoes(arquivo)
+        assert indice_missoes(arquivo) is indice
+        assert indice.recarregar() is False
+
+        _gravar(arquivo, {'JG': [_missao('PROF_SILENCIOSO', 'CAIO', 70, 'IMPORTANTE')]}, semana=8)
+        os.utime(arquivo, ns=(0, os.stat(arquivo).st_mtime_ns + 1_000_000))
+        assert indice_missoes(arquivo) is indice
+        assert (len(indice), indice.semana) == (1, 8)
+        assert indice.consultar(unidade='JG')[0]['professor'] == 'CAIO'
@@ -0,0 +1,103 @@
+"""
+Testes da serie semanal de KPIs do resumo_Executivo (kpi_semanal.py).
+
+Executar: pytest tests/test_kpi_semanal.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from kpi_semanal import SerieKPI, registrar_kpis_semana, semana_do_resumo, serie_kpis
+
+
+def _resumo(semana, conf_bv, freq_bv=90.0, unidades=('BV', 'CD', 'TOTAL')):
+    return pd.DataFrame({
+        'unidade': list(unidades),
+        'semana_atual': [semana] * len(unidades),
+        'pct_conformidade_media': [conf_bv] + [60.0] * (len(unidades) - 1),
+        'frequencia_media': [freq_bv] + [85.0] * (len(unidades) - 1),
+        'semaforo': ['Verde'] * len(unidades),
+    })
+
+
+@pytest.fixture
+def serie():
+    s = SerieKPI()
+    for semana, conf in ((2, 50.0), (3, 55.0), (4, 70.0), (16, 80.0)):
+        s.registrar(semana, _resumo(semana, conf))
+    return s
+
+
+class TestConsultas:
+
+    def test_valor_resumo_e_anterior(self, serie):
+        assert serie.valor('BV', 3, 'pct_conformidade_media') == 55.0
+        assert serie.valor('BV', 5, 'pct_conformidade_media') is None
+        assert serie.valor('XX', 3, 'pct_conformidade_media') is None
+        assert serie.semanas() == [2, 3, 4, 16]
+        assert serie.anterior(16) == 4 and serie.anterior(2) is None
+
+        resumo = serie.resumo(4)
+        assert list(resumo['unidade']) == ['BV', 'CD', 'TOTAL']
+        assert 'semaforo' not in resumo.columns
+        assert resumo.loc[0, 'pct_conformidade_media'] == 70.0
+        assert serie.resumo(5).empty
+
+    def test_variacao_e_medias(self, serie):
+        var = serie.variacao(4).set_index('unidade')
+        assert var.loc['BV', 'pct_conformidade_media'] == 15.0
+        assert var.loc['CD', 'pct_conformidade_media'] == 0.0
+
+        # Trimestre 1 = semanas 1..15: media das semanas gravadas (2, 3, 4)
+        tri = serie.acumulado_trimestre(10).set_index('unidade')
+        assert tri.loc['BV', 'pct_conformidade_media'] == pytest.approx(175 / 3)
+        # Trimestre 2 comeca na 16
+        assert serie.acumulado_trimestre(16).set_index('unidade').loc['BV', 'pct_conformidade_media'] == 80.0
+
+        movel = serie.media_movel(4, janela=2, kpis=['pct_conformidade_media']).set_index('unidade')
+        assert list(movel.columns) == ['pct_conformidade_media']
+        assert movel.loc['BV', 'pct_conformidade_media'] == 62.5
+        assert serie.media(5, 15).set_index('unidade')['pct_conformidade_media'].isna().all()
+
+    def test_intervalo_longo(self, serie):
+        df = serie.intervalo(3, 16, kpis=['pct_conformidade_media'], unidades=['BV'])
+        assert list(df['semana']) == [3, 4, 16]
+        assert list(df['pct_conformidade_media']) == [55.0, 70.0, 80.0]
+
+
+class TestEscrita:
+
+    def test_regravar_semana_e_novos_kpis(self, serie):
+        serie.registrar(4, _resumo(4, 72.0, unidades=('BV', 'TOTAL')))
+        assert serie.valor('BV', 4, 'pct_conformidade_media') == 72.0
+        assert serie.valor('CD', 4, 'pct_conformidade_media') is None   # substituida inteira
+        assert serie.media(4, 4).set_index('unidade').loc['BV', 'pct_conformidade_media'] == 72.0
+
+        novo = _resumo(5, 75.0).assign(total_aulas=[10, 20, 30])
+        serie.registrar(5, novo)
+        assert serie.valor('CD', 5, 'total_aulas') == 20.0
+        assert serie.valor('CD', 3, 'total_aulas') is None
+
+    def test_persistencia_e_instancia_compartilhada(self, tmp_path):
+        path = tmp_path / "kpis_semanais.npz"
+        assert len(serie_kpis(path).semanas()) == 0
+        registrar_kpis_semana(path, 2, _resumo(2, 50.0))
+        registrar_kpis_semana(path, 3, _resumo(3, 60.0))
+        lida = serie_kpis(path)
+        assert lida.semanas() == [2, 3]
+        assert serie_kpis(path) is lida
+        assert lida.valor('BV', 2, 'frequencia_media') == 90.0
+
+    def test_arquivo_corrompido_recomeca(self, tmp_path):
+        path = tmp_path / "kpis_semanais.npz"
+        path.write_bytes(b'lixo')
+        assert SerieKPI.carregar(path).semanas() == []
+
+    def test_semana_do_resumo(self):
+        assert semana_do_resumo(_resumo(12, 50.0), 30) == 12
+        assert semana_do_resumo(pd.DataFrame({'unidade': ['BV']}), 30) == 30
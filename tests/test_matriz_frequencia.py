@@ -0,0 +1,77 @@
+"""
+Testes da matriz de presenca compactada (matriz_frequencia.py).
+
+Executar: pytest tests/test_matriz_frequencia.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from matriz_frequencia import MatrizFrequencia, empacotar, desempacotar
+
+
+@pytest.fixture
+def matriz():
+    """Turma A: aluno 1 = P F F . F F | aluno 2 = P J P P F P ('.' = sem chamada)."""
+    presencas = {1: ['P', 'F', 'F', None, 'F', 'F'], 2: ['P', 'J', 'P', 'P', 'F', 'P']}
+    linhas = [
+        {'aluno_id': a, 'aluno_nome': f'ALUNO {a}', 'unidade': 'BV', 'serie': '6º Ano',
+         'turma': 'A', 'disciplina': 'Arte', 'aula_id': 10 + k,
+         'data_aula': f'2026-02-{10 + k}', 'presenca': p}
+        for a, seq in presencas.items() for k, p in enumerate(seq)
+    ]
+    return MatrizFrequencia.de_chamadas(pd.DataFrame(linhas))
+
+
+class TestMatrizFrequencia:
+
+    def test_empacotamento_reversivel(self):
+        codigos = np.random.default_rng(0).integers(0, 4, (7, 13)).astype(np.uint8)
+        bits = empacotar(codigos)
+        assert bits.shape == (7, 4)
+        assert (desempacotar(bits, 13) == codigos).all()
+
+    def test_taxas(self, matriz):
+        taxas = matriz.taxas().set_index('aluno_id')
+        assert taxas.loc[1, ['total_aulas', 'presencas', 'faltas']].tolist() == [5, 1, 4]
+        assert taxas.loc[2, 'pct_frequencia'] == 83.3
+
+    def test_faltas_consecutivas_ignoram_aula_sem_chamada(self, matriz):
+        seq = matriz.faltas_consecutivas().set_index('aluno_id')
+        assert seq.loc[1, 'maior_sequencia'] == 4
+        assert seq.loc[1, 'sequencia_atual'] == 4
+        assert seq.loc[2, 'sequencia_atual'] == 0
+
+    def test_janelas(self, matriz):
+        recente = matriz.taxa_recente(3).set_index('aluno_id')
+        assert recente.loc[2, 'pct_recente'] == 66.7
+        movel = matriz.janela_movel(0, janela=2)
+        assert movel[1].tolist() == [100.0, 100.0, 100.0, 100.0, 50.0, 50.0]
+
+    def test_salvar_e_carregar(self, matriz, tmp_path):
+        matriz.salvar(tmp_path)
+        lida = MatrizFrequencia.carregar(tmp_path)
+        pd.testing.assert_frame_equal(lida.taxas(), matriz.taxas(), check_dtype=False)
+
+    def test_publicacao_troca_versao_e_poda_anteriores(self, matriz, tmp_path):
+        (tmp_path / "turma_0007.npy").write_bytes(b"layout antigo")
+        primeira = matriz.salvar(tmp_path)
+        leitor = MatrizFrequencia.carregar(tmp_path)
+        segunda = matriz.salvar(tmp_path)
+        assert segunda != primeira
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['manifesto.json', segunda]
+        assert len(leitor.bits) == len(matriz.bits)
+        lida = MatrizFrequencia.carregar(tmp_path)
+        pd.testing.assert_frame_equal(lida.taxas(), matriz.taxas(), check_dtype=False)
+
+    def test_faltas_consecutivas_calculadas_uma_vez(self, matriz, monkeypatch):
+        primeira = matriz.faltas_consecutivas()
+        monkeypatch.setattr(matriz, '_calcular_sequencias', lambda *_: pytest.fail("recalculou"))
+        primeira.loc[0, 'maior_sequencia'] = 99
+        assert matriz.faltas_consecutivas().loc[0, 'maior_sequencia'] != 99
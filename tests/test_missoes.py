@@ -0,0 +1,240 @@
+"""
+Testes da base agregada e dos detectores de missoes (missoes.py).
+
+Executar: pytest tests/test_missoes.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import missoes
+from missoes import preparar_base_missoes
+
+
+def _aulas():
+    linhas = []
+    # ANA: 4 aulas na semana 5, 1 na semana 6 (queda de 75%), sem conteudo
+    for sem, n in [(5, 4), (6, 1)]:
+        for i in range(n):
+            linhas.append(('BV', '6º Ano', 'Geografia', 'ANA', sem, '', f'2026-02-{20 + sem + i:02d}'))
+    # BIA: capitulo 2 citado no conteudo
+    linhas.append(('BV', '6º Ano', 'Historia', 'BIA', 6, 'Capítulo 2 - revisao', '2026-03-02'))
+    linhas.append(('BV', '6º Ano', 'Historia', 'BIA', 6, 'cap. 1', '2026-03-03'))
+    df = pd.DataFrame(linhas, columns=['unidade', 'serie', 'disciplina', 'professor',
+                                       'semana_letiva', 'conteudo', 'data'])
+    df['data'] = pd.to_datetime(df['data'])
+    return df
+
+
+def _horario():
+    return pd.DataFrame({
+        'unidade': ['BV', 'BV', 'BV'],
+        'serie': ['6º Ano', '6º Ano', '6º Ano'],
+        'disciplina': ['Geografia', 'Historia', 'Arte'],
+        'professor': ['ANA', 'BIA', 'CAIO'],
+    })
+
+
+class TestBaseMissoes:
+
+    def test_agrega_por_chave(self):
+        base = preparar_base_missoes(_aulas())
+        assert base['n_aulas'].sum() == 7
+        ana = base[base['professor'] == 'ANA'].set_index('semana_letiva')
+        assert ana.loc[5, 'n_aulas'] == 4
+        assert ana.loc[5, 'n_sem_conteudo'] == 4
+        bia = base[base['professor'] == 'BIA'].iloc[0]
+        assert bia['max_capitulo'] == 2
+        assert bia['ultima_data'] == pd.Timestamp('2026-03-03')
+
+    def test_chaves_vazias_viram_grupo(self):
+        df = _aulas()
+        df.loc[0, 'professor'] = None
+        base = preparar_base_missoes(df)
+        assert base['n_aulas'].sum() == 7
+        assert base['professor'].isna().sum() == 1
+
+
+class TestDetectores:
+
+    def test_queda_orfa_e_sem_conteudo(self):
+        base = preparar_base_missoes(_aulas())
+        hor = _horario()
+        queda = missoes._detectar_prof_queda(base, hor, 6, 'BV', ['6º Ano'])
+        assert [(m['professor'], m['queda_pct']) for m in queda] == [('ANA', 75.0)]
+        orfas = missoes._detectar_disciplina_orfa(base, hor, 6, 'BV', ['6º Ano'])
+        assert [m['disciplina'] for m in orfas] == ['Arte']
+        vazios = missoes._detectar_prof_sem_conteudo(base, hor, 6, 'BV', ['6º Ano'])
+        assert [(m['professor'], m['aulas_total']) for m in vazios] == [('ANA', 5)]
+
+    def test_turma_critica_lista_professor_sem_registro(self):
+        base = preparar_base_missoes(_aulas())
+        turmas = missoes._detectar_turma_critica(base, _horario(), 6, 'BV', ['6º Ano'])
+        assert len(turmas) == 1
+        assert turmas[0]['aulas_registradas'] == 7
+        assert turmas[0]['aulas_esperadas'] == 18
+        assert 'CAIO' in turmas[0]['por_que']
+
+
+class TestCurriculoAtrasado:
+
+    def _progressao(self):
+        return pd.DataFrame({
+            'professor': ['ANA', 'ANA', 'BIA'],
+            'disciplina': ['Geografia', 'Geografia', 'Historia'],
+            'capitulo_atual': [1, 2, 9],
+        })
+
+    def test_indice_por_professor_disciplina(self):
+        prog = missoes.preparar_progressao_missoes(self._progressao())
+        assert prog[('ANA', 'Geografia')] == 2
+        assert missoes.preparar_progressao_missoes(pd.DataFrame({'disciplina': ['X']})).empty
+
+    def test_fallback_so_sem_capitulo_no_conteudo(self):
+        base = preparar_base_missoes(_aulas())
+        prog = missoes.preparar_progressao_missoes(self._progressao())
+        atrasados = missoes._detectar_curriculo_atrasado(base, 16, 'BV', ['6º Ano'], prog)
+        # ANA (sem capitulo no conteudo) vem da progressao; BIA usa o conteudo (2), nao o 9
+        assert sorted((m['professor'], m['capitulo_atual']) for m in atrasados) == [
+            ('ANA', 2), ('BIA', 2)]
+
+    def test_progressao_lida_uma_vez_por_execucao(self, monkeypatch):
+        leituras = []
+
+        def carregar():
+            leituras.append(1)
+            return self._progressao()
+
+        monkeypatch.setattr(missoes, 'carregar_fato_aulas', _aulas)
+        monkeypatch.setattr(missoes, 'carregar_horario_esperado', _horario)
+        monkeypatch.setattr(missoes, 'carregar_frequencia_alunos', pd.DataFrame)
+        monkeypatch.setattr(missoes, 'carregar_ocorrencias', pd.DataFrame)
+        monkeypatch.setattr(missoes, 'carregar_progressao_sae', carregar)
+        monkeypatch.setattr(missoes, 'calcular_semana_letiva', lambda: 12)
+        monkeypatch.setattr(missoes, 'filtrar_ate_hoje', lambda df: df)
+        execucao = missoes._ExecucaoMissoes([('BV', ['6º Ano']), ('BV', ['6º Ano', '7º Ano'])])
+        execucao.missoes_coordenador('BV', ['6º Ano'])
+        execucao.missoes_coordenador('BV', ['6º Ano', '7º Ano'])
+        assert len(leituras) == 1
+
+
+class TestExecucaoRede:
+
+    def test_particao_avaliada_uma_vez_e_repartida(self, monkeypatch):
+        monkeypatch.setattr(missoes, 'carregar_fato_aulas', _aulas)
+        monkeypatch.setattr(missoes, 'carregar_horario_esperado', lambda: pd.concat([
+            _horario(), _horario().assign(serie='7º Ano', disciplina='Musica')], ignore_index=True))
+        monkeypatch.setattr(missoes, 'carregar_frequencia_alunos', pd.DataFrame)
+        monkeypatch.setattr(missoes, 'carregar_ocorrencias', pd.DataFrame)
+        monkeypatch.setattr(missoes, 'carregar_progressao_sae', pd.DataFrame)
+        monkeypatch.setattr(missoes, 'calcular_semana_letiva', lambda: 6)
+        monkeypatch.setattr(missoes, 'filtrar_ate_hoje', lambda df: df)
+        chamadas = []
+        original = missoes._detectar_disciplina_orfa
+
+        def contar(*args):
+            chamadas.append(args[-1])
+            return original(*args)
+
+        monkeypatch.setattr(missoes, '_detectar_disciplina_orfa', contar)
+        execucao = missoes._ExecucaoMissoes([('BV', ['6º Ano']), ('BV', ['6º Ano', '7º Ano'])])
+        so_6 = execucao.missoes_coordenador('BV', ['6º Ano'])
+        ambos = execucao.missoes_coordenador('BV', ['6º Ano', '7º Ano'])
+
+        assert chamadas == [['6º Ano', '7º Ano']]
+        orfas = lambda ms: [(m['serie'], m['disciplina']) for m in ms if m['tipo'] == 'DISCIPLINA_ORFA']
+        assert orfas(so_6) == [('6º Ano', 'Arte')]
+        assert orfas(ambos) == [('6º Ano', 'Arte'), ('7º Ano', 'Musica')]
+        # Copias: pontuar um coordenador nao altera o outro
+        so_6[0]['score'] = 1
+        assert 'score' not in ambos[0]
+
+
+def _carregar(monkeypatch, aulas):
+    """Loaders de missoes apontando para os dados sinteticos (6º e 7º Ano)."""
+    monkeypatch.setattr(missoes, 'carregar_fato_aulas', lambda: aulas)
+    monkeypatch.setattr(missoes, 'carregar_horario_esperado', lambda: pd.concat([
+        _horario(), _horario().assign(serie='7º Ano', disciplina='Musica')], ignore_index=True))
+    monkeypatch.setattr(missoes, 'carregar_frequencia_alunos', pd.DataFrame)
+    monkeypatch.setattr(missoes, 'carregar_ocorrencias', pd.DataFrame)
+    monkeypatch.setattr(missoes, 'carregar_progressao_sae', pd.DataFrame)
+    monkeypatch.setattr(missoes, 'calcular_semana_letiva', lambda: 6)
+    monkeypatch.setattr(missoes, 'filtrar_ate_hoje', lambda df: df)
+
+
+class TestVigiliaIncremental:
+
+    def test_hash_independe_da_ordem(self):
+        df = _aulas()
+        hashes = missoes.hash_particoes(df)
+        assert set(hashes) == {('BV', '6º Ano')}
+        assert missoes.hash_particoes(df.iloc[::-1]) == hashes
+        df.loc[0, 'conteudo'] = 'novo'
+        assert missoes.hash_particoes(df) != hashes
+
+    def test_so_particoes_alteradas_reavaliadas(self, monkeypatch):
+        coordenadores = [('BV', ['6º Ano', '7º Ano'])]
+        aulas = _aulas()
+        _carregar(monkeypatch, aulas)
+        primeira = missoes._ExecucaoMissoes(coordenadores, cache={})
+        antes = primeira.missoes_coordenador('BV', ['6º Ano', '7º Ano'])
+
+        # Sem mudanca: tudo vem do cache
+        segunda = missoes._ExecucaoMissoes(coordenadores, cache=primeira.cache_atual)
+        assert segunda.missoes_coordenador('BV', ['6º Ano', '7º Ano']) == antes
+        assert segunda.estatisticas['recalculados'] == 0
+
+        # Aula nova no 7º Ano: so essa serie volta aos detectores por serie
+        novas = pd.concat([aulas, aulas.iloc[[0]].assign(serie='7º Ano', disciplina='Musica')],
+                          ignore_index=True)
+        _carregar(monkeypatch, novas)
+        chamadas = []
+        original = missoes._detectar_disciplina_orfa
+        monkeypatch.setattr(missoes, '_detectar_disciplina_orfa',
+                            lambda *args: chamadas.append(args[-1]) or original(*args))
+        terceira = missoes._ExecucaoMissoes(coordenadores, cache=segunda.cache_atual)
+        incremental = terceira.missoes_coordenador('BV', ['6º Ano', '7º Ano'])
+        assert chamadas == [['7º Ano']]
+        completa = missoes._ExecucaoMissoes(coordenadores).missoes_coordenador('BV', ['6º Ano', '7º Ano'])
+        assert incremental == completa
+        assert [m['disciplina'] for m in incremental if m['tipo'] == 'DISCIPLINA_ORFA'] == ['Arte']
+
+
+class TestRegistroDetectores:
+
+    def test_registro_declara_entradas_e_custo(self):
+        assert list(missoes.DETECTORES)[:3] == ['silencioso', 'turma', 'orfa']
+        freq = missoes.DETECTORES['frequencia']
+        assert freq.entradas == ('freq',) and freq.custo == 'pesado' and freq.escopo == 'serie'
+        with pytest.raises(ValueError):
+            missoes.registrar_detector('x', custo='enorme')
+
+    def test_paralelo_igual_ao_sequencial_com_metricas(self, monkeypatch):
+        _carregar(monkeypatch, _aulas())
+        coordenadores = [('BV', ['6º Ano']), ('BV', ['6º Ano', '7º Ano'])]
+        sequencial = missoes._ExecucaoMissoes(coordenadores)
+        paralela = missoes._ExecucaoMissoes(coordenadores)
+        paralela.preparar(max_workers=4)
+        for un, series in coordenadores:
+            assert paralela.missoes_coordenador(un, series) == sequencial.missoes_coordenador(un, series)
+        orfa = paralela.estatisticas['detectores']['orfa']
+        assert orfa['avaliacoes'] == 1
+        assert orfa['missoes'] == 2
+        assert orfa['linhas'] == len(paralela.base) + len(paralela.horario)
+        assert orfa['segundos'] > 0
+
+    def test_detector_customizado(self, monkeypatch):
+        _carregar(monkeypatch, _aulas())
+        vistos = []
+        detector = missoes.Detector(
+            'teste', lambda ex, un, series: vistos.append(series) or [{'tipo': 'TESTE', 'serie': s} for s in series],
+            entradas=('horario',), escopo='serie')
+        execucao = missoes._ExecucaoMissoes([('BV', ['6º Ano', '7º Ano'])], detectores={'teste': detector})
+        assert execucao.missoes_coordenador('BV', ['7º Ano', '6º Ano']) == [
+            {'tipo': 'TESTE', 'serie': '7º Ano'}, {'tipo': 'TESTE', 'serie': '6º Ano'}]
+        assert vistos == [['6º Ano', '7º Ano']]
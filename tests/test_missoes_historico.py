@@ -0,0 +1,92 @@
+"""
+Testes do historico de missoes indexado (missoes_historico.py).
+
+Executar: pytest tests/test_missoes_historico.py -v
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import missoes_historico
+from missoes_historico import (
+    atualizar_historico, limpar_historico_antigo, obter_entrada,
+    obter_historico_completo, obter_persistentes,
+)
+
+
+@pytest.fixture(autouse=True)
+def banco(tmp_path, monkeypatch):
+    path = tmp_path / "missoes_historico.sqlite3"
+    monkeypatch.setattr(missoes_historico, '_HISTORICO_PATH', path)
+    return path
+
+
+def _missao(prof, score, unidade='BV', nivel='IMPORTANTE'):
+    return {'tipo': 'PROF_SILENCIOSO', 'unidade': unidade, 'professor': prof, 'score': score,
+            'nivel': nivel, 'n_afetados': 30, 'o_que': f'{prof} sem registro'}
+
+
+def _semanas(rede, semanas):
+    for s in semanas:
+        atualizar_historico(rede, s)
+
+
+class TestUpsert:
+
+    def test_semanas_vistas_sem_duplicar(self):
+        _semanas({'BV': [_missao('ANA', 50)]}, [3, 4, 4, 7])
+        assert atualizar_historico({'BV': [_missao('ANA', 80, nivel='URGENTE')]}, 8) == 1
+        entry = obter_entrada('PROF_SILENCIOSO_BV_ANA')
+        assert entry['semanas_vistas'] == [3, 4, 7, 8]
+        assert entry['semanas_ativas'] == 4
+        assert (entry['primeira_semana'], entry['ultima_semana']) == (3, 8)
+        assert (entry['score'], entry['nivel']) == (80, 'URGENTE')
+        assert 'resolvida_em' not in entry
+        assert obter_entrada('NAO_EXISTE') is None
+
+    def test_semanas_de_varios_anos(self):
+        _semanas({'BV': [_missao('ANA', 50)]}, [1, 47, 60, 130])
+        assert obter_entrada('PROF_SILENCIOSO_BV_ANA')['semanas_vistas'] == [1, 47, 60, 130]
+
+
+class TestConsultas:
+
+    def test_persistentes_ordem_unidade_limite(self):
+        _semanas({'BV': [_missao('ANA', 50), _missao('BIA', 90)],
+                  'CD': [_missao('CAIO', 70, unidade='CD')]}, [1, 2, 3])
+        _semanas({'BV': [_missao('ANA', 50)]}, [4])
+        assert [p['entidade'] for p in obter_persistentes(3)] == ['ANA', 'BIA', 'CAIO']
+        assert [p['entidade'] for p in obter_persistentes(4)] == ['ANA']
+        assert [p['entidade'] for p in obter_persistentes(3, unidade='CD')] == ['CAIO']
+        assert len(obter_persistentes(1, limite=2)) == 2
+
+    def test_limpar_antigas(self):
+        _semanas({'BV': [_missao('ANA', 50)]}, [1])
+        _semanas({'BV': [_missao('BIA', 50)]}, [10])
+        assert limpar_historico_antigo(12, max_inatividade=8) == 1
+        assert set(obter_historico_completo()) == {'PROF_SILENCIOSO_BV_BIA'}
+
+
+class TestImportacao:
+
+    def test_importa_json_antigo(self, banco):
+        legado = {'PROF_SILENCIOSO_BV_ANA': {
+            'fingerprint': 'PROF_SILENCIOSO_BV_ANA', 'tipo': 'PROF_SILENCIOSO', 'unidade': 'BV',
+            'entidade': 'ANA', 'primeira_semana': 2, 'ultima_semana': 5,
+            'semanas_vistas': [2, 3, 5], 'semanas_ativas': 3, 'score': 60, 'nivel': 'IMPORTANTE',
+            'n_afetados': 10, 'o_que': 'x', 'resolvida_em': '2026-03-01T10:00:00'}}
+        (banco.parent / "missoes_historico.json").write_text(json.dumps(legado), encoding='utf-8')
+
+        entry = obter_entrada('PROF_SILENCIOSO_BV_ANA')
+        assert entry['semanas_vistas'] == [2, 3, 5]
+        assert entry['resolvida_em'] == '2026-03-01T10:00:00'
+
+        atualizar_historico({'BV': [_missao('ANA', 65)]}, 6)
+        entry = obter_entrada('PROF_SILENCIOSO_BV_ANA')
+        assert entry['semanas_ativas'] == 4
+        assert 'resolvida_em' not in entry
@@ -0,0 +1,119 @@
+"""
+Testes do banco de planos de acao (planos_acao.py) e do Retroalimentador.
+
+Executar: pytest tests/test_planos_acao.py -v
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import engine
+import planos_acao
+from planos_acao import (
+    adicionar_compromisso, atualizar_acao, carregar_compromissos, carregar_plano,
+    execucao_acumulada, salvar_plano, taxas_execucao,
+)
+
+
+@pytest.fixture(autouse=True)
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(planos_acao, '_PLANOS_PATH', tmp_path / "planos_acao.sqlite3")
+    return tmp_path
+
+
+def _plano(*status, fonte='dados_reais'):
+    return {'gerado_em': '2026-03-02T08:00:00', 'fonte': fonte,
+            'acoes': [{'titulo': f'Acao {i}', 'status': s, 'nota': '', 'prazo': 'sexta-feira'}
+                      for i, s in enumerate(status, 1)]}
+
+
+class TestPlanos:
+
+    def test_salvar_carregar_e_atualizar(self):
+        assert carregar_plano('BV', 5) is None
+        salvar_plano('BV', 5, _plano('nao_iniciada', 'resolvida'))
+        plano = carregar_plano('BV', 5)
+        assert (plano['semana'], plano['unidade'], plano['fonte']) == (5, 'BV', 'dados_reais')
+        assert [a['titulo'] for a in plano['acoes']] == ['Acao 1', 'Acao 2']
+
+        assert atualizar_acao('BV', 5, 1, status='resolvida', nota='feito')
+        assert not atualizar_acao('BV', 5, 9, status='resolvida')
+        acao = carregar_plano('BV', 5)['acoes'][0]
+        assert (acao['status'], acao['nota']) == ('resolvida', 'feito')
+
+        # Regravar substitui as acoes da semana (regenerar plano)
+        salvar_plano('BV', 5, _plano('nao_iniciada'))
+        assert len(carregar_plano('BV', 5)['acoes']) == 1
+
+    def test_campos_extras_preservados(self):
+        plano = _plano('nao_iniciada')
+        plano['acoes'][0]['origem_robo'] = 'VIGILIA'
+        salvar_plano('CD', 2, plano)
+        assert carregar_plano('CD', 2)['acoes'][0]['origem_robo'] == 'VIGILIA'
+
+    def test_compromissos(self):
+        assert adicionar_compromisso('JG', 3, {'titulo': 'Ligar familias', 'status': 'pendente'}) == 1
+        assert adicionar_compromisso('JG', 3, {'titulo': 'Mapa de calor', 'status': 'pendente'}) == 2
+        adicionar_compromisso('JG', 4, {'titulo': 'Reuniao pais', 'status': 'pendente'})
+        atualizar_acao('JG', 3, 2, origem='compromisso', status='concluido')
+        lista = carregar_compromissos('JG')
+        assert [(c['semana'], c['titulo'], c['status']) for c in lista] == [
+            (3, 'Ligar familias', 'pendente'), (3, 'Mapa de calor', 'concluido'),
+            (4, 'Reuniao pais', 'pendente')]
+        assert carregar_plano('JG', 3) is None
+
+
+class TestAgregados:
+
+    def test_taxas_e_acumulado(self):
+        salvar_plano('BV', 1, _plano('resolvida', 'resolvida'))
+        salvar_plano('BV', 2, _plano('resolvida', 'nao_iniciada', 'em_andamento', 'nao_iniciada'))
+        salvar_plano('CD', 2, _plano('nao_iniciada'))
+        adicionar_compromisso('BV', 2, {'titulo': 'x', 'status': 'concluido'})
+
+        df = taxas_execucao(1, 2)
+        assert list(zip(df['unidade'], df['semana'], df['taxa'])) == [
+            ('BV', 1, 100.0), ('BV', 2, 25.0), ('CD', 2, 0.0)]
+        assert list(taxas_execucao(2, 2, unidades=['CD'])['unidade']) == ['CD']
+        assert taxas_execucao(1, 9, origem='compromisso')['taxa'].tolist() == [100.0]
+        assert execucao_acumulada('BV', 2) == {'total': 6, 'concluidas': 3, 'taxa': 50.0}
+
+
+class TestImportacao:
+
+    def test_importa_jsons_antigos(self, pasta):
+        (pasta / "plano_acao_sem4_BV.json").write_text(
+            json.dumps({'semana': 4, 'unidade': 'BV', **_plano('resolvida')}), encoding='utf-8')
+        (pasta / "plano_acao_CD_sem3.json").write_text(json.dumps(_plano('nao_iniciada')), encoding='utf-8')
+        (pasta / "compromissos_diretor_JG.json").write_text(json.dumps([
+            {'titulo': 'a', 'status': 'pendente', 'semana': 2},
+            {'titulo': 'b', 'status': 'concluido', 'semana': 2}]), encoding='utf-8')
+
+        assert carregar_plano('BV', 4)['acoes'][0]['status'] == 'resolvida'
+        assert carregar_plano('CD', 3)['acoes'][0]['status'] == 'nao_iniciada'
+        assert [c['titulo'] for c in carregar_compromissos('JG')] == ['a', 'b']
+
+
+class TestRetroalimentador:
+
+    def test_escala_execucao_baixa_consecutiva(self, pasta, monkeypatch):
+        monkeypatch.setattr(engine, '_RETRO_FILE', pasta / "retro.json")
+        monkeypatch.setattr(engine, 'calcular_semana_letiva', lambda: 10)
+        salvar_plano('BV', 9, _plano('resolvida', 'nao_iniciada', 'nao_iniciada'))
+        salvar_plano('BV', 10, _plano('resolvida', 'nao_iniciada'))
+        salvar_plano('CD', 9, _plano('nao_iniciada'))
+        salvar_plano('CD', 10, _plano('resolvida'))
+        salvar_plano('JG', 10, _plano('nao_iniciada'))   # sem plano na semana 9 = 0%
+
+        resultado = engine.executar_retroalimentador()
+        assert resultado['ok'] and resultado['n_escalacoes'] == 2
+        saida = json.loads((pasta / "retro.json").read_text(encoding='utf-8'))
+        assert [e['unidade'] for e in saida['escalacoes']] == ['BV', 'JG']
+        assert saida['verificacoes']['BV'] == {
+            'acoes_total': 2, 'acoes_resolvidas': 1, 'taxa_execucao': 50.0, 'taxa_4_semanas': 40.0}
+        assert saida['verificacoes']['CDR']['acoes_total'] == 0
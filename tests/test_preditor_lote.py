@@ -0,0 +1,116 @@
+"""
+Testes do preditor em lote (preditor_lote.py).
+
+Executar: pytest tests/test_preditor_lote.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from preditor_lote import (
+    ajustar_lote, ler_projecoes, prever_lote, projetar, salvar_projecoes,
+    series_aluno_ocorrencias, series_professor_conformidade, series_turma_frequencia,
+)
+
+
+def _data(semana, dia=0):
+    return pd.Timestamp('2026-01-26') + pd.Timedelta(days=7 * (semana - 1) + dia)
+
+
+class TestAjuste:
+
+    def test_igual_polyfit_com_lacunas(self):
+        rng = np.random.default_rng(0)
+        Y = rng.normal(80, 5, (5, 10))
+        Y[1, ::3] = np.nan
+        Y[2, :8] = np.nan          # so 2 pontos: sem ajuste
+        x = np.arange(1, 11)
+        coef, intercepto, n = ajustar_lote(Y, x)
+        for i in (0, 1, 3, 4):
+            m = ~np.isnan(Y[i])
+            assert np.allclose(np.polyfit(x[m], Y[i, m], 1), [coef[i], intercepto[i]])
+        assert np.isnan(coef[2]) and n[2] == 2
+
+    def test_intervalo_contem_previsao_e_respeita_limites(self):
+        x = np.arange(1, 9)
+        Y = np.vstack([95 - 6 * x + np.array([1, -1, 2, -2, 1, 0, -1, 1]), np.full(8, 80.0)])
+        r = prever_lote(Y, x, [9, 10], n_boot=300, limites=(0, 100))
+        assert (r['inferior'] <= r['previsao'] + 1e-9).all()
+        assert (r['previsao'] <= r['superior'] + 1e-9).all()
+        assert (r['inferior'] >= 0).all()
+        # Serie sem ruido: intervalo degenerado na propria reta
+        assert np.allclose(r['inferior'][1], 80) and np.allclose(r['superior'][1], 80)
+        # Reprodutivel com a mesma semente
+        assert np.array_equal(r['superior'], prever_lote(Y, x, [9, 10], n_boot=300,
+                                                         limites=(0, 100))['superior'])
+
+
+class TestSeries:
+
+    def test_conformidade_preenche_zero_desde_a_primeira_semana(self):
+        aulas = pd.DataFrame({
+            'professor': ['ANA'] * 5 + ['BIA'] * 2,
+            'unidade': 'BV', 'serie': '6º Ano', 'disciplina': 'Arte',
+            'semana_letiva': [1, 1, 2, 4, 4, 3, 4],
+        })
+        esperadas = pd.DataFrame({'unidade': ['BV'], 'serie': ['6º Ano'], 'disciplina': ['Arte'],
+                                  'aulas_esperadas_semana': [2]})
+        Y, semanas, info = series_professor_conformidade(aulas, esperadas, 5)
+        linhas = dict(zip(info['entidade'], Y))
+        # Semana 5 sem aula na rede (recesso) fica NaN; BIA so conta da semana 3
+        assert np.array_equal(linhas['ANA'], [100, 50, 0, 100, np.nan], equal_nan=True)
+        assert np.array_equal(linhas['BIA'], [np.nan, np.nan, 50, 50, np.nan], equal_nan=True)
+
+    def test_frequencia_turma(self):
+        chamadas = pd.DataFrame({
+            'unidade': 'BV', 'serie': '6º Ano', 'turma': '6A',
+            'data_aula': [_data(1), _data(1), _data(2), _data(2), _data(3)],
+            'presenca': ['P', 'F', 'J', 'P', None],
+        })
+        Y, _, info = series_turma_frequencia(chamadas, 3)
+        assert info['entidade'].tolist() == ['6A']
+        assert np.array_equal(Y[0], [50, 100, np.nan], equal_nan=True)
+
+    def test_ocorrencias_contam_zero_desde_a_semana_1(self):
+        ocorr = pd.DataFrame({
+            'aluno_id': [7, 7, 7], 'aluno_nome': 'CAIO', 'unidade': 'BV', 'serie': '8º Ano',
+            'data': [_data(2), _data(4), _data(4, 1)],
+        })
+        outro = pd.DataFrame({'aluno_id': [9], 'aluno_nome': 'DUDA', 'unidade': 'BV',
+                              'serie': '8º Ano', 'data': [_data(1)]})
+        Y, _, info = series_aluno_ocorrencias(pd.concat([ocorr, outro]), 4)
+        linhas = dict(zip(info['entidade'], Y))
+        assert np.array_equal(linhas['7'], [0, 1, np.nan, 2], equal_nan=True)
+
+
+class TestAlertasEConsulta:
+
+    def _series(self):
+        semanas = np.arange(1, 7)
+        Y = np.array([
+            [96, 92, 88, 84, 80, 76],      # cai 4pp/sem: cruza 75 com folga
+            [80, 79, 79, 78, 78, 77],      # cai devagar: so a pontual cruza
+            [88, 90, 89, 91, 90, 92],      # estavel acima
+        ], dtype=float)
+        info = pd.DataFrame({'unidade': 'BV', 'serie': '6º Ano',
+                             'entidade': ['1', '2', '3'], 'rotulo': ['A', 'B', 'C']})
+        return Y, semanas, info
+
+    def test_alertas(self):
+        df = projetar(self._series(), 'aluno_frequencia', semana=7)
+        assert df.set_index('rotulo')['alerta'].to_dict() == {'A': 'critico', 'B': '', 'C': ''}
+        assert df.set_index('rotulo').loc['A', 'tendencia'] == 'caindo'
+
+    def test_salvar_e_ler(self, tmp_path):
+        df = projetar(self._series(), 'aluno_frequencia', semana=7)
+        path = salvar_projecoes(df, tmp_path / "preditor_entidades.parquet")
+        lido = ler_projecoes(path, metrica='aluno_frequencia', unidade='BV')
+        assert len(lido) == 3
+        assert ler_projecoes(path, unidade='CD').empty
+        assert len(ler_projecoes(path, somente_alertas=True)) == (df['alerta'] != '').sum()
+        assert ler_projecoes(tmp_path / "nada.parquet").empty
@@ -0,0 +1,122 @@
+"""
+Testes do registro compartilhado (registro_dados.py) e do pacote sob demanda (pacote_dados.py).
+
+Executar: pytest tests/test_registro_dados.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import armazenamento
+import registro_dados
+from registro_dados import compartilhado, obter_dataset, relatorio_memoria
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, 'ARQUIVO_VERSAO', tmp_path / "versao_dados.json")
+    path = tmp_path / "fato_Teste.csv"
+    path.write_text("unidade,valor\nBV,1\nCD,2\n", encoding='utf-8')
+    chamadas = []
+
+    @compartilhado('teste', [path])
+    def carregar():
+        chamadas.append(1)
+        return pd.read_csv(path)
+
+    yield carregar, chamadas, path
+    registro_dados.descartar('teste')
+    registro_dados._LOADERS.pop('teste', None)
+
+
+class TestRegistro:
+
+    def test_carrega_uma_vez_por_versao(self, dataset):
+        carregar, chamadas, path = dataset
+        carregar()
+        carregar()
+        assert len(chamadas) == 1
+        armazenamento.registrar_versao_dados('teste')
+        carregar()
+        assert len(chamadas) == 2
+
+    def test_visao_nao_vaza_para_outras_sessoes(self, dataset):
+        carregar, _, _ = dataset
+        visao = carregar()
+        visao['nova'] = 0
+        assert 'nova' not in carregar().columns
+        assert list(obter_dataset('teste')['valor']) == [1, 2]
+
+    def test_relatorio_memoria(self, dataset):
+        carregar, _, _ = dataset
+        carregar()
+        rel = relatorio_memoria()
+        linha = rel[rel['dataset'] == 'teste'].iloc[0]
+        assert linha['linhas'] == 2
+        assert linha['acessos'] == 1
+
+    def test_argumentos_viram_entradas_proprias(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(armazenamento, 'ARQUIVO_VERSAO', tmp_path / "versao_dados.json")
+        path = tmp_path / "fato_Teste.csv"
+        path.write_text("unidade,valor\nBV,1\nCD,2\n", encoding='utf-8')
+
+        @compartilhado('teste_particao', [path])
+        def carregar(unidades=None):
+            df = pd.read_csv(path)
+            return df if unidades is None else df[df['unidade'].isin(unidades)]
+
+        try:
+            assert len(carregar()) == 2
+            assert len(carregar(unidades=['CD'])) == 1
+            assert len(carregar(['CD'])) == 1
+            assert len(carregar(unidades=None)) == 2
+            rel = relatorio_memoria()
+            assert set(rel['dataset']) >= {'teste_particao', 'teste_particao[CD]'}
+            registro_dados.descartar('teste_particao')
+            assert not any(c.startswith('teste_particao') for c in registro_dados._ENTRADAS)
+        finally:
+            registro_dados.descartar('teste_particao')
+            registro_dados._LOADERS.pop('teste_particao', None)
+
+    def test_dataset_desconhecido(self):
+        with pytest.raises(KeyError):
+            obter_dataset('inexistente')
+
+
+class TestPacoteDados:
+
+    def test_carrega_sob_demanda_e_registra_uso(self):
+        from pacote_dados import PacoteDados, uso_por_pagina
+        chamadas = []
+
+        def loader(nome):
+            def carregar():
+                chamadas.append(nome)
+                return pd.DataFrame({'x': [1]})
+            return carregar
+
+        dados = PacoteDados({'a': loader('a'), 'b': loader('b')}, pagina='pagina_teste')
+        assert chamadas == []
+        assert len(dados['a']) == 1
+        dados['a']
+        assert chamadas == ['a']
+        assert uso_por_pagina()['pagina_teste']['a']['acessos'] == 2
+
+        # Segunda execucao da pagina pre-carrega o que foi usado antes
+        dados = PacoteDados({'a': loader('a'), 'b': loader('b')}, pagina='pagina_teste')
+        dados['a']
+        assert chamadas == ['a', 'a']
+        assert dados.carregados() == ['a']
+
+    def test_pre_carregar_em_segundo_plano(self):
+        from pacote_dados import PacoteDados
+        dados = PacoteDados({'a': lambda: pd.DataFrame({'x': [1, 2]})})
+        dados.pre_carregar('a', 'inexistente')
+        assert len(dados['a']) == 2
+        with pytest.raises(KeyError):
+            dados['inexistente']
@@ -0,0 +1,67 @@
+"""
+Testes das versoes imutaveis por extracao (versoes_dados.py).
+
+Executar: pytest tests/test_versoes_dados.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import versoes_dados
+from armazenamento import parquet_disponivel, publicar_tabela
+from versoes_dados import (
+    publicar_versao, versao_atual, listar_versoes, ler_versao, ler_tabela_versao, delta,
+)
+
+pytestmark = pytest.mark.skipif(not parquet_disponivel(), reason="pyarrow nao instalado")
+
+
+def _extrair(path, linhas):
+    """Simula uma extracao: regrava o CSV e publica Parquet + versao."""
+    pd.DataFrame(linhas, columns=['aula_id', 'data', 'unidade', 'professor']).to_csv(path, index=False)
+    futuro = max(path.stat().st_mtime_ns, getattr(_extrair, 'ultimo', 0)) + 10 ** 9
+    _extrair.ultimo = futuro
+    os.utime(path, ns=(futuro, futuro))
+    publicar_tabela(path)
+    return publicar_versao(path, origem='teste')
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "fato_Aulas.csv"
+
+
+class TestVersoes:
+
+    def test_ponteiro_e_delta(self, path):
+        v1 = _extrair(path, [(1, '2026-02-09', 'BV', 'ANA'), (2, '2026-02-09', 'CD', 'BETO'),
+                             (3, '2026-02-10', 'BV', 'ANA')])
+        v2 = _extrair(path, [(1, '2026-02-09', 'BV', 'ANA'), (2, '2026-02-09', 'CD', 'CAIO'),
+                             (4, '2026-02-11', 'JG', 'DORA')])
+        assert (v1['versao'], v2['versao'], v2['anterior']) == (1, 2, 1)
+        assert versao_atual('fato_Aulas', path.parent)['versao'] == 2
+        d = delta('fato_Aulas', 1, diretorio=path.parent)
+        assert d['inseridos'] == [4]
+        assert d['alterados'] == [2]
+        assert d['removidos'] == [3]
+
+    def test_versao_fixada_le_o_instantaneo(self, path):
+        _extrair(path, [(1, '2026-02-09', 'BV', 'ANA'), (2, '2026-02-09', 'CD', 'BETO')])
+        assert len(ler_tabela_versao(path, 1)) == 2
+        _extrair(path, [(1, '2026-02-09', 'BV', 'ANA')])
+        # Sessao que fixou v1 continua vendo v1; a atual ve v2
+        antiga = ler_tabela_versao(path, 1, unidades=['CD'])
+        assert antiga['professor'].tolist() == ['BETO']
+        assert len(ler_tabela_versao(path, 2)) == 1
+        assert '_hash_linha' not in ler_versao('fato_Aulas', diretorio=path.parent).columns
+
+    def test_poda_mantem_as_ultimas(self, path, monkeypatch):
+        monkeypatch.setattr(versoes_dados, 'MANTER_VERSOES', 2)
+        for i in range(4):
+            _extrair(path, [(1, '2026-02-09', 'BV', f'PROF{i}')])
+        assert listar_versoes('fato_Aulas', path.parent) == [3, 4]
@@ -7,8 +7,10 @@ Constantes e funcoes de normalizacao sao delegadas para normalizacao.py
 compatibilidade com todas as paginas existentes.
 """
 
+import logging
 import math
 import os
+import sqlite3
 import tempfile
 import shutil
 import streamlit as st
@@ -32,6 +34,45 @@ from normalizacao import (  # noqa: F401
     normalizar_serie_sae,
 )
 
+# Camada colunar: Parquet tipado com fallback para CSV. O preparo das
+# tabelas (datas, disciplinas normalizadas) e aplicado uma unica vez ali,
+# e o cache dos loaders e invalidado pela versao dos dados, nao por TTL.
+from armazenamento import (  # noqa: F401
+    ler_tabela,
+    cache_por_versao,
+    _normalizar_disciplina_fato,
+    _normalizar_disciplina_horario,
+)
+from registro_dados import (  # noqa: F401
+    compartilhado,
+    obter_dataset,
+    relatorio_memoria,
+)
+# Diario append-only das ocorrencias registradas pelo app
+from diario_ocorrencias import (
+    registrar as registrar_ocorrencia,
+    mesclar as mesclar_diario,
+    arquivos_diario,
+)
+# Pacote de dados preguicoso (carregar_todos_dados)
+from pacote_dados import PacoteDados, uso_por_pagina  # noqa: F401
+from agregados_frequencia import VISOES as VISOES_FREQUENCIA, agregar_chamadas  # noqa: F401
+from matriz_frequencia import carregar_matriz as carregar_matriz_frequencia  # noqa: F401
+from versoes_dados import (  # noqa: F401
+    ler_tabela_versao,
+    versao_fixada,
+    fixar_versoes,
+    versao_atual,
+    delta as delta_versoes,
+    ponteiro_versao,
+)
+# Banco analitico local (SQLite indexado) para filtros pontuais
+from banco_analitico import consultar, consultar_sql, atualizar_banco  # noqa: F401
+from banco_analitico import TABELAS as _TABELAS_BANCO
+from esquema import aplicar_esquema
+from dicionario_chaves import COLUNAS_DOMINIO, codificar_tabela
+from versoes_dados import TABELAS_VERSIONADAS
+
 # ========== CONSTANTES ==========
 
 INICIO_ANO_LETIVO = datetime(2026, 1, 26)
@@ -154,140 +195,112 @@ def status_conformidade(pct):
         return '🔴', 'Critico'
 
 
-# ========== NORMALIZACAO DE DISCIPLINAS ==========
-# Dicts DISCIPLINA_NORM_FATO e DISCIPLINA_NORM_HORARIO sao importados de normalizacao.py
+# ========== CARREGAMENTO DE DADOS COM CACHE ==========
+# Sem TTL: cada loader fica em cache ate seus arquivos de origem mudarem ou
+# uma nova extracao gravar o carimbo de versao (ver armazenamento.py).
+# Os fatos pesados usam @compartilhado: um unico frame somente leitura por
+# processo, entregue sem copia a todas as sessoes (ver registro_dados.py).
+# Paginas que precisem alterar valores in-place devem fazer df.copy() antes.
 
+def unidades_do_usuario():
+    """Unidades que o usuario logado pode ver, para poda de particoes.
 
-def _normalizar_disciplina_fato(df):
-    """Aplica normalizacao de disciplinas e recalcula progressao_key."""
-    if 'disciplina' not in df.columns:
-        return df
-    mask = df['disciplina'].isin(DISCIPLINA_NORM_FATO)
-    if mask.any():
-        df.loc[mask, 'disciplina'] = df.loc[mask, 'disciplina'].map(DISCIPLINA_NORM_FATO)
-        if 'progressao_key' in df.columns and 'serie' in df.columns and 'semana_letiva' in df.columns:
-            df.loc[mask, 'progressao_key'] = (
-                df.loc[mask, 'disciplina'] + '|' +
-                df.loc[mask, 'serie'] + '|' +
-                df.loc[mask, 'semana_letiva'].astype(str)
-            )
-    return df
+    Returns:
+        lista de unidades (diretor/coordenador: a propria) ou None para o CEO
+        (rede inteira — le a tabela completa, ja compartilhada em memoria)
+    """
+    from auth import get_visible_units
+    from normalizacao import UNIDADES
+    unidades = get_visible_units()
+    if set(unidades) >= set(UNIDADES):
+        return None
+    return unidades
+
+
+_ARQUIVOS_NOTAS = [
+    DATA_DIR / "fato_Notas.csv",
+    DATA_DIR / "fato_Notas_Historico.csv",
+    DATA_DIR / "dim_Alunos.csv",
+]
 
+@compartilhado('aulas', [DATA_DIR / "fato_Aulas.csv", ponteiro_versao('fato_Aulas')])
+def _carregar_fato_aulas(versao=None, unidades=None):
+    return ler_tabela_versao(DATA_DIR / "fato_Aulas.csv", versao, unidades=unidades)
 
-def _normalizar_disciplina_horario(df):
-    """Normaliza disciplinas numeradas do horario (Matematica 1 → Matematica)."""
-    if 'disciplina' not in df.columns:
-        return df
-    mask = df['disciplina'].isin(DISCIPLINA_NORM_HORARIO)
-    if mask.any():
-        df.loc[mask, 'disciplina'] = df.loc[mask, 'disciplina'].map(DISCIPLINA_NORM_HORARIO)
-    return df
 
+def carregar_fato_aulas(unidades=None):
+    """Carrega fato_Aulas (Parquet tipado ou CSV), compartilhado e somente leitura.
 
-# ========== CARREGAMENTO DE DADOS COM CACHE ==========
+    Le a versao fixada para esta execucao da pagina (versoes_dados.py): uma
+    extracao que termine no meio do rerun so aparece no proximo.
+    Com unidades=[...] le so as particoes dessas unidades
+    (ex.: carregar_fato_aulas(unidades_do_usuario())).
+    """
+    return _carregar_fato_aulas(versao_fixada('fato_Aulas'), unidades)
 
-@st.cache_data(ttl=300)
-def carregar_fato_aulas():
-    """Carrega fato_Aulas.csv com cache de 5 minutos."""
-    path = DATA_DIR / "fato_Aulas.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    df = pd.read_csv(path)
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
-    df = _normalizar_disciplina_fato(df)
-    return df
 
+carregar_fato_aulas.clear = _carregar_fato_aulas.clear
 
-@st.cache_data(ttl=300)
+
+@compartilhado('horario', [DATA_DIR / "dim_Horario_Esperado.csv"])
 def carregar_horario_esperado():
-    """Carrega dim_Horario_Esperado.csv com cache. Normaliza disciplinas numeradas."""
-    path = DATA_DIR / "dim_Horario_Esperado.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    df = pd.read_csv(path)
-    df = _normalizar_disciplina_horario(df)
-    return df
+    """Carrega dim_Horario_Esperado com cache. Disciplinas numeradas ja normalizadas."""
+    return ler_tabela(DATA_DIR / "dim_Horario_Esperado.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Calendario.csv"])
 def carregar_calendario():
     """Carrega dim_Calendario.csv com cache."""
-    path = DATA_DIR / "dim_Calendario.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    df = pd.read_csv(path)
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
-    return df
+    return ler_tabela(DATA_DIR / "dim_Calendario.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Progressao_SAE.csv"])
 def carregar_progressao_sae():
     """Carrega dim_Progressao_SAE.csv com cache."""
-    path = DATA_DIR / "dim_Progressao_SAE.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Progressao_SAE.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Professores.csv"])
 def carregar_professores():
     """Carrega dim_Professores.csv com cache."""
-    path = DATA_DIR / "dim_Professores.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Professores.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Series.csv"])
 def carregar_series():
     """Carrega dim_Series.csv com cache."""
-    path = DATA_DIR / "dim_Series.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Series.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Disciplinas.csv"])
 def carregar_disciplinas():
     """Carrega dim_Disciplinas.csv com cache."""
-    path = DATA_DIR / "dim_Disciplinas.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Disciplinas.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Unidades.csv"])
 def carregar_unidades():
     """Carrega dim_Unidades.csv com cache."""
-    path = DATA_DIR / "dim_Unidades.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Unidades.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Alunos.csv"])
 def carregar_alunos():
     """Carrega dim_Alunos.csv com cache."""
-    path = DATA_DIR / "dim_Alunos.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Alunos.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao(_ARQUIVOS_NOTAS)
 def carregar_notas():
     """Carrega notas com cache. Tenta fato_Notas.csv (trimestral) ou fato_Notas_Historico.csv (anual)."""
     # Primeiro: notas 2026 trimestrais (quando disponivel)
     path = DATA_DIR / "fato_Notas.csv"
     if path.exists():
-        df = pd.read_csv(path)
-        if 'data_avaliacao' in df.columns:
-            df['data_avaliacao'] = pd.to_datetime(df['data_avaliacao'], errors='coerce')
-        return df
+        return ler_tabela(path)
     # Fallback: historico de notas anuais (todas as unidades)
     path_hist = DATA_DIR / "fato_Notas_Historico.csv"
     if path_hist.exists():
-        df = pd.read_csv(path_hist)
+        df = ler_tabela(path_hist)
         # Compatibilidade: mapear colunas para schema esperado pelas paginas
         # nota pode existir mas estar vazia - usar nota_final como fallback
         if 'nota_final' in df.columns:
@@ -299,17 +312,21 @@ def carregar_notas():
         if 'turma' not in df.columns:
             path_alunos = DATA_DIR / "dim_Alunos.csv"
             if path_alunos.exists():
-                df_al = pd.read_csv(path_alunos, usecols=['aluno_id', 'turma'])
+                df_al = ler_tabela(path_alunos)[['aluno_id', 'turma']]
                 df = df.merge(df_al, on='aluno_id', how='left')
         return df
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "fato_Frequencia_Aluno.csv",
+                   DATA_DIR / VISOES_FREQUENCIA['aluno_disciplina']['csv']] + _ARQUIVOS_NOTAS)
 def carregar_frequencia_alunos():
-    """Carrega frequencia 2026 agregada por aluno/disciplina a partir de fato_Frequencia_Aluno.csv.
+    """Carrega frequencia 2026 agregada por aluno/disciplina.
 
-    Calcula pct_frequencia = presentes / (presentes + faltas + justificadas) * 100.
+    Le a visao resumo_Frequencia_Aluno_Disciplina materializada pela extracao
+    (agregados_frequencia.py); se ela faltar ou for mais antiga que
+    fato_Frequencia_Aluno.csv, agrega as chamadas na hora (vetorizado).
+    Calcula pct_frequencia = (presentes + justificadas) / (presentes + faltas + justificadas) * 100.
     Ignora registros sem chamada feita (presenca NaN).
     Fallback: deriva do historico de notas se CSV nao existir.
 
@@ -321,35 +338,47 @@ def carregar_frequencia_alunos():
     if not path.exists():
         return carregar_frequencia_historico()
 
-    df = pd.read_csv(path)
-    # Filtrar apenas registros com chamada feita (P, F ou J)
-    df = df[df['presenca'].isin(['P', 'F', 'J'])].copy()
-    if df.empty:
+    agg = _ler_visao_frequencia('aluno_disciplina', path)
+    if agg.empty:
         return carregar_frequencia_historico()
+    agg['fonte'] = '2026_chamada'
+    return agg
 
-    # Agregar por aluno + disciplina
-    group_cols = ['aluno_id', 'aluno_nome', 'unidade', 'serie', 'turma', 'disciplina']
-    group_cols = [c for c in group_cols if c in df.columns]
 
-    agg = df.groupby(group_cols).agg(
-        total_aulas=('presenca', 'count'),
-        presencas=('presenca', lambda x: (x == 'P').sum()),
-        faltas=('presenca', lambda x: (x == 'F').sum()),
-        justificadas=('presenca', lambda x: (x == 'J').sum()),
-    ).reset_index()
+def _ler_visao_frequencia(visao, path_chamadas):
+    """Visao materializada se estiver em dia com as chamadas; senao agrega agora."""
+    path_visao = DATA_DIR / VISOES_FREQUENCIA[visao]['csv']
+    try:
+        em_dia = path_visao.stat().st_mtime_ns >= path_chamadas.stat().st_mtime_ns
+    except OSError:
+        em_dia = False
+    if em_dia:
+        return ler_tabela(path_visao)
+    return agregar_chamadas(ler_tabela(path_chamadas), visao)
 
-    agg['pct_frequencia'] = ((agg['presencas'] + agg['justificadas']) / agg['total_aulas'].clip(lower=1) * 100).round(1)
-    agg['fonte'] = '2026_chamada'
-    return agg
 
+@cache_por_versao(lambda visao: [DATA_DIR / "fato_Frequencia_Aluno.csv",
+                                 DATA_DIR / VISOES_FREQUENCIA[visao]['csv']])
+def carregar_frequencia_agregada(visao):
+    """Visao de frequencia pre-agregada: 'aluno_disciplina', 'turma_dia' ou 'unidade_semana'.
 
-@st.cache_data(ttl=300)
+    Returns:
+        DataFrame com as chaves da visao + total_aulas, presencas, faltas,
+        justificadas e pct_frequencia (vazio se nao houver chamadas).
+    """
+    path = DATA_DIR / "fato_Frequencia_Aluno.csv"
+    if not path.exists():
+        return pd.DataFrame()
+    return _ler_visao_frequencia(visao, path)
+
+
+@cache_por_versao(_ARQUIVOS_NOTAS)
 def carregar_frequencia_historico():
     """Deriva frequencia por aluno/disciplina/ano a partir de fato_Notas_Historico (faltas + carga_horaria)."""
     path = DATA_DIR / "fato_Notas_Historico.csv"
     if not path.exists():
         return pd.DataFrame()
-    df = pd.read_csv(path)
+    df = ler_tabela(path)
     # Precisa de faltas e carga_horaria validos
     required = ['aluno_id', 'aluno_nome', 'faltas', 'carga_horaria']
     if not all(c in df.columns for c in required):
@@ -374,7 +403,7 @@ def carregar_frequencia_historico():
     if 'turma' not in df.columns:
         path_al = DATA_DIR / "dim_Alunos.csv"
         if path_al.exists():
-            df_al = pd.read_csv(path_al, usecols=['aluno_id', 'turma'])
+            df_al = ler_tabela(path_al)[['aluno_id', 'turma']]
             df = df.merge(df_al, on='aluno_id', how='left')
     # Colunas de saida
     cols_out = ['aluno_id', 'aluno_nome', 'unidade', 'serie', 'disciplina',
@@ -391,12 +420,12 @@ def carregar_frequencia_historico():
     return df[cols_out]
 
 
-@st.cache_data(ttl=300)
-def carregar_frequencia_detalhada():
+@compartilhado('frequencia_detalhada', [DATA_DIR / "fato_Frequencia_Aluno.csv"])
+def carregar_frequencia_detalhada(unidades=None):
     """Carrega fato_Frequencia_Aluno.csv completo (sem agregar) para analise detalhada.
 
     Filtra apenas registros com chamada feita (presenca P, F ou J).
-    Converte data_aula para datetime.
+    Converte data_aula para datetime. Com unidades=[...] le so essas particoes.
 
     Returns:
         DataFrame com todas as colunas originais do CSV (sem registros sem chamada).
@@ -405,45 +434,35 @@ def carregar_frequencia_detalhada():
     path = DATA_DIR / "fato_Frequencia_Aluno.csv"
     if not path.exists():
         return pd.DataFrame()
-    df = pd.read_csv(path)
-    # Filtrar apenas registros com chamada feita
-    df = df[df['presenca'].isin(['P', 'F', 'J'])].copy()
-    if 'data_aula' in df.columns:
-        df['data_aula'] = pd.to_datetime(df['data_aula'], errors='coerce')
-    return df
+    df = ler_tabela(path, unidades=unidades)
+    # Filtrar apenas registros com chamada feita (data_aula ja vem convertida)
+    return df[df['presenca'].isin(['P', 'F', 'J'])].copy()
 
 
-@st.cache_data(ttl=60)
+@compartilhado('ocorrencias_consolidadas', [WRITABLE_DIR / "fato_Ocorrencias.csv"])
+def _carregar_ocorrencias_consolidadas():
+    """fato_Ocorrencias.csv (SIGA + diario ja compactado), compartilhado."""
+    return ler_tabela(WRITABLE_DIR / "fato_Ocorrencias.csv")
+
+
+@compartilhado('ocorrencias', [WRITABLE_DIR / "fato_Ocorrencias.csv"] + arquivos_diario(WRITABLE_DIR))
 def carregar_ocorrencias():
-    """Carrega fato_Ocorrencias.csv com cache curto (permite refresh apos novo registro)."""
-    path = WRITABLE_DIR / "fato_Ocorrencias.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    df = pd.read_csv(path)
-    if 'data' in df.columns:
-        df['data'] = pd.to_datetime(df['data'], errors='coerce')
-    return df
+    """Carrega as ocorrencias: CSV consolidado + registros do diario ainda nao compactados.
+
+    Um novo registro so muda o diario: o CSV nao e relido, apenas a cauda e mesclada.
+    """
+    return mesclar_diario(_carregar_ocorrencias_consolidadas(), WRITABLE_DIR)
 
 
 def salvar_ocorrencia(registro: dict):
-    """Salva nova ocorrencia em fato_Ocorrencias.csv. Retorna True se sucesso."""
-    path = WRITABLE_DIR / "fato_Ocorrencias.csv"
-    colunas = ['ocorrencia_id', 'aluno_id', 'aluno_nome', 'data', 'unidade', 'serie',
-               'turma', 'tipo', 'categoria', 'gravidade', 'descricao', 'responsavel',
-               'providencia', 'registrado_por', 'data_registro']
-    if path.exists():
-        df = pd.read_csv(path)
-        next_id = df['ocorrencia_id'].max() + 1 if 'ocorrencia_id' in df.columns and not df.empty else 1
-    else:
-        df = pd.DataFrame(columns=colunas)
-        next_id = 1
-    registro['ocorrencia_id'] = int(next_id)
-    registro['data_registro'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')
-    new_row = pd.DataFrame([registro])
-    df = pd.concat([df, new_row], ignore_index=True)
-    df.to_csv(path, index=False)
-    # Limpar cache para carregar dados atualizados
-    carregar_ocorrencias.clear()
+    """Registra nova ocorrencia no diario append-only. Retorna True se sucesso.
+
+    O ID e alocado sob trava (sem corrida entre coordenadores) e o diario e
+    compactado no fato_Ocorrencias.csv em segundo plano (diario_ocorrencias.py).
+    """
+    salvo = registrar_ocorrencia(WRITABLE_DIR, registro)
+    registro['ocorrencia_id'] = salvo['ocorrencia_id']
+    registro['data_registro'] = salvo['data_registro']
     return True
 
 
@@ -463,7 +482,7 @@ def calcular_media_trimestral(notas_df, trimestre=None):
     cols_group = [c for c in ['aluno_id', 'aluno_nome', 'disciplina', 'serie', 'unidade'] if c in df.columns]
     if not cols_group:
         return pd.DataFrame()
-    return df.groupby(cols_group)['nota'].mean().reset_index().rename(columns={'nota': 'media'})
+    return df.groupby(cols_group, observed=True)['nota'].mean().reset_index().rename(columns={'nota': 'media'})
 
 
 def calcular_frequencia_aluno(freq_df, aluno_id=None):
@@ -484,7 +503,7 @@ def calcular_frequencia_aluno(freq_df, aluno_id=None):
     # Formato com coluna 'presente' (dados em tempo real)
     if 'presente' not in df.columns:
         return pd.DataFrame()
-    agg = df.groupby(cols_group).agg(
+    agg = df.groupby(cols_group, observed=True).agg(
         total_aulas=('presente', 'count'),
         presencas=('presente', 'sum'),
     ).reset_index()
@@ -502,37 +521,114 @@ def status_frequencia(pct):
         return '🔴', 'Risco Reprovacao'
 
 
-def carregar_todos_dados():
-    """Carrega todos os dados do sistema de uma vez. Retorna dict."""
-    dados = {}
-    df_aulas = carregar_fato_aulas()
-    if not df_aulas.empty:
-        dados['aulas'] = df_aulas
-    df_horario = carregar_horario_esperado()
-    if not df_horario.empty:
-        dados['horario'] = df_horario
-    df_cal = carregar_calendario()
-    if not df_cal.empty:
-        dados['calendario'] = df_cal
-    df_prog = carregar_progressao_sae()
-    if not df_prog.empty:
-        dados['progressao'] = df_prog
-    df_profs = carregar_professores()
-    if not df_profs.empty:
-        dados['professores'] = df_profs
-    df_alunos = carregar_alunos()
-    if not df_alunos.empty:
-        dados['alunos'] = df_alunos
-    df_notas = carregar_notas()
-    if not df_notas.empty:
-        dados['notas'] = df_notas
-    df_freq = carregar_frequencia_alunos()
-    if not df_freq.empty:
-        dados['frequencia_alunos'] = df_freq
-    df_ocorr = carregar_ocorrencias()
-    if not df_ocorr.empty:
-        dados['ocorrencias'] = df_ocorr
-    return dados
+def carregar_todos_dados(pagina=None, pre_carregar=()):
+    """Pacote com todos os dados do sistema, carregados sob demanda.
+
+    Cada dataset so e lido no primeiro acesso (dados['aulas']); os nomes em
+    pre_carregar comecam a carregar em segundo plano imediatamente. Com
+    pagina='...', o que a pagina usou na execucao anterior tambem e
+    pre-carregado. Datasets sem dados vem como DataFrame vazio.
+
+    Returns:
+        PacoteDados (Mapping) com: aulas, horario, calendario, progressao,
+        professores, alunos, notas, frequencia_alunos, ocorrencias.
+    """
+    pacote = PacoteDados({
+        'aulas': carregar_fato_aulas,
+        'horario': carregar_horario_esperado,
+        'calendario': carregar_calendario,
+        'progressao': carregar_progressao_sae,
+        'professores': carregar_professores,
+        'alunos': carregar_alunos,
+        'notas': carregar_notas,
+        'frequencia_alunos': carregar_frequencia_alunos,
+        'ocorrencias': carregar_ocorrencias,
+    }, pagina=pagina)
+    return pacote.pre_carregar(*pre_carregar)
+
+
+# ========== CONSULTAS INDEXADAS (banco analitico) ==========
+# Alternativa as mascaras encadeadas sobre o frame inteiro: o filtro roda no
+# SQLite local (banco_analitico.py), pelos indices. Se o banco falhar, cai no
+# filtro em pandas sobre o loader correspondente. Os dois caminhos devolvem
+# o mesmo formato do loader: colunas categoricas do esquema e *_cod.
+
+_AVISOS_BANCO = {}  # tabela -> ultimo erro avisado (um aviso por estado do banco)
+
+
+def _filtrar_frame(df, filtros):
+    """Mesmo contrato de banco_analitico.consultar, aplicado a um DataFrame."""
+    mask = pd.Series(True, index=df.index)
+    for chave, valor in filtros.items():
+        col, _, op = chave.partition('__')
+        if valor is None or col not in df.columns:
+            continue
+        if op == 'de':
+            mask &= df[col] >= (pd.Timestamp(valor) if col in ('data', 'data_aula') else valor)
+        elif op == 'ate':
+            mask &= df[col] <= (pd.Timestamp(valor) if col in ('data', 'data_aula') else valor)
+        elif isinstance(valor, (list, tuple, set)):
+            mask &= df[col].isin(list(valor))
+        else:
+            mask &= df[col] == valor
+    return df[mask]
+
+
+def _consultar_banco(tabela, nome, colunas, filtros):
+    """SELECT no banco com o formato do loader (esquema + *_cod); None se indisponivel."""
+    if nome in TABELAS_VERSIONADAS:
+        atual = versao_atual(nome)
+        if versao_fixada(nome) != (atual['versao'] if atual else None):
+            # Execucao fixada numa versao anterior: o banco so tem a atual
+            return None
+    base = None
+    if colunas:
+        # *_cod nao fica no banco: pede a coluna de texto e codifica aqui
+        base = list(dict.fromkeys(
+            c[:-4] if c.endswith('_cod') and c[:-4] in COLUNAS_DOMINIO else c for c in colunas))
+    try:
+        df = consultar(tabela, colunas=base, **filtros)
+    except (sqlite3.Error, pd.errors.DatabaseError) as e:
+        estado = str(e)
+        if _AVISOS_BANCO.get(tabela) != estado:
+            _AVISOS_BANCO[tabela] = estado
+            logging.getLogger("utils").warning(
+                f"Banco analitico indisponivel para {tabela} ({e}); filtrando em memoria")
+        return None
+    _AVISOS_BANCO.pop(tabela, None)
+    return codificar_tabela(aplicar_esquema(df, nome), nome)
+
+
+def _consulta_indexada(tabela, loader, colunas, filtros):
+    nome = Path(_TABELAS_BANCO[tabela]['csv']).stem
+    df = _consultar_banco(tabela, nome, colunas, filtros)
+    if df is None:
+        df = _filtrar_frame(loader(), filtros)
+    return df[colunas] if colunas else df
+
+
+def consultar_aulas(unidade=None, serie=None, disciplina=None, semana=None,
+                    professor=None, data_inicio=None, data_fim=None, colunas=None):
+    """Aulas de fato_Aulas filtradas pelo indice (unidade, serie, disciplina,
+    semana_letiva) ou (professor, data). Cada filtro aceita valor ou lista."""
+    filtros = {
+        'unidade': unidade, 'serie': serie, 'disciplina': disciplina,
+        'semana_letiva': semana, 'professor': professor,
+        'data__de': data_inicio, 'data__ate': data_fim,
+    }
+    return _consulta_indexada('aulas', carregar_fato_aulas, colunas, filtros)
+
+
+def consultar_horario(unidade=None, serie=None, disciplina=None, professor=None, colunas=None):
+    """Slots de dim_Horario_Esperado filtrados pelo indice. Valor ou lista."""
+    filtros = {'unidade': unidade, 'serie': serie, 'disciplina': disciplina, 'professor': professor}
+    return _consulta_indexada('horario', carregar_horario_esperado, colunas, filtros)
+
+
+def consultar_frequencia_aluno(aluno_id, data_inicio=None, data_fim=None, colunas=None):
+    """Chamadas de um aluno (fato_Frequencia_Aluno) pelo indice (aluno_id, data_aula)."""
+    filtros = {'aluno_id': aluno_id, 'data_aula__de': data_inicio, 'data_aula__ate': data_fim}
+    return _consulta_indexada('frequencia', carregar_frequencia_detalhada, colunas, filtros)
 
 
 # ========== FILTROS COMUNS ==========
@@ -635,37 +731,25 @@ def ultima_atualizacao():
 # Dicts _GRADE_MAP_SAE e _DISCIPLINA_SAE_MAP sao importados de normalizacao.py (como aliases)
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Materiais_SAE.csv"])
 def carregar_materiais_sae():
     """Carrega dim_Materiais_SAE.csv com cache."""
-    path = DATA_DIR / "dim_Materiais_SAE.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Materiais_SAE.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "dim_Alunos_SAE.csv"])
 def carregar_alunos_sae():
     """Carrega dim_Alunos_SAE.csv com cache."""
-    path = DATA_DIR / "dim_Alunos_SAE.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "dim_Alunos_SAE.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "fato_Engajamento_SAE.csv"])
 def carregar_engajamento_sae():
     """Carrega fato_Engajamento_SAE.csv com cache."""
-    path = DATA_DIR / "fato_Engajamento_SAE.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "fato_Engajamento_SAE.csv")
 
 
-@st.cache_data(ttl=300)
+@cache_por_versao([DATA_DIR / "fato_Cruzamento.csv"])
 def carregar_cruzamento():
     """Carrega fato_Cruzamento.csv com cache."""
-    path = DATA_DIR / "fato_Cruzamento.csv"
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path)
+    return ler_tabela(DATA_DIR / "fato_Cruzamento.csv")
@@ -0,0 +1,295 @@
+"""
+Versoes imutaveis das tabelas extraidas (uma por extracao) com ponteiro atomico.
+
+run_update regravava fato_Aulas.csv no lugar enquanto as paginas liam o
+arquivo, e a unica forma de comparar duas extracoes eram os dumps
+backup_aulas_*.json. Agora cada extracao publica um instantaneo imutavel:
+
+  power_bi/_versoes/<tabela>/v00012.parquet   — frame tipado (sem *_cod) + _hash_linha
+  power_bi/_versoes/<tabela>/ATUAL.json       — ponteiro para a versao atual
+
+O ponteiro e trocado com tmp + replace (atomico): um leitor ve a versao
+antiga ou a nova, nunca metade. O ponteiro guarda tambem a impressao do CSV
+publicado, entao ler_tabela_versao() le a copia viva (Parquet particionado)
+enquanto ela ainda corresponde a versao pedida, e o instantaneo quando uma
+extracao mais nova ja a substituiu.
+
+Leituras consistentes: Sistema_Pedagogico chama fixar_versoes() no inicio de
+cada execucao da pagina; os loaders leem versao_fixada(tabela) — uma nova
+extracao no meio da execucao so aparece na execucao seguinte.
+
+Deltas: cada linha do instantaneo leva um hash (_hash_linha), entao
+delta(tabela, de, ate) le so as colunas chave + hash das duas versoes.
+
+Funcoes publicas:
+  - publicar_versao(path_csv, origem='')  — grava instantaneo e troca ponteiro
+  - versao_atual(tabela, diretorio=None)  — dict do ponteiro (ou None)
+  - ponteiro_versao(tabela, diretorio=None) — path do ATUAL.json
+  - listar_versoes(tabela, diretorio=None)
+  - ler_versao(tabela, versao=None, unidades=None, diretorio=None)
+  - ler_tabela_versao(path_csv, versao=None, unidades=None)
+  - delta(tabela, de, ate=None, diretorio=None) — chaves inseridas/alteradas/removidas
+  - fixar_versoes() / versao_fixada(tabela)
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from armazenamento import DATA_DIR, ler_tabela, parquet_disponivel
+from dicionario_chaves import codificar_tabela, sem_codigos
+
+logger = logging.getLogger("versoes_dados")
+
+VERSOES_SUBDIR = "_versoes"
+ARQUIVO_PONTEIRO = "ATUAL.json"
+COLUNA_HASH = "_hash_linha"
+
+TABELAS_VERSIONADAS = {
+    'fato_Aulas': 'aula_id',
+}
+"""Tabelas com instantaneos por extracao, e a chave usada nos deltas."""
+
+MANTER_VERSOES = 10
+"""Instantaneos mantidos por tabela (os mais antigos sao apagados)."""
+
+
+# ========== CAMINHOS ==========
+
+def _pasta(tabela, diretorio=None):
+    return Path(diretorio or DATA_DIR) / VERSOES_SUBDIR / tabela
+
+
+def ponteiro_versao(tabela, diretorio=None):
+    """Path do ATUAL.json (entra na impressao digital dos loaders)."""
+    return _pasta(tabela, diretorio) / ARQUIVO_PONTEIRO
+
+
+def _arquivo_versao(tabela, versao, diretorio=None):
+    return _pasta(tabela, diretorio) / f"v{int(versao):05d}.parquet"
+
+
+def _impressao_csv(path_csv):
+    try:
+        st_ = Path(path_csv).stat()
+        return f"{st_.st_mtime_ns}:{st_.st_size}"
+    except OSError:
+        return None
+
+
+# ========== PUBLICACAO ==========
+
+def _hash_linhas(df, chave):
+    """Hash por linha de todas as colunas exceto a chave (Categorical por valor)."""
+    cols = [c for c in df.columns if c != chave]
+    base = df[cols].astype({
+        c: object for c in cols if isinstance(df[c].dtype, pd.CategoricalDtype)
+    })
+    return pd.util.hash_pandas_object(base, index=False).to_numpy()
+
+
+def _gravar_ponteiro(pasta, ponteiro):
+    destino = pasta / ARQUIVO_PONTEIRO
+    tmp = destino.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(ponteiro, f, ensure_ascii=False)
+    tmp.replace(destino)
+
+
+def _podar(tabela, diretorio, atual):
+    for antiga in listar_versoes(tabela, diretorio):
+        if antiga <= atual - MANTER_VERSOES:
+            _arquivo_versao(tabela, antiga, diretorio).unlink(missing_ok=True)
+
+
+def publicar_versao(path_csv, origem=''):
+    """Grava o instantaneo imutavel da tabela e aponta ATUAL.json para ele.
+
+    Chamado pelo extrator logo apos publicar o CSV (e o Parquet).
+
+    Returns:
+        dict do novo ponteiro, ou None se a tabela nao e versionada ou o
+        instantaneo nao pode ser gravado
+    """
+    path_csv = Path(path_csv)
+    tabela = path_csv.stem
+    chave = TABELAS_VERSIONADAS.get(tabela)
+    if chave is None or not path_csv.exists() or not parquet_disponivel():
+        return None
+
+    diretorio = path_csv.parent
+    pasta = _pasta(tabela, diretorio)
+    anterior = versao_atual(tabela, diretorio)
+    versao = max([0] + listar_versoes(tabela, diretorio)) + 1
+    destino = _arquivo_versao(tabela, versao, diretorio)
+    tmp = destino.with_suffix('.tmp')
+    try:
+        impressao = _impressao_csv(path_csv)
+        # *_cod dependem do dim_Chaves.csv atual: recalculadas em ler_versao
+        df = sem_codigos(ler_tabela(path_csv))
+        df = df.assign(**{COLUNA_HASH: _hash_linhas(df, chave)})
+        pasta.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp, index=False)
+        tmp.replace(destino)
+        ponteiro = {
+            'tabela': tabela,
+            'versao': versao,
+            'arquivo': destino.name,
+            'linhas': len(df),
+            'impressao_csv': impressao,
+            'anterior': anterior['versao'] if anterior else None,
+            'criado_em': datetime.now().isoformat(),
+            'origem': origem,
+        }
+        _gravar_ponteiro(pasta, ponteiro)
+    except Exception as e:
+        logger.warning(f"Versao de {tabela} nao publicada: {e}")
+        tmp.unlink(missing_ok=True)
+        return None
+    _podar(tabela, diretorio, versao)
+    return ponteiro
+
+
+# ========== LEITURA ==========
+
+def versao_atual(tabela, diretorio=None):
+    """Ponteiro da versao atual (dict) ou None se a tabela nunca foi versionada."""
+    try:
+        with open(ponteiro_versao(tabela, diretorio), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def listar_versoes(tabela, diretorio=None):
+    """Numeros das versoes com instantaneo em disco, em ordem crescente."""
+    pasta = _pasta(tabela, diretorio)
+    if not pasta.exists():
+        return []
+    versoes = []
+    for arq in pasta.glob("v*.parquet"):
+        try:
+            versoes.append(int(arq.stem[1:]))
+        except ValueError:
+            continue
+    return sorted(versoes)
+
+
+def ler_versao(tabela, versao=None, unidades=None, diretorio=None):
+    """Le um instantaneo (padrao: o atual).
+
+    Raises:
+        FileNotFoundError se a versao nao existir (nunca publicada ou podada)
+    """
+    if versao is None:
+        ponteiro = versao_atual(tabela, diretorio)
+        if ponteiro is None:
+            raise FileNotFoundError(f"{tabela}: nenhuma versao publicada")
+        versao = ponteiro['versao']
+    df = pd.read_parquet(_arquivo_versao(tabela, versao, diretorio))
+    df = df.drop(columns=[COLUNA_HASH], errors='ignore')
+    if unidades is not None and 'unidade' in df.columns:
+        df = df[df['unidade'].isin(list(unidades))].reset_index(drop=True)
+    return codificar_tabela(df, tabela, diretorio)
+
+
+def ler_tabela_versao(path_csv, versao=None, unidades=None):
+    """Le a tabela na versao pedida, pela copia viva sempre que possivel.
+
+    Sem versao (ou se a copia viva ainda e a versao pedida) equivale a
+    ler_tabela(path_csv, unidades); senao le o instantaneo imutavel.
+    """
+    path_csv = Path(path_csv)
+    if versao is None:
+        return ler_tabela(path_csv, unidades=unidades)
+    ponteiro = versao_atual(path_csv.stem, path_csv.parent)
+    if (ponteiro and ponteiro['versao'] == versao
+            and ponteiro.get('impressao_csv') == _impressao_csv(path_csv)):
+        return ler_tabela(path_csv, unidades=unidades)
+    try:
+        return ler_versao(path_csv.stem, versao, unidades=unidades, diretorio=path_csv.parent)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Versao {versao} de {path_csv.stem} indisponivel, usando a atual: {e}")
+        return ler_tabela(path_csv, unidades=unidades)
+
+
+# ========== DELTAS ==========
+
+def _ler_hashes(tabela, versao, chave, diretorio):
+    df = pd.read_parquet(_arquivo_versao(tabela, versao, diretorio), columns=[chave, COLUNA_HASH])
+    return df.drop_duplicates(chave, keep='last')
+
+
+def delta(tabela, de, ate=None, diretorio=None):
+    """Diferenca linha a linha entre duas versoes, pela chave da tabela.
+
+    Args:
+        tabela: ex. 'fato_Aulas'
+        de: versao de origem
+        ate: versao de destino (padrao: a atual)
+
+    Returns:
+        dict {'de', 'ate', 'inseridos', 'alterados', 'removidos'} com listas
+        ordenadas de chaves (aula_id)
+
+    Raises:
+        KeyError se a tabela nao for versionada; FileNotFoundError se alguma
+        versao nao existir
+    """
+    chave = TABELAS_VERSIONADAS[tabela]
+    if ate is None:
+        ponteiro = versao_atual(tabela, diretorio)
+        if ponteiro is None:
+            raise FileNotFoundError(f"{tabela}: nenhuma versao publicada")
+        ate = ponteiro['versao']
+    antes = _ler_hashes(tabela, de, chave, diretorio)
+    depois = _ler_hashes(tabela, ate, chave, diretorio)
+    m = antes.merge(depois, on=chave, how='outer', suffixes=('_de', '_ate'), indicator=True)
+    alterado = (m['_merge'] == 'both') & (m[f'{COLUNA_HASH}_de'] != m[f'{COLUNA_HASH}_ate'])
+    return {
+        'de': int(de),
+        'ate': int(ate),
+        'inseridos': sorted(m.loc[m['_merge'] == 'right_only', chave].tolist()),
+        'alterados': sorted(m.loc[alterado, chave].tolist()),
+        'removidos': sorted(m.loc[m['_merge'] == 'left_only', chave].tolist()),
+    }
+
+
+# ========== FIXACAO POR EXECUCAO ==========
+
+def _sessao_streamlit():
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return st.session_state if get_script_run_ctx() is not None else None
+    except Exception:
+        return None
+
+
+def fixar_versoes():
+    """Fixa a versao atual de cada tabela versionada para esta execucao.
+
+    Chamar no inicio do script (Sistema_Pedagogico faz isso a cada rerun).
+    """
+    sessao = _sessao_streamlit()
+    fixadas = {}
+    for tabela in TABELAS_VERSIONADAS:
+        ponteiro = versao_atual(tabela)
+        fixadas[tabela] = ponteiro['versao'] if ponteiro else None
+    if sessao is not None:
+        sessao['_versoes_fixadas'] = fixadas
+    return fixadas
+
+
+def versao_fixada(tabela):
+    """Versao fixada para a execucao atual (ou a atual, fora do Streamlit)."""
+    sessao = _sessao_streamlit()
+    if sessao is not None:
+        fixadas = sessao.get('_versoes_fixadas')
+        if fixadas is not None and tabela in fixadas:
+            return fixadas[tabela]
+    ponteiro = versao_atual(tabela)
+    return ponteiro['versao'] if ponteiro else None